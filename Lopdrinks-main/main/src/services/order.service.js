@@ -3,6 +3,7 @@ import { ENDPOINTS } from '../api/endpoints';
 
 /**
  * Normalise any API response shape into a plain array.
+ * Paginated bodies nest the list as `data.items`.
  */
 const toArray = (raw) => {
   if (Array.isArray(raw)) return raw;
@@ -10,10 +11,23 @@ const toArray = (raw) => {
     for (const key of ['items', 'orders', 'data', 'results']) {
       if (Array.isArray(raw[key])) return raw[key];
     }
+    if (raw.data && typeof raw.data === 'object') return toArray(raw.data);
   }
   return [];
 };
 
+/**
+ * Normalise a paginated response into `{ items, nextCursor, total }`.
+ */
+const toPage = (raw) => {
+  const page = raw?.data && !Array.isArray(raw.data) ? raw.data : raw;
+  return {
+    items: toArray(raw),
+    nextCursor: page?.next_cursor ?? null,
+    total: page?.total ?? null,
+  };
+};
+
 const orderService = {
   /** @returns {Promise<Array>} */
   getAll: async () => {
@@ -21,6 +35,17 @@ const orderService = {
     return toArray(data);
   },
 
+  /**
+   * One page of orders, newest first. Pass the previous page's
+   * `nextCursor` as `after` to fetch the next one.
+   * @param {{ limit?: number, after?: string, status?: string }} params
+   * @returns {Promise<{ items: Array, nextCursor: string|null, total: number|null }>}
+   */
+  getPage: async (params = {}) => {
+    const { data } = await apiClient.get(ENDPOINTS.ORDERS, { params });
+    return toPage(data);
+  },
+
   /**
    * @param {number} limit
    * @returns {Promise<Array>}
@@ -12,7 +12,11 @@ from app.extensions import db, migrate, jwt, cors
 from app.logging.setup import configure_logging
 from app.exceptions.handlers import register_error_handlers
 from app.middleware.request_logger import register_request_hooks
+from app.middleware.stream_handoff import StreamHandoff
 from app.api import register_routes
+from app.cli import register_commands
+from app.services.listeners import register_order_listeners, register_order_relay
+from app.services.stream_hub import order_stream_hub
 
 
 def create_app(config_name: str | None = None) -> Flask:
@@ -45,8 +49,8 @@ def create_app(config_name: str | None = None) -> Flask:
             r"/*": {
                 "origins": app.config["ALLOWED_ORIGINS"],
                 "methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
-                "allow_headers": ["Content-Type", "Authorization"],
-                "expose_headers": ["Content-Type", "Authorization"],
+                "allow_headers": ["Content-Type", "Authorization", "Idempotency-Key"],
+                "expose_headers": ["Content-Type", "Authorization", "Idempotent-Replayed"],
                 "supports_credentials": False,
             }
         },
@@ -58,7 +62,18 @@ def create_app(config_name: str | None = None) -> Flask:
     os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
 
     # -- Import models so Flask-Migrate can detect them -----------------------
-    from app.models import user, recipe, order, brew_method, ingredient, recipe_ingredient  # noqa: F401
+    from app.models import (  # noqa: F401
+        user,
+        recipe,
+        order,
+        order_archive,
+        brew_method,
+        ingredient,
+        recipe_ingredient,
+        daily_recipe_sales,
+        daily_status_sales,
+        idempotency_key,
+    )
 
     # NOTE: db.create_all() is intentionally omitted here.
     # Schema is managed exclusively by Alembic migrations (flask db upgrade).
@@ -67,6 +82,11 @@ def create_app(config_name: str | None = None) -> Flask:
 
     # -- Middleware / request hooks -------------------------------------------
     register_request_hooks(app)
+    app.wsgi_app = StreamHandoff(app.wsgi_app, order_stream_hub)
+
+    # -- In-process read models fed by the order change bus -------------------
+    register_order_listeners()
+    register_order_relay(app)
 
     # -- Exception handlers ---------------------------------------------------
     register_error_handlers(app)
@@ -74,5 +94,8 @@ def create_app(config_name: str | None = None) -> Flask:
     # -- Routes ---------------------------------------------------------------
     register_routes(app)
 
+    # -- CLI commands (flask <group> <command>) -------------------------------
+    register_commands(app)
+
     app.logger.info("Application started successfully.")
     return app
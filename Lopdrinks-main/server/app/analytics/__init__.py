@@ -0,0 +1 @@
+# Analytics sub-package — NumPy-based, read-mostly computations over orders.
@@ -0,0 +1,179 @@
+"""
+"Customers also ordered": recipe co-occurrence over per-user histories.
+
+Two recipes co-occur once for every user who ordered both within the
+window. With X the (users x recipes) 0/1 basket matrix, the counts are
+C = XᵀX. X is very sparse — a user orders a handful of the menu — so it
+is only ever materialised a block of users at a time from its non-zero
+(user, recipe) pairs, and C (recipes x recipes, a few hundred squared)
+is accumulated block by block.
+
+The published result is a top-k list per recipe, so a lookup is a dict
+hit. New, deleted and cancelled orders update C and the affected top-k
+lists incrementally — each basket counts a user's orders per recipe, so a
+pair only leaves it with the user's last order of that recipe. The
+periodic full rebuild is what drops pairs that aged out of the window.
+"""
+
+import threading
+from typing import Iterable, Optional
+
+import numpy as np
+
+# Users per block when accumulating XᵀX; bounds the dense block's size.
+USER_BLOCK = 4096
+
+
+def co_occurrence_counts(
+    user_ids: np.ndarray, recipe_ids: np.ndarray, orders: Optional[np.ndarray] = None
+) -> tuple[np.ndarray, np.ndarray, dict[int, dict[int, int]]]:
+    """
+    Accumulate C = XᵀX from distinct (user_id, recipe_id) pairs, with
+    ``orders`` (default 1 each) the number of orders behind each pair.
+
+    Returns:
+        (recipes, counts, baskets): the sorted recipe ids indexing both axes
+        of ``counts`` (diagonal = users per recipe), and each user's
+        {recipe_id: orders} for later incremental updates.
+    """
+    recipes, cols = np.unique(recipe_ids, return_inverse=True)
+    users, rows = np.unique(user_ids, return_inverse=True)
+    counts = np.zeros((len(recipes), len(recipes)), dtype=np.int64)
+
+    order = np.argsort(rows, kind="stable")
+    rows, cols = rows[order], cols[order]
+    bounds = np.searchsorted(rows, np.arange(0, len(users) + USER_BLOCK, USER_BLOCK))
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        if lo == hi:
+            continue
+        block_rows = rows[lo:hi] - rows[lo]
+        block = np.zeros((block_rows[-1] + 1, len(recipes)), dtype=np.float32)
+        block[block_rows, cols[lo:hi]] = 1.0
+        counts += (block.T @ block).astype(np.int64)
+
+    if orders is None:
+        orders = np.ones(len(rows), dtype=np.int64)
+    else:
+        orders = orders[order]
+    baskets: dict[int, dict[int, int]] = {}
+    for user, recipe, n in zip(users[rows].tolist(), recipes[cols].tolist(), orders.tolist()):
+        basket = baskets.setdefault(user, {})
+        basket[recipe] = basket.get(recipe, 0) + n
+    return recipes, counts, baskets
+
+
+def top_k(row: np.ndarray, k: int, exclude: int) -> list[tuple[int, int]]:
+    """(column, count) of the k largest positive entries, ties by column."""
+    row = row.copy()
+    row[exclude] = 0
+    k = min(k, int(np.count_nonzero(row > 0)))
+    if k == 0:
+        return []
+    candidates = np.argpartition(-row, k - 1)[:k]
+    # lexsort's last key is primary: count descending, then column.
+    ranked = candidates[np.lexsort((candidates, -row[candidates]))]
+    return [(int(c), int(row[c])) for c in ranked]
+
+
+class CoOccurrenceIndex:
+    """Per-recipe top-k co-occurrence lists, updated as orders arrive."""
+
+    def __init__(self, k: int = 20) -> None:
+        self.k = k
+        self._lock = threading.Lock()
+        self._position: dict[int, int] = {}
+        self._recipes: list[int] = []
+        self._counts = np.zeros((0, 0), dtype=np.int64)
+        self._baskets: dict[int, dict[int, int]] = {}
+        self._top: dict[int, list[tuple[int, int]]] = {}
+        self.built_at: Optional[float] = None
+        # Orders placed before this (epoch) aren't in the counts.
+        self.since: float = float("-inf")
+
+    def rebuild(
+        self,
+        pairs: Iterable[tuple[np.ndarray, np.ndarray, np.ndarray]],
+        now: float,
+        since: float = float("-inf"),
+    ) -> None:
+        """
+        Replace the index with one built from batches of (user_ids,
+        recipe_ids, orders) covering the orders placed from ``since``.
+        """
+        batches = list(pairs)
+        empty = np.zeros(0, np.int64)
+        users, recipes, orders = (
+            np.concatenate([b[i] for b in batches] or [empty]) for i in range(3)
+        )
+        ids, counts, baskets = co_occurrence_counts(users, recipes, orders)
+        ids = ids.tolist()
+        top = {
+            recipe: self._named(top_k(counts[i], self.k, i), ids)
+            for i, recipe in enumerate(ids)
+        }
+        with self._lock:
+            self._recipes = ids
+            self._position = {recipe: i for i, recipe in enumerate(ids)}
+            self._counts = counts
+            self._baskets = baskets
+            self._top = top
+            self.built_at = now
+            self.since = since
+
+    def observe(self, user_id: int, recipe_id: int) -> None:
+        """Fold in one new order: O(basket) count updates + top-k refreshes."""
+        with self._lock:
+            basket = self._baskets.setdefault(user_id, {})
+            basket[recipe_id] = basket.get(recipe_id, 0) + 1
+            if basket[recipe_id] == 1:
+                i = self._index_of(recipe_id)
+                self._shift(i, [self._position[r] for r in basket if r != recipe_id], 1)
+
+    def forget(self, user_id: int, recipe_id: int, ordered_at: float) -> None:
+        """
+        Take back one order placed at epoch ``ordered_at`` (deleted or
+        cancelled); the pair leaves the basket with the user's last such order.
+        """
+        with self._lock:
+            basket = self._baskets.get(user_id)
+            if ordered_at < self.since or not basket or recipe_id not in basket:
+                return  # never counted
+            basket[recipe_id] -= 1
+            if basket[recipe_id] > 0:
+                return
+            del basket[recipe_id]
+            others = [self._position[r] for r in basket]
+            self._shift(self._position[recipe_id], others, -1)
+
+    def also_ordered(self, recipe_id: int, k: int) -> tuple[int, list[tuple[int, int]]]:
+        """(users who ordered ``recipe_id``, its top-k (recipe_id, count) list)."""
+        with self._lock:
+            i = self._position.get(recipe_id)
+            if i is None:
+                return 0, []
+            return int(self._counts[i, i]), self._top.get(recipe_id, [])[:k]
+
+    def _shift(self, i: int, others: list[int], delta: int) -> None:
+        """Add ``delta`` to recipe ``i``'s user count and its pairs with ``others``."""
+        self._counts[i, i] += delta
+        if not others:
+            return
+        self._counts[i, others] += delta
+        self._counts[others, i] += delta
+        for j in [i, *others]:
+            self._top[self._recipes[j]] = self._named(
+                top_k(self._counts[j], self.k, j), self._recipes
+            )
+
+    def _index_of(self, recipe_id: int) -> int:
+        i = self._position.get(recipe_id)
+        if i is None:
+            i = len(self._recipes)
+            self._recipes.append(recipe_id)
+            self._position[recipe_id] = i
+            self._counts = np.pad(self._counts, ((0, 1), (0, 1)))
+        return i
+
+    @staticmethod
+    def _named(ranked: list[tuple[int, int]], ids: list[int]) -> list[tuple[int, int]]:
+        return [(ids[c], count) for c, count in ranked]
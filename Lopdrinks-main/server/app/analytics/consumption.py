@@ -0,0 +1,76 @@
+"""
+Ingredient consumption as a matrix product.
+
+    consumption (days x ingredients) = sold (days x recipes) @ BOM (recipes x ingredients)
+
+``sold`` comes from the daily recipe rollups and the bill of materials
+from the parsed ``recipe_ingredient.amount`` / ``unit`` columns. An
+ingredient used in different units (ml in one recipe, tsp in another) gets
+one column per unit rather than a guessed conversion.
+"""
+
+from typing import Iterable
+
+import numpy as np
+
+
+def bill_of_materials(
+    lines: Iterable[tuple[int, int, str, float, str]],
+) -> tuple[np.ndarray, list[tuple[int, str, str]], np.ndarray]:
+    """
+    Build the recipe x ingredient-unit matrix from parsed recipe lines.
+
+    Args:
+        lines: (recipe_id, ingredient_id, ingredient_name, amount, unit);
+               repeated lines for the same recipe and ingredient add up.
+
+    Returns:
+        (recipe_ids, columns, bom): sorted recipe ids (the row axis), one
+        (ingredient_id, name, unit) per column, and the float64 matrix.
+    """
+    lines = list(lines)
+    if not lines:
+        return np.zeros(0, dtype=np.int64), [], np.zeros((0, 0))
+
+    recipe_id, ingredient_id, names, amount, unit = zip(*lines)
+    recipe_ids, rows = np.unique(np.array(recipe_id, dtype=np.int64), return_inverse=True)
+
+    keys = sorted(set(zip(ingredient_id, unit)))
+    column_of = {key: i for i, key in enumerate(keys)}
+    name_of = dict(zip(ingredient_id, names))
+    cols = np.array([column_of[key] for key in zip(ingredient_id, unit)], dtype=np.int64)
+
+    bom = np.zeros((len(recipe_ids), len(keys)))
+    np.add.at(bom, (rows, cols), np.array(amount, dtype=np.float64))
+    columns = [(ing_id, name_of[ing_id], u) for ing_id, u in keys]
+    return recipe_ids, columns, bom
+
+
+def consumption(
+    day_index: np.ndarray,
+    recipe_id: np.ndarray,
+    quantity: np.ndarray,
+    n_days: int,
+    recipe_ids: np.ndarray,
+    bom: np.ndarray,
+) -> np.ndarray:
+    """
+    Per-day ingredient consumption in one pass.
+
+    Args:
+        day_index: 0-based day of each sales row.
+        recipe_id: Recipe of each sales row.
+        quantity: Units sold in each row.
+        n_days: Length of the day axis.
+        recipe_ids, bom: Output of :func:`bill_of_materials`.
+
+    Returns:
+        (n_days, bom columns) float64 matrix. Sales of recipes with no
+        parsed ingredients contribute nothing.
+    """
+    sold = np.zeros((n_days, len(recipe_ids)))
+    if len(recipe_ids):
+        rows = np.minimum(np.searchsorted(recipe_ids, recipe_id), len(recipe_ids) - 1)
+        known = recipe_ids[rows] == recipe_id
+        np.add.at(sold, (day_index[known], rows[known]), quantity[known])
+    return sold @ bom
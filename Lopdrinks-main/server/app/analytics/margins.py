@@ -0,0 +1,129 @@
+"""
+Recipe cost and margin as a matrix-vector product.
+
+    recipe_cost (recipes) = BOM (recipes x ingredient-units) @ unit_cost (ingredient-units)
+
+The full product runs on (re)build. A single ingredient's cost change only
+touches its BOM column, so it is applied as ``cost += column * delta``:
+O(recipes), no re-query, no full product.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+
+class MarginIndex:
+    """Per-worker recipe costs and margins, patched in place on cost changes."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.built_at: float | None = None
+        # Epoch seconds at which a future-dated cost takes effect.
+        self.valid_until: float | None = None
+        self._recipe_ids = np.zeros(0, dtype=np.int64)
+        self._names: list[str] = []
+        self._prices = np.zeros(0)
+        self._bom = np.zeros((0, 0))
+        self._column_of: dict[tuple[int, str], int] = {}
+        self._unit_cost = np.zeros(0)
+        self._cost = np.zeros(0)
+        self._missing = np.zeros(0, dtype=np.int64)
+
+    def rebuild(
+        self,
+        recipes: list[tuple[int, str, float]],
+        lines: list[tuple[int, int, float, str]],
+        unparsed: dict[int, int],
+        costs: dict[tuple[int, str], float],
+        valid_until: float | None = None,
+    ) -> None:
+        """
+        Args:
+            recipes: (recipe_id, name, price) for every recipe.
+            lines: Parsed (recipe_id, ingredient_id, amount, unit) lines.
+            unparsed: {recipe_id: ingredient lines whose quantity did not parse}.
+            costs: {(ingredient_id, unit): cost per unit} currently in force.
+            valid_until: When the next known cost change takes effect.
+        """
+        recipes = sorted(recipes)
+        recipe_ids = np.array([r[0] for r in recipes], dtype=np.int64)
+        column_of = {key: i for i, key in enumerate(sorted({(l[1], l[3]) for l in lines}))}
+
+        bom = np.zeros((len(recipe_ids), len(column_of)))
+        if lines:
+            recipe_id, ingredient_id, amount, unit = zip(*lines)
+            rows = np.searchsorted(recipe_ids, np.array(recipe_id, dtype=np.int64))
+            known = rows < len(recipe_ids)
+            known[known] = recipe_ids[rows[known]] == np.array(recipe_id)[known]
+            cols = np.array([column_of[key] for key in zip(ingredient_id, unit)], dtype=np.int64)
+            np.add.at(bom, (rows[known], cols[known]), np.array(amount, dtype=np.float64)[known])
+
+        unit_cost = np.full(len(column_of), np.nan)
+        for key, i in column_of.items():
+            if key in costs:
+                unit_cost[i] = costs[key]
+
+        missing = (bom > 0) @ np.isnan(unit_cost).astype(np.int64)
+        missing += np.array([unparsed.get(int(r), 0) for r in recipe_ids], dtype=np.int64)
+
+        with self._lock:
+            self._recipe_ids = recipe_ids
+            self._names = [r[1] for r in recipes]
+            self._prices = np.array([r[2] for r in recipes], dtype=np.float64)
+            self._bom = bom
+            self._column_of = column_of
+            self._unit_cost = unit_cost
+            self._cost = bom @ np.nan_to_num(unit_cost)
+            self._missing = missing
+            self.valid_until = valid_until
+            self.built_at = time.time()
+
+    def set_cost(self, ingredient_id: int, unit: str, cost: float) -> int:
+        """Apply one ingredient-unit's new cost; returns the number of recipes it changed."""
+        with self._lock:
+            col = self._column_of.get((ingredient_id, unit))
+            if col is None:
+                return 0
+            column = self._bom[:, col]
+            old = self._unit_cost[col]
+            if np.isnan(old):
+                self._missing -= (column > 0).astype(np.int64)
+                old = 0.0
+            self._cost += column * (cost - old)
+            self._unit_cost[col] = cost
+            return int(np.count_nonzero(column))
+
+    def expire_at(self, at: float) -> None:
+        """Force a rebuild once a future-dated cost takes effect."""
+        with self._lock:
+            if self.valid_until is None or at < self.valid_until:
+                self.valid_until = at
+
+    def lowest(self, k: int) -> list[dict]:
+        """The ``k`` priced recipes with the lowest margin %, lowest first."""
+        with self._lock:
+            priced = np.flatnonzero(self._prices > 0)
+            cost = self._cost[priced]
+            price = self._prices[priced]
+            margin = price - cost
+            pct = margin / price * 100
+            k = min(k, len(priced))
+            if k == 0:
+                return []
+            top = np.argpartition(pct, k - 1)[:k] if k < len(priced) else np.arange(k)
+            top = top[np.lexsort((self._recipe_ids[priced][top], pct[top]))]
+            return [
+                {
+                    "recipe_id": int(self._recipe_ids[priced[i]]),
+                    "recipe_name": self._names[priced[i]],
+                    "price": round(float(price[i]), 2),
+                    "cost": round(float(cost[i]), 4),
+                    "margin": round(float(margin[i]), 4),
+                    "margin_pct": round(float(pct[i]), 2),
+                    # Lines without a cost (or a parsed amount) count as free.
+                    "missing_costs": int(self._missing[priced[i]]),
+                }
+                for i in top
+            ]
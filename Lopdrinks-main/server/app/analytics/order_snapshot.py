@@ -0,0 +1,211 @@
+"""
+Columnar, memory-mapped snapshot of the order table.
+
+The exporter streams orders out of the database once and writes each
+column as a standalone ``.npy`` file:
+
+    <ANALYTICS_DIR>/orders/<version>/
+        ordered_at.npy      int64   epoch seconds (UTC)
+        recipe_id.npy       int32
+        user_id.npy         int32
+        quantity.npy        int32
+        unit_price.npy      float64
+        status.npy          uint8   index into OrderStatus.ALL
+        recipe_category.npy int32   lookup: recipe_id -> category_id (-1 = none)
+        manifest.json
+    <ANALYTICS_DIR>/orders/CURRENT  name of the live version directory
+
+Readers open the columns with ``mmap_mode="r"``, so every worker process
+on the host shares the same page-cache pages and nothing is copied onto
+the Python heap. Publishing a new version is an atomic rename of CURRENT;
+readers pick it up on their next call.
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from app.constants.order_status import OrderStatus
+
+logger = logging.getLogger(__name__)
+
+COLUMNS: dict[str, np.dtype] = {
+    "ordered_at": np.dtype(np.int64),
+    "recipe_id": np.dtype(np.int32),
+    "user_id": np.dtype(np.int32),
+    "quantity": np.dtype(np.int32),
+    "unit_price": np.dtype(np.float64),
+    "status": np.dtype(np.uint8),
+}
+
+STATUS_CODES: dict[str, int] = {s: i for i, s in enumerate(OrderStatus.ALL)}
+UNKNOWN_STATUS = 255
+
+_SNAPSHOT_SUBDIR = "orders"
+_KEEP_VERSIONS = 2
+
+
+def _root(directory: str) -> str:
+    return os.path.join(directory, _SNAPSHOT_SUBDIR)
+
+
+def to_epoch_seconds(values: list[datetime]) -> np.ndarray:
+    """Vectorised naive-UTC datetime -> int64 epoch seconds."""
+    return np.array(values, dtype="datetime64[s]").astype(np.int64)
+
+
+def export_order_snapshot(
+    directory: str,
+    total_rows: int,
+    batches,
+    recipe_categories: dict[int, int | None],
+) -> dict:
+    """
+    Write a new snapshot version and make it current.
+
+    Args:
+        directory: ANALYTICS_DIR.
+        total_rows: Number of rows ``batches`` will yield (pre-sizes the files).
+        batches: Iterable of row batches; each row is
+                 (ordered_at, recipe_id, user_id, quantity, unit_price, status).
+        recipe_categories: {recipe_id: category_id or None}.
+
+    Returns:
+        The manifest written alongside the columns.
+    """
+    root = _root(directory)
+    version = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    target = os.path.join(root, version)
+    os.makedirs(target, exist_ok=True)
+
+    columns = {
+        name: np.lib.format.open_memmap(
+            os.path.join(target, f"{name}.npy"), mode="w+", dtype=dtype, shape=(total_rows,)
+        )
+        for name, dtype in COLUMNS.items()
+    }
+
+    offset = 0
+    for batch in batches:
+        if not batch:
+            continue
+        end = offset + len(batch)
+        if end > total_rows:
+            raise RuntimeError("Snapshot source yielded more rows than counted.")
+        ordered_at, recipe_id, user_id, quantity, unit_price, status = zip(*batch)
+        columns["ordered_at"][offset:end] = to_epoch_seconds(ordered_at)
+        columns["recipe_id"][offset:end] = recipe_id
+        columns["user_id"][offset:end] = user_id
+        columns["quantity"][offset:end] = quantity
+        columns["unit_price"][offset:end] = unit_price
+        columns["status"][offset:end] = [
+            STATUS_CODES.get(s, UNKNOWN_STATUS) for s in status
+        ]
+        offset = end
+        logger.debug("Snapshot export: %d/%d rows written", offset, total_rows)
+
+    for col in columns.values():
+        col.flush()
+    del columns
+
+    size = max(recipe_categories, default=0) + 1
+    lookup = np.full(size, -1, dtype=np.int32)
+    for recipe_id, category_id in recipe_categories.items():
+        if category_id is not None:
+            lookup[recipe_id] = category_id
+    np.save(os.path.join(target, "recipe_category.npy"), lookup)
+
+    manifest = {
+        "version": version,
+        # Rows deleted between the count and the stream leave a short tail.
+        "rows": offset,
+        "created_at": datetime.utcnow().isoformat(),
+        "statuses": list(OrderStatus.ALL),
+    }
+    with open(os.path.join(target, "manifest.json"), "w") as fh:
+        json.dump(manifest, fh)
+
+    publish_version(root, version, keep=_KEEP_VERSIONS)
+    logger.info("Order snapshot %s published: %d rows", version, offset)
+    return manifest
+
+
+def publish_version(root: str, version: str, keep: int = _KEEP_VERSIONS) -> None:
+    """Atomically point ``root/CURRENT`` at ``version`` and drop older versions."""
+    pointer_tmp = os.path.join(root, "CURRENT.tmp")
+    with open(pointer_tmp, "w") as fh:
+        fh.write(version)
+    os.replace(pointer_tmp, os.path.join(root, "CURRENT"))
+    _prune_old_versions(root, keep=keep)
+
+
+def read_current_version(root: str) -> str | None:
+    """The version named by ``root/CURRENT``, or None if nothing is published."""
+    try:
+        with open(os.path.join(root, "CURRENT")) as fh:
+            return fh.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def _prune_old_versions(root: str, keep: int) -> None:
+    # Unlinking files that a reader still has mapped is safe on POSIX;
+    # the pages stay valid until that reader drops its mapping.
+    versions = sorted(
+        d for d in os.listdir(root) if os.path.isdir(os.path.join(root, d))
+    )
+    for stale in versions[:-keep]:
+        shutil.rmtree(os.path.join(root, stale), ignore_errors=True)
+
+
+class OrderSnapshot:
+    """Read-only, memory-mapped view over one snapshot version."""
+
+    def __init__(self, path: str) -> None:
+        with open(os.path.join(path, "manifest.json")) as fh:
+            self.manifest: dict = json.load(fh)
+        rows = self.manifest["rows"]
+        for name in COLUMNS:
+            column = np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+            setattr(self, name, column[:rows])
+        self.recipe_category: np.ndarray = np.load(
+            os.path.join(path, "recipe_category.npy"), mmap_mode="r"
+        )
+
+    @property
+    def version(self) -> str:
+        return self.manifest["version"]
+
+    def __len__(self) -> int:
+        return self.manifest["rows"]
+
+
+_current: OrderSnapshot | None = None
+_current_lock = threading.Lock()
+
+
+def load_current_snapshot(directory: str) -> OrderSnapshot | None:
+    """
+    Return the live snapshot, re-mapping only when CURRENT has changed.
+
+    Returns None if no snapshot has been exported yet.
+    """
+    global _current
+    root = _root(directory)
+    version = read_current_version(root)
+    if version is None:
+        return None
+
+    snapshot = _current
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+    with _current_lock:
+        if _current is None or _current.version != version:
+            _current = OrderSnapshot(os.path.join(root, version))
+            logger.info("Mapped order snapshot %s (%d rows)", version, len(_current))
+        return _current
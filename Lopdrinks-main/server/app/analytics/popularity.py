@@ -0,0 +1,139 @@
+"""
+Time-decayed recipe popularity, maintained incrementally in memory.
+
+Scores use *forward* exponential decay: an order of quantity q placed at
+time t adds ``q * exp(rate * (t - landmark))`` to its recipe's score.
+Because every score decays at the same rate, adding an order never
+changes the relative order of the other recipes — so a sorted ranking can
+be updated with one remove + insert, and the top k is a slice, O(k).
+A score read "now" is the stored value times ``exp(-rate * (now -
+landmark))``: roughly the quantity ordered in the last half-life or so,
+with older orders fading out smoothly.
+
+The landmark is moved forward (rescaling every score) long before the
+exponent could overflow.
+"""
+
+import math
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Callable, Iterable, Optional
+
+# Rebase once the newest weights reach 2**RENORMALISE_AFTER_HALF_LIVES.
+RENORMALISE_AFTER_HALF_LIVES = 64
+
+
+class DecayedLeaderboard:
+    """Forward-decayed scores per item with an always-sorted ranking."""
+
+    def __init__(self, half_life_seconds: float, now: Optional[float] = None) -> None:
+        self.half_life = half_life_seconds
+        self._rate = math.log(2) / half_life_seconds
+        self._landmark = time.time() if now is None else now
+        self._scores: dict[int, float] = {}
+        # Ascending (-score, item_id): best first, ties by lowest id.
+        self._ranking: list[tuple[float, int]] = []
+
+    def add(self, item_id: int, amount: float, at: float) -> None:
+        """Add ``amount`` observed at epoch time ``at`` (negative to retract)."""
+        if at - self._landmark > RENORMALISE_AFTER_HALF_LIVES * self.half_life:
+            self._rebase(at)
+        old = self._scores.get(item_id)
+        if old is not None:
+            del self._ranking[bisect_left(self._ranking, (-old, item_id))]
+        new = (old or 0.0) + amount * math.exp(self._rate * (at - self._landmark))
+        if new > 1e-9:
+            self._scores[item_id] = new
+            insort(self._ranking, (-new, item_id))
+        else:
+            self._scores.pop(item_id, None)
+
+    def top(self, k: int, now: Optional[float] = None) -> list[tuple[int, float]]:
+        """The k highest-scoring items as (item_id, score decayed to ``now``)."""
+        now = time.time() if now is None else now
+        scale = math.exp(-self._rate * (now - self._landmark))
+        return [(item_id, -neg * scale) for neg, item_id in self._ranking[:k]]
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def _rebase(self, landmark: float) -> None:
+        scale = math.exp(-self._rate * (landmark - self._landmark))
+        self._scores = {i: s * scale for i, s in self._scores.items()}
+        self._ranking = [(neg * scale, i) for neg, i in self._ranking]
+        self._landmark = landmark
+
+
+class PopularityIndex:
+    """
+    One DecayedLeaderboard per named window, safe to update from the
+    change-bus dispatcher thread while request threads read it.
+
+    Adds may carry a ``version`` — the rollup watermark their change wrote
+    — so a rebuild from the rollups neither double counts changes it read
+    nor loses the ones that arrived while it was reading.
+    """
+
+    def __init__(self, windows: dict[str, float]) -> None:
+        self._windows = windows
+        self._lock = threading.Lock()
+        self._boards = {name: DecayedLeaderboard(h) for name, h in windows.items()}
+        self.built_at: Optional[float] = None
+        # Watermark of the rollups the boards were built from.
+        self.version: Optional[float] = None
+        # Adds seen while a rebuild is loading, replayed onto its boards.
+        self._pending: Optional[list[tuple[int, float, float, Optional[float]]]] = None
+
+    @property
+    def windows(self) -> tuple[str, ...]:
+        return tuple(self._windows)
+
+    def add(
+        self, recipe_id: int, quantity: float, at: float, version: Optional[float] = None
+    ) -> None:
+        with self._lock:
+            if version is not None and self.version is not None and version <= self.version:
+                return  # already in the rollups the boards were built from
+            if self._pending is not None:
+                self._pending.append((recipe_id, quantity, at, version))
+            for board in self._boards.values():
+                board.add(recipe_id, quantity, at)
+
+    def rebuild(
+        self,
+        load: Callable[[], tuple[Iterable[tuple[int, float, float]], Optional[float]]],
+        now: float,
+    ) -> None:
+        """
+        Replace every board with fresh ones fed the ``(recipe_id, quantity,
+        at)`` entries ``load()`` returns, together with the version they
+        reflect. Adds made while ``load`` runs are replayed onto the new
+        boards if newer than that version; later adds at or below it are
+        skipped. Callers serialise rebuilds.
+        """
+        with self._lock:
+            self._pending = []
+        try:
+            entries, version = load()
+            boards = {
+                name: DecayedLeaderboard(h, now=now) for name, h in self._windows.items()
+            }
+            for recipe_id, quantity, at in entries:
+                for board in boards.values():
+                    board.add(recipe_id, quantity, at)
+            with self._lock:
+                for recipe_id, quantity, at, seen in self._pending:
+                    if seen is None or version is None or seen > version:
+                        for board in boards.values():
+                            board.add(recipe_id, quantity, at)
+                self._boards = boards
+                self.built_at = now
+                self.version = version
+        finally:
+            with self._lock:
+                self._pending = None
+
+    def top(self, window: str, k: int, now: Optional[float] = None) -> list[tuple[int, float]]:
+        with self._lock:
+            return self._boards[window].top(k, now)
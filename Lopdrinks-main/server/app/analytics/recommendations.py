@@ -0,0 +1,255 @@
+"""
+Personalised recipe recommendations — implicit-feedback ALS, served from
+a precomputed in-memory table.
+
+Offline (``flask analytics recommend``):
+
+1. Each user's orders become an implicit-feedback matrix R (users x
+   recipes): quantity, decayed by age with a configurable half-life.
+2. R is factorised with alternating least squares for implicit feedback
+   (Hu, Koren & Volinsky): preference p = [r > 0], confidence
+   c = 1 + alpha * r. Each half-step solves one small f x f system per
+   user (or recipe); a block of them is assembled and solved at once.
+3. Every user's top-k unseen recipes are written out, with the global
+   popularity ranking for cold users and the recipe display fields:
+
+    <ANALYTICS_DIR>/recommendations/<version>/
+        users.npy     int64  sorted user ids
+        table.npy     int32  (users, k) recipe ids, -1 = empty slot
+        popular.npy   int32  recipe ids, most popular first (cold users)
+        recipes.json  {recipe_id: {name, price, image_url}}
+        manifest.json
+    <ANALYTICS_DIR>/recommendations/CURRENT
+
+Online, each worker loads the current version into memory once; a lookup
+is a binary search over ``users`` and a row slice, with no database.
+"""
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from app.analytics.order_snapshot import publish_version, read_current_version
+
+logger = logging.getLogger(__name__)
+
+_SUBDIR = "recommendations"
+
+# Rows solved / scored per vectorised block, and nonzeros per outer-product chunk.
+SOLVE_BLOCK = 1024
+SCORE_BLOCK = 4096
+OUTER_CHUNK = 8192
+
+
+def _root(directory: str) -> str:
+    return os.path.join(directory, _SUBDIR)
+
+
+def implicit_feedback(
+    user_id: np.ndarray,
+    recipe_id: np.ndarray,
+    quantity: np.ndarray,
+    ordered_at: np.ndarray,
+    now: float,
+    half_life_days: float,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Collapse order rows into a sparse, recency-decayed user x recipe matrix.
+
+    Returns:
+        (users, recipes, rows, cols, values): the sorted id axes and the
+        COO entries, one per (user, recipe) pair, rows sorted.
+    """
+    users, u = np.unique(user_id, return_inverse=True)
+    recipes, r = np.unique(recipe_id, return_inverse=True)
+    age_days = np.maximum(now - ordered_at, 0) / 86_400
+    weight = quantity * np.exp2(-age_days / half_life_days)
+
+    pairs, inverse = np.unique(u.astype(np.int64) * len(recipes) + r, return_inverse=True)
+    values = np.bincount(inverse, weights=weight, minlength=len(pairs))
+    return users, recipes, pairs // len(recipes), pairs % len(recipes), values
+
+
+def _solve_side(
+    fixed: np.ndarray,
+    rows: np.ndarray,
+    cols: np.ndarray,
+    confidence: np.ndarray,
+    n_rows: int,
+    regularization: float,
+) -> np.ndarray:
+    """
+    One ALS half-step: for every row x_u minimise against the ``fixed`` factors
+
+        (YᵀY + Yᵀ(C_u - I)Y + λI) x_u = YᵀC_u p_u
+
+    Entries must be sorted by ``rows``.
+    """
+    factors = fixed.shape[1]
+    gram = fixed.T @ fixed + regularization * np.eye(factors)
+    solved = np.zeros((n_rows, factors))
+    bounds = np.searchsorted(rows, np.arange(0, n_rows + SOLVE_BLOCK, SOLVE_BLOCK))
+    for block, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:])):
+        first = block * SOLVE_BLOCK
+        size = min(SOLVE_BLOCK, n_rows - first)
+        if size <= 0:
+            break
+        a = np.broadcast_to(gram, (size, factors, factors)).copy()
+        b = np.zeros((size, factors))
+        # Outer products are f x f each, so bound how many exist at once.
+        for start in range(lo, hi, OUTER_CHUNK):
+            stop = min(start + OUTER_CHUNK, hi)
+            local = rows[start:stop] - first
+            y = fixed[cols[start:stop]]
+            c = confidence[start:stop]
+            np.add.at(a, local, (c - 1)[:, None, None] * y[:, :, None] * y[:, None, :])
+            np.add.at(b, local, c[:, None] * y)
+        solved[first:first + size] = np.linalg.solve(a, b[:, :, None])[:, :, 0]
+    return solved
+
+
+def als_implicit(
+    rows: np.ndarray,
+    cols: np.ndarray,
+    values: np.ndarray,
+    shape: tuple[int, int],
+    factors: int = 16,
+    regularization: float = 0.1,
+    alpha: float = 20.0,
+    iterations: int = 10,
+    seed: int = 0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Factorise the implicit-feedback matrix; returns (user, recipe) factors."""
+    n_users, n_recipes = shape
+    rng = np.random.default_rng(seed)
+    user_f = rng.normal(scale=0.01, size=(n_users, factors))
+    recipe_f = rng.normal(scale=0.01, size=(n_recipes, factors))
+    confidence = 1.0 + alpha * values
+
+    by_recipe = np.lexsort((rows, cols))
+    t_rows, t_cols, t_conf = cols[by_recipe], rows[by_recipe], confidence[by_recipe]
+    for _ in range(iterations):
+        user_f = _solve_side(recipe_f, rows, cols, confidence, n_users, regularization)
+        recipe_f = _solve_side(user_f, t_rows, t_cols, t_conf, n_recipes, regularization)
+    return user_f, recipe_f
+
+
+def top_unseen(
+    user_f: np.ndarray,
+    recipe_f: np.ndarray,
+    rows: np.ndarray,
+    cols: np.ndarray,
+    popular: np.ndarray,
+    k: int,
+) -> np.ndarray:
+    """
+    Each user's k best-scoring recipes they have not ordered, as recipe
+    indices; ties go to the more popular recipe (``popular`` lists
+    indices, best first). Slots beyond the unseen recipes are -1.
+    """
+    n_users, n_recipes = len(user_f), len(recipe_f)
+    k = min(k, n_recipes)
+    table = np.full((n_users, k), -1, dtype=np.int64)
+    rank = np.full(n_recipes, n_recipes, dtype=np.int64)
+    rank[popular] = np.arange(len(popular))
+
+    bounds = np.searchsorted(rows, np.arange(0, n_users + SCORE_BLOCK, SCORE_BLOCK))
+    for block, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:])):
+        first = block * SCORE_BLOCK
+        size = min(SCORE_BLOCK, n_users - first)
+        if size <= 0:
+            break
+        seen = np.zeros((size, n_recipes), dtype=bool)
+        seen[rows[lo:hi] - first, cols[lo:hi]] = True
+        scores = np.where(seen, -np.inf, user_f[first:first + size] @ recipe_f.T)
+        # lexsort's last key is primary: score descending, then popularity.
+        order = np.lexsort((np.broadcast_to(rank, scores.shape), -scores), axis=1)[:, :k]
+        table[first:first + size] = np.where(
+            np.take_along_axis(seen, order, axis=1), -1, order
+        )
+    return table
+
+
+def publish_recommendations(
+    directory: str,
+    users: np.ndarray,
+    table: np.ndarray,
+    popular: np.ndarray,
+    recipes: dict[int, dict],
+    stats: dict,
+) -> dict:
+    """Write a new recommendations version and make it current."""
+    root = _root(directory)
+    version = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    target = os.path.join(root, version)
+    os.makedirs(target, exist_ok=True)
+
+    np.save(os.path.join(target, "users.npy"), users.astype(np.int64))
+    np.save(os.path.join(target, "table.npy"), table.astype(np.int32))
+    np.save(os.path.join(target, "popular.npy"), popular.astype(np.int32))
+    with open(os.path.join(target, "recipes.json"), "w") as fh:
+        json.dump({str(k): v for k, v in recipes.items()}, fh)
+    manifest = {
+        "version": version,
+        "users": int(len(users)),
+        "k": int(table.shape[1]) if table.ndim == 2 else 0,
+        "created_at": datetime.utcnow().isoformat(),
+        **stats,
+    }
+    with open(os.path.join(target, "manifest.json"), "w") as fh:
+        json.dump(manifest, fh)
+
+    publish_version(root, version)
+    logger.info("Recommendations %s published: %d users", version, len(users))
+    return manifest
+
+
+class RecommendationTable:
+    """One published version, held in memory for database-free lookups."""
+
+    def __init__(self, path: str) -> None:
+        with open(os.path.join(path, "manifest.json")) as fh:
+            self.manifest: dict = json.load(fh)
+        self.users: np.ndarray = np.load(os.path.join(path, "users.npy"))
+        self.table: np.ndarray = np.load(os.path.join(path, "table.npy"))
+        self.popular: np.ndarray = np.load(os.path.join(path, "popular.npy"))
+        with open(os.path.join(path, "recipes.json")) as fh:
+            self.recipes: dict[int, dict] = {int(k): v for k, v in json.load(fh).items()}
+
+    @property
+    def version(self) -> str:
+        return self.manifest["version"]
+
+    def lookup(self, user_id: int, k: int) -> tuple[str, list[int]]:
+        """(``"personal"`` | ``"popular"``, up to k recipe ids) for ``user_id``."""
+        i = int(np.searchsorted(self.users, user_id))
+        if i < len(self.users) and self.users[i] == user_id:
+            row = self.table[i, :k]
+            return "personal", row[row >= 0].tolist()
+        return "popular", self.popular[:k].tolist()
+
+
+_current: RecommendationTable | None = None
+_current_lock = threading.Lock()
+
+
+def load_current_recommendations(directory: str) -> RecommendationTable | None:
+    """The live table, reloaded only when CURRENT changes; None if never trained."""
+    global _current
+    root = _root(directory)
+    version = read_current_version(root)
+    if version is None:
+        return None
+
+    table = _current
+    if table is not None and table.version == version:
+        return table
+    with _current_lock:
+        if _current is None or _current.version != version:
+            _current = RecommendationTable(os.path.join(root, version))
+            logger.info("Loaded recommendations %s (%d users)", version, len(_current.users))
+        return _current
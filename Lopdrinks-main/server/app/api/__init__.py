@@ -19,6 +19,8 @@ def register_routes(app: Flask) -> None:
     from app.api.routes.upload_routes import upload_bp
     from app.api.routes.health_routes import health_bp
     from app.api.routes.category_routes import category_bp
+    from app.api.routes.analytics_routes import analytics_bp
+    from app.api.routes.me_routes import me_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(brew_method_bp)
@@ -28,5 +30,7 @@ def register_routes(app: Flask) -> None:
     app.register_blueprint(upload_bp)
     app.register_blueprint(health_bp)
     app.register_blueprint(category_bp)
+    app.register_blueprint(analytics_bp)
+    app.register_blueprint(me_bp)
 
     app.logger.info("All blueprints registered.")
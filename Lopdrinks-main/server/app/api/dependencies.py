@@ -7,24 +7,66 @@ mock here and every controller using that service gets the mock — no
 changes required elsewhere (Dependency Inversion Principle).
 """
 
+import threading
+from typing import Callable
+
+from flask import current_app
+
 from app.repositories.user_repository import UserRepository
 from app.repositories.brew_method_repository import BrewMethodRepository
 from app.repositories.ingredient_repository import IngredientRepository
 from app.repositories.recipe_repository import RecipeRepository
 from app.repositories.order_repository import OrderRepository
 from app.repositories.category_repository import CategoryRepository
+from app.repositories.sales_rollup_repository import SalesRollupRepository
+from app.repositories.idempotency_repository import IdempotencyRepository
+from app.repositories.order_archive_repository import OrderArchiveRepository
+from app.repositories.user_summary_repository import UserSummaryRepository
+from app.repositories.stock_repository import StockRepository
+from app.repositories.pos_import_repository import PosImportRepository
 
 from app.services.auth_service import AuthService
+from app.services.password_hasher import PasswordHasher, get_hasher
 from app.services.brew_method_service import BrewMethodService
 from app.services.ingredient_service import IngredientService
 from app.services.recipe_service import RecipeService
 from app.services.order_service import OrderService
+from app.services.order_writer import GroupCommitWriter, get_writer
+from app.services.change_bus import order_change_bus
 from app.services.upload_service import UploadService
 from app.services.category_service import CategoryService
+from app.services.analytics_service import AnalyticsService
+from app.services.sales_service import SalesService
+from app.services.idempotency_service import IdempotencyService
+from app.services.order_export_service import OrderExportService
+from app.services.popularity_service import PopularityService, recipe_popularity
+from app.services.co_occurrence_service import CoOccurrenceService, recipe_co_occurrence
+from app.services.recommendation_service import RecommendationService
+from app.services.forecast_service import ForecastService
+from app.services.margin_service import MarginService, recipe_margins
+from app.services.user_summary_service import UserSummaryService
+from app.services.prep_queue_service import PrepQueueService, prep_queue
+from app.services.stock_service import StockService, recipe_availability
+from app.services.view_counter import ViewCounter, get_counter
+from app.services.pos_import_service import PosImportService
 
 
 def get_auth_service() -> AuthService:
-    return AuthService(user_repo=UserRepository())
+    return AuthService(user_repo=UserRepository(), hasher=get_password_hasher())
+
+
+def get_password_hasher() -> PasswordHasher:
+    """This worker's password hasher and its process pool."""
+    config = current_app.config
+    return get_hasher(
+        current_app._get_current_object(),
+        lambda: PasswordHasher(
+            method=config["PASSWORD_HASH_METHOD"],
+            workers=config["PASSWORD_HASH_WORKERS"],
+            max_pending=config["PASSWORD_HASH_MAX_PENDING"],
+            timeout=config["PASSWORD_HASH_TIMEOUT_SECONDS"],
+        ),
+    )
 
 
 def get_brew_method_service() -> BrewMethodService:
@@ -41,6 +83,8 @@ def get_recipe_service() -> RecipeService:
         brew_method_repo=BrewMethodRepository(),
         ingredient_repo=IngredientRepository(),
         category_repo=CategoryRepository(),
+        stock_service=get_stock_service(),
+        view_counter=get_view_counter(),
     )
 
 
@@ -49,6 +93,43 @@ def get_order_service() -> OrderService:
         order_repo=OrderRepository(),
         recipe_repo=RecipeRepository(),
         user_repo=UserRepository(),
+        rollup_repo=SalesRollupRepository(),
+        summary_repo=UserSummaryRepository(),
+        stock_repo=StockRepository(),
+        archive_repo=OrderArchiveRepository(),
+        order_writer=(
+            get_order_writer() if current_app.config["ORDER_GROUP_COMMIT"] else None
+        ),
+        change_bus=order_change_bus,
+        availability=recipe_availability,
+    )
+
+
+def get_order_writer() -> GroupCommitWriter:
+    """This worker's group-commit writer, flushing inside a fresh app context."""
+    app = current_app._get_current_object()
+
+    def flush(rows: list[dict]) -> list[int]:
+        with app.app_context():
+            service = OrderService(
+                order_repo=OrderRepository(),
+                recipe_repo=RecipeRepository(),
+                user_repo=UserRepository(),
+                rollup_repo=SalesRollupRepository(),
+                summary_repo=UserSummaryRepository(),
+                stock_repo=StockRepository(),
+                change_bus=order_change_bus,
+                availability=recipe_availability,
+            )
+            return service.insert_batch(rows)
+
+    return get_writer(
+        app,
+        lambda: GroupCommitWriter(
+            flush,
+            max_rows=app.config["ORDER_GROUP_COMMIT_MAX_ROWS"],
+            max_wait_ms=app.config["ORDER_GROUP_COMMIT_WAIT_MS"],
+        ),
     )
 
 
@@ -58,3 +139,129 @@ def get_upload_service() -> UploadService:
 
 def get_category_service() -> CategoryService:
     return CategoryService(repo=CategoryRepository())
+
+
+def get_analytics_service() -> AnalyticsService:
+    return AnalyticsService(
+        snapshot_dir=current_app.config["ANALYTICS_DIR"],
+        order_repo=OrderRepository(),
+        recipe_repo=RecipeRepository(),
+    )
+
+
+def get_sales_service() -> SalesService:
+    return SalesService(
+        rollup_repo=SalesRollupRepository(),
+        recipe_repo=RecipeRepository(),
+        view_counter=get_view_counter(),
+    )
+
+
+def get_view_counter() -> ViewCounter:
+    """This worker's recipe view counter, flushing inside a fresh app context."""
+    app = current_app._get_current_object()
+
+    def flush(counts: dict[int, int]) -> None:
+        with app.app_context():
+            SalesService(
+                rollup_repo=SalesRollupRepository(),
+                recipe_repo=RecipeRepository(),
+            ).record_views(counts)
+
+    return get_counter(
+        app, lambda: ViewCounter(flush, interval=app.config["VIEW_FLUSH_SECONDS"])
+    )
+
+
+def get_idempotency_service() -> IdempotencyService:
+    return IdempotencyService(repo=IdempotencyRepository())
+
+
+def get_order_export_service() -> OrderExportService:
+    return OrderExportService(order_repo=OrderRepository())
+
+
+def get_popularity_service() -> PopularityService:
+    return PopularityService(
+        index=recipe_popularity,
+        rollup_repo=SalesRollupRepository(),
+        recipe_repo=RecipeRepository(),
+        refresh_seconds=current_app.config["POPULARITY_REFRESH_SECONDS"],
+    )
+
+
+def get_co_occurrence_service() -> CoOccurrenceService:
+    app = current_app._get_current_object()
+
+    def run_in_background(job: Callable[[], None]) -> None:
+        def _run() -> None:
+            with app.app_context():
+                job()
+
+        threading.Thread(target=_run, name="co-occurrence-rebuild", daemon=True).start()
+
+    return CoOccurrenceService(
+        index=recipe_co_occurrence,
+        order_repo=OrderRepository(),
+        recipe_repo=RecipeRepository(),
+        window_days=app.config["CO_OCCURRENCE_WINDOW_DAYS"],
+        refresh_seconds=app.config["CO_OCCURRENCE_REFRESH_SECONDS"],
+        run_in_background=run_in_background,
+    )
+
+
+def get_recommendation_service() -> RecommendationService:
+    return RecommendationService(
+        snapshot_dir=current_app.config["ANALYTICS_DIR"],
+        recipe_repo=RecipeRepository(),
+    )
+
+
+def get_forecast_service() -> ForecastService:
+    return ForecastService(
+        rollup_repo=SalesRollupRepository(),
+        recipe_repo=RecipeRepository(),
+        history_days=current_app.config["FORECAST_HISTORY_DAYS"],
+        max_days=current_app.config["FORECAST_MAX_DAYS"],
+    )
+
+
+def get_margin_service() -> MarginService:
+    return MarginService(
+        index=recipe_margins,
+        ingredient_repo=IngredientRepository(),
+        recipe_repo=RecipeRepository(),
+        refresh_seconds=current_app.config["MARGIN_REFRESH_SECONDS"],
+    )
+
+
+def get_user_summary_service() -> UserSummaryService:
+    return UserSummaryService(summary_repo=UserSummaryRepository())
+
+
+def get_pos_import_service() -> PosImportService:
+    return PosImportService(
+        import_repo=PosImportRepository(),
+        sales_service=get_sales_service(),
+        summary_service=get_user_summary_service(),
+    )
+
+
+def get_prep_queue_service() -> PrepQueueService:
+    return PrepQueueService(
+        queue=prep_queue,
+        order_repo=OrderRepository(),
+        recipe_repo=RecipeRepository(),
+        stations=current_app.config["PREP_STATIONS"],
+        promise_minutes=current_app.config["PREP_PROMISE_MINUTES"],
+        refresh_seconds=current_app.config["PREP_QUEUE_REFRESH_SECONDS"],
+    )
+
+
+def get_stock_service() -> StockService:
+    return StockService(
+        index=recipe_availability,
+        stock_repo=StockRepository(),
+        ingredient_repo=IngredientRepository(),
+        refresh_seconds=current_app.config["STOCK_REFRESH_SECONDS"],
+    )
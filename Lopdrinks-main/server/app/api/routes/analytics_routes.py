@@ -0,0 +1,47 @@
+"""Analytics routes — URL binding only. No logic."""
+
+from flask import Blueprint
+from flask_jwt_extended import jwt_required
+
+from app.controllers.analytics_controller import (
+    get_revenue,
+    get_daily_sales,
+    get_recipe_sales,
+    get_status_sales,
+    get_recipe_conversion,
+    get_ingredient_consumption,
+    get_forecast,
+    get_lowest_margins,
+)
+from app.middleware.auth import require_role
+from app.constants.roles import Role
+
+analytics_bp = Blueprint("analytics", __name__)
+
+analytics_bp.get("/admin/analytics/revenue")(
+    jwt_required()(require_role(Role.ADMIN)(get_revenue))
+)
+
+# Rollup-backed dashboard aggregates
+analytics_bp.get("/admin/sales/daily")(
+    jwt_required()(require_role(Role.ADMIN)(get_daily_sales))
+)
+analytics_bp.get("/admin/sales/recipes")(
+    jwt_required()(require_role(Role.ADMIN)(get_recipe_sales))
+)
+analytics_bp.get("/admin/sales/statuses")(
+    jwt_required()(require_role(Role.ADMIN)(get_status_sales))
+)
+analytics_bp.get("/admin/sales/consumption")(
+    jwt_required()(require_role(Role.ADMIN)(get_ingredient_consumption))
+)
+
+analytics_bp.get("/admin/sales/conversion")(
+    jwt_required()(require_role(Role.ADMIN)(get_recipe_conversion))
+)
+analytics_bp.get("/admin/forecast")(
+    jwt_required()(require_role(Role.ADMIN)(get_forecast))
+)
+analytics_bp.get("/admin/margins")(
+    jwt_required()(require_role(Role.ADMIN)(get_lowest_margins))
+)
@@ -6,6 +6,7 @@ from flask_jwt_extended import jwt_required
 from app.controllers.brew_method_controller import (
     get_brew_methods,
     create_brew_method,
+    update_brew_method,
 )
 from app.middleware.auth import require_role
 from app.constants.roles import Role
@@ -17,3 +18,7 @@ brew_method_bp.get("/brew_methods/")(get_brew_methods)
 brew_method_bp.post("/brew_methods/")(
     jwt_required()(require_role(Role.ADMIN)(create_brew_method))
 )
+
+brew_method_bp.patch("/brew_methods/<int:brew_method_id>")(
+    jwt_required()(require_role(Role.ADMIN)(update_brew_method))
+)
@@ -6,6 +6,11 @@ from flask_jwt_extended import jwt_required
 from app.controllers.ingredient_controller import (
     get_ingredients,
     create_ingredient,
+    get_ingredient_costs,
+    create_ingredient_cost,
+    get_ingredient_stock,
+    set_ingredient_stock,
+    receive_ingredient_stock,
 )
 from app.middleware.auth import require_role
 from app.constants.roles import Role
@@ -17,3 +22,20 @@ ingredient_bp.get("/ingredients/")(get_ingredients)
 ingredient_bp.post("/ingredients/")(
     jwt_required()(require_role(Role.ADMIN)(create_ingredient))
 )
+
+ingredient_bp.get("/ingredients/<int:ingredient_id>/costs")(
+    jwt_required()(require_role(Role.ADMIN)(get_ingredient_costs))
+)
+ingredient_bp.post("/ingredients/<int:ingredient_id>/costs")(
+    jwt_required()(require_role(Role.ADMIN)(create_ingredient_cost))
+)
+
+ingredient_bp.get("/ingredients/<int:ingredient_id>/stock")(
+    jwt_required()(require_role(Role.ADMIN)(get_ingredient_stock))
+)
+ingredient_bp.put("/ingredients/<int:ingredient_id>/stock")(
+    jwt_required()(require_role(Role.ADMIN)(set_ingredient_stock))
+)
+ingredient_bp.post("/ingredients/<int:ingredient_id>/stock")(
+    jwt_required()(require_role(Role.ADMIN)(receive_ingredient_stock))
+)
@@ -0,0 +1,11 @@
+"""Current-user routes — URL binding only. No logic."""
+
+from flask import Blueprint
+from flask_jwt_extended import jwt_required
+
+from app.controllers.me_controller import get_my_recommendations, get_my_summary
+
+me_bp = Blueprint("me", __name__)
+
+me_bp.get("/me/recommendations")(jwt_required()(get_my_recommendations))
+me_bp.get("/me/summary")(jwt_required()(get_my_summary))
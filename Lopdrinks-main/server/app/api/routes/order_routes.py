@@ -6,15 +6,38 @@ from flask_jwt_extended import jwt_required
 from app.controllers.order_controller import (
     get_all_orders,
     get_order_by_id,
+    get_order_eta,
+    get_prep_queue,
+    stream_orders,
+    get_archived_orders,
+    export_orders,
     create_order,
+    checkout_cart,
     update_order,
+    bulk_update_orders,
     delete_order,
 )
+from app.middleware.auth import require_role
+from app.middleware.idempotency import idempotent
+from app.constants.roles import Role
 
 order_bp = Blueprint("orders", __name__)
 
 order_bp.get("/orders/")(jwt_required()(get_all_orders))
+order_bp.get("/orders/stream")(jwt_required()(stream_orders))
+order_bp.get("/orders/archive")(jwt_required()(get_archived_orders))
+order_bp.get("/orders/export")(
+    jwt_required()(require_role(Role.ADMIN)(export_orders))
+)
+order_bp.get("/orders/prep-queue")(
+    jwt_required()(require_role(Role.ADMIN)(get_prep_queue))
+)
 order_bp.get("/orders/<int:order_id>")(jwt_required()(get_order_by_id))
-order_bp.post("/orders/")(jwt_required()(create_order))
+order_bp.get("/orders/<int:order_id>/eta")(jwt_required()(get_order_eta))
+order_bp.post("/orders/")(jwt_required()(idempotent(create_order)))
+order_bp.post("/orders/cart")(jwt_required()(idempotent(checkout_cart)))
+order_bp.patch("/orders/bulk")(
+    jwt_required()(require_role(Role.ADMIN)(bulk_update_orders))
+)
 order_bp.patch("/orders/<int:order_id>")(jwt_required()(update_order))
 order_bp.delete("/orders/<int:order_id>")(jwt_required()(delete_order))
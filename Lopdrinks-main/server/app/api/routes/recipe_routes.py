@@ -6,6 +6,8 @@ from flask_jwt_extended import jwt_required
 from app.controllers.recipe_controller import (
     get_recipes,
     get_recipe_by_id,
+    get_popular_recipes,
+    get_also_ordered,
     get_recipes_by_category,
     create_recipe,
     update_recipe,
@@ -17,7 +19,9 @@ from app.constants.roles import Role
 recipe_bp = Blueprint("recipes", __name__)
 
 recipe_bp.get("/recipes/")(get_recipes)
+recipe_bp.get("/recipes/popular")(get_popular_recipes)
 recipe_bp.get("/recipes/<int:recipe_id>")(get_recipe_by_id)
+recipe_bp.get("/recipes/<int:recipe_id>/also_ordered")(get_also_ordered)
 recipe_bp.get("/recipes/category/<int:category_id>")(get_recipes_by_category)
 
 recipe_bp.post("/recipes/")(
@@ -0,0 +1,206 @@
+"""
+Flask CLI commands for operational jobs.
+
+Run with the app factory, e.g.:
+
+    flask --app run:app analytics export
+    flask --app run:app analytics export --interval 300   # keep refreshing
+    flask --app run:app analytics recommend               # nightly
+    flask --app run:app rollups rebuild
+    flask --app run:app rollups rebuild-summaries
+    flask --app run:app recipes parse-quantities
+    flask --app run:app idempotency purge
+    flask --app run:app orders archive          # nightly
+    flask --app run:app orders partitions       # monthly, PostgreSQL
+    flask --app run:app orders import-pos pos-2019.csv.gz
+
+Commands reuse the same services as the HTTP layer; they only add
+argument parsing and console output.
+"""
+
+import gzip
+import time
+
+import click
+from flask import Flask, current_app
+from flask.cli import AppGroup
+
+from app.api.dependencies import (
+    get_analytics_service,
+    get_idempotency_service,
+    get_order_service,
+    get_pos_import_service,
+    get_recipe_service,
+    get_recommendation_service,
+    get_sales_service,
+    get_user_summary_service,
+)
+from app.services.pos_import_service import FORMATS as POS_FORMATS
+
+analytics_cli = AppGroup("analytics", help="Columnar analytics snapshots.")
+rollups_cli = AppGroup("rollups", help="Daily sales rollup tables.")
+idempotency_cli = AppGroup("idempotency", help="Idempotency-Key storage.")
+orders_cli = AppGroup("orders", help="Order storage maintenance.")
+recipes_cli = AppGroup("recipes", help="Recipe data maintenance.")
+
+
+@analytics_cli.command("export")
+@click.option(
+    "--interval",
+    type=int,
+    default=0,
+    show_default=True,
+    help="Re-export every N seconds instead of exiting (0 = run once).",
+)
+@click.option("--batch-size", type=int, default=10_000, show_default=True)
+def export_snapshot(interval: int, batch_size: int) -> None:
+    """Export orders to memory-mapped columnar files."""
+    while True:
+        manifest = get_analytics_service().export_snapshot(batch_size=batch_size)
+        click.echo(f"Snapshot {manifest['version']}: {manifest['rows']} rows")
+        if interval <= 0:
+            return
+        time.sleep(interval)
+
+
+@analytics_cli.command("recommend")
+@click.option(
+    "--export/--no-export",
+    default=True,
+    show_default=True,
+    help="Export a fresh order snapshot before training.",
+)
+@click.option("--factors", type=int, default=16, show_default=True)
+@click.option("--iterations", type=int, default=10, show_default=True)
+@click.option(
+    "--half-life-days",
+    type=float,
+    default=60.0,
+    show_default=True,
+    help="Age at which an order counts half as much.",
+)
+def train_recommendations(
+    export: bool, factors: int, iterations: int, half_life_days: float
+) -> None:
+    """Train per-user recipe recommendations (ALS) and publish them."""
+    if export:
+        get_analytics_service().export_snapshot()
+    manifest = get_recommendation_service().train(
+        factors=factors, iterations=iterations, half_life_days=half_life_days
+    )
+    click.echo(
+        f"Recommendations {manifest['version']}: {manifest['users']} users, "
+        f"{manifest['pairs']} user/recipe pairs in {manifest['train_seconds']}s"
+    )
+
+
+@rollups_cli.command("rebuild")
+def rebuild_rollups() -> None:
+    """Recompute daily sales rollups from the order table."""
+    result = get_sales_service().rebuild()
+    click.echo(
+        f"Rebuilt rollups: {result['recipe_rows']} recipe rows, "
+        f"{result['status_rows']} status rows"
+    )
+
+
+@rollups_cli.command("rebuild-summaries")
+def rebuild_user_summaries() -> None:
+    """Recompute per-user order summaries from the order table."""
+    result = get_user_summary_service().rebuild()
+    click.echo(f"Rebuilt order summaries for {result['users']} users")
+
+
+@recipes_cli.command("parse-quantities")
+def parse_recipe_quantities() -> None:
+    """Parse ingredient quantity text into numeric amounts and units."""
+    result = get_recipe_service().parse_quantities()
+    click.echo(f"Parsed {result['lines']} ingredient lines")
+    for text in result["unparsed"]:
+        click.echo(f"  unparsed: {text!r}")
+
+
+@idempotency_cli.command("purge")
+def purge_idempotency_keys() -> None:
+    """Delete expired Idempotency-Key records."""
+    removed = get_idempotency_service().purge_expired()
+    click.echo(f"Purged {removed} expired idempotency keys")
+
+
+@orders_cli.command("archive")
+@click.option(
+    "--older-than-days",
+    type=int,
+    default=None,
+    help="Archive terminal orders older than this [default: ORDER_ARCHIVE_AFTER_DAYS].",
+)
+@click.option("--batch-size", type=int, default=5000, show_default=True)
+def archive_orders(older_than_days: int | None, batch_size: int) -> None:
+    """Move old Delivered/Cancelled orders to order_archive."""
+    result = get_order_service().archive_old_orders(
+        older_than_days=older_than_days or current_app.config["ORDER_ARCHIVE_AFTER_DAYS"],
+        batch_size=batch_size,
+    )
+    click.echo(f"Archived {result['archived']} orders placed before {result['cutoff']}")
+
+
+@orders_cli.command("partitions")
+@click.option("--months-ahead", type=int, default=3, show_default=True)
+def ensure_order_partitions(months_ahead: int) -> None:
+    """Create upcoming monthly order partitions (PostgreSQL)."""
+    created = get_order_service().ensure_partitions(months_ahead=months_ahead)
+    click.echo(f"Created partitions: {', '.join(created)}" if created else "Partitions up to date")
+
+
+@orders_cli.command("import-pos")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--format",
+    "fmt",
+    type=click.Choice(POS_FORMATS),
+    default=None,
+    help="Input format [default: from the file extension, .ndjson/.jsonl or csv].",
+)
+@click.option("--chunk-size", type=int, default=5000, show_default=True)
+@click.option(
+    "--defer-indexes/--keep-indexes",
+    default=True,
+    show_default=True,
+    help="Drop the order indexes during the load and rebuild them after.",
+)
+@click.option(
+    "--rebuild/--no-rebuild",
+    default=True,
+    show_default=True,
+    help="Rebuild sales rollups and user summaries after the load.",
+)
+def import_pos_history(
+    path: str, fmt: str | None, chunk_size: int, defer_indexes: bool, rebuild: bool
+) -> None:
+    """Bulk-load historical orders from a POS export (CSV/NDJSON, optionally .gz)."""
+    stem = path[:-3] if path.endswith(".gz") else path
+    fmt = fmt or ("ndjson" if stem.endswith((".ndjson", ".jsonl")) else "csv")
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8-sig", newline="") as lines:
+        result = get_pos_import_service().import_stream(
+            lines,
+            fmt=fmt,
+            chunk_size=chunk_size,
+            defer_indexes=defer_indexes,
+            rebuild=rebuild,
+        )
+    click.echo(
+        f"Read {result['read']} records: {result['imported']} imported, "
+        f"{result['duplicates']} duplicates skipped, {result['rejected']} rejected"
+    )
+    for reject in result["rejects"]:
+        click.echo(f"  line {reject['line']}: {reject['reason']}")
+
+
+def register_commands(app: Flask) -> None:
+    """Attach all CLI command groups to the Flask app."""
+    app.cli.add_command(analytics_cli)
+    app.cli.add_command(rollups_cli)
+    app.cli.add_command(idempotency_cli)
+    app.cli.add_command(orders_cli)
+    app.cli.add_command(recipes_cli)
@@ -17,12 +17,35 @@ load_dotenv()
 class BaseConfig:
     """Shared configuration inherited by all environments."""
 
+    # -- Request threads -------------------------------------------------------
+    # gunicorn --threads per worker; start.sh passes the same variable. Work
+    # that parks a thread is capped below it so one thread always stays free
+    # for short requests: in-flight password hashes get all but one.
+    WEB_THREADS: int = int(os.getenv("WEB_THREADS", "8"))
+    # Open SSE streams per worker. Under gunicorn they are served by one
+    # StreamHub thread, not request threads, so this bounds sockets only.
+    ORDER_STREAM_MAX_CLIENTS: int = int(os.getenv("ORDER_STREAM_MAX_CLIENTS", "500"))
+
     # -- Security --------------------------------------------------------------
     SECRET_KEY: str = os.getenv("SECRET_KEY", "change-me-in-production")
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "change-me-jwt-secret")
     # Non-expiring tokens keep existing frontend behaviour. Set a real delta
     # in production via JWT_ACCESS_TOKEN_EXPIRES env var.
     JWT_ACCESS_TOKEN_EXPIRES: bool = False
+    # werkzeug method string, e.g. "scrypt:16384:8:1" or "pbkdf2:sha256:600000".
+    # Changing it upgrades each stored hash at that user's next login.
+    PASSWORD_HASH_METHOD: str = os.getenv("PASSWORD_HASH_METHOD", "scrypt")
+    # Per-worker process pool for hashing; 0 hashes on the request thread.
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "1"))
+    # Hashes in flight per worker before logins get a 503. Each one holds a
+    # request thread while it waits; see "Request threads" below.
+    PASSWORD_HASH_MAX_PENDING: int = int(
+        os.getenv(
+            "PASSWORD_HASH_MAX_PENDING",
+            str(max(1, WEB_THREADS - 1)),
+        )
+    )
+    PASSWORD_HASH_TIMEOUT_SECONDS: float = float(os.getenv("PASSWORD_HASH_TIMEOUT_SECONDS", "5"))
 
     # -- Database --------------------------------------------------------------
     SQLALCHEMY_TRACK_MODIFICATIONS: bool = False
@@ -34,6 +57,42 @@ class BaseConfig:
     ALLOWED_EXTENSIONS: set[str] = {"png", "jpg", "jpeg", "gif"}
     MAX_CONTENT_LENGTH: int = 16 * 1024 * 1024  # 16 MB
 
+    # -- Analytics -------------------------------------------------------------
+    # Columnar order snapshots (memory-mapped .npy files) live here. Point it
+    # at a disk shared by all workers on the host so they share page cache.
+    ANALYTICS_DIR: str = os.getenv(
+        "ANALYTICS_DIR",
+        os.path.join(os.path.dirname(os.path.dirname(__file__)), "instance", "analytics"),
+    )
+
+    # -- Popularity leaderboard ------------------------------------------------
+    # Each worker re-syncs its in-memory board from the rollups this often.
+    POPULARITY_REFRESH_SECONDS: float = float(os.getenv("POPULARITY_REFRESH_SECONDS", "300"))
+    POPULARITY_DEFAULT_K: int = 10
+    POPULARITY_MAX_K: int = 50
+
+    # -- "Customers also ordered" ---------------------------------------------
+    # Orders older than this don't count towards co-occurrence.
+    CO_OCCURRENCE_WINDOW_DAYS: int = int(os.getenv("CO_OCCURRENCE_WINDOW_DAYS", "90"))
+    # Full rebuild cadence (background thread); new orders apply immediately.
+    CO_OCCURRENCE_REFRESH_SECONDS: float = float(
+        os.getenv("CO_OCCURRENCE_REFRESH_SECONDS", "3600")
+    )
+    CO_OCCURRENCE_DEFAULT_K: int = 5
+
+    # -- Recipe margins (GET /admin/margins) ----------------------------------
+    # Full re-sync cadence; costs recorded in this worker apply immediately.
+    MARGIN_REFRESH_SECONDS: float = float(os.getenv("MARGIN_REFRESH_SECONDS", "300"))
+    MARGIN_DEFAULT_K: int = 10
+    MARGIN_MAX_K: int = 100
+
+    # -- Demand forecast (GET /admin/forecast) --------------------------------
+    FORECAST_HISTORY_DAYS: int = int(os.getenv("FORECAST_HISTORY_DAYS", "56"))
+    FORECAST_MAX_DAYS: int = 28
+
+    # -- Personal recommendations (trained by `flask analytics recommend`) -----
+    RECOMMENDATIONS_DEFAULT_K: int = 5
+
     # -- CORS ------------------------------------------------------------------
     ALLOWED_ORIGINS: list[str] = os.getenv(
         "ALLOWED_ORIGINS",
@@ -48,6 +107,50 @@ class BaseConfig:
 
     # -- Pagination ------------------------------------------------------------
     DEFAULT_PAGE_LIMIT: int = 5
+    # Hard upper bound on any single page; larger requests are clamped.
+    MAX_PAGE_LIMIT: int = int(os.getenv("MAX_PAGE_LIMIT", "100"))
+
+    # -- Orders ----------------------------------------------------------------
+    MAX_CART_LINES: int = 50
+    MAX_BULK_IDS: int = 1000
+    # Group commit: batch concurrent POST /orders/ inserts into one
+    # transaction per window (see app/services/order_writer.py).
+    ORDER_GROUP_COMMIT: bool = os.getenv("ORDER_GROUP_COMMIT", "").lower() in ("1", "true", "yes")
+    ORDER_GROUP_COMMIT_WAIT_MS: float = float(os.getenv("ORDER_GROUP_COMMIT_WAIT_MS", "5"))
+    ORDER_GROUP_COMMIT_MAX_ROWS: int = int(os.getenv("ORDER_GROUP_COMMIT_MAX_ROWS", "200"))
+    # Delivered/Cancelled orders older than this move to order_archive
+    # (flask orders archive).
+    ORDER_ARCHIVE_AFTER_DAYS: int = int(os.getenv("ORDER_ARCHIVE_AFTER_DAYS", "90"))
+
+    # SSE change feed: idle connections get a keep-alive comment this often.
+    ORDER_STREAM_HEARTBEAT_SECONDS: float = 15.0
+    # LISTEN/NOTIFY channel relaying order events between workers (PostgreSQL).
+    ORDER_CHANGE_CHANNEL: str = "order_changes"
+
+    # -- Recipe views (GET /admin/sales/conversion) ----------------------------
+    # Each worker batches view increments and writes them this often.
+    VIEW_FLUSH_SECONDS: float = float(os.getenv("VIEW_FLUSH_SECONDS", "5"))
+    CONVERSION_DEFAULT_K: int = 20
+    CONVERSION_MAX_K: int = 200
+
+    # -- Ingredient stock ------------------------------------------------------
+    # Full re-sync of the per-worker sold-out cache; this worker's
+    # reservations and restocks apply immediately.
+    STOCK_REFRESH_SECONDS: float = float(os.getenv("STOCK_REFRESH_SECONDS", "30"))
+
+    # -- Barista prep queue (GET /orders/prep-queue) ---------------------------
+    PREP_STATIONS: int = int(os.getenv("PREP_STATIONS", "2"))
+    # A confirmed order is promised this long after it was placed.
+    PREP_PROMISE_MINUTES: float = float(os.getenv("PREP_PROMISE_MINUTES", "15"))
+    # Full re-plan cadence; status changes in this worker apply immediately.
+    PREP_QUEUE_REFRESH_SECONDS: float = float(os.getenv("PREP_QUEUE_REFRESH_SECONDS", "60"))
+
+    # -- Idempotency keys ------------------------------------------------------
+    IDEMPOTENCY_TTL_SECONDS: int = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+    # How long a concurrent duplicate waits for the first request to finish.
+    IDEMPOTENCY_WAIT_SECONDS: float = 5.0
+    # An unfinished claim older than this is treated as abandoned (crashed worker).
+    IDEMPOTENCY_LEASE_SECONDS: int = 60
 
 
 class DevelopmentConfig(BaseConfig):
@@ -68,6 +171,9 @@ class TestingConfig(BaseConfig):
     SQLALCHEMY_DATABASE_URI: str = "sqlite:///:memory:"
     JWT_SECRET_KEY: str = "test-jwt-secret"
     WTF_CSRF_ENABLED: bool = False
+    # Cheap hashes, on the request thread.
+    PASSWORD_HASH_METHOD: str = "pbkdf2:sha256:1000"
+    PASSWORD_HASH_WORKERS: int = 0
 
 
 class ProductionConfig(BaseConfig):
@@ -1,4 +1,4 @@
-"""Order lifecycle status constants."""
+"""Order lifecycle status constants and state machine."""
 
 
 class OrderStatus:
@@ -12,3 +12,30 @@ class OrderStatus:
 
     # Only pending orders may be cancelled/deleted by the owning user
     USER_CANCELLABLE: tuple[str, ...] = (PENDING,)
+
+    # Quantity can change until the order ships
+    QUANTITY_EDITABLE: tuple[str, ...] = (PENDING, CONFIRMED)
+
+    # Not made yet: these orders hold their reserved ingredient stock
+    RESERVES_STOCK: tuple[str, ...] = (PENDING, CONFIRMED)
+
+    # Final states; old orders in these are moved to the archive
+    TERMINAL: tuple[str, ...] = (DELIVERED, CANCELLED)
+
+    # Allowed forward transitions. Terminal statuses have no successors.
+    TRANSITIONS: dict[str, tuple[str, ...]] = {
+        PENDING: (CONFIRMED, CANCELLED),
+        CONFIRMED: (SHIPPED, CANCELLED),
+        SHIPPED: (DELIVERED,),
+        DELIVERED: (),
+        CANCELLED: (),
+    }
+
+    @classmethod
+    def can_transition(cls, current: str, target: str) -> bool:
+        return target in cls.TRANSITIONS.get(current, ())
+
+    @classmethod
+    def predecessors(cls, target: str) -> tuple[str, ...]:
+        """Return the statuses an order may move to ``target`` from."""
+        return tuple(s for s in cls.ALL if target in cls.TRANSITIONS[s])
@@ -0,0 +1,88 @@
+"""Analytics controller — HTTP in, HTTP out. No business logic."""
+
+import logging
+from flask import current_app, request
+
+from app.api.dependencies import (
+    get_analytics_service,
+    get_forecast_service,
+    get_margin_service,
+    get_sales_service,
+)
+from app.utils.dates import parse_iso_datetime
+from app.utils.response import success_response
+
+logger = logging.getLogger(__name__)
+
+
+def get_revenue():
+    """GET /admin/analytics/revenue"""
+    service = get_analytics_service()
+    data = service.revenue(
+        group_by=request.args.get("group_by", default="day", type=str),
+        date_from=parse_iso_datetime(request.args.get("from"), "from"),
+        date_to=parse_iso_datetime(request.args.get("to"), "to"),
+        include_cancelled=request.args.get("include_cancelled", "").lower()
+        in ("1", "true", "yes"),
+    )
+    return success_response("Revenue fetched.", data=data)
+
+
+def _day_range() -> dict:
+    """Extract the optional inclusive ?from=&to= day range."""
+    day_from = parse_iso_datetime(request.args.get("from"), "from")
+    day_to = parse_iso_datetime(request.args.get("to"), "to")
+    return {
+        "day_from": day_from.date() if day_from else None,
+        "day_to": day_to.date() if day_to else None,
+    }
+
+
+def get_daily_sales():
+    """GET /admin/sales/daily"""
+    data = get_sales_service().daily(**_day_range())
+    return success_response("Daily sales fetched.", data=data)
+
+
+def get_recipe_sales():
+    """GET /admin/sales/recipes"""
+    data = get_sales_service().by_recipe(**_day_range())
+    return success_response("Recipe sales fetched.", data=data)
+
+
+def get_status_sales():
+    """GET /admin/sales/statuses"""
+    data = get_sales_service().by_status(**_day_range())
+    return success_response("Status totals fetched.", data=data)
+
+
+def get_ingredient_consumption():
+    """GET /admin/sales/consumption"""
+    data = get_sales_service().consumption(**_day_range())
+    return success_response("Ingredient consumption fetched.", data=data)
+
+
+def get_recipe_conversion():
+    """GET /admin/sales/conversion"""
+    data = get_sales_service().conversion(
+        k=request.args.get("k", default=current_app.config["CONVERSION_DEFAULT_K"], type=int),
+        max_k=current_app.config["CONVERSION_MAX_K"],
+    )
+    return success_response("Recipe conversion fetched.", data=data)
+
+
+def get_forecast():
+    """GET /admin/forecast"""
+    data = get_forecast_service().forecast(
+        days=request.args.get("days", default=7, type=int),
+    )
+    return success_response("Forecast fetched.", data=data)
+
+
+def get_lowest_margins():
+    """GET /admin/margins"""
+    data = get_margin_service().lowest_margins(
+        k=request.args.get("k", default=current_app.config["MARGIN_DEFAULT_K"], type=int),
+        max_k=current_app.config["MARGIN_MAX_K"],
+    )
+    return success_response("Recipe margins fetched.", data=data)
@@ -23,5 +23,15 @@ def create_brew_method():
     result = service.create(
         name=body.get("name", ""),
         details=body.get("details"),
+        prep_seconds=body.get("prep_seconds"),
+        batch_size=body.get("batch_size"),
+        equipment=body.get("equipment"),
     )
     return success_response(result["message"], status_code=201)
+
+
+def update_brew_method(brew_method_id: int):
+    """PATCH /brew_methods/<brew_method_id>"""
+    body = request.get_json(silent=True) or {}
+    result = get_brew_method_service().update(brew_method_id, body)
+    return success_response(result["message"], data=result["brew_method"])
@@ -3,7 +3,11 @@
 import logging
 from flask import request
 
-from app.api.dependencies import get_ingredient_service
+from app.api.dependencies import (
+    get_ingredient_service,
+    get_margin_service,
+    get_stock_service,
+)
 from app.utils.response import success_response
 
 logger = logging.getLogger(__name__)
@@ -22,3 +26,36 @@ def create_ingredient():
     service = get_ingredient_service()
     result = service.create(name=body.get("name", ""))
     return success_response(result["message"], status_code=201)
+
+
+def get_ingredient_costs(ingredient_id: int):
+    """GET /ingredients/<ingredient_id>/costs"""
+    data = get_margin_service().cost_history(ingredient_id=ingredient_id)
+    return success_response("Ingredient costs fetched.", data=data)
+
+
+def create_ingredient_cost(ingredient_id: int):
+    """POST /ingredients/<ingredient_id>/costs"""
+    body = request.get_json(silent=True) or {}
+    result = get_margin_service().set_cost(ingredient_id=ingredient_id, data=body)
+    return success_response(result["message"], data=result["cost"], status_code=201)
+
+
+def get_ingredient_stock(ingredient_id: int):
+    """GET /ingredients/<ingredient_id>/stock"""
+    data = get_stock_service().levels(ingredient_id=ingredient_id)
+    return success_response("Ingredient stock fetched.", data=data)
+
+
+def set_ingredient_stock(ingredient_id: int):
+    """PUT /ingredients/<ingredient_id>/stock"""
+    body = request.get_json(silent=True) or {}
+    result = get_stock_service().set_level(ingredient_id=ingredient_id, data=body)
+    return success_response(result["message"], data=result["stock"])
+
+
+def receive_ingredient_stock(ingredient_id: int):
+    """POST /ingredients/<ingredient_id>/stock"""
+    body = request.get_json(silent=True) or {}
+    result = get_stock_service().set_level(ingredient_id=ingredient_id, data=body, received=True)
+    return success_response(result["message"], data=result["stock"])
@@ -0,0 +1,28 @@
+"""Current-user controller — HTTP in, HTTP out. No business logic."""
+
+import logging
+from flask import current_app, request
+from flask_jwt_extended import get_jwt_identity
+
+from app.api.dependencies import get_recommendation_service, get_user_summary_service
+from app.utils.response import success_response
+
+logger = logging.getLogger(__name__)
+
+
+def get_my_recommendations():
+    """GET /me/recommendations"""
+    identity = get_jwt_identity()
+    service = get_recommendation_service()
+    data = service.for_user(
+        user_id=identity["id"],
+        k=request.args.get("k", default=current_app.config["RECOMMENDATIONS_DEFAULT_K"], type=int),
+    )
+    return success_response("Recommendations fetched.", data=data)
+
+
+def get_my_summary():
+    """GET /me/summary"""
+    identity = get_jwt_identity()
+    data = get_user_summary_service().for_user(user_id=identity["id"])
+    return success_response("Order summary fetched.", data=data)
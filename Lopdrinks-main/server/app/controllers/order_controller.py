@@ -1,11 +1,20 @@
 """Order controller — HTTP in, HTTP out. No business logic."""
 
 import logging
-from flask import request
+from datetime import datetime
+
+from flask import Response, current_app, request, stream_with_context
 from flask_jwt_extended import get_jwt_identity
 
-from app.api.dependencies import get_order_service
+from app.api.dependencies import (
+    get_order_export_service,
+    get_order_service,
+    get_prep_queue_service,
+)
+from app.middleware.stream_handoff import can_hand_off, claim_stream
+from app.utils.dates import parse_iso_datetime
 from app.utils.response import success_response
+from app.utils.sse import format_comment, format_event, format_retry
 
 logger = logging.getLogger(__name__)
 
@@ -19,18 +28,42 @@ def _identity() -> tuple[int, str]:
 def get_all_orders():
     """GET /orders/"""
     user_id, user_role = _identity()
-    limit = request.args.get("limit", default=5, type=int)
+    limit = request.args.get(
+        "limit", default=current_app.config["DEFAULT_PAGE_LIMIT"], type=int
+    )
     status = request.args.get("status", default=None, type=str)
+    after = request.args.get("after", default=None, type=str)
+    include_total = request.args.get("count", "").lower() in ("1", "true", "yes")
     service = get_order_service()
     data = service.get_orders(
         requesting_user_id=user_id,
         requesting_user_role=user_role,
         status=status,
         limit=limit,
+        after=after,
+        include_total=include_total,
+        max_limit=current_app.config["MAX_PAGE_LIMIT"],
     )
     return success_response("Orders fetched.", data=data)
 
 
+def get_archived_orders():
+    """GET /orders/archive"""
+    user_id, user_role = _identity()
+    service = get_order_service()
+    data = service.get_archived_orders(
+        requesting_user_id=user_id,
+        requesting_user_role=user_role,
+        status=request.args.get("status", default=None, type=str),
+        limit=request.args.get(
+            "limit", default=current_app.config["DEFAULT_PAGE_LIMIT"], type=int
+        ),
+        after=request.args.get("after", default=None, type=str),
+        max_limit=current_app.config["MAX_PAGE_LIMIT"],
+    )
+    return success_response("Archived orders fetched.", data=data)
+
+
 def get_order_by_id(order_id: int):
     """GET /orders/<order_id>"""
     user_id, user_role = _identity()
@@ -43,6 +76,85 @@ def get_order_by_id(order_id: int):
     return success_response("Order fetched.", data=data)
 
 
+def get_prep_queue():
+    """GET /orders/prep-queue"""
+    data = get_prep_queue_service().queue()
+    return success_response("Prep queue fetched.", data=data)
+
+
+def get_order_eta(order_id: int):
+    """GET /orders/<order_id>/eta"""
+    user_id, user_role = _identity()
+    data = get_prep_queue_service().eta(
+        order_id=order_id,
+        requesting_user_id=user_id,
+        requesting_user_role=user_role,
+    )
+    return success_response("Order ETA fetched.", data=data)
+
+
+def stream_orders():
+    """GET /orders/stream — Server-Sent Events feed of order changes."""
+    user_id, user_role = _identity()
+    service = get_order_service()
+    subscription = service.subscribe(
+        requesting_user_id=user_id,
+        requesting_user_role=user_role,
+        last_event_id=request.headers.get("Last-Event-ID")
+        or request.args.get("last_event_id"),
+        max_subscribers=current_app.config["ORDER_STREAM_MAX_CLIENTS"],
+    )
+    heartbeat = current_app.config["ORDER_STREAM_HEARTBEAT_SECONDS"]
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+    if can_hand_off():
+        # This worker's StreamHub serves the connection from here on; the
+        # request thread goes straight back to the pool.
+        claim_stream(subscription, heartbeat)
+        return Response(format_retry(3000), mimetype="text/event-stream", headers=headers)
+
+    # Not wrapped in stream_with_context: the app context (and its DB
+    # session) is released as soon as this view returns, so idle streams
+    # hold no database connection.
+    def generate():
+        try:
+            yield format_retry(3000)
+            for event in subscription.events(heartbeat=heartbeat):
+                if event is None:
+                    yield format_comment("keep-alive")
+                else:
+                    yield format_event(event.data, event=event.kind, event_id=event.id or None)
+        finally:
+            subscription.close()
+
+    return Response(generate(), mimetype="text/event-stream", headers=headers)
+
+
+def export_orders():
+    """GET /orders/export — stream all orders as CSV or NDJSON."""
+    fmt = request.args.get("format", default="csv", type=str)
+    # Quality-aware, so "gzip;q=0" means no.
+    compress = request.accept_encodings["gzip"] > 0
+    mimetype, chunks = get_order_export_service().export(
+        fmt=fmt,
+        date_from=parse_iso_datetime(request.args.get("from"), "from"),
+        date_to=parse_iso_datetime(request.args.get("to"), "to"),
+        compress=compress,
+    )
+    headers = {
+        "Content-Disposition": (
+            f"attachment; filename=orders-{datetime.utcnow():%Y%m%d}.{fmt}"
+        ),
+        "Vary": "Accept-Encoding",
+        "X-Accel-Buffering": "no",
+    }
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    # stream_with_context keeps the DB session (and its server-side
+    # cursor) alive until the last chunk has been sent.
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers=headers)
+
+
 def create_order():
     """POST /orders/"""
     user_id, _ = _identity()
@@ -53,6 +165,21 @@ def create_order():
         recipe_id=body.get("recipe_id"),
         quantity=body.get("quantity", 1),
     )
+    # 202: a group commit that hasn't resolved yet may still place the order.
+    status_code = 202 if result.get("pending") else 201
+    return success_response(result["message"], data=result, status_code=status_code)
+
+
+def checkout_cart():
+    """POST /orders/cart"""
+    user_id, _ = _identity()
+    body = request.get_json(silent=True) or {}
+    service = get_order_service()
+    result = service.create_many(
+        user_id=user_id,
+        items=body.get("items"),
+        max_lines=current_app.config["MAX_CART_LINES"],
+    )
     return success_response(result["message"], data=result, status_code=201)
 
 
@@ -70,6 +197,16 @@ def update_order(order_id: int):
     return success_response(result["message"], data=result)
 
 
+def bulk_update_orders():
+    """PATCH /orders/bulk"""
+    body = request.get_json(silent=True) or {}
+    service = get_order_service()
+    result = service.bulk_update_status(
+        data=body, max_ids=current_app.config["MAX_BULK_IDS"]
+    )
+    return success_response(result["message"], data=result)
+
+
 def delete_order(order_id: int):
     """DELETE /orders/<order_id>"""
     user_id, user_role = _identity()
@@ -1,10 +1,14 @@
 """Recipe controller — HTTP in, HTTP out. No business logic."""
 
 import logging
-from flask import request
+from flask import current_app, request
 from flask_jwt_extended import get_jwt_identity
 
-from app.api.dependencies import get_recipe_service
+from app.api.dependencies import (
+    get_co_occurrence_service,
+    get_popularity_service,
+    get_recipe_service,
+)
 from app.utils.response import success_response
 
 logger = logging.getLogger(__name__)
@@ -24,6 +28,27 @@ def get_recipe_by_id(recipe_id: int):
     return success_response("Recipe fetched.", data=data)
 
 
+def get_popular_recipes():
+    """GET /recipes/popular"""
+    service = get_popularity_service()
+    data = service.popular(
+        window=request.args.get("window", type=str),
+        k=request.args.get("k", default=current_app.config["POPULARITY_DEFAULT_K"], type=int),
+        max_k=current_app.config["POPULARITY_MAX_K"],
+    )
+    return success_response("Popular recipes fetched.", data=data)
+
+
+def get_also_ordered(recipe_id: int):
+    """GET /recipes/<recipe_id>/also_ordered"""
+    service = get_co_occurrence_service()
+    data = service.also_ordered(
+        recipe_id=recipe_id,
+        k=request.args.get("k", default=current_app.config["CO_OCCURRENCE_DEFAULT_K"], type=int),
+    )
+    return success_response("Related recipes fetched.", data=data)
+
+
 def get_recipes_by_category(category_id: int):
     """GET /recipes/category/<category_id>"""
     service = get_recipe_service()
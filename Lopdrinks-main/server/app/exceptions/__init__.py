@@ -7,6 +7,7 @@ from app.exceptions.custom_exceptions import (
     ValidationError,
     ConflictError,
     InternalServerError,
+    ServiceUnavailableError,
 )
 
 __all__ = [
@@ -17,4 +18,5 @@ __all__ = [
     "ValidationError",
     "ConflictError",
     "InternalServerError",
+    "ServiceUnavailableError",
 ]
@@ -73,3 +73,10 @@ class InternalServerError(AppError):
 
     status_code = 500
     message = "An internal server error occurred."
+
+
+class ServiceUnavailableError(AppError):
+    """Raised when the server is too busy to take the request right now."""
+
+    status_code = 503
+    message = "The service is busy. Please try again shortly."
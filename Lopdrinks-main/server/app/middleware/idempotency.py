@@ -0,0 +1,79 @@
+"""
+Idempotency-Key decorator.
+
+Wraps a POST controller so a client retry carrying the same
+``Idempotency-Key`` header gets the original response back instead of
+re-running the handler:
+
+    order_bp.post("/orders/")(jwt_required()(idempotent(create_order)))
+
+Must be used INSIDE @jwt_required(); keys are scoped per user. Requests
+without the header are passed straight through.
+"""
+
+import hashlib
+from functools import wraps
+from typing import Callable
+
+from flask import current_app, request
+from flask_jwt_extended import get_jwt_identity
+
+from app.api.dependencies import get_idempotency_service
+
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+def _request_hash() -> str:
+    digest = hashlib.sha256()
+    for part in (request.method.encode(), request.path.encode(), request.get_data()):
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def idempotent(fn: Callable) -> Callable:
+    """Replay stored responses for repeated Idempotency-Key requests."""
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return fn(*args, **kwargs)
+
+        user_id = get_jwt_identity()["id"]
+        request_hash = _request_hash()
+        config = current_app.config
+        service = get_idempotency_service()
+
+        stored = service.begin(
+            user_id,
+            key,
+            request_hash,
+            ttl_seconds=config["IDEMPOTENCY_TTL_SECONDS"],
+            wait_seconds=config["IDEMPOTENCY_WAIT_SECONDS"],
+            lease_seconds=config["IDEMPOTENCY_LEASE_SECONDS"],
+        )
+        if stored is not None:
+            status_code, body = stored
+            response = current_app.response_class(
+                body, status=status_code, mimetype="application/json"
+            )
+            response.headers[REPLAYED_HEADER] = "true"
+            return response
+
+        try:
+            response = current_app.make_response(fn(*args, **kwargs))
+        except Exception:
+            service.abandon(user_id, key)
+            raise
+
+        if response.status_code >= 500:
+            service.abandon(user_id, key)
+        else:
+            service.complete(
+                user_id, key, request_hash, response.status_code, response.get_data(as_text=True)
+            )
+        return response
+
+    return wrapper
@@ -0,0 +1,94 @@
+"""
+Hand SSE connections over from gunicorn's request threads to the StreamHub.
+
+A streaming view that yields events keeps its request thread until the
+client disconnects. Under gunicorn the client socket is available as
+``environ["gunicorn.socket"]``, so the stream view instead claims the
+connection for the hub:
+
+    if can_hand_off():
+        claim_stream(subscription, heartbeat)
+        return Response(preamble, mimetype="text/event-stream", ...)
+
+Flask still builds that response (so after_request hooks such as CORS
+add their headers), but StreamHandoff, wrapped around ``app.wsgi_app``,
+captures it: it writes the status line and headers itself on a duplicate
+of the socket, with ``Connection: close`` and no length or chunking (the
+body ends when the connection does), passes the socket to the hub, and
+raises StopIteration — gunicorn's signal to drop a connection without
+writing anything. gunicorn closes its descriptor; the hub keeps the
+duplicate, and the request thread returns to the pool.
+
+Servers that don't expose the socket (the dev server, the test client)
+get the plain streaming response.
+"""
+
+import logging
+from typing import Callable, Iterable
+
+from flask import request
+
+from app.services.change_bus import Subscription
+from app.services.stream_hub import StreamHub
+
+logger = logging.getLogger(__name__)
+
+SOCKET_KEY = "gunicorn.socket"
+CLAIM_KEY = "lopdrinks.stream_claim"
+# Framing is ours now: close-delimited, so none of these may pass through.
+_HOP_BY_HOP = {"connection", "content-length", "keep-alive", "transfer-encoding"}
+
+
+def can_hand_off() -> bool:
+    """True when the server exposes this request's socket."""
+    return SOCKET_KEY in request.environ
+
+
+def claim_stream(subscription: Subscription, heartbeat: float) -> None:
+    """Have StreamHandoff serve ``subscription`` on this request's connection."""
+    request.environ[CLAIM_KEY] = (subscription, heartbeat)
+
+
+class StreamHandoff:
+    """WSGI middleware that moves claimed stream connections onto ``hub``."""
+
+    def __init__(self, wsgi_app: Callable, hub: StreamHub) -> None:
+        self._wsgi_app = wsgi_app
+        self._hub = hub
+
+    def __call__(self, environ: dict, start_response: Callable) -> Iterable[bytes]:
+        captured: list = []
+
+        def start(status: str, headers: list, exc_info=None):
+            if CLAIM_KEY in environ:
+                captured[:] = [status, headers]
+                return lambda data: None
+            return start_response(status, headers, exc_info)
+
+        body = self._wsgi_app(environ, start)
+        claim = environ.pop(CLAIM_KEY, None)
+        if claim is None:
+            return body
+
+        subscription, heartbeat = claim
+        status, headers = captured
+        if not status.startswith("200"):
+            # Something after the view turned it into an error; send that.
+            subscription.close()
+            start_response(status, headers)
+            return body
+        try:
+            preamble = b"".join(body)
+        finally:
+            if hasattr(body, "close"):
+                body.close()
+
+        head = [f"HTTP/1.1 {status}"]
+        head += [f"{k}: {v}" for k, v in headers if k.lower() not in _HOP_BY_HOP]
+        head.append("Connection: close")
+        sock = environ[SOCKET_KEY].dup()
+        self._hub.attach(
+            sock, ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + preamble, subscription, heartbeat
+        )
+        logger.debug("Order stream handed to the hub (%d open)", self._hub.client_count)
+        raise StopIteration("stream handed to the hub")
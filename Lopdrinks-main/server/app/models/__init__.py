@@ -8,9 +8,37 @@ discover every table when generating migrations.
 from app.models.user import User
 from app.models.brew_method import BrewMethod
 from app.models.ingredient import Ingredient
+from app.models.ingredient_cost import IngredientCost
+from app.models.ingredient_stock import IngredientStock
 from app.models.category import Category
 from app.models.recipe import Recipe
 from app.models.recipe_ingredient import RecipeIngredient
 from app.models.order import Order
+from app.models.order_archive import OrderArchive
+from app.models.daily_recipe_sales import DailyRecipeSales
+from app.models.daily_status_sales import DailyStatusSales
+from app.models.idempotency_key import IdempotencyKey
+from app.models.user_order_summary import UserOrderSummary
+from app.models.user_recipe_totals import UserRecipeTotals
+from app.models.pos_transaction import PosTransaction
+from app.models.order_stock_reservation import OrderStockReservation
 
-__all__ = ["User", "BrewMethod", "Ingredient", "Category", "Recipe", "RecipeIngredient", "Order"]
+__all__ = [
+    "User",
+    "BrewMethod",
+    "Ingredient",
+    "IngredientCost",
+    "IngredientStock",
+    "Category",
+    "Recipe",
+    "RecipeIngredient",
+    "Order",
+    "OrderArchive",
+    "DailyRecipeSales",
+    "DailyStatusSales",
+    "IdempotencyKey",
+    "UserOrderSummary",
+    "UserRecipeTotals",
+    "PosTransaction",
+    "OrderStockReservation",
+]
@@ -12,6 +12,14 @@ class BrewMethod(db.Model):
     name: str = db.Column(db.String(100), nullable=False)
     details: str | None = db.Column(db.Text, nullable=True)
 
+    # Prep-queue scheduling (app/services/prep_queue.py).
+    # Seconds one batch takes at a station.
+    prep_seconds: int = db.Column(db.Integer, nullable=False, default=120, server_default="120")
+    # Drinks one batch serves (a Cold Brew pour fills many cups; 1 = made to order).
+    batch_size: int = db.Column(db.Integer, nullable=False, default=1, server_default="1")
+    # Methods naming the same equipment never run at the same time.
+    equipment: str | None = db.Column(db.String(50), nullable=True)
+
     # Relationships
     recipes = db.relationship("Recipe", backref="brew_method", lazy=True)
 
@@ -0,0 +1,31 @@
+"""DailyRecipeSales rollup model."""
+
+from datetime import date, datetime
+
+from app.extensions import db
+
+
+class DailyRecipeSales(db.Model):
+    """
+    Per-day, per-recipe sales totals, maintained incrementally by OrderService.
+
+    Cancelled orders are excluded, so ``revenue`` is what the shop actually
+    expects to take. Rebuild from scratch with ``flask rollups rebuild``.
+    """
+
+    __tablename__ = "daily_recipe_sales"
+
+    day: date = db.Column(db.Date, primary_key=True)
+    recipe_id: int = db.Column(db.Integer, primary_key=True)
+    order_count: int = db.Column(db.Integer, nullable=False, default=0)
+    quantity: int = db.Column(db.Integer, nullable=False, default=0)
+    revenue: float = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at: datetime = db.Column(
+        db.DateTime, default=datetime.utcnow, nullable=False, index=True
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<DailyRecipeSales day={self.day} recipe={self.recipe_id} "
+            f"orders={self.order_count}>"
+        )
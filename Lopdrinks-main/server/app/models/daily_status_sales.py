@@ -0,0 +1,31 @@
+"""DailyStatusSales rollup model."""
+
+from datetime import date, datetime
+
+from app.extensions import db
+
+
+class DailyStatusSales(db.Model):
+    """
+    Per-day, per-status order totals, maintained incrementally by OrderService.
+
+    Every order counts under its current status, so summing a day across
+    statuses gives all orders placed that day.
+    """
+
+    __tablename__ = "daily_status_sales"
+
+    day: date = db.Column(db.Date, primary_key=True)
+    status: str = db.Column(db.String(20), primary_key=True)
+    order_count: int = db.Column(db.Integer, nullable=False, default=0)
+    quantity: int = db.Column(db.Integer, nullable=False, default=0)
+    revenue: float = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at: datetime = db.Column(
+        db.DateTime, default=datetime.utcnow, nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<DailyStatusSales day={self.day} status={self.status!r} "
+            f"orders={self.order_count}>"
+        )
@@ -0,0 +1,38 @@
+"""IdempotencyKey model."""
+
+from datetime import datetime
+
+from app.extensions import db
+
+
+class IdempotencyKey(db.Model):
+    """
+    A client-supplied ``Idempotency-Key`` and the response it produced.
+
+    A row with ``status_code`` NULL is an in-progress claim: the first
+    request holding the key is still running. Rows are dropped once
+    ``expires_at`` has passed (``flask idempotency purge``).
+    """
+
+    __tablename__ = "idempotency_key"
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "key", name="uq_idempotency_key_user_id_key"),
+    )
+
+    id: int = db.Column(db.Integer, primary_key=True)
+    user_id: int = db.Column(db.Integer, nullable=False)
+    key: str = db.Column(db.String(255), nullable=False)
+    # SHA-256 of method, path and body; a reused key must replay the same request.
+    request_hash: str = db.Column(db.String(64), nullable=False)
+    status_code: int | None = db.Column(db.Integer, nullable=True)
+    response_body: str | None = db.Column(db.Text, nullable=True)
+    created_at: datetime = db.Column(
+        db.DateTime, default=datetime.utcnow, nullable=False
+    )
+    expires_at: datetime = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"<IdempotencyKey user={self.user_id} key={self.key!r} "
+            f"status={self.status_code}>"
+        )
@@ -0,0 +1,41 @@
+"""IngredientCost model."""
+
+from datetime import datetime
+
+from app.extensions import db
+
+
+class IngredientCost(db.Model):
+    """
+    Cost of one ``unit`` of an ingredient from ``effective_from`` onwards.
+
+    ``unit`` matches the canonical units parsed into
+    ``recipe_ingredient.unit`` (ml, g, shot, ...). Rows are never updated:
+    a price change is a new row, and the cost in force at any moment is
+    the latest row whose ``effective_from`` has passed.
+    """
+
+    __tablename__ = "ingredient_cost"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "ingredient_id", "unit", "effective_from",
+            name="uq_ingredient_cost_ingredient_unit_from",
+        ),
+    )
+
+    id: int = db.Column(db.Integer, primary_key=True)
+    ingredient_id: int = db.Column(
+        db.Integer, db.ForeignKey("ingredient.id"), nullable=False
+    )
+    unit: str = db.Column(db.String(20), nullable=False)
+    cost_per_unit: float = db.Column(db.Float, nullable=False)
+    effective_from: datetime = db.Column(db.DateTime, nullable=False)
+    created_at: datetime = db.Column(
+        db.DateTime, default=datetime.utcnow, nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<IngredientCost ingredient={self.ingredient_id} unit={self.unit!r} "
+            f"cost={self.cost_per_unit} from={self.effective_from}>"
+        )
@@ -0,0 +1,36 @@
+"""IngredientStock model."""
+
+from datetime import datetime
+
+from app.extensions import db
+
+
+class IngredientStock(db.Model):
+    """
+    On-hand quantity of an ingredient, in one of the canonical units parsed
+    into ``recipe_ingredient.unit`` (ml, g, shot, ...). Ingredients without
+    a row are not tracked and never limit orders.
+
+    Placing an order decrements the rows its recipe uses; the check
+    constraint is the last line of defence against overselling.
+    """
+
+    __tablename__ = "ingredient_stock"
+    __table_args__ = (
+        db.CheckConstraint("quantity >= 0", name="ck_ingredient_stock_non_negative"),
+    )
+
+    ingredient_id: int = db.Column(
+        db.Integer, db.ForeignKey("ingredient.id"), primary_key=True
+    )
+    unit: str = db.Column(db.String(20), primary_key=True)
+    quantity: float = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at: datetime = db.Column(
+        db.DateTime, default=datetime.utcnow, nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<IngredientStock ingredient={self.ingredient_id} unit={self.unit!r} "
+            f"quantity={self.quantity}>"
+        )
@@ -10,9 +10,20 @@ class Order(db.Model):
     A customer's order for a specific Recipe.
 
     Status lifecycle: Pending → Confirmed → Shipped → Delivered | Cancelled
+
+    On PostgreSQL the table is range-partitioned by month of ``ordered_at``
+    (primary key ``(id, ordered_at)`` in the database; ``id`` alone stays
+    unique via its sequence). Old terminal orders move to OrderArchive.
     """
 
     __tablename__ = "order"
+    __table_args__ = (
+        # Keyset pagination indexes: every listing sorts by (ordered_at, id)
+        # and optionally filters by owner or status first.
+        db.Index("ix_order_ordered_at_id", "ordered_at", "id"),
+        db.Index("ix_order_user_id_ordered_at_id", "user_id", "ordered_at", "id"),
+        db.Index("ix_order_status_ordered_at_id", "status", "ordered_at", "id"),
+    )
 
     id: int = db.Column(db.Integer, primary_key=True)
     user_id: int = db.Column(
@@ -0,0 +1,46 @@
+"""OrderArchive model."""
+
+from datetime import datetime
+
+from app.extensions import db
+
+
+class OrderArchive(db.Model):
+    """
+    Cold storage for old Delivered / Cancelled orders.
+
+    Rows are moved here verbatim (same id) by ``flask orders archive`` so
+    the live ``order`` table and its indexes only hold the working set.
+    There are deliberately no foreign keys: history must survive the
+    deletion of the user or recipe it refers to.
+    """
+
+    __tablename__ = "order_archive"
+    __table_args__ = (
+        db.Index("ix_order_archive_ordered_at_id", "ordered_at", "id"),
+        db.Index("ix_order_archive_user_id_ordered_at_id", "user_id", "ordered_at", "id"),
+    )
+
+    id: int = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id: int = db.Column(db.Integer, nullable=False)
+    recipe_id: int = db.Column(db.Integer, nullable=False)
+    quantity: int = db.Column(db.Integer, nullable=False)
+    unit_price: float = db.Column(db.Float, nullable=False)
+    status: str = db.Column(db.String(20), nullable=False)
+    ordered_at: datetime = db.Column(db.DateTime, nullable=False)
+    archived_at: datetime = db.Column(
+        db.DateTime, default=datetime.utcnow, nullable=False
+    )
+
+    recipe = db.relationship(
+        "Recipe",
+        primaryjoin="foreign(OrderArchive.recipe_id) == Recipe.id",
+        viewonly=True,
+        lazy=True,
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<OrderArchive id={self.id} user={self.user_id} "
+            f"recipe={self.recipe_id} status={self.status!r}>"
+        )
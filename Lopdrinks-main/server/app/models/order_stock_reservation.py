@@ -0,0 +1,31 @@
+"""OrderStockReservation model."""
+
+from app.extensions import db
+
+
+class OrderStockReservation(db.Model):
+    """
+    Ingredient stock an open (Pending / Confirmed) order is holding.
+
+    Written in the order's own transaction when it is placed, from the
+    recipe and tracked ingredients of that moment. Cancelling or deleting
+    the order gives back exactly these amounts, however the recipe or the
+    set of tracked ingredients has changed since; once the order ships the
+    stock is used and the rows are dropped.
+
+    No foreign key to ``order``: on PostgreSQL its primary key is
+    (id, ordered_at).
+    """
+
+    __tablename__ = "order_stock_reservation"
+
+    order_id: int = db.Column(db.Integer, primary_key=True)
+    ingredient_id: int = db.Column(db.Integer, primary_key=True)
+    unit: str = db.Column(db.String(20), primary_key=True)
+    amount: float = db.Column(db.Float, nullable=False)
+
+    def __repr__(self) -> str:
+        return (
+            f"<OrderStockReservation order={self.order_id} ingredient={self.ingredient_id} "
+            f"{self.amount:g}{self.unit}>"
+        )
@@ -0,0 +1,27 @@
+"""PosTransaction model."""
+
+from datetime import datetime
+
+from app.extensions import db
+
+
+class PosTransaction(db.Model):
+    """
+    A point-of-sale transaction id already imported into ``order``.
+
+    ``flask orders import-pos`` claims each id here in the same transaction
+    that loads its order, so re-running an import skips what is already in.
+    Kept apart from ``order`` because that table is partitioned on
+    PostgreSQL (every unique key must include ``ordered_at``) and its old
+    rows move to ``order_archive``.
+    """
+
+    __tablename__ = "pos_transaction"
+
+    txn_id: str = db.Column(db.String(64), primary_key=True)
+    imported_at: datetime = db.Column(
+        db.DateTime, default=datetime.utcnow, nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<PosTransaction txn_id={self.txn_id!r}>"
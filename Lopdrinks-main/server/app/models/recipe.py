@@ -30,6 +30,8 @@ class Recipe(db.Model):
         db.Integer, db.ForeignKey("user.id"), nullable=True
     )
     created_at: datetime = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    # Detail-page views, written behind in batches (app/services/view_counter.py).
+    views: int = db.Column(db.BigInteger, default=0, server_default="0", nullable=False)
 
     # Relationships
     orders = db.relationship("Order", backref="recipe", lazy=True)
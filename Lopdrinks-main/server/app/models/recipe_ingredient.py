@@ -4,7 +4,13 @@ from app.extensions import db
 
 
 class RecipeIngredient(db.Model):
-    """Association table linking a Recipe to its Ingredients with quantities."""
+    """
+    Association table linking a Recipe to its Ingredients with quantities.
+
+    ``quantity`` is the free text shown to customers; ``amount`` and
+    ``unit`` are parsed from it (see app.utils.quantities) for
+    consumption reporting and are None when the text does not parse.
+    """
 
     __tablename__ = "recipe_ingredient"
 
@@ -16,6 +22,8 @@ class RecipeIngredient(db.Model):
         db.Integer, db.ForeignKey("ingredient.id"), nullable=False
     )
     quantity: str | None = db.Column(db.String(50), nullable=True)
+    amount: float | None = db.Column(db.Float, nullable=True)
+    unit: str | None = db.Column(db.String(20), nullable=True)
 
     def __repr__(self) -> str:
         return (
@@ -0,0 +1,36 @@
+"""UserOrderSummary read model."""
+
+from datetime import datetime
+
+from app.extensions import db
+
+
+class UserOrderSummary(db.Model):
+    """
+    One row per user with their lifetime order totals, favourite recipe
+    and most recent order, maintained incrementally by OrderService so the
+    dashboard reads it by primary key. Cancelled orders are excluded.
+
+    Rebuild from scratch with ``flask rollups rebuild-summaries``.
+    """
+
+    __tablename__ = "user_order_summary"
+
+    user_id: int = db.Column(db.Integer, primary_key=True)
+    order_count: int = db.Column(db.Integer, nullable=False, default=0)
+    quantity: int = db.Column(db.Integer, nullable=False, default=0)
+    revenue: float = db.Column(db.Float, nullable=False, default=0.0)
+    favourite_recipe_id: int | None = db.Column(db.Integer, nullable=True)
+    favourite_quantity: int | None = db.Column(db.Integer, nullable=True)
+    last_order_id: int | None = db.Column(db.Integer, nullable=True)
+    last_recipe_id: int | None = db.Column(db.Integer, nullable=True)
+    last_ordered_at: datetime | None = db.Column(db.DateTime, nullable=True)
+    updated_at: datetime = db.Column(
+        db.DateTime, default=datetime.utcnow, nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<UserOrderSummary user={self.user_id} orders={self.order_count} "
+            f"favourite={self.favourite_recipe_id}>"
+        )
@@ -0,0 +1,25 @@
+"""UserRecipeTotals read model."""
+
+from app.extensions import db
+
+
+class UserRecipeTotals(db.Model):
+    """
+    Per-user, per-recipe order totals (cancelled excluded). Backs the
+    favourite recipe in UserOrderSummary: the primary key makes "this
+    user's best recipe" a short index range scan.
+    """
+
+    __tablename__ = "user_recipe_totals"
+
+    user_id: int = db.Column(db.Integer, primary_key=True)
+    recipe_id: int = db.Column(db.Integer, primary_key=True)
+    order_count: int = db.Column(db.Integer, nullable=False, default=0)
+    quantity: int = db.Column(db.Integer, nullable=False, default=0)
+    revenue: float = db.Column(db.Float, nullable=False, default=0.0)
+
+    def __repr__(self) -> str:
+        return (
+            f"<UserRecipeTotals user={self.user_id} recipe={self.recipe_id} "
+            f"quantity={self.quantity}>"
+        )
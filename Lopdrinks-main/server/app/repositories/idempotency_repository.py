@@ -0,0 +1,125 @@
+"""Idempotency key repository — database operations only."""
+
+import logging
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import and_, delete, or_, select, update
+
+from app.extensions import db
+from app.models.idempotency_key import IdempotencyKey
+from app.repositories.upsert import upsert_insert
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Completed responses never change, so a process-local LRU can answer
+# repeats without a round trip. In-progress claims are never cached.
+COMPLETED_CACHE_TTL_SECONDS = 300
+_completed_cache = TTLCache(ttl=COMPLETED_CACHE_TTL_SECONDS, maxsize=10_000)
+
+
+class IdempotencyRepository:
+    """Claims and stored responses for Idempotency-Key requests.
+
+    Every write commits immediately: a claim must be visible to concurrent
+    requests before the guarded work starts, independent of its transaction.
+    """
+
+    def find_completed(self, user_id: int, key: str) -> Optional[tuple[str, int, str]]:
+        """Return (request_hash, status_code, body) from the LRU, if cached."""
+        return _completed_cache.get((user_id, key))
+
+    def find(self, user_id: int, key: str) -> Optional[IdempotencyKey]:
+        """Fetch the live (unexpired) row for a key, bypassing the identity map."""
+        return db.session.execute(
+            select(IdempotencyKey)
+            .where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+                IdempotencyKey.expires_at >= datetime.utcnow(),
+            )
+            .execution_options(populate_existing=True)
+        ).scalar_one_or_none()
+
+    def claim(
+        self,
+        user_id: int,
+        key: str,
+        request_hash: str,
+        expires_at: datetime,
+        stale_before: datetime,
+    ) -> bool:
+        """
+        Atomically take ownership of a key.
+
+        Expired rows, and in-progress claims older than ``stale_before``
+        (their owner died mid-request), are cleared first. The insert then
+        relies on the (user_id, key) unique constraint, so exactly one of
+        any number of concurrent claimants wins.
+
+        Returns:
+            True if this caller now owns the key.
+        """
+        now = datetime.utcnow()
+        db.session.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+                or_(
+                    IdempotencyKey.expires_at < now,
+                    and_(
+                        IdempotencyKey.status_code.is_(None),
+                        IdempotencyKey.created_at < stale_before,
+                    ),
+                ),
+            )
+        )
+        result = db.session.execute(
+            upsert_insert(IdempotencyKey)
+            .values(
+                user_id=user_id,
+                key=key,
+                request_hash=request_hash,
+                created_at=now,
+                expires_at=expires_at,
+            )
+            .on_conflict_do_nothing(index_elements=["user_id", "key"])
+        )
+        db.session.commit()
+        return result.rowcount == 1
+
+    def complete(
+        self, user_id: int, key: str, request_hash: str, status_code: int, body: str
+    ) -> None:
+        """Store the response for a claimed key and cache it."""
+        db.session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+            .values(status_code=status_code, response_body=body)
+        )
+        db.session.commit()
+        _completed_cache.set((user_id, key), (request_hash, status_code, body))
+
+    def release(self, user_id: int, key: str) -> None:
+        """Drop an in-progress claim so the client may retry."""
+        db.session.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+                IdempotencyKey.status_code.is_(None),
+            )
+        )
+        db.session.commit()
+
+    def purge_expired(self, now: datetime) -> int:
+        """Delete expired keys. Returns the number removed."""
+        result = db.session.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.expires_at < now)
+        )
+        db.session.commit()
+        _completed_cache.clear()
+        return result.rowcount
+
+    def rollback(self) -> None:
+        db.session.rollback()
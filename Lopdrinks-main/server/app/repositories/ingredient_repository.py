@@ -1,10 +1,14 @@
 """Ingredient repository — database operations only."""
 
 import logging
+from datetime import datetime
 from typing import Optional
 
+from sqlalchemy import func, select
+
 from app.extensions import db
 from app.models.ingredient import Ingredient
+from app.models.ingredient_cost import IngredientCost
 
 logger = logging.getLogger(__name__)
 
@@ -23,5 +27,62 @@ class IngredientRepository:
         db.session.commit()
         return ingredient
 
+    def add_cost(self, cost: IngredientCost) -> IngredientCost:
+        db.session.add(cost)
+        db.session.commit()
+        return cost
+
+    def find_costs(self, ingredient_id: int) -> list[IngredientCost]:
+        """Every cost row for the ingredient, newest effective date first."""
+        return (
+            IngredientCost.query.filter_by(ingredient_id=ingredient_id)
+            .order_by(IngredientCost.effective_from.desc(), IngredientCost.unit)
+            .all()
+        )
+
+    def find_cost_at(
+        self, ingredient_id: int, unit: str, effective_from: datetime
+    ) -> Optional[IngredientCost]:
+        return IngredientCost.query.filter_by(
+            ingredient_id=ingredient_id, unit=unit, effective_from=effective_from
+        ).first()
+
+    def current_costs(self, at: datetime) -> dict[tuple[int, str], float]:
+        """{(ingredient_id, unit): cost_per_unit} in force at ``at``."""
+        c = IngredientCost
+        latest = (
+            select(c.ingredient_id, c.unit, func.max(c.effective_from).label("effective_from"))
+            .where(c.effective_from <= at)
+            .group_by(c.ingredient_id, c.unit)
+            .subquery()
+        )
+        rows = db.session.execute(
+            select(c.ingredient_id, c.unit, c.cost_per_unit).join(
+                latest,
+                (c.ingredient_id == latest.c.ingredient_id)
+                & (c.unit == latest.c.unit)
+                & (c.effective_from == latest.c.effective_from),
+            )
+        )
+        return {(ingredient_id, unit): cost for ingredient_id, unit, cost in rows}
+
+    def current_cost(self, ingredient_id: int, unit: str, at: datetime) -> Optional[float]:
+        """The cost in force at ``at`` for one ingredient unit, or None."""
+        c = IngredientCost
+        return db.session.execute(
+            select(c.cost_per_unit)
+            .where(c.ingredient_id == ingredient_id, c.unit == unit, c.effective_from <= at)
+            .order_by(c.effective_from.desc())
+            .limit(1)
+        ).scalar()
+
+    def next_cost_change(self, after: datetime) -> Optional[datetime]:
+        """When the earliest future-dated cost takes effect, if any."""
+        return db.session.execute(
+            select(func.min(IngredientCost.effective_from)).where(
+                IngredientCost.effective_from > after
+            )
+        ).scalar()
+
     def rollback(self) -> None:
         db.session.rollback()
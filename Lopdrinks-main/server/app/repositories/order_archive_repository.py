@@ -0,0 +1,93 @@
+"""Order archive repository — database operations only."""
+
+import logging
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, insert, literal, select, tuple_
+from sqlalchemy.orm import joinedload
+
+from app.extensions import db
+from app.models.order import Order
+from app.models.order_archive import OrderArchive
+from app.models.recipe import Recipe
+
+logger = logging.getLogger(__name__)
+
+_COLUMNS = ("id", "user_id", "recipe_id", "quantity", "unit_price", "status", "ordered_at")
+
+
+class OrderArchiveRepository:
+    """Moves cold orders out of the live table and pages through them."""
+
+    def find_all(
+        self,
+        user_id: Optional[int] = None,
+        status: Optional[str] = None,
+        limit: int = 5,
+        after: Optional[tuple[datetime, int]] = None,
+    ) -> list[OrderArchive]:
+        """One keyset page of archived orders, newest first (see OrderRepository.find_all)."""
+        query = OrderArchive.query.options(
+            joinedload(OrderArchive.recipe).load_only(Recipe.name)
+        )
+        if user_id is not None:
+            query = query.filter(OrderArchive.user_id == user_id)
+        if status is not None:
+            query = query.filter(OrderArchive.status == status)
+        if after is not None:
+            query = query.filter(
+                tuple_(OrderArchive.ordered_at, OrderArchive.id) < tuple_(*after)
+            )
+        return (
+            query.order_by(OrderArchive.ordered_at.desc(), OrderArchive.id.desc())
+            .limit(limit)
+            .all()
+        )
+
+    def archive_batch(
+        self, cutoff: datetime, statuses: tuple[str, ...], batch_size: int
+    ) -> int:
+        """
+        Copy up to ``batch_size`` orders placed before ``cutoff`` in
+        ``statuses`` into the archive and delete them from ``order``,
+        without committing.
+
+        The ``ordered_at < cutoff`` predicate is repeated on the DELETE so
+        PostgreSQL only touches the cold partitions.
+
+        Returns:
+            The number of orders moved (0 when nothing is left).
+        """
+        ids = list(
+            db.session.execute(
+                select(Order.id)
+                .where(Order.status.in_(statuses), Order.ordered_at < cutoff)
+                .order_by(Order.id)
+                .limit(batch_size)
+            ).scalars()
+        )
+        if not ids:
+            return 0
+
+        source = [getattr(Order, c) for c in _COLUMNS]
+        db.session.execute(
+            insert(OrderArchive).from_select(
+                [*_COLUMNS, "archived_at"],
+                select(*source, literal(datetime.utcnow(), db.DateTime)).where(
+                    Order.id.in_(ids)
+                ),
+            )
+        )
+        db.session.execute(
+            delete(Order)
+            .where(Order.id.in_(ids), Order.ordered_at < cutoff)
+            .execution_options(synchronize_session=False)
+        )
+        return len(ids)
+
+    def commit(self) -> None:
+        db.session.commit()
+
+    def rollback(self) -> None:
+        db.session.rollback()
@@ -1,10 +1,19 @@
 """Order repository — database operations only."""
 
+import json
 import logging
-from typing import Optional
+from datetime import datetime, timedelta
+from typing import Iterator, Optional
 
+from sqlalchemy import Row, delete, func, insert, literal, select, text, tuple_, union_all, update
+from sqlalchemy.orm import joinedload
+
+from app.constants.order_status import OrderStatus
 from app.extensions import db
 from app.models.order import Order
+from app.models.order_archive import OrderArchive
+from app.models.recipe import Recipe
+from app.models.user import User
 
 logger = logging.getLogger(__name__)
 
@@ -13,40 +22,474 @@ class OrderRepository:
     """CRUD and query operations for the Order model."""
 
     def find_by_id(self, order_id: int) -> Optional[Order]:
-        return db.session.get(Order, order_id)
+        return db.session.get(Order, order_id, options=[self._with_recipe_name()])
 
     def find_all(
         self,
         user_id: Optional[int] = None,
         status: Optional[str] = None,
         limit: int = 5,
+        after: Optional[tuple[datetime, int]] = None,
     ) -> list[Order]:
         """
-        Fetch orders with optional filters.
+        Fetch one keyset page of orders, newest first.
 
         Args:
             user_id: If provided, restrict to this user's orders.
             status: If provided, filter by order status.
             limit: Maximum number of results (default 5).
+            after: (ordered_at, id) of the last row of the previous page.
+                   Rows strictly older than this key are returned, which
+                   the composite (…, ordered_at, id) indexes serve as a
+                   range seek regardless of page depth.
         """
-        query = Order.query
-        if user_id is not None:
-            query = query.filter_by(user_id=user_id)
-        if status is not None:
-            query = query.filter_by(status=status)
-        return query.order_by(Order.ordered_at.desc()).limit(limit).all()
+        query = self._filtered(
+            Order.query.options(self._with_recipe_name()), user_id, status
+        )
+        if after is not None:
+            query = query.filter(tuple_(Order.ordered_at, Order.id) < tuple_(*after))
+        return (
+            query.order_by(Order.ordered_at.desc(), Order.id.desc())
+            .limit(limit)
+            .all()
+        )
+
+    def count(
+        self,
+        user_id: Optional[int] = None,
+        status: Optional[str] = None,
+        estimate: bool = True,
+    ) -> tuple[int, bool]:
+        """
+        Count orders matching the filters.
+
+        On PostgreSQL (with estimate=True) the figure comes from planner
+        statistics instead of a full scan: pg_class.reltuples for the
+        unfiltered table, the planner's row estimate for filtered ones.
+        Other dialects fall back to an exact COUNT(*).
+
+        Returns:
+            (count, is_estimate)
+        """
+        stmt = self._filtered(
+            select(func.count()).select_from(Order), user_id, status
+        )
+        bind = db.session.get_bind()
+        if estimate and bind.dialect.name == "postgresql":
+            rows = self._planner_estimate(bind, stmt, filtered=bool(user_id or status))
+            if rows is not None:
+                return rows, True
+        return db.session.execute(stmt).scalar_one(), False
+
+    def stream_analytics_rows(
+        self, batch_size: int = 10_000
+    ) -> tuple[int, Iterator[list[tuple]]]:
+        """
+        Stream the columns the analytics snapshot needs: archived orders
+        first, then live ones, each in id order.
+
+        The live stream is bounded by the max id seen up front so the
+        returned count stays valid while new orders keep arriving.
+
+        Returns:
+            (row_count, batches) where each batch is a list of
+            (ordered_at, recipe_id, user_id, quantity, unit_price, status).
+        """
+        max_id = db.session.execute(select(func.max(Order.id))).scalar() or 0
+        sources = [(OrderArchive, None), (Order, max_id)]
+        total = 0
+        statements = []
+        for model, bound in sources:
+            stmt = select(
+                model.ordered_at,
+                model.recipe_id,
+                model.user_id,
+                model.quantity,
+                model.unit_price,
+                model.status,
+            )
+            count = select(func.count()).select_from(model)
+            if bound is not None:
+                stmt = stmt.where(model.id <= bound)
+                count = count.where(model.id <= bound)
+            total += db.session.execute(count).scalar_one()
+            statements.append(
+                stmt.order_by(model.id).execution_options(yield_per=batch_size)
+            )
+
+        def _batches() -> Iterator[list[tuple]]:
+            for stmt in statements:
+                for partition in db.session.execute(stmt).partitions():
+                    yield [tuple(row) for row in partition]
+
+        return total, _batches()
+
+    def stream_user_recipe_counts(
+        self, since: datetime, batch_size: int = 50_000
+    ) -> Iterator[list[tuple[int, int, int]]]:
+        """
+        Stream (user_id, recipe_id, orders) for every pair ordered since
+        ``since`` — live and archived, cancelled orders excluded — where
+        ``orders`` is how many such orders the pair has.
+        """
+        placed = union_all(
+            *(
+                select(model.user_id, model.recipe_id).where(
+                    model.ordered_at >= since,
+                    model.status != OrderStatus.CANCELLED,
+                )
+                for model in (OrderArchive, Order)
+            )
+        ).subquery()
+        stmt = (
+            select(placed.c.user_id, placed.c.recipe_id, func.count())
+            .group_by(placed.c.user_id, placed.c.recipe_id)
+            .execution_options(yield_per=batch_size)
+        )
+        for partition in db.session.execute(stmt).partitions():
+            yield [tuple(row) for row in partition]
+
+    def stream_export_rows(
+        self,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        batch_size: int = 5_000,
+    ) -> Iterator[list[tuple]]:
+        """
+        Stream export rows, archived orders first, then live ones, each in
+        (ordered_at, id) order, with user and recipe names joined in SQL.
+
+        Rows arrive ``batch_size`` at a time from a server-side cursor
+        (``yield_per``), so memory stays flat however large the range.
+        ``date_from`` is inclusive, ``date_to`` exclusive.
+
+        Yields:
+            Batches of (id, ordered_at, user_id, username, recipe_id,
+            recipe_name, quantity, unit_price, status, archived).
+        """
+        for model, archived in ((OrderArchive, True), (Order, False)):
+            stmt = (
+                select(
+                    model.id,
+                    model.ordered_at,
+                    model.user_id,
+                    User.username,
+                    model.recipe_id,
+                    Recipe.name,
+                    model.quantity,
+                    model.unit_price,
+                    model.status,
+                    literal(archived),
+                )
+                .outerjoin(User, User.id == model.user_id)
+                .outerjoin(Recipe, Recipe.id == model.recipe_id)
+                .order_by(model.ordered_at, model.id)
+                .execution_options(yield_per=batch_size)
+            )
+            if date_from is not None:
+                stmt = stmt.where(model.ordered_at >= date_from)
+            if date_to is not None:
+                stmt = stmt.where(model.ordered_at < date_to)
+            for partition in db.session.execute(stmt).partitions():
+                yield [tuple(row) for row in partition]
+
+    def ensure_partitions(self, months_ahead: int = 3) -> list[str]:
+        """
+        Create any missing monthly partitions of ``order`` from the current
+        month up to ``months_ahead`` months out, without committing.
+
+        Rows already sitting in the DEFAULT partition for a new month would
+        make a plain CREATE ... PARTITION OF fail, so for such a month the
+        DEFAULT partition is detached, the partition created, the rows moved
+        into it and DEFAULT reattached — all in the caller's transaction,
+        which holds ``order`` exclusively until it commits.
+
+        A no-op (returns []) unless the table is partitioned on PostgreSQL.
+
+        Returns:
+            The names of the partitions created.
+        """
+        if db.session.get_bind().dialect.name != "postgresql":
+            return []
+        partitioned = db.session.execute(
+            text(
+                "SELECT NULLIF(partdefid, 0)::regclass::text FROM pg_partitioned_table "
+                "WHERE partrelid = '\"order\"'::regclass"
+            )
+        ).first()
+        if partitioned is None:
+            return []
+        default = partitioned[0]
+
+        existing = set(
+            db.session.execute(
+                text(
+                    "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                    "WHERE i.inhparent = '\"order\"'::regclass"
+                )
+            ).scalars()
+        )
+        created = []
+        month = datetime.utcnow().date().replace(day=1)
+        for _ in range(months_ahead + 1):
+            nxt = (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+            name = f"order_y{month.year}m{month.month:02d}"
+            if name not in existing:
+                self._create_partition(name, month, nxt, default)
+                created.append(name)
+            month = nxt
+        return created
+
+    def _create_partition(self, name: str, start, end, default: Optional[str]) -> None:
+        bounds = {"start": start, "end": end}
+        in_range = "ordered_at >= :start AND ordered_at < :end"
+        strays = default is not None and db.session.execute(
+            text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_range})"), bounds
+        ).scalar()
+        if strays:
+            db.session.execute(text(f'ALTER TABLE "order" DETACH PARTITION {default}'))
+        db.session.execute(
+            text(
+                f'CREATE TABLE {name} PARTITION OF "order" '
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+        )
+        if strays:
+            db.session.execute(
+                text(f'INSERT INTO "order" SELECT * FROM {default} WHERE {in_range}'), bounds
+            )
+            db.session.execute(text(f"DELETE FROM {default} WHERE {in_range}"), bounds)
+            db.session.execute(text(f'ALTER TABLE "order" ATTACH PARTITION {default} DEFAULT'))
+
+    def add(self, order: Order) -> Order:
+        """Stage a new order and flush to assign its id, without committing."""
+        db.session.add(order)
+        db.session.flush()
+        return order
 
     def save(self, order: Order) -> Order:
         db.session.add(order)
         db.session.commit()
         return order
 
-    def delete(self, order: Order) -> None:
-        db.session.delete(order)
-        db.session.commit()
+    def insert_many(self, rows: list[dict]) -> list[int]:
+        """
+        Bulk-insert order rows in one statement without committing.
+
+        Returns:
+            The new primary keys, in the same order as ``rows``.
+        """
+        result = db.session.execute(
+            insert(Order).returning(Order.id, sort_by_parameter_order=True), rows
+        )
+        return list(result.scalars())
+
+    def transition_status(
+        self,
+        to_status: str,
+        from_statuses: tuple[str, ...],
+        ids: Optional[list[int]] = None,
+        filters: Optional[dict] = None,
+    ) -> list[Row]:
+        """
+        Move every matching order in ``from_statuses`` to ``to_status``
+        with one set-based UPDATE, without committing.
+
+        Args:
+            ids: Restrict to these order ids.
+            filters: Optional ``status``, ``user_id``, ``from`` and ``to``
+                     (ordered_at bounds, inclusive/exclusive) criteria.
+
+        Returns:
+            The updated rows (id, user_id, recipe_id, quantity, unit_price,
+            status, ordered_at) as they are after the update.
+        """
+        stmt = self._bulk_criteria(update(Order), ids, filters).where(
+            Order.status.in_(from_statuses)
+        )
+        result = db.session.execute(
+            stmt.values(status=to_status).returning(*self._fact_columns()),
+            execution_options={"synchronize_session": False},
+        )
+        return result.all()
+
+    def find_facts(self, order_id: int) -> Optional[Row]:
+        """Fetch just the fact columns of one order (no ORM object)."""
+        return db.session.execute(
+            select(*self._fact_columns()).where(Order.id == order_id)
+        ).first()
+
+    def find_facts_by_status(self, status: str) -> list[Row]:
+        """Fact columns of every live order in ``status``."""
+        return db.session.execute(
+            select(*self._fact_columns()).where(Order.status == status)
+        ).all()
+
+    def guarded_update(
+        self,
+        order_id: int,
+        values: dict,
+        user_id: Optional[int] = None,
+        statuses: Optional[tuple[str, ...]] = None,
+    ) -> Optional[Row]:
+        """
+        Conditionally update one order in a single statement, without committing.
+
+        ``WITH seen AS MATERIALIZED (SELECT status, quantity ... FOR UPDATE)
+        UPDATE order SET ... WHERE id = :id [AND user_id = :user_id]
+        [AND status IN :statuses] AND status = seen.status AND quantity =
+        seen.quantity RETURNING ..., seen.status, seen.quantity`` — the
+        guards make the check and the write atomic, and the CTE hands back
+        the values the update replaced (RETURNING only sees the new row),
+        which the rollups need. SQLite ignores FOR UPDATE; it has a single
+        writer anyway.
+
+        Returns:
+            The order's fact row after the update plus ``previous_status``
+            and ``previous_quantity``, or None if no row matched (missing,
+            not owned, or in the wrong state).
+        """
+        seen = (
+            select(Order.status, Order.quantity)
+            .where(Order.id == order_id)
+            .with_for_update()
+            .cte("seen")
+            .prefix_with("MATERIALIZED")
+        )
+        seen_status = select(seen.c.status).scalar_subquery()
+        seen_quantity = select(seen.c.quantity).scalar_subquery()
+        stmt = (
+            self._guarded(update(Order), order_id, user_id, statuses)
+            .add_cte(seen)
+            .where(Order.status == seen_status, Order.quantity == seen_quantity)
+        )
+        return db.session.execute(
+            stmt.values(**values).returning(
+                *self._fact_columns(),
+                seen_status.label("previous_status"),
+                seen_quantity.label("previous_quantity"),
+            ),
+            execution_options={"synchronize_session": False},
+        ).first()
+
+    def guarded_delete(
+        self,
+        order_id: int,
+        user_id: Optional[int] = None,
+        statuses: Optional[tuple[str, ...]] = None,
+    ) -> Optional[Row]:
+        """
+        Conditionally delete one order in a single statement, without committing.
+
+        Returns:
+            The deleted order's fact row, or None if no row matched.
+        """
+        stmt = self._guarded(delete(Order), order_id, user_id, statuses)
+        return db.session.execute(
+            stmt.returning(*self._fact_columns()),
+            execution_options={"synchronize_session": False},
+        ).first()
+
+    def find_ids(
+        self,
+        ids: Optional[list[int]] = None,
+        filters: Optional[dict] = None,
+        exclude_statuses: tuple[str, ...] = (),
+    ) -> list[int]:
+        """Return ids matching the bulk criteria, minus ``exclude_statuses``."""
+        stmt = self._bulk_criteria(select(Order.id), ids, filters)
+        if exclude_statuses:
+            stmt = stmt.where(Order.status.not_in(exclude_statuses))
+        return list(db.session.execute(stmt).scalars())
 
     def commit(self) -> None:
         db.session.commit()
 
     def rollback(self) -> None:
         db.session.rollback()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _fact_columns() -> tuple:
+        return (
+            Order.id,
+            Order.user_id,
+            Order.recipe_id,
+            Order.quantity,
+            Order.unit_price,
+            Order.status,
+            Order.ordered_at,
+        )
+
+    @staticmethod
+    def _guarded(stmt, order_id: int, user_id: Optional[int], statuses):
+        stmt = stmt.where(Order.id == order_id)
+        if user_id is not None:
+            stmt = stmt.where(Order.user_id == user_id)
+        if statuses is not None:
+            stmt = stmt.where(Order.status.in_(statuses))
+        return stmt
+
+    @staticmethod
+    def _with_recipe_name():
+        """
+        Load each order's recipe name in the same SELECT.
+
+        Serialisation reads ``order.recipe.name``; without this the lazy
+        backref issues one extra query per order row (N+1).
+        """
+        return joinedload(Order.recipe).load_only(Recipe.name)
+
+    @staticmethod
+    def _filtered(query, user_id: Optional[int], status: Optional[str]):
+        if user_id is not None:
+            query = query.filter(Order.user_id == user_id)
+        if status is not None:
+            query = query.filter(Order.status == status)
+        return query
+
+    @staticmethod
+    def _bulk_criteria(stmt, ids: Optional[list[int]], filters: Optional[dict]):
+        if ids is not None:
+            stmt = stmt.where(Order.id.in_(ids))
+        filters = filters or {}
+        if filters.get("status") is not None:
+            stmt = stmt.where(Order.status == filters["status"])
+        if filters.get("user_id") is not None:
+            stmt = stmt.where(Order.user_id == filters["user_id"])
+        if filters.get("from") is not None:
+            stmt = stmt.where(Order.ordered_at >= filters["from"])
+        if filters.get("to") is not None:
+            stmt = stmt.where(Order.ordered_at < filters["to"])
+        return stmt
+
+    @staticmethod
+    def _planner_estimate(bind, stmt, filtered: bool) -> Optional[int]:
+        """Return PostgreSQL's row estimate, or None if stats are missing."""
+        if not filtered:
+            # A partitioned parent has no statistics of its own; sum its
+            # partitions' instead.
+            reltuples = db.session.execute(
+                text(
+                    "SELECT CASE WHEN c.relkind = 'p' THEN ("
+                    "  SELECT sum(greatest(p.reltuples, 0)) FROM pg_inherits i"
+                    "  JOIN pg_class p ON p.oid = i.inhrelid WHERE i.inhparent = c.oid"
+                    ") ELSE c.reltuples END::bigint "
+                    "FROM pg_class c WHERE c.oid = '\"order\"'::regclass"
+                )
+            ).scalar()
+            # reltuples is -1 (PG14+) or 0 until the table has been analysed.
+            return int(reltuples) if reltuples and reltuples > 0 else None
+
+        # EXPLAIN the row source (not the COUNT) and read the top node's
+        # estimate. The filters stay bound parameters: the driver quotes
+        # them, nothing is pasted into the SQL.
+        source = stmt.with_only_columns(Order.id).compile(dialect=bind.dialect)
+        plan = db.session.connection().exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {source}", source.params
+        ).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
@@ -0,0 +1,126 @@
+"""POS history import repository — database operations only."""
+
+import csv
+import io
+import logging
+from datetime import datetime
+from typing import Iterable
+
+from sqlalchemy import insert, select
+from sqlalchemy.schema import CreateIndex, DropIndex
+
+from app.extensions import db
+from app.models.order import Order
+from app.models.pos_transaction import PosTransaction
+from app.models.recipe import Recipe
+from app.models.user import User
+from app.repositories.upsert import upsert_insert
+
+logger = logging.getLogger(__name__)
+
+# Columns written by load_orders(), in COPY order.
+ORDER_COLUMNS: tuple[str, ...] = (
+    "user_id",
+    "recipe_id",
+    "quantity",
+    "unit_price",
+    "status",
+    "ordered_at",
+)
+
+
+class PosImportRepository:
+    """Bulk loads of historical orders, keyed by POS transaction id."""
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    def user_ids(self, usernames: Iterable[str]) -> dict[str, int]:
+        """{username: user_id} for the usernames that exist."""
+        rows = db.session.execute(
+            select(User.username, User.id).where(User.username.in_(list(usernames)))
+        )
+        return {username: user_id for username, user_id in rows}
+
+    def recipe_prices(self, names: Iterable[str]) -> dict[str, tuple[int, float]]:
+        """{name: (recipe_id, current price)} for the recipe names that exist."""
+        rows = db.session.execute(
+            select(Recipe.name, Recipe.id, Recipe.price).where(Recipe.name.in_(list(names)))
+        )
+        return {name: (recipe_id, price) for name, recipe_id, price in rows}
+
+    # ------------------------------------------------------------------
+    # Writes (none of these commit)
+    # ------------------------------------------------------------------
+    def claim(self, txn_ids: list[str]) -> set[str]:
+        """
+        Record ``txn_ids`` as imported, skipping any already recorded.
+
+        Returns:
+            The ids claimed by this call — the ones whose orders still
+            need loading.
+        """
+        if not txn_ids:
+            return set()
+        now = datetime.utcnow()
+        stmt = (
+            upsert_insert(PosTransaction)
+            .on_conflict_do_nothing(index_elements=["txn_id"])
+            .returning(PosTransaction.txn_id)
+        )
+        result = db.session.execute(stmt, [{"txn_id": t, "imported_at": now} for t in txn_ids])
+        return set(result.scalars())
+
+    def load_orders(self, rows: list[tuple]) -> None:
+        """
+        Append order rows (tuples in ORDER_COLUMNS order) in the session's
+        transaction: one ``COPY ... FROM STDIN`` on PostgreSQL (psycopg2),
+        a single executemany INSERT elsewhere.
+        """
+        if not rows:
+            return
+        connection = db.session.connection()
+        if connection.dialect.name == "postgresql":
+            cursor = connection.connection.cursor()
+            if hasattr(cursor, "copy_expert"):
+                try:
+                    self._copy(cursor, rows)
+                finally:
+                    cursor.close()
+                return
+            cursor.close()
+        db.session.execute(insert(Order), [dict(zip(ORDER_COLUMNS, row)) for row in rows])
+
+    def drop_order_indexes(self) -> list[str]:
+        """Drop the order table's secondary indexes; returns their names."""
+        indexes = sorted(Order.__table__.indexes, key=lambda index: index.name)
+        for index in indexes:
+            db.session.execute(DropIndex(index, if_exists=True))
+        return [index.name for index in indexes]
+
+    def create_order_indexes(self) -> list[str]:
+        """(Re)create the order table's secondary indexes; returns their names."""
+        indexes = sorted(Order.__table__.indexes, key=lambda index: index.name)
+        for index in indexes:
+            db.session.execute(CreateIndex(index, if_not_exists=True))
+        return [index.name for index in indexes]
+
+    def commit(self) -> None:
+        db.session.commit()
+
+    def rollback(self) -> None:
+        db.session.rollback()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _copy(cursor, rows: list[tuple]) -> None:
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        for row in rows:
+            writer.writerow(row[:-1] + (row[-1].isoformat(sep=" "),))
+        buf.seek(0)
+        cursor.copy_expert(
+            f'COPY "order" ({", ".join(ORDER_COLUMNS)}) FROM STDIN WITH (FORMAT csv)', buf
+        )
@@ -1,9 +1,13 @@
 """Recipe repository — database operations only."""
 
 import logging
-from typing import Optional
+from typing import Iterable, Optional
+
+from sqlalchemy import bindparam, select, update
 
 from app.extensions import db
+from app.models.brew_method import BrewMethod
+from app.models.ingredient import Ingredient
 from app.models.recipe import Recipe
 from app.models.recipe_ingredient import RecipeIngredient
 
@@ -20,6 +24,81 @@ class RecipeRepository:
     def find_by_id(self, recipe_id: int) -> Optional[Recipe]:
         return db.session.get(Recipe, recipe_id)
 
+    def find_prices(self, recipe_ids: Iterable[int]) -> dict[int, float]:
+        """Return {recipe_id: price} for the given ids in one IN query."""
+        rows = db.session.execute(
+            select(Recipe.id, Recipe.price).where(Recipe.id.in_(list(recipe_ids)))
+        )
+        return {recipe_id: float(price) for recipe_id, price in rows}
+
+    def find_summaries(self, recipe_ids: Iterable[int]) -> dict[int, tuple]:
+        """Return {recipe_id: (name, price, image_url)} for the given ids in one IN query."""
+        rows = db.session.execute(
+            select(Recipe.id, Recipe.name, Recipe.price, Recipe.image_url).where(
+                Recipe.id.in_(list(recipe_ids))
+            )
+        )
+        return {recipe_id: (name, price, image_url) for recipe_id, name, price, image_url in rows}
+
+    def price_list(self) -> list[tuple[int, str, float]]:
+        """(recipe_id, name, price) for every recipe."""
+        rows = db.session.execute(select(Recipe.id, Recipe.name, Recipe.price))
+        return [(recipe_id, name, float(price)) for recipe_id, name, price in rows]
+
+    def prep_methods(self) -> list:
+        """
+        (recipe_id, brew_method_id, name, prep_seconds, batch_size, equipment)
+        for every recipe; the brew method columns are None where it has none.
+        """
+        return db.session.execute(
+            select(
+                Recipe.id.label("recipe_id"),
+                BrewMethod.id.label("brew_method_id"),
+                BrewMethod.name,
+                BrewMethod.prep_seconds,
+                BrewMethod.batch_size,
+                BrewMethod.equipment,
+            ).outerjoin(BrewMethod, BrewMethod.id == Recipe.brew_method_id)
+        ).all()
+
+    def add_views(self, counts: dict[int, int]) -> None:
+        """
+        ``views = views + n`` for every {recipe_id: n}, as one executemany,
+        without committing. Rows are updated in id order so concurrent
+        flushes from several workers can't deadlock.
+        """
+        # Core table, not the ORM entity: a per-row WHERE with executemany.
+        c = Recipe.__table__.c
+        db.session.execute(
+            update(Recipe.__table__)
+            .where(c.id == bindparam("b_id"))
+            .values(views=c.views + bindparam("b_views")),
+            [{"b_id": recipe_id, "b_views": n} for recipe_id, n in sorted(counts.items())],
+        )
+
+    def category_map(self) -> dict[int, Optional[int]]:
+        """Return {recipe_id: category_id} for every recipe."""
+        rows = db.session.execute(select(Recipe.id, Recipe.category_id))
+        return {recipe_id: category_id for recipe_id, category_id in rows}
+
+    def bill_of_materials(self) -> list:
+        """
+        (recipe_id, ingredient_id, ingredient name, amount, unit) for every
+        recipe ingredient line; amount/unit are None where the text did not parse.
+        """
+        return db.session.execute(
+            select(
+                RecipeIngredient.recipe_id,
+                RecipeIngredient.ingredient_id,
+                Ingredient.name,
+                RecipeIngredient.amount,
+                RecipeIngredient.unit,
+            ).join(Ingredient, Ingredient.id == RecipeIngredient.ingredient_id)
+        ).all()
+
+    def find_all_ingredient_lines(self) -> list[RecipeIngredient]:
+        return RecipeIngredient.query.all()
+
     def find_by_category_id(self, category_id: int) -> list[Recipe]:
         """Return all recipes belonging to the given category."""
         return Recipe.query.filter_by(category_id=category_id).all()
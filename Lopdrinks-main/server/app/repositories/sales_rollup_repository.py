@@ -0,0 +1,229 @@
+"""Sales rollup repository — database operations only."""
+
+import logging
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import and_, delete, func, insert, literal, select, union_all
+
+from app.constants.order_status import OrderStatus
+from app.extensions import db
+from app.models.daily_recipe_sales import DailyRecipeSales
+from app.models.daily_status_sales import DailyStatusSales
+from app.models.order import Order
+from app.models.order_archive import OrderArchive
+from app.models.recipe import Recipe
+from app.repositories.upsert import upsert_insert
+
+logger = logging.getLogger(__name__)
+
+_TOTALS = ("order_count", "quantity", "revenue")
+
+
+class SalesRollupRepository:
+    """Incremental maintenance and O(days) reads of the daily sales rollups."""
+
+    # ------------------------------------------------------------------
+    # Writes (joined to the caller's transaction — no commit here)
+    # ------------------------------------------------------------------
+    def apply(
+        self,
+        recipe_deltas: dict[tuple[date, int], list],
+        status_deltas: dict[tuple[date, str], list],
+    ) -> datetime:
+        """
+        Add signed [order_count, quantity, revenue] increments to the rollups.
+
+        Keys are written in sorted order so concurrent transactions touch
+        rows in the same sequence and cannot deadlock each other.
+
+        Returns:
+            The ``updated_at`` stamp written to the touched rows.
+        """
+        now = datetime.utcnow()
+        if recipe_deltas:
+            self._increment(
+                DailyRecipeSales,
+                ("day", "recipe_id"),
+                [
+                    {"day": day, "recipe_id": recipe_id, **self._totals(t), "updated_at": now}
+                    for (day, recipe_id), t in sorted(recipe_deltas.items())
+                ],
+            )
+        if status_deltas:
+            self._increment(
+                DailyStatusSales,
+                ("day", "status"),
+                [
+                    {"day": day, "status": status, **self._totals(t), "updated_at": now}
+                    for (day, status), t in sorted(status_deltas.items())
+                ],
+            )
+        return now
+
+    def rebuild(self) -> tuple[int, int]:
+        """
+        Recompute both rollups from live and archived orders in two
+        INSERT ... SELECTs.
+
+        Returns:
+            (recipe_rows, status_rows) written. Caller commits.
+        """
+        db.session.execute(delete(DailyRecipeSales))
+        db.session.execute(delete(DailyStatusSales))
+
+        columns = ("recipe_id", "status", "quantity", "unit_price", "ordered_at")
+        orders = union_all(
+            *(
+                select(*(getattr(model, c) for c in columns))
+                for model in (Order, OrderArchive)
+            )
+        ).subquery("orders")
+
+        now = literal(datetime.utcnow(), db.DateTime)
+        day = func.date(orders.c.ordered_at)
+        totals = (
+            func.count(),
+            func.sum(orders.c.quantity),
+            func.sum(orders.c.quantity * orders.c.unit_price),
+        )
+
+        recipe_rows = db.session.execute(
+            insert(DailyRecipeSales).from_select(
+                ["day", "recipe_id", *_TOTALS, "updated_at"],
+                select(day, orders.c.recipe_id, *totals, now)
+                .where(orders.c.status != OrderStatus.CANCELLED)
+                .group_by(day, orders.c.recipe_id),
+            )
+        ).rowcount
+        status_rows = db.session.execute(
+            insert(DailyStatusSales).from_select(
+                ["day", "status", *_TOTALS, "updated_at"],
+                select(day, orders.c.status, *totals, now).group_by(day, orders.c.status),
+            )
+        ).rowcount
+        return recipe_rows, status_rows
+
+    def commit(self) -> None:
+        db.session.commit()
+
+    def rollback(self) -> None:
+        db.session.rollback()
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def totals_by_day(self, day_from: date, day_to: date) -> list:
+        """Non-cancelled totals per day, for days in [day_from, day_to]."""
+        t = DailyRecipeSales
+        return db.session.execute(
+            select(t.day, *self._sums(t))
+            .where(t.day.between(day_from, day_to))
+            .group_by(t.day)
+            .order_by(t.day)
+        ).all()
+
+    def totals_by_recipe(self, day_from: date, day_to: date) -> list:
+        """Non-cancelled totals per recipe (with its name) over the range."""
+        t = DailyRecipeSales
+        return db.session.execute(
+            select(t.recipe_id, Recipe.name, *self._sums(t))
+            .outerjoin(Recipe, Recipe.id == t.recipe_id)
+            .where(t.day.between(day_from, day_to))
+            .group_by(t.recipe_id, Recipe.name)
+            .order_by(func.sum(t.revenue).desc())
+        ).all()
+
+    def totals_by_status(self, day_from: date, day_to: date) -> list:
+        """Totals per current order status over the range."""
+        t = DailyStatusSales
+        return db.session.execute(
+            select(t.status, *self._sums(t))
+            .where(t.day.between(day_from, day_to))
+            .group_by(t.status)
+            .order_by(t.status)
+        ).all()
+
+    def recipe_quantities_since(self, day_from: date) -> tuple[list, Optional[datetime]]:
+        """
+        (day, recipe_id, quantity) for every non-cancelled rollup row since
+        ``day_from``, plus the recipe rollup's newest ``updated_at`` — read
+        in one statement, so the watermark matches the rows.
+        """
+        t = DailyRecipeSales
+        watermark = select(func.max(t.updated_at).label("watermark")).subquery()
+        rows = db.session.execute(
+            select(watermark.c.watermark, t.day, t.recipe_id, t.quantity)
+            .select_from(watermark)
+            .outerjoin(t, and_(t.day >= day_from, t.quantity > 0))
+        ).all()
+        # The outer join yields one all-NULL row when nothing matches.
+        return [r[1:] for r in rows if r.recipe_id is not None], rows[0].watermark
+
+    def recipe_quantities_between(self, day_from: date, day_to: date) -> list:
+        """(day, recipe_id, quantity) for non-cancelled rollup rows in [day_from, day_to]."""
+        t = DailyRecipeSales
+        return db.session.execute(
+            select(t.day, t.recipe_id, t.quantity).where(
+                t.day.between(day_from, day_to), t.quantity > 0
+            )
+        ).all()
+
+    def orders_and_views(self) -> list:
+        """
+        (recipe_id, name, views, order_count, quantity) for every recipe,
+        with all-time non-cancelled order totals from the rollups.
+        """
+        t = DailyRecipeSales
+        return db.session.execute(
+            select(
+                Recipe.id.label("recipe_id"),
+                Recipe.name,
+                Recipe.views,
+                func.coalesce(func.sum(t.order_count), 0).label("order_count"),
+                func.coalesce(func.sum(t.quantity), 0).label("quantity"),
+            )
+            .outerjoin(t, t.recipe_id == Recipe.id)
+            .group_by(Recipe.id, Recipe.name, Recipe.views)
+        ).all()
+
+    def watermark(self) -> Optional[datetime]:
+        """
+        Time of the most recent change to either rollup, in one round trip
+        (the recipe rollup's max comes off its index; the status rollup is
+        a few rows per day).
+        """
+        recipe, status = db.session.execute(
+            select(
+                select(func.max(DailyRecipeSales.updated_at)).scalar_subquery(),
+                select(func.max(DailyStatusSales.updated_at)).scalar_subquery(),
+            )
+        ).one()
+        return max((t for t in (recipe, status) if t is not None), default=None)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _totals(t: list) -> dict:
+        return {"order_count": t[0], "quantity": t[1], "revenue": t[2]}
+
+    @staticmethod
+    def _sums(t):
+        return (
+            func.sum(t.order_count).label("order_count"),
+            func.sum(t.quantity).label("quantity"),
+            func.sum(t.revenue).label("revenue"),
+        )
+
+    @staticmethod
+    def _increment(model, keys: tuple[str, ...], rows: list[dict]) -> None:
+        stmt = upsert_insert(model)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={
+                **{c: getattr(model, c) + getattr(stmt.excluded, c) for c in _TOTALS},
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        db.session.execute(stmt, rows)
@@ -0,0 +1,154 @@
+"""Ingredient stock repository — database operations only."""
+
+import logging
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import and_, case, delete, insert, select, tuple_, update
+
+from app.extensions import db
+from app.models.ingredient import Ingredient
+from app.models.ingredient_stock import IngredientStock
+from app.models.order_stock_reservation import OrderStockReservation
+from app.models.recipe_ingredient import RecipeIngredient
+from app.repositories.upsert import upsert_insert
+
+logger = logging.getLogger(__name__)
+
+
+class StockRepository:
+    """Stock levels and the conditional decrements that reserve them."""
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def adjust(self, deltas: dict[tuple[int, str], float]) -> list[tuple[int, str, float]]:
+        """
+        Subtract ``deltas`` {(ingredient_id, unit): amount} from stock in one
+        conditional UPDATE, without committing. A row only changes if it
+        holds at least its amount, so each row is checked and decremented
+        atomically and no lock is taken before the statement. Negative
+        amounts give stock back.
+
+        Returns:
+            (ingredient_id, unit, new quantity) for every row updated; a
+            key missing from the result did not have enough stock.
+        """
+        s = IngredientStock
+        keys = sorted(deltas)
+        amount = case(
+            *(
+                (and_(s.ingredient_id == ingredient_id, s.unit == unit), deltas[(ingredient_id, unit)])
+                for ingredient_id, unit in keys
+            ),
+        )
+        stmt = (
+            update(s)
+            .where(tuple_(s.ingredient_id, s.unit).in_(keys), s.quantity >= amount)
+            .values(quantity=s.quantity - amount, updated_at=datetime.utcnow())
+            .returning(s.ingredient_id, s.unit, s.quantity)
+            .execution_options(synchronize_session=False)
+        )
+        return [tuple(row) for row in db.session.execute(stmt)]
+
+    def set_level(self, ingredient_id: int, unit: str, quantity: float) -> float:
+        """Set (stocktake) a level, creating the row; returns the new quantity."""
+        return self._upsert(ingredient_id, unit, quantity, absolute=True)
+
+    def receive(self, ingredient_id: int, unit: str, quantity: float) -> float:
+        """Add a delivery to a level, creating the row; returns the new quantity."""
+        return self._upsert(ingredient_id, unit, quantity, absolute=False)
+
+    def replace_reservations(
+        self, order_ids: Iterable[int], rows: list[tuple[int, int, str, float]]
+    ) -> None:
+        """
+        Delete the reservations of ``order_ids`` and insert ``rows``
+        (order_id, ingredient_id, unit, amount), without committing.
+        """
+        order_ids = list(order_ids)
+        if order_ids:
+            db.session.execute(
+                delete(OrderStockReservation)
+                .where(OrderStockReservation.order_id.in_(order_ids))
+                .execution_options(synchronize_session=False)
+            )
+        if rows:
+            db.session.execute(
+                insert(OrderStockReservation),
+                [
+                    {"order_id": o, "ingredient_id": i, "unit": u, "amount": a}
+                    for o, i, u, a in rows
+                ],
+            )
+
+    def commit(self) -> None:
+        db.session.commit()
+
+    def rollback(self) -> None:
+        db.session.rollback()
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def tracked_lines(self, recipe_ids: Optional[Iterable[int]] = None) -> list:
+        """
+        (recipe_id, ingredient_id, unit, amount) for recipe ingredient lines
+        whose ingredient unit has a stock row — for ``recipe_ids`` or every
+        recipe.
+        """
+        ri, s = RecipeIngredient, IngredientStock
+        stmt = select(ri.recipe_id, ri.ingredient_id, ri.unit, ri.amount).join(
+            s, and_(s.ingredient_id == ri.ingredient_id, s.unit == ri.unit)
+        )
+        if recipe_ids is not None:
+            stmt = stmt.where(ri.recipe_id.in_(list(recipe_ids)))
+        return db.session.execute(stmt.where(ri.amount.is_not(None))).all()
+
+    def reservations(self, order_ids: Iterable[int]) -> list:
+        """(order_id, ingredient_id, unit, amount) rows held by ``order_ids``."""
+        r = OrderStockReservation
+        return db.session.execute(
+            select(r.order_id, r.ingredient_id, r.unit, r.amount).where(
+                r.order_id.in_(list(order_ids))
+            )
+        ).all()
+
+    def levels(self, ingredient_id: Optional[int] = None) -> list:
+        """(ingredient_id, name, unit, quantity, updated_at) rows, by ingredient name."""
+        s = IngredientStock
+        stmt = (
+            select(s.ingredient_id, Ingredient.name, s.unit, s.quantity, s.updated_at)
+            .join(Ingredient, Ingredient.id == s.ingredient_id)
+            .order_by(Ingredient.name, s.unit)
+        )
+        if ingredient_id is not None:
+            stmt = stmt.where(s.ingredient_id == ingredient_id)
+        return db.session.execute(stmt).all()
+
+    def ingredient_names(self, ingredient_ids: Iterable[int]) -> dict[int, str]:
+        rows = db.session.execute(
+            select(Ingredient.id, Ingredient.name).where(Ingredient.id.in_(list(ingredient_ids)))
+        )
+        return {ingredient_id: name for ingredient_id, name in rows}
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _upsert(ingredient_id: int, unit: str, quantity: float, absolute: bool) -> float:
+        s = IngredientStock
+        stmt = upsert_insert(s).values(
+            ingredient_id=ingredient_id,
+            unit=unit,
+            quantity=quantity,
+            updated_at=datetime.utcnow(),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["ingredient_id", "unit"],
+            set_={
+                "quantity": stmt.excluded.quantity if absolute else s.quantity + stmt.excluded.quantity,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        return db.session.execute(stmt.returning(s.quantity)).scalar_one()
@@ -0,0 +1,31 @@
+"""
+Dialect-aware INSERT ... ON CONFLICT helper.
+
+PostgreSQL and SQLite both support ``ON CONFLICT DO UPDATE`` with an
+``excluded`` pseudo-table, but SQLAlchemy exposes it through each
+dialect's own ``insert()`` construct. Repositories call upsert_insert()
+and stay dialect-agnostic.
+"""
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.extensions import db
+
+_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def upsert_insert(model):
+    """
+    Return a dialect-specific INSERT for ``model`` supporting on_conflict_*.
+
+    Raises:
+        NotImplementedError: On databases other than PostgreSQL and SQLite.
+    """
+    dialect = db.session.get_bind().dialect.name
+    try:
+        return _INSERTS[dialect](model)
+    except KeyError:
+        raise NotImplementedError(f"Upserts are not supported on {dialect}.")
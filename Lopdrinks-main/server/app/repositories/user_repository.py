@@ -10,9 +10,17 @@ from typing import Optional
 
 from app.extensions import db
 from app.models.user import User
+from app.utils.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Process-wide "this user id exists" cache consulted by authenticated reads.
+# Only positive answers are cached; writes through this repository
+# invalidate the entry, and the TTL bounds staleness for out-of-band
+# deletes and for other workers.
+USER_EXISTS_TTL_SECONDS = 30
+_user_exists_cache = TTLCache(ttl=USER_EXISTS_TTL_SECONDS, maxsize=10_000)
+
 
 class UserRepository:
     """CRUD operations for the User model."""
@@ -21,6 +29,17 @@ class UserRepository:
         """Fetch a user by primary key."""
         return db.session.get(User, user_id)
 
+    def exists(self, user_id: int) -> bool:
+        """Return True if the user exists, skipping the DB on a cache hit."""
+        if _user_exists_cache.get(user_id):
+            return True
+        found = (
+            db.session.query(User.id).filter(User.id == user_id).first() is not None
+        )
+        if found:
+            _user_exists_cache.set(user_id, True)
+        return found
+
     def find_by_email(self, email: str) -> Optional[User]:
         """Fetch a user by email address."""
         return User.query.filter_by(email=email).first()
@@ -33,8 +52,16 @@ class UserRepository:
         """Persist a new or updated user."""
         db.session.add(user)
         db.session.commit()
+        _user_exists_cache.invalidate(user.id)
         return user
 
+    def delete(self, user: User) -> None:
+        """Delete a user and drop it from the existence cache."""
+        user_id = user.id
+        db.session.delete(user)
+        db.session.commit()
+        _user_exists_cache.invalidate(user_id)
+
     def rollback(self) -> None:
         """Roll back the current transaction."""
         db.session.rollback()
@@ -0,0 +1,275 @@
+"""Per-user order summary repository — database operations only."""
+
+import logging
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import (
+    and_,
+    bindparam,
+    delete,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    union_all,
+    update,
+)
+from sqlalchemy.orm import aliased
+
+from app.constants.order_status import OrderStatus
+from app.extensions import db
+from app.models.order import Order
+from app.models.order_archive import OrderArchive
+from app.models.recipe import Recipe
+from app.models.user_order_summary import UserOrderSummary
+from app.models.user_recipe_totals import UserRecipeTotals
+from app.repositories.upsert import upsert_insert
+
+logger = logging.getLogger(__name__)
+
+_TOTALS = ("order_count", "quantity", "revenue")
+
+
+class UserSummaryRepository:
+    """Incremental maintenance and primary-key reads of user_order_summary."""
+
+    # ------------------------------------------------------------------
+    # Writes (joined to the caller's transaction — no commit here)
+    # ------------------------------------------------------------------
+    def apply(
+        self,
+        user_deltas: dict[int, list],
+        recipe_deltas: dict[tuple[int, int], list],
+        appeared: list,
+        disappeared: list,
+    ) -> None:
+        """
+        Add signed [order_count, quantity, revenue] increments and move
+        the favourite / last order where the changes require it.
+        ``appeared`` / ``disappeared`` are the OrderFacts of orders that
+        started / stopped counting.
+
+        Keys are written in sorted order so concurrent transactions touch
+        rows in the same sequence and cannot deadlock each other.
+        """
+        now = datetime.utcnow()
+        if recipe_deltas:
+            self._increment(
+                UserRecipeTotals,
+                ("user_id", "recipe_id"),
+                [
+                    {"user_id": user_id, "recipe_id": recipe_id, **self._totals(t)}
+                    for (user_id, recipe_id), t in sorted(recipe_deltas.items())
+                ],
+            )
+        if user_deltas:
+            self._increment(
+                UserOrderSummary,
+                ("user_id",),
+                [
+                    {"user_id": user_id, **self._totals(t), "updated_at": now}
+                    for user_id, t in sorted(user_deltas.items())
+                ],
+                extra={"updated_at"},
+            )
+        if recipe_deltas:
+            self._refresh_favourites(sorted({user_id for user_id, _ in recipe_deltas}))
+        if appeared:
+            self._advance_last_orders(appeared)
+        if disappeared:
+            self._refresh_last_orders(
+                sorted({f.user_id for f in disappeared}),
+                only_if_last=[f.id for f in disappeared],
+            )
+
+    def rebuild(self) -> int:
+        """
+        Recompute both tables from live and archived orders.
+
+        Returns:
+            Summary rows written. Caller commits.
+        """
+        db.session.execute(delete(UserRecipeTotals))
+        db.session.execute(delete(UserOrderSummary))
+
+        orders = self._counted_orders()
+        totals = (
+            func.count(),
+            func.sum(orders.c.quantity),
+            func.sum(orders.c.quantity * orders.c.unit_price),
+        )
+        db.session.execute(
+            insert(UserRecipeTotals).from_select(
+                ["user_id", "recipe_id", *_TOTALS],
+                select(orders.c.user_id, orders.c.recipe_id, *totals).group_by(
+                    orders.c.user_id, orders.c.recipe_id
+                ),
+            )
+        )
+        rows = db.session.execute(
+            insert(UserOrderSummary).from_select(
+                ["user_id", *_TOTALS, "updated_at"],
+                select(
+                    orders.c.user_id, *totals, literal(datetime.utcnow(), db.DateTime)
+                ).group_by(orders.c.user_id),
+            )
+        ).rowcount
+        self._refresh_favourites(None)
+        self._refresh_last_orders(None)
+        return rows
+
+    def commit(self) -> None:
+        db.session.commit()
+
+    def rollback(self) -> None:
+        db.session.rollback()
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def find(self, user_id: int) -> Optional[tuple]:
+        """
+        The user's summary row plus favourite / last recipe names, in one
+        statement keyed by primary key; None if they never ordered.
+        """
+        s = UserOrderSummary
+        favourite, last = aliased(Recipe), aliased(Recipe)
+        return db.session.execute(
+            select(
+                s.order_count,
+                s.quantity,
+                s.revenue,
+                s.favourite_recipe_id,
+                favourite.name.label("favourite_recipe_name"),
+                s.favourite_quantity,
+                s.last_order_id,
+                s.last_recipe_id,
+                last.name.label("last_recipe_name"),
+                s.last_ordered_at,
+            )
+            .outerjoin(favourite, favourite.id == s.favourite_recipe_id)
+            .outerjoin(last, last.id == s.last_recipe_id)
+            .where(s.user_id == user_id)
+        ).first()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _totals(t: list) -> dict:
+        return {"order_count": t[0], "quantity": t[1], "revenue": t[2]}
+
+    @staticmethod
+    def _increment(model, keys: tuple[str, ...], rows: list[dict], extra=()) -> None:
+        stmt = upsert_insert(model)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={
+                **{c: getattr(model, c) + getattr(stmt.excluded, c) for c in _TOTALS},
+                **{c: getattr(stmt.excluded, c) for c in extra},
+            },
+        )
+        db.session.execute(stmt, rows)
+
+    @staticmethod
+    def _counted_orders():
+        """Live and archived non-cancelled orders as one subquery."""
+        columns = ("id", "user_id", "recipe_id", "quantity", "unit_price", "ordered_at")
+        return union_all(
+            *(
+                select(*(getattr(model, c) for c in columns)).where(
+                    model.status != OrderStatus.CANCELLED
+                )
+                for model in (Order, OrderArchive)
+            )
+        ).subquery("orders")
+
+    @staticmethod
+    def _refresh_favourites(user_ids: Optional[Iterable[int]]) -> None:
+        """Set each user's favourite to their highest-quantity recipe (ties: lowest id)."""
+        s, t = UserOrderSummary, UserRecipeTotals
+
+        def best(column):
+            return (
+                select(column)
+                .where(t.user_id == s.user_id, t.quantity > 0)
+                .order_by(t.quantity.desc(), t.recipe_id)
+                .limit(1)
+                .scalar_subquery()
+            )
+
+        stmt = update(s).values(
+            favourite_recipe_id=best(t.recipe_id),
+            favourite_quantity=best(t.quantity),
+        )
+        if user_ids is not None:
+            stmt = stmt.where(s.user_id.in_(list(user_ids)))
+        db.session.execute(stmt.execution_options(synchronize_session=False))
+
+    @staticmethod
+    def _advance_last_orders(appeared: list) -> None:
+        """Make each newly counted order the user's last one if it is newer."""
+        # Core table, not the ORM entity: a per-row WHERE with executemany.
+        s = UserOrderSummary.__table__.c
+        db.session.execute(
+            update(UserOrderSummary.__table__)
+            .where(
+                s.user_id == bindparam("b_user_id"),
+                or_(
+                    s.last_ordered_at.is_(None),
+                    s.last_ordered_at < bindparam("b_ordered_at"),
+                    and_(
+                        s.last_ordered_at == bindparam("b_ordered_at"),
+                        s.last_order_id < bindparam("b_id"),
+                    ),
+                ),
+            )
+            .values(
+                last_order_id=bindparam("b_id"),
+                last_recipe_id=bindparam("b_recipe_id"),
+                last_ordered_at=bindparam("b_ordered_at"),
+            ),
+            [
+                {
+                    "b_user_id": f.user_id,
+                    "b_id": f.id,
+                    "b_recipe_id": f.recipe_id,
+                    "b_ordered_at": f.ordered_at,
+                }
+                for f in sorted(appeared, key=lambda f: (f.user_id, f.ordered_at, f.id))
+            ],
+        )
+
+    def _refresh_last_orders(
+        self,
+        user_ids: Optional[list[int]],
+        only_if_last: Optional[list[int]] = None,
+    ) -> None:
+        """
+        Re-derive the last order from the order tables — for every user, or
+        for ``user_ids`` whose current last order is in ``only_if_last``.
+        """
+        s = UserOrderSummary
+        orders = self._counted_orders()
+
+        def latest(column):
+            return (
+                select(column)
+                .where(orders.c.user_id == s.user_id)
+                .order_by(orders.c.ordered_at.desc(), orders.c.id.desc())
+                .limit(1)
+                .scalar_subquery()
+            )
+
+        stmt = update(s).values(
+            last_order_id=latest(orders.c.id),
+            last_recipe_id=latest(orders.c.recipe_id),
+            last_ordered_at=latest(orders.c.ordered_at),
+        )
+        if user_ids is not None:
+            stmt = stmt.where(s.user_id.in_(user_ids))
+        if only_if_last is not None:
+            stmt = stmt.where(s.last_order_id.in_(only_if_last))
+        db.session.execute(stmt.execution_options(synchronize_session=False))
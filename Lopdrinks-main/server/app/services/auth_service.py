@@ -8,11 +8,11 @@ This module has zero Flask dependencies — no request/response objects.
 import logging
 from datetime import datetime
 
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import create_access_token
 
 from app.models.user import User
 from app.repositories.user_repository import UserRepository
+from app.services.password_hasher import PasswordHasher
 from app.utils.otp import generate_otp, send_verification_email
 from app.exceptions.custom_exceptions import (
     ValidationError,
@@ -28,8 +28,9 @@ logger = logging.getLogger(__name__)
 class AuthService:
     """Handles user registration, email verification, and JWT login."""
 
-    def __init__(self, user_repo: UserRepository) -> None:
+    def __init__(self, user_repo: UserRepository, hasher: PasswordHasher) -> None:
         self._user_repo = user_repo
+        self._hasher = hasher
 
     # ------------------------------------------------------------------
     # Registration
@@ -50,6 +51,7 @@ class AuthService:
         Raises:
             ValidationError: If required fields are missing.
             ConflictError: If email or username is already taken.
+            ServiceUnavailableError: If too many hashes are already queued.
             InternalServerError: On unexpected DB failure.
         """
         if not all([username, email, password]):
@@ -61,7 +63,7 @@ class AuthService:
         if self._user_repo.find_by_username(username):
             raise ConflictError("This username is already taken.")
 
-        hashed_pw = generate_password_hash(password)
+        hashed_pw = self._hasher.hash(password)
         otp = generate_otp()
 
         user = User(
@@ -121,20 +123,27 @@ class AuthService:
         """
         Authenticate a user and return a JWT access token.
 
+        A password hashed with older parameters than PASSWORD_HASH_METHOD
+        is re-hashed with the current ones while it is at hand.
+
         Raises:
             ValidationError: If email or password is missing.
             UnauthorizedError: If credentials are wrong or email is unverified.
+            ServiceUnavailableError: If too many hashes are already queued.
         """
         if not all([email, password]):
             raise ValidationError("email and password are required.")
 
         user = self._user_repo.find_by_email(email)
-        if not user or not check_password_hash(user.password, password):
+        if not user or not self._hasher.verify(user.password, password):
             raise UnauthorizedError("Invalid credentials.")
 
         if not user.is_verified:
             raise UnauthorizedError("Please verify your email before logging in.")
 
+        if self._hasher.needs_rehash(user.password):
+            self._rehash(user, password)
+
         # expires_delta=False keeps existing non-expiring behaviour
         token = create_access_token(
             identity={"id": user.id, "role": user.role},
@@ -146,3 +155,15 @@ class AuthService:
             "token": token,
             "role": user.role,
         }
+
+    def _rehash(self, user: User, password: str) -> None:
+        """Upgrade a stored hash; failure is logged, never fails the login."""
+        old = user.password.split("$", 1)[0]
+        try:
+            user.password = self._hasher.hash(password)
+            self._user_repo.save(user)
+        except Exception:
+            self._user_repo.rollback()
+            logger.exception("Password rehash failed for user id=%d", user.id)
+            return
+        logger.info("Password rehashed: user id=%d %s -> %s", user.id, old, self._hasher.params)
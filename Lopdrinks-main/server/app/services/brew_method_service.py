@@ -1,14 +1,50 @@
 """BrewMethod business logic service."""
 
 import logging
+from typing import Any
 
 from app.models.brew_method import BrewMethod
 from app.repositories.brew_method_repository import BrewMethodRepository
-from app.exceptions.custom_exceptions import ValidationError, InternalServerError
+from app.exceptions.custom_exceptions import (
+    InternalServerError,
+    NotFoundError,
+    ValidationError,
+)
 
 logger = logging.getLogger(__name__)
 
 
+def _serialise(bm: BrewMethod) -> dict:
+    return {
+        "id": bm.id,
+        "name": bm.name,
+        "details": bm.details,
+        "prep_seconds": bm.prep_seconds,
+        "batch_size": bm.batch_size,
+        "equipment": bm.equipment,
+    }
+
+
+def _prep_settings(data: dict[str, Any]) -> dict:
+    """
+    Validate the prep-queue fields present in ``data``.
+
+    Raises:
+        ValidationError: Non-positive prep_seconds / batch_size.
+    """
+    settings: dict = {}
+    for key in ("prep_seconds", "batch_size"):
+        if data.get(key) is None:
+            continue
+        value = data[key]
+        if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+            raise ValidationError(f"{key} must be a positive integer.")
+        settings[key] = value
+    if "equipment" in data:
+        settings["equipment"] = (data["equipment"] or "").strip() or None
+    return settings
+
+
 class BrewMethodService:
 
     def __init__(self, repo: BrewMethodRepository) -> None:
@@ -17,23 +53,21 @@ class BrewMethodService:
     def get_all(self) -> list[dict]:
         """Return all brew methods serialised as plain dicts."""
         methods = self._repo.find_all()
-        return [
-            {"id": bm.id, "name": bm.name, "details": bm.details}
-            for bm in methods
-        ]
+        return [_serialise(bm) for bm in methods]
 
-    def create(self, name: str, details: str | None) -> dict:
+    def create(self, name: str, details: str | None, **prep: Any) -> dict:
         """
-        Create a new brew method.
+        Create a new brew method. ``prep`` may carry prep_seconds,
+        batch_size and equipment for the prep queue.
 
         Raises:
-            ValidationError: If name is missing.
+            ValidationError: If name is missing or a prep setting is invalid.
             InternalServerError: On DB failure.
         """
         if not name:
             raise ValidationError("name is required.")
 
-        brew_method = BrewMethod(name=name, details=details)
+        brew_method = BrewMethod(name=name, details=details, **_prep_settings(prep))
         try:
             self._repo.save(brew_method)
         except Exception as exc:
@@ -43,3 +77,36 @@ class BrewMethodService:
 
         logger.info("BrewMethod created: %s", name)
         return {"message": "Brew method created."}
+
+    def update(self, brew_method_id: int, data: dict[str, Any]) -> dict:
+        """
+        Update a brew method's details and prep-queue settings. Running
+        prep queues pick the change up on their next rebuild.
+
+        Raises:
+            NotFoundError: Brew method not found.
+            ValidationError: Empty name or invalid prep setting.
+            InternalServerError: On DB failure.
+        """
+        brew_method = self._repo.find_by_id(brew_method_id)
+        if not brew_method:
+            raise NotFoundError(f"Brew method {brew_method_id} not found.")
+
+        if "name" in data:
+            if not data["name"]:
+                raise ValidationError("name must not be empty.")
+            brew_method.name = data["name"]
+        if "details" in data:
+            brew_method.details = data["details"]
+        for key, value in _prep_settings(data).items():
+            setattr(brew_method, key, value)
+
+        try:
+            self._repo.save(brew_method)
+        except Exception as exc:
+            self._repo.rollback()
+            logger.exception("DB error updating brew method id=%d", brew_method_id)
+            raise InternalServerError("Failed to update brew method.") from exc
+
+        logger.info("BrewMethod updated: id=%d", brew_method_id)
+        return {"message": "Brew method updated.", "brew_method": _serialise(brew_method)}
@@ -0,0 +1,268 @@
+"""
+In-process change bus feeding the order SSE stream.
+
+Publishers (OrderService, after commit) drop events on an inbound queue
+and return immediately. A single dispatcher thread per process appends
+each event to a bounded ring buffer and fans it out to the queues of
+matching subscribers, waking whoever serves them (the StreamHub, see
+app/services/stream_hub.py). Publishing costs the same with one
+subscriber or a thousand.
+
+The ring buffer makes streams resumable: a client reconnecting with
+``Last-Event-ID`` is replayed every buffered event after that one. If the
+event has already fallen out of the buffer the client is told to reset
+(refetch, then resume from the live stream).
+
+On its own the bus is process-local: with several gunicorn workers, each
+stream sees the writes handled by its own worker, and ids come from a
+per-process counter. On PostgreSQL the app attaches a PgNotifyRelay
+(app/services/change_relay.py): every worker dispatches every worker's
+events, in the same order, under ids drawn from a database sequence — so
+a client can resume on any worker.
+"""
+
+import logging
+import os
+import queue
+import threading
+from collections import deque
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Optional
+
+if TYPE_CHECKING:
+    from app.services.change_relay import PgNotifyRelay
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """One published change. ``id`` comes from the relay, else the dispatcher."""
+
+    kind: str
+    user_id: int
+    data: dict[str, Any]
+    id: int = 0
+
+
+# Yielded to a subscriber whose resume point or backlog was lost.
+RESET = ChangeEvent(kind="reset", user_id=0, data={})
+
+
+@dataclass(eq=False)
+class Subscription:
+    """A subscriber's filtered, bounded view of the bus."""
+
+    bus: "ChangeBus"
+    user_id: Optional[int]  # None = all users (admin)
+    max_pending: int
+    # Called (on the dispatcher thread) whenever something is queued.
+    notify: Optional[Callable[[], None]] = None
+    _queue: queue.Queue = field(init=False)
+
+    def __post_init__(self) -> None:
+        self._queue = queue.Queue(maxsize=self.max_pending)
+
+    def wants(self, event: ChangeEvent) -> bool:
+        return self.user_id is None or event.user_id == self.user_id
+
+    def offer(self, event: ChangeEvent) -> bool:
+        """Queue an event; False if this subscriber has fallen too far behind."""
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            return False
+        self._notify()
+        return True
+
+    def reset(self) -> None:
+        """Discard anything pending and tell the consumer to start over."""
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        self._queue.put_nowait(RESET)
+        self._notify()
+
+    def pending(self) -> Iterator[ChangeEvent]:
+        """Yield what is queued now without waiting; stops after RESET."""
+        while True:
+            try:
+                event = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            yield event
+            if event is RESET:
+                return
+
+    def events(self, heartbeat: float) -> Iterator[Optional[ChangeEvent]]:
+        """
+        Yield events as they arrive, or None after ``heartbeat`` idle seconds.
+
+        Ends after yielding RESET if the subscriber was dropped for lagging.
+        """
+        while True:
+            try:
+                event = self._queue.get(timeout=heartbeat)
+            except queue.Empty:
+                yield None
+                continue
+            yield event
+            if event is RESET:
+                return
+
+    def close(self) -> None:
+        self.bus.unsubscribe(self)
+
+    def _notify(self) -> None:
+        if self.notify is not None:
+            self.notify()
+
+
+class ChangeBus:
+
+    def __init__(self, buffer_size: int = 1000, max_pending: int = 1000) -> None:
+        self._buffer: deque[ChangeEvent] = deque(maxlen=buffer_size)
+        self._max_pending = max_pending
+        self._inbound: queue.SimpleQueue = queue.SimpleQueue()
+        self._subscribers: set[Subscription] = set()
+        self._listeners: list[Callable[[ChangeEvent], None]] = []
+        self._last_id = 0
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._relay: "PgNotifyRelay | None" = None
+        self._pid: int | None = None
+
+    def relay_through(self, relay: "PgNotifyRelay | None") -> None:
+        """Route published events through ``relay`` to every process (None: local only)."""
+        with self._lock:
+            self._relay = relay
+            self._pid = None  # (re)start the relay with the dispatcher
+
+    def publish(self, kind: str, user_id: int, data: dict[str, Any]) -> None:
+        """Hand an event to the dispatcher (or the relay) without blocking the caller."""
+        self._ensure_started()
+        event = ChangeEvent(kind=kind, user_id=user_id, data=data)
+        if self._relay is not None:
+            self._relay.send(event)
+        else:
+            self._inbound.put(event)
+
+    def deliver(self, event: ChangeEvent) -> None:
+        """Dispatch an event in this process only; the relay's way in."""
+        self._ensure_started()
+        self._inbound.put(event)
+
+    def reset_subscribers(self) -> None:
+        """Drop every subscriber with a reset, e.g. after events were lost."""
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, set()
+        for sub in subscribers:
+            sub.reset()
+
+    def subscribe(
+        self,
+        user_id: Optional[int],
+        last_event_id: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Optional[Subscription]:
+        """
+        Register a subscriber, pre-loaded with the backlog after ``last_event_id``.
+
+        Registration and backlog replay happen under the dispatcher's lock,
+        so no event is missed or delivered twice. The backlog is everything
+        dispatched after that event here; relayed ids need not arrive in
+        increasing order, but every worker dispatches them in the same one.
+        Returns None if ``limit`` subscribers are already registered.
+        """
+        self._ensure_started()
+        sub = Subscription(bus=self, user_id=user_id, max_pending=self._max_pending)
+        with self._lock:
+            if limit is not None and len(self._subscribers) >= limit:
+                return None
+            if last_event_id is not None:
+                ids = [event.id for event in self._buffer]
+                if last_event_id not in ids:
+                    # Evicted, or never dispatched by this process (it
+                    # started later, or restarted): the gap can't be replayed.
+                    sub.reset()
+                    return sub
+                start = len(ids) - ids[::-1].index(last_event_id)
+                for event in list(self._buffer)[start:]:
+                    if sub.wants(event) and not sub.offer(event):
+                        sub.reset()
+                        return sub
+            self._subscribers.add(sub)
+        return sub
+
+    def add_listener(self, listener: Callable[[ChangeEvent], None]) -> None:
+        """
+        Call ``listener(event)`` on the dispatcher thread for every event.
+
+        For in-process read models; listeners must be quick and must not
+        block, since they run before the next event is dispatched.
+        """
+        with self._lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _ensure_started(self) -> None:
+        # Keyed by PID: a worker forked from a parent that already started
+        # the dispatcher inherits the object but not the thread.
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                if self._thread is None or not self._thread.is_alive():
+                    self._subscribers.clear()
+                    self._thread = threading.Thread(
+                        target=self._dispatch, name="order-change-bus", daemon=True
+                    )
+                    self._thread.start()
+                if self._relay is not None:
+                    self._relay.start(self)
+                self._pid = os.getpid()
+
+    def _dispatch(self) -> None:
+        while True:
+            event = self._inbound.get()
+            with self._lock:
+                if self._relay is None:
+                    self._last_id += 1
+                    event = replace(event, id=self._last_id)
+                # Relayed events keep their shared id; id 0 (dispatched
+                # locally after a relay failure) is sent without one.
+                listeners = list(self._listeners)
+                self._buffer.append(event)
+                lagging = [
+                    sub
+                    for sub in self._subscribers
+                    if sub.wants(event) and not sub.offer(event)
+                ]
+                for sub in lagging:
+                    self._subscribers.discard(sub)
+                    sub.reset()
+            if lagging:
+                logger.warning("Dropped %d lagging change-bus subscriber(s)", len(lagging))
+            for listener in listeners:
+                try:
+                    listener(event)
+                except Exception:
+                    logger.exception("Change-bus listener %r failed", listener)
+
+
+# Buffered events available for Last-Event-ID resumption, per process.
+ORDER_EVENT_BUFFER_SIZE = 1000
+order_change_bus = ChangeBus(buffer_size=ORDER_EVENT_BUFFER_SIZE)
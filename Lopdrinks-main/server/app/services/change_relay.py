@@ -0,0 +1,179 @@
+"""
+Cross-process relay for the change bus over PostgreSQL LISTEN/NOTIFY.
+
+A ChangeBus on its own only sees the writes of its own gunicorn worker.
+With a relay attached, ``publish`` hands events to the relay instead: a
+sender thread numbers them from the ``sequence`` and NOTIFYs them on
+``channel`` (a batch per transaction), and a listener thread in every
+worker LISTENs on the channel and feeds what arrives — its own worker's
+events included — into the local dispatcher. Every worker's streams and
+read models therefore see every worker's writes, in the order PostgreSQL
+delivers them, under the same event ids.
+
+Failure handling keeps the worker's own streams honest rather than
+exact: if a NOTIFY fails the batch is dispatched locally only (without
+ids, so clients can't resume from those events elsewhere), and after
+the listening connection drops and comes back every subscriber is reset
+(told to refetch), since notifications sent meanwhile are gone.
+
+Requires psycopg2 (``notifies`` / ``poll``); wired up in create_app only
+when the app runs on it.
+"""
+
+import json
+import logging
+import queue
+import select
+import os
+import threading
+import time
+from dataclasses import replace
+from typing import TYPE_CHECKING
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.services.change_bus import ChangeEvent
+
+if TYPE_CHECKING:
+    from app.services.change_bus import ChangeBus
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more.
+MAX_PAYLOAD_BYTES = 7900
+
+
+class PgNotifyRelay:
+
+    def __init__(
+        self,
+        engine: Engine,
+        channel: str,
+        sequence: str = "order_event_id_seq",
+        batch_size: int = 100,
+        poll_seconds: float = 5.0,
+        max_backoff: float = 30.0,
+    ) -> None:
+        self._engine = engine
+        self._channel = channel
+        self._sequence = sequence
+        self._batch_size = batch_size
+        self._poll_seconds = poll_seconds
+        self._max_backoff = max_backoff
+        self._outbound: queue.SimpleQueue = queue.SimpleQueue()
+        self._bus: "ChangeBus | None" = None
+        self._pid: int | None = None
+
+    def start(self, bus: "ChangeBus") -> None:
+        """Start this process's sender and listener threads (once per PID)."""
+        if self._pid == os.getpid():
+            return
+        self._bus = bus
+        self._outbound = queue.SimpleQueue()
+        for target, name in ((self._send_loop, "send"), (self._listen_loop, "listen")):
+            threading.Thread(
+                target=target, name=f"change-relay-{name}", daemon=True
+            ).start()
+        self._pid = os.getpid()
+
+    def send(self, event: ChangeEvent) -> None:
+        """Queue an event for NOTIFY without blocking the caller."""
+        self._outbound.put(event)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _send_loop(self) -> None:
+        while True:
+            batch = [self._outbound.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._outbound.get_nowait())
+                except queue.Empty:
+                    break
+            local: list[ChangeEvent] = []
+            try:
+                with self._engine.begin() as conn:
+                    ids = conn.execute(
+                        text("SELECT nextval(CAST(:seq AS regclass)) FROM generate_series(1, :n)"),
+                        {"seq": self._sequence, "n": len(batch)},
+                    ).scalars().all()
+                    payloads = []
+                    for event, event_id in zip(batch, ids):
+                        payload = _encode(replace(event, id=event_id))
+                        if len(payload.encode()) > MAX_PAYLOAD_BYTES:
+                            logger.warning(
+                                "Change event %s too large to relay; dispatched locally", event.kind
+                            )
+                            local.append(event)
+                        else:
+                            payloads.append(payload)
+                    if payloads:
+                        conn.execute(
+                            text(
+                                "SELECT pg_notify(:channel, payload) "
+                                "FROM unnest(CAST(:payloads AS text[])) AS payload"
+                            ),
+                            {"channel": self._channel, "payloads": payloads},
+                        )
+            except Exception:
+                logger.exception("Change relay NOTIFY failed; dispatching %d event(s) locally", len(batch))
+                local = batch
+            for event in local:
+                self._bus.deliver(event)
+
+    def _listen_loop(self) -> None:
+        backoff = 1.0
+        lost = False
+        while True:
+            try:
+                raw = self._engine.raw_connection()
+                raw.detach()  # held for the life of the worker; not pool material
+                conn = raw.dbapi_connection
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f'LISTEN "{self._channel}"')
+                if lost:
+                    logger.warning("Change relay reconnected; resetting subscribers")
+                    self._bus.reset_subscribers()
+                backoff = 1.0
+                self._drain(conn)
+            except Exception:
+                logger.exception("Change relay listener failed; retrying in %.0fs", backoff)
+                lost = True
+                time.sleep(backoff)
+                backoff = min(backoff * 2, self._max_backoff)
+
+    def _drain(self, conn) -> None:
+        try:
+            while True:
+                if select.select([conn], [], [], self._poll_seconds) == ([], [], []):
+                    # Idle: a round trip notices a dead connection.
+                    with conn.cursor() as cur:
+                        cur.execute("SELECT 1")
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    try:
+                        self._bus.deliver(_decode(notify.payload))
+                    except (ValueError, KeyError, TypeError):
+                        logger.warning("Ignoring malformed change relay payload")
+        finally:
+            conn.close()
+
+
+def _encode(event: ChangeEvent) -> str:
+    # The id also keeps payloads distinct: PostgreSQL folds identical
+    # payloads sent in one transaction into one notification.
+    return json.dumps(
+        {"id": event.id, "kind": event.kind, "user_id": event.user_id, "data": event.data},
+        separators=(",", ":"),
+    )
+
+
+def _decode(payload: str) -> ChangeEvent:
+    body = json.loads(payload)
+    return ChangeEvent(
+        kind=body["kind"], user_id=int(body["user_id"]), data=body["data"], id=int(body["id"])
+    )
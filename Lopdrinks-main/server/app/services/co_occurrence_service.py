@@ -0,0 +1,161 @@
+"""
+"Customers also ordered" — cross-sell lists from recipe co-occurrence.
+
+Each worker keeps a CoOccurrenceIndex in memory. The first request builds
+it inline; after that a stale index is rebuilt on a background thread
+while requests keep answering from the current lists. Orders placed,
+deleted or cancelled are folded in through the change bus in between.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+import numpy as np
+
+from app.analytics.co_occurrence import CoOccurrenceIndex
+from app.constants.order_status import OrderStatus
+from app.exceptions.custom_exceptions import NotFoundError
+from app.repositories.order_repository import OrderRepository
+from app.repositories.recipe_repository import RecipeRepository
+from app.services.change_bus import ChangeEvent
+
+logger = logging.getLogger(__name__)
+
+# Lists are precomputed this deep; ?k= is capped here.
+CO_OCCURRENCE_TOP_K = 20
+
+recipe_co_occurrence = CoOccurrenceIndex(k=CO_OCCURRENCE_TOP_K)
+# Held from the moment a rebuild is scheduled until it finishes.
+_rebuild_lock = threading.Lock()
+
+
+def _epoch(value: datetime | str) -> float:
+    # ordered_at is naive UTC throughout the app (ISO text on the bus).
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+def apply_co_occurrence_event(index: CoOccurrenceIndex, event: ChangeEvent) -> None:
+    """Add or take back the order's basket entry as it starts or stops counting."""
+    data = event.data
+    counted = data["status"] != OrderStatus.CANCELLED
+    if event.kind == "order.created":
+        was_counted = False
+    elif event.kind == "order.deleted":
+        was_counted, counted = counted, False
+    elif event.kind == "order.updated":
+        was_counted = data["previous"]["status"] != OrderStatus.CANCELLED
+    else:
+        return
+    if counted and not was_counted:
+        index.observe(data["user_id"], data["recipe_id"])
+    elif was_counted and not counted:
+        index.forget(data["user_id"], data["recipe_id"], _epoch(data["ordered_at"]))
+
+
+def co_occurrence_listener(event: ChangeEvent) -> None:
+    """Change-bus listener feeding this process's co-occurrence index."""
+    apply_co_occurrence_event(recipe_co_occurrence, event)
+
+
+class CoOccurrenceService:
+
+    def __init__(
+        self,
+        index: CoOccurrenceIndex,
+        order_repo: OrderRepository,
+        recipe_repo: RecipeRepository,
+        window_days: int = 90,
+        refresh_seconds: float = 3600.0,
+        run_in_background: Callable[[Callable[[], None]], None] | None = None,
+    ) -> None:
+        self._index = index
+        self._order_repo = order_repo
+        self._recipe_repo = recipe_repo
+        self._window_days = window_days
+        self._refresh_seconds = refresh_seconds
+        self._run_in_background = run_in_background
+
+    def also_ordered(self, recipe_id: int, k: int) -> dict:
+        """
+        Recipes most often ordered by customers who also ordered ``recipe_id``.
+
+        Raises:
+            NotFoundError: If the recipe does not exist.
+        """
+        k = max(1, min(k, self._index.k))
+        self._ensure_fresh()
+
+        customers, ranked = self._index.also_ordered(recipe_id, k)
+        summaries = self._recipe_repo.find_summaries(
+            [recipe_id, *(other for other, _ in ranked)]
+        )
+        if recipe_id not in summaries:
+            raise NotFoundError(f"Recipe with id {recipe_id} not found.")
+
+        recipes = []
+        for other, count in ranked:
+            if other not in summaries:  # deleted since it was ordered
+                continue
+            name, price, image_url = summaries[other]
+            recipes.append(
+                {
+                    "recipe_id": other,
+                    "name": name,
+                    "price": price,
+                    "image_url": image_url,
+                    "customers": count,
+                    "confidence": round(count / customers, 3),
+                }
+            )
+        return {
+            "recipe_id": recipe_id,
+            "customers": customers,
+            "window_days": self._window_days,
+            "also_ordered": recipes,
+        }
+
+    def rebuild(self) -> int:
+        """Recompute the index from the last ``window_days`` of orders; returns pairs read."""
+        since = datetime.utcnow() - timedelta(days=self._window_days)
+        batches = [
+            tuple(
+                np.fromiter((row[i] for row in batch), dtype=np.int64, count=len(batch))
+                for i in range(3)
+            )
+            for batch in self._order_repo.stream_user_recipe_counts(since)
+        ]
+        self._index.rebuild(batches, time.time(), since=_epoch(since))
+        pairs = sum(len(b[0]) for b in batches)
+        logger.info("Co-occurrence index rebuilt from %d user/recipe pairs", pairs)
+        return pairs
+
+    def _ensure_fresh(self) -> None:
+        built_at = self._index.built_at
+        if built_at is None:
+            with _rebuild_lock:
+                if self._index.built_at is None:
+                    self.rebuild()
+            return
+        if time.time() - built_at < self._refresh_seconds:
+            return
+        if self._run_in_background is None or not _rebuild_lock.acquire(blocking=False):
+            return
+
+        def job() -> None:
+            try:
+                self.rebuild()
+            except Exception:
+                logger.exception("Background co-occurrence rebuild failed")
+            finally:
+                _rebuild_lock.release()
+
+        try:
+            self._run_in_background(job)
+        except Exception:
+            _rebuild_lock.release()
+            raise
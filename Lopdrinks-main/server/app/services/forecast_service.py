@@ -0,0 +1,161 @@
+"""
+Recipe and ingredient demand forecast for stock planning.
+
+The model is refitted from the daily recipe rollups only when they change:
+each worker caches the last forecast (at the maximum horizon) keyed by the
+rollup watermark, so repeated dashboard loads between orders cost one
+indexed MAX query. Recipe ingredient edits show up with the next refit.
+"""
+
+import logging
+import threading
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from app.analytics.consumption import bill_of_materials, consumption
+from app.analytics.forecast import SEASON, seasonal_smoothing
+from app.exceptions.custom_exceptions import ValidationError
+from app.repositories.recipe_repository import RecipeRepository
+from app.repositories.sales_rollup_repository import SalesRollupRepository
+
+logger = logging.getLogger(__name__)
+
+_cached: tuple[tuple, dict] | None = None
+_cache_lock = threading.Lock()
+
+
+def _as_date(value) -> date:
+    # SQLite returns rollup days written by INSERT ... SELECT as text.
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _series(values: np.ndarray, days: int) -> dict:
+    return {
+        "total": round(float(values[:days].sum()), 2),
+        "daily": [round(float(v), 2) for v in values[:days]],
+    }
+
+
+class ForecastService:
+
+    def __init__(
+        self,
+        rollup_repo: SalesRollupRepository,
+        recipe_repo: RecipeRepository,
+        history_days: int = 56,
+        max_days: int = 28,
+    ) -> None:
+        self._rollup_repo = rollup_repo
+        self._recipe_repo = recipe_repo
+        self._history_days = max(history_days, 2 * SEASON)
+        self._max_days = max_days
+
+    def forecast(self, days: int) -> dict:
+        """
+        Projected daily demand per recipe and per ingredient for ``days``
+        days starting today (UTC), fitted on the complete days before it.
+
+        Raises:
+            ValidationError: days outside 1..max_days.
+        """
+        global _cached
+        if not 1 <= days <= self._max_days:
+            raise ValidationError(f"days must be between 1 and {self._max_days}.")
+
+        today = datetime.utcnow().date()
+        key = (self._rollup_repo.watermark(), today, self._history_days, self._max_days)
+        cached = _cached
+        if cached is None or cached[0] != key:
+            with _cache_lock:
+                if _cached is None or _cached[0] != key:
+                    _cached = (key, self._fit(today))
+                cached = _cached
+        full = cached[1]
+
+        return {
+            "history_from": full["history_from"],
+            "history_to": full["history_to"],
+            "days": full["days"][:days],
+            "recipes": sorted(
+                (
+                    {
+                        "recipe_id": r["recipe_id"],
+                        "recipe_name": r["recipe_name"],
+                        **_series(r["values"], days),
+                    }
+                    for r in full["recipes"]
+                ),
+                key=lambda r: -r["total"],
+            ),
+            "ingredients": [
+                {
+                    "ingredient_id": i["ingredient_id"],
+                    "ingredient_name": i["ingredient_name"],
+                    "unit": i["unit"],
+                    **_series(i["values"], days),
+                }
+                for i in full["ingredients"]
+            ],
+        }
+
+    def _fit(self, today: date) -> dict:
+        """Fit every recipe's series and project ``max_days`` ahead."""
+        history_from = today - timedelta(days=self._history_days)
+        history_to = today - timedelta(days=1)
+        rows = self._rollup_repo.recipe_quantities_between(history_from, history_to)
+
+        if rows:
+            days, recipe_id, quantity = zip(*rows)
+            recipe_ids, recipe_index = np.unique(
+                np.array(recipe_id, dtype=np.int64), return_inverse=True
+            )
+            series = np.zeros((len(recipe_ids), self._history_days))
+            day_index = np.array([(_as_date(d) - history_from).days for d in days])
+            np.add.at(series, (recipe_index, day_index), np.array(quantity, dtype=np.float64))
+            projected = seasonal_smoothing(series, self._max_days)
+        else:
+            recipe_ids = np.zeros(0, dtype=np.int64)
+            projected = np.zeros((0, self._max_days))
+
+        # Ingredient demand is the forecast pushed through the bill of materials.
+        bom_recipes, columns, bom = bill_of_materials(
+            line for line in self._recipe_repo.bill_of_materials() if line.amount is not None
+        )
+        ingredient_demand = consumption(
+            np.tile(np.arange(self._max_days), len(recipe_ids)),
+            np.repeat(recipe_ids, self._max_days),
+            projected.ravel(),
+            self._max_days,
+            bom_recipes,
+            bom,
+        )
+
+        summaries = self._recipe_repo.find_summaries(recipe_ids.tolist())
+        logger.info(
+            "Demand forecast fitted: %d recipes over %d days", len(recipe_ids), self._history_days
+        )
+        return {
+            "history_from": history_from.isoformat(),
+            "history_to": history_to.isoformat(),
+            "days": [(today + timedelta(days=i)).isoformat() for i in range(self._max_days)],
+            "recipes": [
+                {
+                    "recipe_id": recipe_id,
+                    "recipe_name": summaries[recipe_id][0],
+                    "values": projected[i],
+                }
+                for i, recipe_id in enumerate(recipe_ids.tolist())
+                # Recipes deleted since they were sold are not restocked.
+                if recipe_id in summaries
+            ],
+            "ingredients": [
+                {
+                    "ingredient_id": ingredient_id,
+                    "ingredient_name": name,
+                    "unit": unit,
+                    "values": ingredient_demand[:, i],
+                }
+                for i, (ingredient_id, name, unit) in enumerate(columns)
+            ],
+        }
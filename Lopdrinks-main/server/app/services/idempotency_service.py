@@ -0,0 +1,104 @@
+"""Idempotency-Key handling for replay-safe POST endpoints."""
+
+import logging
+import time
+from datetime import datetime, timedelta
+
+from app.repositories.idempotency_repository import IdempotencyRepository
+from app.exceptions.custom_exceptions import ValidationError, ConflictError
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+_POLL_SECONDS = 0.05
+
+
+class IdempotencyService:
+
+    def __init__(self, repo: IdempotencyRepository) -> None:
+        self._repo = repo
+
+    def begin(
+        self,
+        user_id: int,
+        key: str,
+        request_hash: str,
+        ttl_seconds: int = 86_400,
+        wait_seconds: float = 5.0,
+        lease_seconds: int = 60,
+    ) -> tuple[int, str] | None:
+        """
+        Claim ``key`` for this request, or return the response it already got.
+
+        Returns None when the caller owns the key and must run the request,
+        then call complete() or abandon(). Returns (status_code, body) when
+        the key has already completed. A concurrent duplicate waits up to
+        ``wait_seconds`` for the first request to finish.
+
+        Raises:
+            ValidationError: Malformed key, or key reused for a different request.
+            ConflictError: The first request is still running after the wait.
+        """
+        if not key or len(key) > MAX_KEY_LENGTH or not key.isprintable():
+            raise ValidationError(
+                f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} printable characters."
+            )
+
+        cached = self._repo.find_completed(user_id, key)
+        if cached:
+            return self._replay(key, request_hash, *cached)
+
+        deadline = time.monotonic() + wait_seconds
+        while True:
+            now = datetime.utcnow()
+            if self._repo.claim(
+                user_id,
+                key,
+                request_hash,
+                expires_at=now + timedelta(seconds=ttl_seconds),
+                stale_before=now - timedelta(seconds=lease_seconds),
+            ):
+                return None
+
+            row = self._repo.find(user_id, key)
+            if row is not None and row.status_code is not None:
+                return self._replay(key, request_hash, row.request_hash, row.status_code, row.response_body)
+            if row is not None and row.request_hash != request_hash:
+                raise self._mismatch()
+            if time.monotonic() >= deadline:
+                raise ConflictError(
+                    "A request with this Idempotency-Key is still in progress."
+                )
+            # End the read transaction so the next look sees the owner's commit.
+            self._repo.rollback()
+            time.sleep(_POLL_SECONDS)
+
+    def complete(
+        self, user_id: int, key: str, request_hash: str, status_code: int, body: str
+    ) -> None:
+        """Record the owner's response so repeats can replay it."""
+        self._repo.complete(user_id, key, request_hash, status_code, body)
+
+    def abandon(self, user_id: int, key: str) -> None:
+        """Release the claim after a failed request so the client can retry."""
+        self._repo.rollback()
+        self._repo.release(user_id, key)
+
+    def purge_expired(self) -> int:
+        removed = self._repo.purge_expired(datetime.utcnow())
+        logger.info("Purged %d expired idempotency keys", removed)
+        return removed
+
+    def _replay(
+        self, key: str, request_hash: str, stored_hash: str, status_code: int, body: str
+    ) -> tuple[int, str]:
+        if stored_hash != request_hash:
+            raise self._mismatch()
+        logger.info("Replaying stored response for Idempotency-Key %r", key)
+        return status_code, body
+
+    @staticmethod
+    def _mismatch() -> ValidationError:
+        return ValidationError(
+            "Idempotency-Key has already been used for a different request."
+        )
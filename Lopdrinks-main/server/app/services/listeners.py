@@ -0,0 +1,32 @@
+"""Wiring of in-process read models onto the order change bus."""
+
+from flask import Flask
+
+from app.extensions import db
+from app.services.change_bus import order_change_bus
+from app.services.change_relay import PgNotifyRelay
+from app.services.co_occurrence_service import co_occurrence_listener
+from app.services.popularity_service import popularity_listener
+from app.services.prep_queue_service import prep_queue_listener
+
+
+def register_order_listeners() -> None:
+    """Attach every order-event listener (idempotent; safe per app instance)."""
+    order_change_bus.add_listener(popularity_listener)
+    order_change_bus.add_listener(co_occurrence_listener)
+    order_change_bus.add_listener(prep_queue_listener)
+
+
+def register_order_relay(app: Flask) -> None:
+    """
+    Fan order events out to every worker over LISTEN/NOTIFY when the app
+    runs on PostgreSQL through psycopg2; other databases stay per-process.
+    """
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg2":
+        order_change_bus.relay_through(
+            PgNotifyRelay(engine, channel=app.config["ORDER_CHANGE_CHANNEL"])
+        )
+    else:
+        order_change_bus.relay_through(None)
@@ -0,0 +1,178 @@
+"""
+Ingredient unit costs and recipe margins.
+
+Each worker keeps a MarginIndex in memory. A cost recorded through this
+service patches only the affected BOM column; other workers, recipe edits
+and future-dated costs are picked up by a full rebuild every
+MARGIN_REFRESH_SECONDS (or as soon as a future cost takes effect).
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any
+
+from app.analytics.margins import MarginIndex
+from app.models.ingredient_cost import IngredientCost
+from app.repositories.ingredient_repository import IngredientRepository
+from app.repositories.recipe_repository import RecipeRepository
+from app.exceptions.custom_exceptions import (
+    ConflictError,
+    InternalServerError,
+    NotFoundError,
+    ValidationError,
+)
+from app.utils.dates import parse_iso_datetime
+from app.utils.quantities import UNITS
+
+logger = logging.getLogger(__name__)
+
+recipe_margins = MarginIndex()
+_refresh_lock = threading.Lock()
+
+
+def _epoch(value: datetime) -> float:
+    # Timestamps are naive UTC throughout the app.
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _serialise_cost(c: IngredientCost) -> dict:
+    return {
+        "id": c.id,
+        "unit": c.unit,
+        "cost_per_unit": c.cost_per_unit,
+        "effective_from": c.effective_from.isoformat(),
+    }
+
+
+class MarginService:
+
+    def __init__(
+        self,
+        index: MarginIndex,
+        ingredient_repo: IngredientRepository,
+        recipe_repo: RecipeRepository,
+        refresh_seconds: float = 300.0,
+    ) -> None:
+        self._index = index
+        self._ingredient_repo = ingredient_repo
+        self._recipe_repo = recipe_repo
+        self._refresh_seconds = refresh_seconds
+
+    def lowest_margins(self, k: int, max_k: int) -> dict:
+        """The ``k`` recipes with the lowest margin % at current ingredient costs."""
+        k = max(1, min(k, max_k))
+        self._ensure_fresh()
+        return {"recipes": self._index.lowest(k)}
+
+    def cost_history(self, ingredient_id: int) -> list[dict]:
+        """
+        Raises:
+            NotFoundError: Ingredient not found.
+        """
+        if not self._ingredient_repo.find_by_id(ingredient_id):
+            raise NotFoundError(f"Ingredient {ingredient_id} not found.")
+        return [_serialise_cost(c) for c in self._ingredient_repo.find_costs(ingredient_id)]
+
+    def set_cost(self, ingredient_id: int, data: dict[str, Any]) -> dict:
+        """
+        Record an ingredient's cost per unit from ``effective_from`` (default now).
+
+        Raises:
+            NotFoundError: Ingredient not found.
+            ValidationError: Unknown unit or invalid cost / date.
+            ConflictError: A cost already starts at that moment for this unit.
+            InternalServerError: DB failure.
+        """
+        if not self._ingredient_repo.find_by_id(ingredient_id):
+            raise NotFoundError(f"Ingredient {ingredient_id} not found.")
+
+        unit = data.get("unit")
+        if unit not in UNITS:
+            raise ValidationError(f"unit must be one of: {', '.join(sorted(UNITS))}.")
+        try:
+            cost = float(data.get("cost_per_unit"))
+        except (TypeError, ValueError) as exc:
+            raise ValidationError("cost_per_unit must be a number.") from exc
+        if not math.isfinite(cost) or cost < 0:
+            raise ValidationError("cost_per_unit must not be negative.")
+        now = datetime.utcnow()
+        effective_from = parse_iso_datetime(data.get("effective_from"), "effective_from") or now
+        if effective_from.tzinfo is not None:
+            effective_from = effective_from.astimezone(timezone.utc).replace(tzinfo=None)
+
+        if self._ingredient_repo.find_cost_at(ingredient_id, unit, effective_from):
+            raise ConflictError(
+                f"A {unit} cost for ingredient {ingredient_id} already starts at "
+                f"{effective_from.isoformat()}."
+            )
+
+        row = IngredientCost(
+            ingredient_id=ingredient_id,
+            unit=unit,
+            cost_per_unit=cost,
+            effective_from=effective_from,
+        )
+        try:
+            self._ingredient_repo.add_cost(row)
+        except Exception as exc:
+            self._ingredient_repo.rollback()
+            logger.exception("DB error recording cost for ingredient id=%d", ingredient_id)
+            raise InternalServerError("Failed to record ingredient cost.") from exc
+
+        if effective_from > now:
+            self._index.expire_at(_epoch(effective_from))
+            affected = 0
+        else:
+            # A backdated row may still be superseded by a later one.
+            current = self._ingredient_repo.current_cost(ingredient_id, unit, now)
+            affected = self._index.set_cost(ingredient_id, unit, current)
+
+        logger.info(
+            "Ingredient cost recorded: ingredient=%d unit=%s cost=%s from=%s "
+            "(%d recipes repriced)",
+            ingredient_id,
+            unit,
+            cost,
+            effective_from,
+            affected,
+        )
+        return {"message": "Ingredient cost recorded.", "cost": _serialise_cost(row)}
+
+    def rebuild(self) -> int:
+        """Reload BOM, prices and current costs; returns the number of recipes."""
+        now = datetime.utcnow()
+        lines = self._recipe_repo.bill_of_materials()
+        recipes = self._recipe_repo.price_list()
+        next_change = self._ingredient_repo.next_cost_change(now)
+        self._index.rebuild(
+            recipes=recipes,
+            lines=[
+                (line.recipe_id, line.ingredient_id, line.amount, line.unit)
+                for line in lines
+                if line.amount is not None
+            ],
+            unparsed=Counter(line.recipe_id for line in lines if line.amount is None),
+            costs=self._ingredient_repo.current_costs(now),
+            valid_until=_epoch(next_change) if next_change else None,
+        )
+        logger.info(
+            "Margin index rebuilt: %d recipes, %d ingredient lines", len(recipes), len(lines)
+        )
+        return len(recipes)
+
+    def _ensure_fresh(self) -> None:
+        now = time.time()
+        built_at, valid_until = self._index.built_at, self._index.valid_until
+        if (
+            built_at is not None
+            and now - built_at < self._refresh_seconds
+            and (valid_until is None or now < valid_until)
+        ):
+            return
+        with _refresh_lock:
+            if self._index.built_at == built_at:
+                self.rebuild()
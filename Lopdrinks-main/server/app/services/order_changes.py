@@ -0,0 +1,163 @@
+"""
+Order change facts and the read-model deltas derived from them.
+
+Every order write is described as a (before, after) pair of OrderFacts:
+``(None, facts)`` for a new order, ``(facts, None)`` for a deletion and
+``(old, new)`` for an update. Read models derived from orders (sales
+rollups, per-user summaries, stock reservations, ...) compute their
+increments from these pairs, so each one only has to define what a single
+order contributes.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Iterable, NamedTuple, Optional
+
+from app.constants.order_status import OrderStatus
+
+
+class OrderFacts(NamedTuple):
+    """Immutable copy of the order fields read models depend on."""
+
+    id: int
+    user_id: int
+    recipe_id: int
+    quantity: int
+    unit_price: float
+    status: str
+    ordered_at: datetime
+
+    @classmethod
+    def of(cls, order) -> "OrderFacts":
+        """Capture facts from an Order instance or a row with the same fields."""
+        return cls(
+            id=order.id,
+            user_id=order.user_id,
+            recipe_id=order.recipe_id,
+            quantity=int(order.quantity),
+            unit_price=float(order.unit_price),
+            status=order.status,
+            ordered_at=order.ordered_at,
+        )
+
+    @property
+    def revenue(self) -> float:
+        return self.quantity * self.unit_price
+
+    @property
+    def day(self) -> date:
+        return self.ordered_at.date()
+
+
+OrderChange = tuple[Optional[OrderFacts], Optional[OrderFacts]]
+
+# [order_count, quantity, revenue]
+Totals = list
+
+
+def rollup_deltas(
+    changes: Iterable[OrderChange],
+) -> tuple[dict[tuple[date, int], Totals], dict[tuple[date, str], Totals]]:
+    """
+    Net the sales-rollup increments for a batch of order changes.
+
+    Returns:
+        (recipe_deltas, status_deltas) keyed by (day, recipe_id) and
+        (day, status). Keys whose increments cancel out are dropped.
+    """
+    by_recipe: dict = defaultdict(lambda: [0, 0, 0.0])
+    by_status: dict = defaultdict(lambda: [0, 0, 0.0])
+
+    for before, after in changes:
+        for facts, sign in ((before, -1), (after, 1)):
+            if facts is None:
+                continue
+            if facts.status != OrderStatus.CANCELLED:
+                _bump(by_recipe[(facts.day, facts.recipe_id)], facts, sign)
+            _bump(by_status[(facts.day, facts.status)], facts, sign)
+
+    return _non_zero(by_recipe), _non_zero(by_status)
+
+
+def _bump(totals: Totals, facts: OrderFacts, sign: int) -> None:
+    totals[0] += sign
+    totals[1] += sign * facts.quantity
+    totals[2] += sign * facts.revenue
+
+
+def _non_zero(deltas: dict) -> dict:
+    return {
+        key: totals
+        for key, totals in deltas.items()
+        if totals[0] or totals[1] or abs(totals[2]) > 1e-9
+    }
+
+
+def summary_deltas(
+    changes: Iterable[OrderChange],
+) -> tuple[
+    dict[int, Totals],
+    dict[tuple[int, int], Totals],
+    list[OrderFacts],
+    list[OrderFacts],
+]:
+    """
+    Net the per-user summary increments for a batch of order changes.
+    Cancelled orders don't count towards a user's summary.
+
+    Returns:
+        (user_deltas, user_recipe_deltas, appeared, disappeared): totals
+        keyed by user_id and (user_id, recipe_id), plus the orders that
+        started / stopped counting (the only changes that can move a
+        user's last order).
+    """
+    by_user: dict = defaultdict(lambda: [0, 0, 0.0])
+    by_user_recipe: dict = defaultdict(lambda: [0, 0, 0.0])
+    appeared: list[OrderFacts] = []
+    disappeared: list[OrderFacts] = []
+
+    for before, after in changes:
+        counted_before = before is not None and before.status != OrderStatus.CANCELLED
+        counted_after = after is not None and after.status != OrderStatus.CANCELLED
+        for facts, sign, counted in ((before, -1, counted_before), (after, 1, counted_after)):
+            if counted:
+                _bump(by_user[facts.user_id], facts, sign)
+                _bump(by_user_recipe[(facts.user_id, facts.recipe_id)], facts, sign)
+        if counted_after and not counted_before:
+            appeared.append(after)
+        elif counted_before and not counted_after:
+            disappeared.append(before)
+
+    return _non_zero(by_user), _non_zero(by_user_recipe), appeared, disappeared
+
+
+class ReservationChanges(NamedTuple):
+    """What a batch of order changes does to per-order stock reservations."""
+
+    placed: list[OrderFacts]
+    # order_id -> (old quantity, new quantity)
+    resized: dict[int, tuple[int, int]]
+    # order_id -> True to give the stock back (cancelled / deleted unmade),
+    # False when it was used (the order shipped).
+    closed: dict[int, bool]
+
+
+def reservation_changes(changes: Iterable[OrderChange]) -> ReservationChanges:
+    """
+    Sort order changes by their effect on reserved stock. Only open
+    (Pending / Confirmed) orders hold a reservation: it is taken when the
+    order is placed, scaled when its quantity changes, and released or
+    consumed when the order leaves the open statuses.
+    """
+    result = ReservationChanges([], {}, {})
+    for before, after in changes:
+        was_open = before is not None and before.status in OrderStatus.RESERVES_STOCK
+        is_open = after is not None and after.status in OrderStatus.RESERVES_STOCK
+        if is_open and before is None:
+            result.placed.append(after)
+        elif was_open and is_open:
+            if before.quantity != after.quantity:
+                result.resized[after.id] = (before.quantity, after.quantity)
+        elif was_open:
+            result.closed[before.id] = after is None or after.status == OrderStatus.CANCELLED
+    return result
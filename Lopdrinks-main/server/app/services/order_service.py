@@ -1,23 +1,107 @@
 """Order business logic service."""
 
 import logging
-from datetime import datetime
+from collections import defaultdict
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import datetime, timedelta
+from functools import partial
 
 from app.models.order import Order
 from app.repositories.order_repository import OrderRepository
 from app.repositories.recipe_repository import RecipeRepository
 from app.repositories.user_repository import UserRepository
+from app.repositories.sales_rollup_repository import SalesRollupRepository
+from app.repositories.order_archive_repository import OrderArchiveRepository
+from app.repositories.user_summary_repository import UserSummaryRepository
+from app.repositories.stock_repository import StockRepository
+from app.services.order_changes import (
+    OrderChange,
+    OrderFacts,
+    reservation_changes,
+    rollup_deltas,
+    summary_deltas,
+)
+from app.services.stock_availability import AvailabilityIndex
+from app.services.order_writer import GroupCommitWriter, RESULT_TIMEOUT_SECONDS
+from app.services.change_bus import ChangeBus, Subscription
 from app.constants.order_status import OrderStatus
 from app.constants.roles import Role
+from app.utils.dates import parse_iso_datetime
+from app.utils.pagination import clamp_limit, decode_cursor, encode_cursor
 from app.exceptions.custom_exceptions import (
+    AppError,
     ValidationError,
     NotFoundError,
     ForbiddenError,
+    ConflictError,
     InternalServerError,
+    ServiceUnavailableError,
 )
 
 logger = logging.getLogger(__name__)
 
+# Criteria a bulk status update may select orders by.
+BULK_FILTER_KEYS: tuple[str, ...] = ("status", "user_id", "from", "to")
+
+
+def _parse_quantity(value) -> int:
+    """
+    Raises:
+        ValidationError: If value is not a positive integer.
+    """
+    try:
+        quantity = int(value)
+        if quantity < 1:
+            raise ValueError
+    except (ValueError, TypeError):
+        raise ValidationError("quantity must be a positive integer.")
+    return quantity
+
+
+def _check_status_filter(status: str | None) -> None:
+    """
+    Raises:
+        ValidationError: If status is given and isn't an OrderStatus.
+    """
+    if status is not None and status not in OrderStatus.ALL:
+        raise ValidationError(
+            f"Invalid status. Must be one of: {', '.join(OrderStatus.ALL)}."
+        )
+
+
+def _log_late_commit(user_id: int, future: Future) -> None:
+    """Record how a group-commit row answered with 202 finally turned out."""
+    exc = future.exception()
+    if exc is None:
+        logger.info("Late group commit: order id=%d placed for user_id=%d", future.result(), user_id)
+    else:
+        logger.warning("Late group commit: order for user_id=%d failed: %s", user_id, exc)
+
+
+def _keyset_page(rows: list, limit: int) -> dict:
+    """Serialise up to ``limit`` of ``limit + 1`` fetched rows plus the next cursor."""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "items": [_serialise_order(o) for o in rows],
+        "next_cursor": (
+            encode_cursor(rows[-1].ordered_at, rows[-1].id) if has_more else None
+        ),
+    }
+
+
+def _serialise_facts(f: OrderFacts) -> dict:
+    return {
+        "id": f.id,
+        "recipe_id": f.recipe_id,
+        "quantity": f.quantity,
+        "unit_price": f.unit_price,
+        "status": f.status,
+        "ordered_at": f.ordered_at.isoformat(),
+        "user_id": f.user_id,
+    }
+
 
 def _serialise_order(o: Order) -> dict:
     return {
@@ -39,10 +123,164 @@ class OrderService:
         order_repo: OrderRepository,
         recipe_repo: RecipeRepository,
         user_repo: UserRepository,
+        rollup_repo: SalesRollupRepository,
+        summary_repo: UserSummaryRepository,
+        stock_repo: StockRepository,
+        archive_repo: OrderArchiveRepository | None = None,
+        order_writer: GroupCommitWriter | None = None,
+        change_bus: ChangeBus | None = None,
+        availability: AvailabilityIndex | None = None,
     ) -> None:
         self._order_repo = order_repo
         self._recipe_repo = recipe_repo
         self._user_repo = user_repo
+        self._rollup_repo = rollup_repo
+        self._summary_repo = summary_repo
+        self._stock_repo = stock_repo
+        self._archive_repo = archive_repo
+        # Set when ORDER_GROUP_COMMIT is on; create() then queues instead of committing.
+        self._order_writer = order_writer
+        self._change_bus = change_bus
+        self._availability = availability
+        # Stock levels written by the last _record(), applied once committed.
+        self._stock_levels: list[tuple[int, str, float]] = []
+        # Rollup stamp written by the last _record(), sent with its events.
+        self._rolled_up_at: datetime | None = None
+
+    def _require_user(self, user_id: int) -> None:
+        """
+        Reject JWTs whose user has since been deleted.
+
+        Backed by UserRepository.exists(), which serves repeat lookups from
+        a short-TTL process cache instead of a round trip per request.
+
+        Raises:
+            NotFoundError: If the user no longer exists.
+        """
+        if not self._user_repo.exists(user_id):
+            raise NotFoundError("User not found.")
+
+    def _record(self, changes: list[OrderChange]) -> None:
+        """
+        Apply the read-model side effects of order writes.
+
+        Runs inside the caller's transaction (before its commit) so the
+        rollups, user summaries and stock can never drift from the order
+        rows they follow.
+
+        Raises:
+            ConflictError: Not enough stock; the caller must roll back.
+        """
+        self._reserve_stock(changes)
+        self._rolled_up_at = self._rollup_repo.apply(*rollup_deltas(changes))
+        self._summary_repo.apply(*summary_deltas(changes))
+
+    def _reserve_stock(self, changes: list[OrderChange]) -> None:
+        """
+        Reserve stock for newly placed orders and give back or drop what
+        changed orders hold, with one conditional UPDATE. Nothing is locked
+        beforehand: each stock row is checked and decremented atomically,
+        and the row locks last only until the caller commits.
+
+        New orders reserve their recipe's tracked ingredients and record the
+        amounts in order_stock_reservation; quantity edits scale, and
+        cancellations / unmade deletions release, exactly those recorded
+        amounts, so later recipe edits or newly tracked ingredients can't
+        make a release differ from the reservation. An order placed before
+        its ingredients were tracked holds nothing and releases nothing.
+
+        Raises:
+            ConflictError: An ingredient doesn't have enough stock.
+        """
+        self._stock_levels = []
+        placed, resized, closed = reservation_changes(changes)
+        if not (placed or resized or closed):
+            return
+
+        deltas: dict[tuple[int, str], float] = defaultdict(float)
+        rows: list[tuple[int, int, str, float]] = []
+        if placed:
+            per_cup: dict[int, dict] = defaultdict(lambda: defaultdict(float))
+            for line in self._stock_repo.tracked_lines({o.recipe_id for o in placed}):
+                per_cup[line.recipe_id][(line.ingredient_id, line.unit)] += line.amount
+            for order in placed:
+                for key, amount in per_cup.get(order.recipe_id, {}).items():
+                    rows.append((order.id, *key, amount * order.quantity))
+                    deltas[key] += amount * order.quantity
+        if resized or closed:
+            for held in self._stock_repo.reservations([*resized, *closed]):
+                key = (held.ingredient_id, held.unit)
+                if held.order_id in resized:
+                    old_quantity, new_quantity = resized[held.order_id]
+                    amount = held.amount * new_quantity / old_quantity
+                    rows.append((held.order_id, *key, amount))
+                    deltas[key] += amount - held.amount
+                elif closed[held.order_id]:
+                    deltas[key] -= held.amount
+        self._stock_repo.replace_reservations([*resized, *closed], rows)
+
+        deltas = {key: amount for key, amount in deltas.items() if abs(amount) > 1e-9}
+        if not deltas:
+            return
+        levels = self._stock_repo.adjust(deltas)
+        # A release only misses when its stock row has been removed since.
+        updated = {(i, u) for i, u, _ in levels}
+        short = sorted({i for (i, u), n in deltas.items() if n > 0 and (i, u) not in updated})
+        if short:
+            names = self._stock_repo.ingredient_names(short)
+            raise ConflictError(
+                "Not enough stock: " + ", ".join(names.get(i, str(i)) for i in short) + "."
+            )
+        self._stock_levels = levels
+
+    def _publish(self, changes: list[OrderChange]) -> None:
+        """
+        Announce committed order changes: this worker's availability cache
+        gets the new stock levels, stream subscribers get the events.
+        """
+        if self._availability is not None and self._stock_levels:
+            self._availability.apply_levels(self._stock_levels)
+            self._stock_levels = []
+        if self._change_bus is None:
+            return
+        for before, after in changes:
+            if before is None:
+                kind = "order.created"
+            elif after is None:
+                kind = "order.deleted"
+            else:
+                kind = "order.updated"
+            facts = after or before
+            data = _serialise_facts(facts)
+            if before is not None and after is not None:
+                data["previous"] = {"quantity": before.quantity, "status": before.status}
+            if self._rolled_up_at is not None:
+                # Lets rollup-built read models skip changes they already hold.
+                data["rolled_up_at"] = self._rolled_up_at.isoformat()
+            self._change_bus.publish(kind, facts.user_id, data)
+
+    def _insert(self, rows: list[dict]) -> list[OrderChange]:
+        """Bulk-insert validated order rows and their rollup deltas, uncommitted."""
+        order_ids = self._order_repo.insert_many(rows)
+        changes = [(None, OrderFacts(id=i, **r)) for i, r in zip(order_ids, rows)]
+        self._record(changes)
+        return changes
+
+    def insert_batch(self, rows: list[dict]) -> list[int]:
+        """
+        Insert and commit pre-validated order rows as one transaction.
+
+        This is the group-commit writer's flush; it re-raises DB errors so
+        the writer can fall back to committing rows one by one.
+        """
+        try:
+            changes = self._insert(rows)
+            self._order_repo.commit()
+        except Exception:
+            self._order_repo.rollback()
+            raise
+        self._publish(changes)
+        return [after.id for _, after in changes]
 
     def get_orders(
         self,
@@ -50,34 +288,133 @@ class OrderService:
         requesting_user_role: str,
         status: str | None = None,
         limit: int = 5,
-    ) -> list[dict]:
+        after: str | None = None,
+        include_total: bool = False,
+        max_limit: int = 100,
+    ) -> dict:
         """
         Admins see all orders; regular users see only their own.
 
+        Results are keyset-paginated on (ordered_at, id), newest first.
+        Pass the returned ``next_cursor`` back as ``after`` to fetch the
+        following page; it is None on the last page.
+
         Raises:
-            ValidationError: If limit < 1.
+            ValidationError: If limit < 1, the status is unknown or the
+                             cursor is malformed.
             NotFoundError: If the requesting user doesn't exist.
         """
-        if limit < 1:
-            raise ValidationError("limit must be a positive integer.")
+        limit = clamp_limit(limit, max_limit)
+        _check_status_filter(status)
+        after_key = decode_cursor(after) if after else None
 
-        user = self._user_repo.find_by_id(requesting_user_id)
-        if not user:
-            raise NotFoundError("User not found.")
+        self._require_user(requesting_user_id)
 
         user_id_filter = (
             None if requesting_user_role == Role.ADMIN else requesting_user_id
         )
+        # Fetch one extra row to learn whether another page exists.
         orders = self._order_repo.find_all(
-            user_id=user_id_filter, status=status, limit=limit
+            user_id=user_id_filter, status=status, limit=limit + 1, after=after_key
         )
         logger.debug(
             "Fetched %d orders for user_id=%d role=%s",
-            len(orders),
+            min(len(orders), limit),
             requesting_user_id,
             requesting_user_role,
         )
-        return [_serialise_order(o) for o in orders]
+
+        page = _keyset_page(orders, limit)
+        if include_total:
+            total, estimated = self._order_repo.count(
+                user_id=user_id_filter, status=status
+            )
+            page["total"] = total
+            page["total_is_estimate"] = estimated
+        return page
+
+    def get_archived_orders(
+        self,
+        requesting_user_id: int,
+        requesting_user_role: str,
+        status: str | None = None,
+        limit: int = 5,
+        after: str | None = None,
+        max_limit: int = 100,
+    ) -> dict:
+        """
+        Keyset-paginated archived orders, newest first; same visibility
+        rules and cursor format as get_orders().
+
+        Raises:
+            ValidationError: If limit < 1, the status is unknown or the
+                             cursor is malformed.
+            NotFoundError: If the requesting user doesn't exist.
+        """
+        limit = clamp_limit(limit, max_limit)
+        _check_status_filter(status)
+        after_key = decode_cursor(after) if after else None
+
+        self._require_user(requesting_user_id)
+
+        user_id_filter = (
+            None if requesting_user_role == Role.ADMIN else requesting_user_id
+        )
+        orders = self._archive_repo.find_all(
+            user_id=user_id_filter, status=status, limit=limit + 1, after=after_key
+        )
+        return _keyset_page(orders, limit)
+
+    def archive_old_orders(self, older_than_days: int, batch_size: int = 5000) -> dict:
+        """
+        Move Delivered / Cancelled orders older than ``older_than_days`` to
+        the archive, one committed batch at a time so locks stay short.
+
+        Rollups are untouched: archived orders still count as history.
+
+        Raises:
+            ValidationError: If older_than_days or batch_size is not positive.
+            InternalServerError: On DB failure (earlier batches stay archived).
+        """
+        if older_than_days < 1 or batch_size < 1:
+            raise ValidationError("older_than_days and batch_size must be positive.")
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+
+        archived = 0
+        while True:
+            try:
+                moved = self._archive_repo.archive_batch(
+                    cutoff, OrderStatus.TERMINAL, batch_size
+                )
+                self._archive_repo.commit()
+            except Exception as exc:
+                self._archive_repo.rollback()
+                logger.exception("DB error archiving orders before %s", cutoff)
+                raise InternalServerError("Failed to archive orders.") from exc
+            archived += moved
+            if moved < batch_size:
+                break
+
+        logger.info("Archived %d orders placed before %s", archived, cutoff)
+        return {"archived": archived, "cutoff": cutoff.isoformat()}
+
+    def ensure_partitions(self, months_ahead: int = 3) -> list[str]:
+        """
+        Create upcoming monthly partitions (PostgreSQL only).
+
+        Raises:
+            InternalServerError: On DB failure.
+        """
+        try:
+            created = self._order_repo.ensure_partitions(months_ahead)
+            self._order_repo.commit()
+        except Exception as exc:
+            self._order_repo.rollback()
+            logger.exception("DB error creating order partitions")
+            raise InternalServerError("Failed to create order partitions.") from exc
+        if created:
+            logger.info("Created order partitions: %s", ", ".join(created))
+        return created
 
     def get_by_id(
         self, order_id: int, requesting_user_id: int, requesting_user_role: str
@@ -87,9 +424,7 @@ class OrderService:
             NotFoundError: Order or user not found.
             ForbiddenError: Non-admin trying to access another user's order.
         """
-        user = self._user_repo.find_by_id(requesting_user_id)
-        if not user:
-            raise NotFoundError("User not found.")
+        self._require_user(requesting_user_id)
 
         order = self._order_repo.find_by_id(order_id)
         if not order:
@@ -104,44 +439,172 @@ class OrderService:
         """
         Place a new order.
 
+        With group commit, a row whose shared commit hasn't finished within
+        RESULT_TIMEOUT_SECONDS comes back with ``pending: True`` and no
+        ``order_id``: it may still be committed, so the caller must not
+        blindly place it again.
+
         Raises:
             ValidationError: If quantity is invalid.
             NotFoundError: If recipe is not found.
+            ConflictError: If an ingredient is out of stock.
             InternalServerError: On DB failure.
         """
-        try:
-            quantity = int(quantity)
-            if quantity < 1:
-                raise ValueError
-        except (ValueError, TypeError):
-            raise ValidationError("quantity must be a positive integer.")
+        quantity = _parse_quantity(quantity)
 
         recipe = self._recipe_repo.find_by_id(recipe_id)
         if not recipe:
             raise NotFoundError("Recipe not found.")
 
-        order = Order(
-            user_id=user_id,
-            recipe_id=recipe_id,
-            quantity=quantity,
-            unit_price=float(recipe.price),
-            status=OrderStatus.PENDING,
-            ordered_at=datetime.utcnow(),
-        )
+        row = {
+            "user_id": user_id,
+            "recipe_id": recipe_id,
+            "quantity": quantity,
+            "unit_price": float(recipe.price),
+            "status": OrderStatus.PENDING,
+            "ordered_at": datetime.utcnow(),
+        }
+
+        if self._order_writer is not None:
+            order_id = self._submit(row)
+            if order_id is None:
+                return {
+                    "message": (
+                        "Order accepted but not yet confirmed; it may already be placed. "
+                        "Check your orders before placing it again, or retry with the "
+                        "same Idempotency-Key."
+                    ),
+                    "order_id": None,
+                    "pending": True,
+                    "quantity": quantity,
+                    "recipe_id": recipe_id,
+                }
+        else:
+            order = Order(**row)
+            try:
+                self._order_repo.add(order)
+                changes = [(None, OrderFacts.of(order))]
+                self._record(changes)
+                self._order_repo.commit()
+            except AppError:
+                self._order_repo.rollback()
+                raise
+            except Exception as exc:
+                self._order_repo.rollback()
+                logger.exception("DB error creating order user_id=%d", user_id)
+                raise InternalServerError("Failed to place order.") from exc
+            self._publish(changes)
+            order_id = changes[0][1].id
+
+        logger.info("Order created: id=%d user_id=%d", order_id, user_id)
+        return {
+            "message": "Order placed successfully.",
+            "order_id": order_id,
+            "quantity": quantity,
+            "recipe_id": recipe_id,
+        }
+
+    def _submit(self, row: dict) -> int | None:
+        """
+        Queue a row on the group-commit writer and wait for its id.
+
+        Returns:
+            The new order id, or None if the commit is still outstanding
+            after RESULT_TIMEOUT_SECONDS. The row stays queued and may yet
+            be committed; its eventual outcome is logged.
 
+        Raises:
+            ConflictError: If an ingredient is out of stock.
+            InternalServerError: If the shared commit fails.
+        """
+        # End the read transaction first: a burst of waiting requests must
+        # not hold every pooled connection while the writer needs one.
+        self._order_repo.rollback()
+        future = self._order_writer.submit(row)
         try:
-            self._order_repo.save(order)
+            return future.result(timeout=RESULT_TIMEOUT_SECONDS)
+        except FutureTimeoutError:
+            logger.warning(
+                "Group commit still pending after %.0fs for user_id=%d; answering 202",
+                RESULT_TIMEOUT_SECONDS,
+                row["user_id"],
+            )
+            future.add_done_callback(partial(_log_late_commit, row["user_id"]))
+            return None
+        except AppError:
+            raise
         except Exception as exc:
-            self._order_repo.rollback()
-            logger.exception("DB error creating order user_id=%d", user_id)
+            logger.exception("Group commit error creating order user_id=%d", row["user_id"])
             raise InternalServerError("Failed to place order.") from exc
 
-        logger.info("Order created: id=%d user_id=%d", order.id, user_id)
+    def create_many(self, user_id: int, items: list, max_lines: int = 50) -> dict:
+        """
+        Check out a cart: place one order per ``{recipe_id, quantity}`` line.
+
+        All lines are priced with a single ``IN`` lookup and inserted with
+        one bulk INSERT in a single transaction, so a cart either lands in
+        full or not at all.
+
+        Raises:
+            ValidationError: If the cart is empty, too large, or a line is invalid.
+            NotFoundError: If any recipe does not exist.
+            ConflictError: If the cart needs more of an ingredient than is in stock.
+            InternalServerError: On DB failure.
+        """
+        if not isinstance(items, list) or not items:
+            raise ValidationError("items must be a non-empty list.")
+        if len(items) > max_lines:
+            raise ValidationError(f"A cart may contain at most {max_lines} lines.")
+
+        lines: list[tuple[int, int]] = []
+        for item in items:
+            # type() rather than isinstance(): JSON true/false are bools, and
+            # bool is an int subclass.
+            if not isinstance(item, dict) or type(item.get("recipe_id")) is not int:
+                raise ValidationError("Each item needs an integer recipe_id.")
+            quantity = item.get("quantity", 1)
+            if type(quantity) is not int:
+                raise ValidationError("quantity must be a positive integer.")
+            lines.append((item["recipe_id"], _parse_quantity(quantity)))
+
+        prices = self._recipe_repo.find_prices({recipe_id for recipe_id, _ in lines})
+        missing = sorted({recipe_id for recipe_id, _ in lines} - prices.keys())
+        if missing:
+            raise NotFoundError(
+                f"Recipe(s) not found: {', '.join(map(str, missing))}."
+            )
+
+        ordered_at = datetime.utcnow()
+        rows = [
+            {
+                "user_id": user_id,
+                "recipe_id": recipe_id,
+                "quantity": quantity,
+                "unit_price": prices[recipe_id],
+                "status": OrderStatus.PENDING,
+                "ordered_at": ordered_at,
+            }
+            for recipe_id, quantity in lines
+        ]
+
+        try:
+            changes = self._insert(rows)
+            self._order_repo.commit()
+        except AppError:
+            self._order_repo.rollback()
+            raise
+        except Exception as exc:
+            self._order_repo.rollback()
+            logger.exception("DB error checking out cart user_id=%d", user_id)
+            raise InternalServerError("Failed to place orders.") from exc
+        self._publish(changes)
+        order_ids = [after.id for _, after in changes]
+
+        logger.info("Cart checked out: %d orders user_id=%d", len(order_ids), user_id)
         return {
-            "message": "Order placed successfully.",
-            "order_id": order.id,
-            "quantity": order.quantity,
-            "recipe_id": order.recipe_id,
+            "message": "Orders placed successfully.",
+            "order_ids": order_ids,
+            "total": round(sum(r["quantity"] * r["unit_price"] for r in rows), 2),
         }
 
     def update(
@@ -152,89 +615,295 @@ class OrderService:
         data: dict,
     ) -> dict:
         """
-        Update quantity (owner or admin) or status (admin only).
+        Update quantity (owner or admin, until shipped) or status (admin
+        only, along OrderStatus.TRANSITIONS).
+
+        Every write is a single guarded UPDATE whose WHERE clause carries
+        the ownership and state checks, so there is no window between
+        check and write; it also returns the replaced status and quantity
+        for the rollups. Only when it matches nothing is the order read,
+        to tell the caller why.
 
         Raises:
-            NotFoundError, ForbiddenError, ValidationError, InternalServerError.
+            NotFoundError: Order not found.
+            ForbiddenError: Not the owner, or a non-admin changing status.
+            ConflictError: The order's current state doesn't allow the change.
+            ValidationError, InternalServerError.
         """
-        order = self._order_repo.find_by_id(order_id)
-        if not order:
-            raise NotFoundError("Order not found.")
-
-        if order.user_id != requesting_user_id and requesting_user_role != Role.ADMIN:
-            raise ForbiddenError()
-
-        updated = False
-
-        if "quantity" in data:
-            try:
-                qty = int(data["quantity"])
-                if qty < 1:
-                    raise ValueError
-                order.quantity = qty
-                updated = True
-            except (ValueError, TypeError):
-                raise ValidationError("quantity must be a positive integer.")
+        is_admin = requesting_user_role == Role.ADMIN
+        owner_id = None if is_admin else requesting_user_id
 
+        quantity = _parse_quantity(data["quantity"]) if "quantity" in data else None
+        target = data.get("status")
         if "status" in data:
-            if requesting_user_role != Role.ADMIN:
+            if not is_admin:
                 raise ForbiddenError("Only admins can update order status.")
-            if data["status"] not in OrderStatus.ALL:
+            if target not in OrderStatus.ALL:
                 raise ValidationError(
                     f"Invalid status. Must be one of: {', '.join(OrderStatus.ALL)}."
                 )
-            order.status = data["status"]
-            updated = True
-
-        if not updated:
+        if quantity is None and target is None:
             raise ValidationError("No valid fields to update.")
 
+        values: dict = {}
+        allowed = OrderStatus.ALL
+        if quantity is not None:
+            values["quantity"] = quantity
+            allowed = OrderStatus.QUANTITY_EDITABLE
+        if target is not None:
+            values["status"] = target
+            allowed = tuple(st for st in allowed if OrderStatus.can_transition(st, target))
+
         try:
+            row = self._order_repo.guarded_update(
+                order_id, values, user_id=owner_id, statuses=allowed
+            )
+            if row is None:
+                self._raise_unmatched(
+                    order_id,
+                    owner_id,
+                    allowed,
+                    action="edited" if target is None else f"moved to {target}",
+                )
+            after = OrderFacts.of(row)
+            change = (
+                after._replace(status=row.previous_status, quantity=row.previous_quantity),
+                after,
+            )
+            self._record([change])
             self._order_repo.commit()
+        except AppError:
+            self._order_repo.rollback()
+            raise
         except Exception as exc:
             self._order_repo.rollback()
             logger.exception("DB error updating order id=%d", order_id)
             raise InternalServerError("Failed to update order.") from exc
+        self._publish([change])
 
         logger.info("Order updated: id=%d", order_id)
         return {
             "message": "Order updated.",
-            "order_id": order.id,
-            "quantity": order.quantity,
-            "status": order.status,
+            "order_id": after.id,
+            "quantity": after.quantity,
+            "status": after.status,
         }
 
-    def delete(
+    def _raise_unmatched(
         self,
         order_id: int,
+        owner_id: int | None,
+        allowed: tuple[str, ...],
+        action: str,
+        refused: type[AppError] = ConflictError,
+    ) -> None:
+        """
+        Explain why a guarded write matched no row (off the success path).
+        ``refused`` is raised when the order's status doesn't allow it.
+
+        Raises:
+            NotFoundError, ForbiddenError or ConflictError.
+        """
+        row = self._order_repo.find_facts(order_id)
+        if row is None:
+            raise NotFoundError("Order not found.")
+        if owner_id is not None and row.user_id != owner_id:
+            raise ForbiddenError()
+        if row.status not in allowed:
+            raise refused(f"A {row.status} order cannot be {action}.")
+        raise ConflictError("Order was modified concurrently; please retry.")
+
+    def bulk_update_status(self, data: dict, max_ids: int = 1000) -> dict:
+        """
+        Admin-only: move many orders to one target status in one UPDATE.
+
+        ``data`` holds the target ``status`` and either ``ids`` (a list of
+        order ids) or ``filter`` (``status``, ``user_id``, ``from``, ``to``).
+        Only orders whose current status may transition to the target (per
+        OrderStatus.TRANSITIONS) are changed; the rest are reported as skipped.
+
+        Raises:
+            ValidationError: Invalid status, selector, or too many ids.
+            InternalServerError: On DB failure.
+        """
+        target = data.get("status")
+        if target not in OrderStatus.ALL:
+            raise ValidationError(
+                f"Invalid status. Must be one of: {', '.join(OrderStatus.ALL)}."
+            )
+        allowed_from = OrderStatus.predecessors(target)
+        if not allowed_from:
+            raise ValidationError(f"No status can transition to {target}.")
+
+        ids, filters = self._bulk_selector(data, max_ids)
+
+        try:
+            # One set-based UPDATE per predecessor status, so every returned
+            # row's previous status is known for the rollup deltas.
+            changes: list[OrderChange] = []
+            for from_status in allowed_from:
+                for row in self._order_repo.transition_status(
+                    target, (from_status,), ids=ids, filters=filters
+                ):
+                    after = OrderFacts.of(row)
+                    changes.append((after._replace(status=from_status), after))
+            updated = [after.id for _, after in changes]
+            self._record(changes)
+            if ids is not None:
+                updated_set = set(updated)
+                skipped = [i for i in ids if i not in updated_set]
+            else:
+                skipped = self._order_repo.find_ids(
+                    filters=filters, exclude_statuses=(target,)
+                )
+            self._order_repo.commit()
+        except Exception as exc:
+            self._order_repo.rollback()
+            logger.exception("DB error in bulk status update to %s", target)
+            raise InternalServerError("Failed to update orders.") from exc
+        self._publish(changes)
+
+        logger.info(
+            "Bulk status update to %s: %d updated, %d skipped",
+            target,
+            len(updated),
+            len(skipped),
+        )
+        return {
+            "message": f"{len(updated)} order(s) moved to {target}.",
+            "updated_ids": sorted(updated),
+            "skipped_ids": sorted(skipped),
+        }
+
+    @staticmethod
+    def _bulk_selector(data: dict, max_ids: int) -> tuple[list[int] | None, dict | None]:
+        """Validate the ``ids`` / ``filter`` part of a bulk request."""
+        ids, raw_filter = data.get("ids"), data.get("filter")
+        if (ids is None) == (raw_filter is None):
+            raise ValidationError("Provide exactly one of ids or filter.")
+
+        if ids is not None:
+            if (
+                not isinstance(ids, list)
+                or not ids
+                or not all(type(i) is int for i in ids)
+            ):
+                raise ValidationError("ids must be a non-empty list of integers.")
+            if len(ids) > max_ids:
+                raise ValidationError(f"At most {max_ids} ids per request.")
+            return list(dict.fromkeys(ids)), None
+
+        if not isinstance(raw_filter, dict) or not raw_filter:
+            raise ValidationError("filter must be a non-empty object.")
+        unknown = sorted(set(raw_filter) - set(BULK_FILTER_KEYS))
+        if unknown:
+            raise ValidationError(
+                f"Unknown filter key(s): {', '.join(unknown)}. "
+                f"Allowed: {', '.join(BULK_FILTER_KEYS)}."
+            )
+        status = raw_filter.get("status")
+        if status is not None and status not in OrderStatus.ALL:
+            raise ValidationError(
+                f"Invalid filter status. Must be one of: {', '.join(OrderStatus.ALL)}."
+            )
+        user_id = raw_filter.get("user_id")
+        if user_id is not None and type(user_id) is not int:
+            raise ValidationError("filter.user_id must be an integer.")
+        filters = {
+            "status": status,
+            "user_id": user_id,
+            "from": parse_iso_datetime(raw_filter.get("from"), "filter.from"),
+            "to": parse_iso_datetime(raw_filter.get("to"), "filter.to"),
+        }
+        # An all-null filter would select every order.
+        if all(value is None for value in filters.values()):
+            raise ValidationError(
+                f"filter needs at least one of: {', '.join(BULK_FILTER_KEYS)}."
+            )
+        return None, filters
+
+    def subscribe(
+        self,
         requesting_user_id: int,
         requesting_user_role: str,
-    ) -> dict:
+        last_event_id: str | None = None,
+        max_subscribers: int | None = None,
+    ) -> Subscription:
         """
-        Delete an order. Non-admins can only delete their own Pending orders.
+        Open a change-feed subscription: admins see every order, users their own.
+
+        ``last_event_id`` resumes after an event already received. At most
+        ``max_subscribers`` streams stay open per process.
 
         Raises:
-            NotFoundError, ForbiddenError, InternalServerError.
+            ValidationError: If last_event_id is not an integer.
+            NotFoundError: If the requesting user doesn't exist.
+            ServiceUnavailableError: If max_subscribers streams are open.
+            InternalServerError: If the change feed is not configured.
         """
-        order = self._order_repo.find_by_id(order_id)
-        if not order:
-            raise NotFoundError("Order not found.")
+        if self._change_bus is None:
+            raise InternalServerError("Order change feed is unavailable.")
+        try:
+            resume_after = int(last_event_id) if last_event_id else None
+        except ValueError:
+            raise ValidationError("Last-Event-ID must be an integer.")
 
-        if order.user_id != requesting_user_id and requesting_user_role != Role.ADMIN:
-            raise ForbiddenError()
+        self._require_user(requesting_user_id)
+
+        user_id_filter = (
+            None if requesting_user_role == Role.ADMIN else requesting_user_id
+        )
+        subscription = self._change_bus.subscribe(
+            user_id_filter, last_event_id=resume_after, limit=max_subscribers
+        )
+        if subscription is None:
+            logger.warning("Order stream refused: %d streams already open", max_subscribers)
+            raise ServiceUnavailableError("Too many open order streams. Please retry shortly.")
+        return subscription
+
+    def delete(
+        self,
+        order_id: int,
+        requesting_user_id: int,
+        requesting_user_role: str,
+    ) -> dict:
+        """
+        Delete an order in one guarded DELETE. Non-admins can only delete
+        their own Pending orders.
 
-        if (
-            order.status not in OrderStatus.USER_CANCELLABLE
-            and requesting_user_role != Role.ADMIN
-        ):
-            raise ForbiddenError("Only pending orders can be deleted.")
+        Raises:
+            NotFoundError: Order not found.
+            ForbiddenError: Not the owner, or a non-admin deleting an order
+                            that is no longer Pending.
+            InternalServerError: On DB failure.
+        """
+        is_admin = requesting_user_role == Role.ADMIN
+        owner_id = None if is_admin else requesting_user_id
+        allowed = OrderStatus.ALL if is_admin else OrderStatus.USER_CANCELLABLE
 
         try:
-            self._order_repo.delete(order)
+            row = self._order_repo.guarded_delete(
+                order_id,
+                user_id=owner_id,
+                statuses=None if is_admin else allowed,
+            )
+            if row is None:
+                # Users may only delete their own Pending orders; any other
+                # refusal is a permission failure, not a conflict.
+                self._raise_unmatched(
+                    order_id, owner_id, allowed, action="deleted", refused=ForbiddenError
+                )
+            changes = [(OrderFacts.of(row), None)]
+            self._record(changes)
+            self._order_repo.commit()
+        except AppError:
+            self._order_repo.rollback()
+            raise
         except Exception as exc:
             self._order_repo.rollback()
             logger.exception("DB error deleting order id=%d", order_id)
             raise InternalServerError("Failed to delete order.") from exc
+        self._publish(changes)
 
         logger.info("Order deleted: id=%d", order_id)
         return {"message": "Order deleted.", "order_id": order_id}
@@ -0,0 +1,150 @@
+"""
+Group-commit writer for single-order inserts.
+
+With ``ORDER_GROUP_COMMIT`` enabled, ``POST /orders/`` does not commit on
+its own. Validated order rows are queued to one writer thread per worker
+process, which drains the queue into a single transaction every
+``ORDER_GROUP_COMMIT_WAIT_MS`` milliseconds or ``ORDER_GROUP_COMMIT_MAX_ROWS``
+rows, whichever comes first. Each caller blocks on a Future that resolves
+with its order id once the shared commit is durable — so a burst of N
+orders costs one fsync instead of N. A caller that stops waiting (see
+RESULT_TIMEOUT_SECONDS) does not withdraw its row.
+
+The thread is started lazily on first use and is keyed by PID, so a
+gunicorn worker forked after app creation gets its own writer instead of
+a copy of the parent's dead thread.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable
+
+from app.exceptions.custom_exceptions import AppError
+
+logger = logging.getLogger(__name__)
+
+# flush(rows) -> ids, committing them as one transaction.
+FlushFn = Callable[[list[dict]], list[int]]
+
+_STOP = object()
+
+# How long a request waits for its batch. After that it is answered 202
+# (outcome unknown) while the row stays queued and may still commit.
+RESULT_TIMEOUT_SECONDS = 10.0
+
+
+class GroupCommitWriter:
+    """Batches queued rows into shared transactions on a background thread."""
+
+    def __init__(self, flush: FlushFn, max_rows: int = 200, max_wait_ms: float = 5.0) -> None:
+        self._flush = flush
+        self._max_rows = max_rows
+        self._max_wait = max_wait_ms / 1000.0
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, row: dict) -> Future:
+        """Queue one row; the returned Future resolves with its new id."""
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((row, future))
+        return future
+
+    def close(self, timeout: float | None = 5.0) -> None:
+        """Flush everything queued so far and stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="order-group-commit", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch = [first]
+            stop = False
+            deadline = time.monotonic() + self._max_wait
+            while len(batch) < self._max_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._write(batch)
+            if stop:
+                return
+
+    def _write(self, batch: list[tuple[dict, Future]]) -> None:
+        """
+        Commit one batch. If the shared transaction fails, retry its rows
+        one by one so a single bad row only fails its own request.
+        """
+        try:
+            ids = self._flush([row for row, _ in batch])
+        except Exception as exc:
+            if len(batch) == 1:
+                if isinstance(exc, AppError) and exc.status_code < 500:
+                    # Expected outcome (e.g. sold out), reported to the caller.
+                    logger.info("Group commit rejected 1 order: %s", exc.message)
+                else:
+                    logger.exception("Group commit failed for 1 order")
+                batch[0][1].set_exception(exc)
+                return
+            logger.warning(
+                "Group commit of %d orders failed; retrying individually", len(batch)
+            )
+            for item in batch:
+                self._write([item])
+            return
+
+        logger.debug("Group commit: %d orders", len(ids))
+        for (_, future), order_id in zip(batch, ids):
+            future.set_result(order_id)
+
+
+_writers: dict[tuple[int, int], GroupCommitWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(key: object, factory: Callable[[], GroupCommitWriter]) -> GroupCommitWriter:
+    """
+    Return this process's writer for ``key`` (usually the Flask app),
+    creating it with ``factory`` on first use or after a fork.
+    """
+    slot = (id(key), os.getpid())
+    writer = _writers.get(slot)
+    if writer is None:
+        with _writers_lock:
+            writer = _writers.get(slot)
+            if writer is None:
+                writer = factory()
+                _writers[slot] = writer
+                atexit.register(writer.close)
+    return writer
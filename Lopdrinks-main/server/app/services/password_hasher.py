@@ -0,0 +1,155 @@
+"""
+Password hashing off the request threads.
+
+A scrypt/pbkdf2 hash is deliberately slow — tens to hundreds of
+milliseconds of CPU. Run inline, a burst of logins keeps a worker's
+request threads busy hashing while catalog reads queue behind them. The
+PasswordHasher sends hashes and checks to a small per-worker process pool
+instead, so at most ``workers`` hashes burn CPU at once per gunicorn
+worker.
+
+The request thread still waits for its hash, so the number of hashes in
+flight is capped at ``max_pending`` — sized below the worker's thread
+count (WEB_THREADS) so a login burst can never occupy every thread. A
+login over the cap, or one whose hash takes longer than ``timeout``, gets
+a 503 straight away instead of queueing. If a pool process dies (OOM
+kill, segfault) the broken pool is replaced and the call retried once.
+
+``method`` is a werkzeug method string ("scrypt", "scrypt:16384:8:1",
+"pbkdf2:sha256:600000"). Stored hashes made with other parameters are
+reported by ``needs_rehash`` so AuthService can upgrade them at the next
+successful login, when the plain password is at hand.
+
+Like the group-commit writer, hashers are keyed by PID so a forked
+gunicorn worker starts its own pool.
+"""
+
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from app.exceptions.custom_exceptions import ServiceUnavailableError
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasher:
+    """Hashes and checks passwords, on a bounded process pool when ``workers`` > 0."""
+
+    def __init__(
+        self,
+        method: str = "scrypt",
+        workers: int = 0,
+        max_pending: int = 1,
+        timeout: float = 5.0,
+    ) -> None:
+        # Also validates the method: werkzeug raises ValueError for unknown ones.
+        self._params = _params(generate_password_hash("", method))
+        self._method = method
+        self._workers = workers
+        self._timeout = timeout
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        self._pool_lock = threading.Lock()
+        self._pool: Executor | None = self._new_pool() if workers > 0 else None
+
+    @property
+    def params(self) -> str:
+        """The full parameter string new hashes get, e.g. ``scrypt:32768:8:1``."""
+        return self._params
+
+    def hash(self, password: str) -> str:
+        return self._call(generate_password_hash, password, self._method)
+
+    def verify(self, stored: str, password: str) -> bool:
+        return self._call(check_password_hash, stored, password)
+
+    def needs_rehash(self, stored: str) -> bool:
+        """True when ``stored`` was hashed with other parameters than ours."""
+        return _params(stored) != self._params
+
+    def close(self) -> None:
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _call(self, fn: Callable, *args):
+        if self._pool is None:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            logger.warning("Password hashing saturated; rejecting request")
+            raise ServiceUnavailableError("Too many sign-ins in progress. Please retry shortly.")
+        held_by_future = False
+        try:
+            for attempt in (1, 2):
+                pool = self._pool
+                if pool is None:  # closed
+                    return fn(*args)
+                try:
+                    future = pool.submit(fn, *args)
+                    return future.result(timeout=self._timeout)
+                except BrokenProcessPool:
+                    self._replace_pool(pool)
+                    if attempt == 2:
+                        raise ServiceUnavailableError("Sign-in is unavailable. Please retry shortly.")
+                except FutureTimeoutError:
+                    if not future.cancel():
+                        # Still running: its slot frees up when the hash does.
+                        future.add_done_callback(lambda _: self._slots.release())
+                        held_by_future = True
+                    logger.warning("Password hash took over %.1fs; rejecting request", self._timeout)
+                    raise ServiceUnavailableError("Sign-in is busy. Please retry shortly.")
+        finally:
+            if not held_by_future:
+                self._slots.release()
+
+    def _new_pool(self) -> Executor:
+        # Not fork: the pool may start while request threads hold locks.
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        return ProcessPoolExecutor(max_workers=self._workers, mp_context=context)
+
+    def _replace_pool(self, broken: Executor) -> None:
+        """Swap in a fresh pool once per breakage, however many threads noticed it."""
+        with self._pool_lock:
+            if self._pool is not broken:
+                return
+            logger.error("Password hashing pool broke (a worker process died); restarting it")
+            self._pool = self._new_pool()
+        broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _params(stored: str) -> str:
+    return stored.split("$", 1)[0]
+
+
+_hashers: dict[tuple[int, int], PasswordHasher] = {}
+_hashers_lock = threading.Lock()
+
+
+def get_hasher(key: object, factory: Callable[[], PasswordHasher]) -> PasswordHasher:
+    """
+    Return this process's hasher for ``key`` (usually the Flask app),
+    creating it with ``factory`` on first use or after a fork.
+    """
+    slot = (id(key), os.getpid())
+    hasher = _hashers.get(slot)
+    if hasher is None:
+        with _hashers_lock:
+            hasher = _hashers.get(slot)
+            if hasher is None:
+                hasher = factory()
+                _hashers[slot] = hasher
+                atexit.register(hasher.close)
+    return hasher
@@ -0,0 +1,184 @@
+"""
+Recipe popularity leaderboard — incremental, time-decayed, served in O(k).
+
+Each worker keeps a PopularityIndex in memory. Order events from the
+change bus adjust it as they happen; cold starts and periodic refreshes
+rebuild it from the daily recipe rollups (never from raw orders), which
+also folds in orders taken by the other workers. Between refreshes a
+worker's board may lag the others by whatever they sold since.
+
+Events carry the rollup ``updated_at`` their write stamped. A rebuild
+reads the rollups with their newest stamp, so an event dispatched after
+the rebuild read its change is skipped instead of counted twice, and one
+dispatched during the read but not in it is kept.
+"""
+
+import logging
+import threading
+import time
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+
+from app.analytics.popularity import PopularityIndex
+from app.constants.order_status import OrderStatus
+from app.exceptions.custom_exceptions import ValidationError
+from app.repositories.recipe_repository import RecipeRepository
+from app.repositories.sales_rollup_repository import SalesRollupRepository
+from app.services.change_bus import ChangeEvent
+
+logger = logging.getLogger(__name__)
+
+# Window name -> half-life in seconds.
+POPULARITY_WINDOWS = {
+    "trending": 12 * 3600.0,
+    "week": 3.5 * 86400.0,
+}
+DEFAULT_WINDOW = "week"
+
+# Rollups older than this many half-lives contribute < 0.4% and are skipped.
+REBUILD_HALF_LIVES = 8
+
+recipe_popularity = PopularityIndex(POPULARITY_WINDOWS)
+_refresh_lock = threading.Lock()
+
+
+def _epoch(value: str | datetime) -> float:
+    # Order and rollup times are naive UTC throughout the app.
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _counted(quantity: int, status: str) -> int:
+    return 0 if status == OrderStatus.CANCELLED else quantity
+
+
+def apply_order_event(index: PopularityIndex, event: ChangeEvent) -> None:
+    """Adjust ``index`` for one order.* change-bus event."""
+    data = event.data
+    if event.kind == "order.created":
+        delta = _counted(data["quantity"], data["status"])
+    elif event.kind == "order.deleted":
+        delta = -_counted(data["quantity"], data["status"])
+    elif event.kind == "order.updated":
+        previous = data["previous"]
+        delta = _counted(data["quantity"], data["status"]) - _counted(
+            previous["quantity"], previous["status"]
+        )
+    else:
+        return
+    if delta:
+        stamp = data.get("rolled_up_at")
+        index.add(
+            data["recipe_id"],
+            delta,
+            _epoch(data["ordered_at"]),
+            version=None if stamp is None else _epoch(stamp),
+        )
+
+
+def popularity_listener(event: ChangeEvent) -> None:
+    """Change-bus listener feeding this process's leaderboard."""
+    apply_order_event(recipe_popularity, event)
+
+
+class PopularityService:
+
+    def __init__(
+        self,
+        index: PopularityIndex,
+        rollup_repo: SalesRollupRepository,
+        recipe_repo: RecipeRepository,
+        refresh_seconds: float = 300.0,
+    ) -> None:
+        self._index = index
+        self._rollup_repo = rollup_repo
+        self._recipe_repo = recipe_repo
+        self._refresh_seconds = refresh_seconds
+
+    def popular(self, window: str | None, k: int, max_k: int) -> dict:
+        """
+        The ``k`` most popular recipes over ``window``, best first.
+
+        Raises:
+            ValidationError: If the window is unknown.
+        """
+        window = window or DEFAULT_WINDOW
+        if window not in POPULARITY_WINDOWS:
+            raise ValidationError(
+                f"window must be one of: {', '.join(POPULARITY_WINDOWS)}."
+            )
+        k = max(1, min(k, max_k))
+        self._ensure_fresh()
+
+        ranked = self._index.top(window, k)
+        summaries = self._recipe_repo.find_summaries(recipe_id for recipe_id, _ in ranked)
+        recipes = []
+        for recipe_id, score in ranked:
+            summary = summaries.get(recipe_id)
+            if summary is None:  # deleted since it was ordered
+                continue
+            name, price, image_url = summary
+            recipes.append(
+                {
+                    "recipe_id": recipe_id,
+                    "name": name,
+                    "price": price,
+                    "image_url": image_url,
+                    "score": round(score, 3),
+                }
+            )
+        return {
+            "window": window,
+            "half_life_hours": round(POPULARITY_WINDOWS[window] / 3600, 1),
+            "recipes": recipes,
+        }
+
+    def rebuild(self, now: float | None = None) -> int:
+        """Reload the leaderboard from the daily rollups; returns rows read."""
+        now = time.time() if now is None else now
+        since = datetime.fromtimestamp(now, timezone.utc).date() - timedelta(
+            seconds=REBUILD_HALF_LIVES * max(POPULARITY_WINDOWS.values())
+        )
+        rows: list = []
+
+        def load() -> tuple[list, float | None]:
+            read, watermark = self._rollup_repo.recipe_quantities_since(since)
+            rows.extend(read)
+            # Orders in a rollup day are credited at midday (or now, for today).
+            entries = [
+                (
+                    recipe_id,
+                    quantity,
+                    min(
+                        now,
+                        datetime.combine(
+                            _as_date(day), dt_time(12), tzinfo=timezone.utc
+                        ).timestamp(),
+                    ),
+                )
+                for day, recipe_id, quantity in read
+            ]
+            return entries, None if watermark is None else _epoch(watermark)
+
+        self._index.rebuild(load, now)
+        logger.info("Popularity leaderboard rebuilt from %d rollup rows", len(rows))
+        return len(rows)
+
+    def _ensure_fresh(self) -> None:
+        built_at = self._index.built_at
+        if built_at is not None and time.time() - built_at < self._refresh_seconds:
+            return
+        # Cold start: every request waits for the first build. Refresh: one
+        # request rebuilds while the rest keep serving the current board.
+        if not _refresh_lock.acquire(blocking=built_at is None):
+            return
+        try:
+            if self._index.built_at == built_at:
+                self.rebuild()
+        finally:
+            _refresh_lock.release()
+
+
+def _as_date(value) -> date:
+    # SQLite returns rollup days written by INSERT ... SELECT as text.
+    return date.fromisoformat(value) if isinstance(value, str) else value
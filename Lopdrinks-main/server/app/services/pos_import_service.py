@@ -0,0 +1,295 @@
+"""
+Bulk import of point-of-sale history into the order table.
+
+OrderService.create does per-order work (stock, rollups, listeners) that
+years of history doesn't need and can't afford. This importer streams a
+CSV or NDJSON export instead, ``chunk_size`` records at a time, and per
+chunk:
+
+1. parses and validates the records (bad ones are counted and sampled,
+   never fatal);
+2. maps usernames and recipe names to ids with one IN lookup each for the
+   names not seen earlier in the run;
+3. claims the chunk's POS transaction ids in ``pos_transaction`` — ids
+   already there are duplicates from an earlier run and are skipped;
+4. loads the remaining orders with COPY (PostgreSQL) or one executemany,
+   and commits.
+
+Claim and load share a transaction, so an interrupted import can simply
+be re-run. The order indexes are dropped for the load and rebuilt once at
+the end; the sales rollups and per-user summaries are then rebuilt from
+the order tables, since the import bypasses their incremental upkeep.
+"""
+
+import csv
+import json
+import logging
+import math
+import time
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Iterable, Iterator
+
+from app.constants.order_status import OrderStatus
+from app.exceptions.custom_exceptions import InternalServerError, ValidationError
+from app.repositories.pos_import_repository import PosImportRepository
+from app.services.sales_service import SalesService
+from app.services.user_summary_service import UserSummaryService
+
+logger = logging.getLogger(__name__)
+
+FORMATS: tuple[str, ...] = ("csv", "ndjson")
+REQUIRED_FIELDS: tuple[str, ...] = (
+    "transaction_id",
+    "ordered_at",
+    "username",
+    "recipe_name",
+    "quantity",
+)
+# Optional: unit_price (defaults to the recipe's current price) and
+# status (Delivered or Cancelled; defaults to Delivered).
+MAX_REJECT_SAMPLES = 20
+TXN_ID_MAX_LENGTH = 64
+
+
+class PosImportService:
+
+    def __init__(
+        self,
+        import_repo: PosImportRepository,
+        sales_service: SalesService,
+        summary_service: UserSummaryService,
+    ) -> None:
+        self._import_repo = import_repo
+        self._sales_service = sales_service
+        self._summary_service = summary_service
+        # Name -> id (or None when missing), for the whole run.
+        self._users: dict[str, int | None] = {}
+        self._recipes: dict[str, tuple[int, float] | None] = {}
+
+    def import_stream(
+        self,
+        lines: Iterable[str],
+        fmt: str = "csv",
+        chunk_size: int = 5_000,
+        defer_indexes: bool = True,
+        rebuild: bool = True,
+    ) -> dict:
+        """
+        Import POS records from ``lines`` (an open text file or any
+        iterable of lines).
+
+        Returns:
+            Counts of records read, imported, skipped as duplicates and
+            rejected, with up to MAX_REJECT_SAMPLES rejects as
+            {"line", "reason"}.
+
+        Raises:
+            ValidationError: Unknown format, bad chunk size, or a CSV
+                header missing required fields.
+            InternalServerError: DB failure. Chunks committed before the
+                failure stay imported; re-running skips them.
+        """
+        if fmt not in FORMATS:
+            raise ValidationError(f"format must be one of: {', '.join(FORMATS)}.")
+        if chunk_size < 1:
+            raise ValidationError("chunk_size must be at least 1.")
+
+        records = _records(lines, fmt)
+        stats = {"read": 0, "imported": 0, "duplicates": 0, "rejected": 0, "rejects": []}
+        started = time.monotonic()
+        logger.info("POS import started: format=%s chunk_size=%d", fmt, chunk_size)
+
+        if defer_indexes:
+            self._run(self._import_repo.drop_order_indexes, "drop order indexes")
+        try:
+            while chunk := list(islice(records, chunk_size)):
+                self._import_chunk(chunk, stats)
+                logger.info(
+                    "POS import progress: %d read, %d imported in %.1fs",
+                    stats["read"],
+                    stats["imported"],
+                    time.monotonic() - started,
+                )
+        finally:
+            if defer_indexes:
+                self._run(self._import_repo.create_order_indexes, "rebuild order indexes")
+
+        if rebuild and stats["imported"]:
+            stats["rollups"] = self._sales_service.rebuild()
+            stats["summaries"] = self._summary_service.rebuild()
+
+        logger.info(
+            "POS import finished: %d read, %d imported, %d duplicates, %d rejected in %.1fs",
+            stats["read"],
+            stats["imported"],
+            stats["duplicates"],
+            stats["rejected"],
+            time.monotonic() - started,
+        )
+        return stats
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _import_chunk(self, chunk: list[tuple[int, dict | str]], stats: dict) -> None:
+        stats["read"] += len(chunk)
+        parsed: dict[str, tuple] = {}
+        for line, record in chunk:
+            try:
+                row = _parse(record)
+            except ValueError as exc:
+                _reject(stats, line, str(exc))
+                continue
+            if row[0] in parsed:
+                stats["duplicates"] += 1
+            else:
+                parsed[row[0]] = (line, *row[1:])
+
+        self._resolve(
+            {row[1] for row in parsed.values()}, {row[2] for row in parsed.values()}
+        )
+        orders: dict[str, tuple] = {}
+        for txn_id, (line, username, recipe_name, *facts) in parsed.items():
+            quantity, unit_price, status, ordered_at = facts
+            user_id, recipe = self._users.get(username), self._recipes.get(recipe_name)
+            if user_id is None:
+                _reject(stats, line, f"unknown user {username!r}")
+            elif recipe is None:
+                _reject(stats, line, f"unknown recipe {recipe_name!r}")
+            else:
+                recipe_id, price = recipe
+                orders[txn_id] = (
+                    user_id,
+                    recipe_id,
+                    quantity,
+                    price if unit_price is None else unit_price,
+                    status,
+                    ordered_at,
+                )
+
+        try:
+            claimed = self._import_repo.claim(list(orders))
+            self._import_repo.load_orders([orders[txn_id] for txn_id in orders if txn_id in claimed])
+            self._import_repo.commit()
+        except Exception as exc:
+            self._import_repo.rollback()
+            logger.exception("DB error importing a POS chunk after %d records", stats["read"])
+            raise InternalServerError("Failed to import POS orders.") from exc
+        stats["imported"] += len(claimed)
+        stats["duplicates"] += len(orders) - len(claimed)
+
+    def _resolve(self, usernames: set[str], recipe_names: set[str]) -> None:
+        """Look up names not seen earlier in the run, one query per kind."""
+        new_users = usernames - self._users.keys()
+        if new_users:
+            found = self._import_repo.user_ids(new_users)
+            self._users.update({name: found.get(name) for name in new_users})
+        new_recipes = recipe_names - self._recipes.keys()
+        if new_recipes:
+            found = self._import_repo.recipe_prices(new_recipes)
+            self._recipes.update({name: found.get(name) for name in new_recipes})
+
+    def _run(self, step, what: str) -> None:
+        try:
+            names = step()
+            self._import_repo.commit()
+        except Exception as exc:
+            self._import_repo.rollback()
+            logger.exception("DB error trying to %s", what)
+            raise InternalServerError(f"Failed to {what}.") from exc
+        logger.info("POS import: %s (%s)", what, ", ".join(names))
+
+
+def _records(lines: Iterable[str], fmt: str) -> Iterator[tuple[int, dict | str]]:
+    """
+    Return an iterator of (line number, record) pairs. Undecodable NDJSON
+    lines come through as their raw text so the chunk can reject them.
+
+    Raises:
+        ValidationError: A CSV header missing required fields (checked
+            before anything is read past it).
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        missing = [f for f in REQUIRED_FIELDS if f not in (reader.fieldnames or ())]
+        if missing:
+            raise ValidationError(f"CSV header is missing: {', '.join(missing)}.")
+        return ((reader.line_num, record) for record in reader)
+    return _ndjson_records(lines)
+
+
+def _ndjson_records(lines: Iterable[str]) -> Iterator[tuple[int, dict | str]]:
+    for number, text in enumerate(lines, start=1):
+        if not text.strip():
+            continue
+        try:
+            record = json.loads(text)
+        except json.JSONDecodeError:
+            record = text
+        yield number, record if isinstance(record, dict) else text
+
+
+def _parse(record: dict | str) -> tuple:
+    """
+    Validate one record.
+
+    Returns:
+        (txn_id, username, recipe_name, quantity, unit_price | None,
+        status, ordered_at as naive UTC).
+
+    Raises:
+        ValueError: With the reason the record is rejected.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("not a JSON object")
+    missing = [f for f in REQUIRED_FIELDS if record.get(f) in (None, "")]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+
+    txn_id = str(record["transaction_id"]).strip()
+    if len(txn_id) > TXN_ID_MAX_LENGTH:
+        raise ValueError(f"transaction_id longer than {TXN_ID_MAX_LENGTH} characters")
+    try:
+        ordered_at = datetime.fromisoformat(str(record["ordered_at"]))
+    except ValueError:
+        raise ValueError("ordered_at is not an ISO-8601 datetime") from None
+    if ordered_at.tzinfo is not None:
+        ordered_at = ordered_at.astimezone(timezone.utc).replace(tzinfo=None)
+    try:
+        quantity = int(record["quantity"])
+    except (TypeError, ValueError):
+        raise ValueError("quantity is not an integer") from None
+    if quantity < 1:
+        raise ValueError("quantity must be at least 1")
+
+    unit_price = record.get("unit_price")
+    if unit_price in (None, ""):
+        unit_price = None
+    else:
+        try:
+            unit_price = float(unit_price)
+        except (TypeError, ValueError):
+            raise ValueError("unit_price is not a number") from None
+        if not math.isfinite(unit_price) or unit_price < 0:
+            raise ValueError("unit_price must not be negative")
+
+    status = record.get("status") or OrderStatus.DELIVERED
+    if status not in OrderStatus.TERMINAL:
+        raise ValueError(f"status must be one of: {', '.join(OrderStatus.TERMINAL)}")
+
+    return (
+        txn_id,
+        str(record["username"]).strip(),
+        str(record["recipe_name"]).strip(),
+        quantity,
+        unit_price,
+        status,
+        ordered_at,
+    )
+
+
+def _reject(stats: dict, line: int, reason: str) -> None:
+    stats["rejected"] += 1
+    if len(stats["rejects"]) < MAX_REJECT_SAMPLES:
+        stats["rejects"].append({"line": line, "reason": reason})
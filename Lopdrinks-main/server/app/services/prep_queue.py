@@ -0,0 +1,315 @@
+"""
+Barista prep queue — confirmed orders planned onto N stations.
+
+Tickets wait in one heap per brew method, keyed by promised time. The
+planner repeatedly takes the method whose head is due soonest, fills a
+batch from that heap up to the method's batch size (a Cold Brew pour
+serves many cups, an espresso is made to order) and puts it on the
+station that frees up first. Methods naming the same equipment never
+overlap, even on different stations, so the espresso machine is used by
+one barista at a time.
+
+The plan is a list of batches plus the station / equipment availability
+just before each one, so a status change only re-plans the suffix it can
+affect:
+
+* a ticket that fits the spare cups of a batch that hasn't started joins
+  it — no other ETA moves;
+* a ticket due after every pending batch is appended;
+* anything else replays from the first pending batch it displaces.
+
+Batches that have already started are never moved. Finishing one early
+(its last order shipped) frees its station from now on.
+
+The queue is per worker and fed by the change bus; the service rebuilds
+it from the database periodically to pick up other workers' changes.
+"""
+
+import heapq
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, NamedTuple, Optional
+
+
+@dataclass(frozen=True)
+class PrepMethod:
+    """How one brew method occupies a station."""
+
+    id: Optional[int]
+    name: str
+    prep_seconds: float
+    batch_size: int = 1
+    equipment: Optional[str] = None
+
+    def cycles(self, units: int) -> int:
+        return math.ceil(units / self.batch_size)
+
+    def duration(self, units: int) -> float:
+        return self.prep_seconds * self.cycles(units)
+
+
+# Recipes without a brew method.
+UNSPECIFIED = PrepMethod(id=None, name="Unspecified", prep_seconds=120.0)
+
+
+class PrepTicket(NamedTuple):
+    order_id: int
+    recipe_id: int
+    quantity: int
+    promised_at: float
+    method: PrepMethod
+
+    @property
+    def key(self) -> tuple[float, int]:
+        return (self.promised_at, self.order_id)
+
+
+@dataclass(eq=False)
+class PrepBatch:
+    method: PrepMethod
+    station: int
+    start: float
+    end: float
+    tickets: list[PrepTicket] = field(default_factory=list)
+
+    @property
+    def units(self) -> int:
+        return sum(t.quantity for t in self.tickets)
+
+
+# (free-at per station, free-at per equipment) before a batch is placed.
+_State = tuple[tuple[float, ...], dict[str, float]]
+
+
+class PrepQueue:
+    """Per-worker plan of confirmed orders, re-planned incrementally."""
+
+    def __init__(self, stations: int = 2, promise_seconds: float = 900.0) -> None:
+        self._lock = threading.Lock()
+        self.built_at: float | None = None
+        # Set when an event names a recipe the queue doesn't know yet.
+        self.stale = False
+        self.stations = stations
+        self.promise_seconds = promise_seconds
+        self._methods: dict[int, PrepMethod] = {}
+        self._batches: list[PrepBatch] = []
+        self._states: list[_State] = [((0.0,) * stations, {})]
+        # order_id -> absolute batch position; _base batches were trimmed.
+        self._position: dict[int, int] = {}
+        self._base = 0
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+    def rebuild(
+        self,
+        methods: dict[int, PrepMethod],
+        orders: Iterable[tuple[int, int, int, float]],
+        stations: int,
+        promise_seconds: float,
+        now: float | None = None,
+    ) -> None:
+        """
+        Args:
+            methods: {recipe_id: PrepMethod} for every recipe.
+            orders: Confirmed (order_id, recipe_id, quantity, ordered_at epoch).
+            stations: Barista stations to plan onto.
+            promise_seconds: Promised time = ordered_at + this.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            self.stations = max(1, stations)
+            self.promise_seconds = promise_seconds
+            self._methods = dict(methods)
+            self._batches = []
+            self._states = [((now,) * self.stations, {})]
+            self._position = {}
+            self._base = 0
+            tickets = [self._ticket(*order) for order in orders]
+            self._replan(0, tickets, now)
+            self.stale = False
+            self.built_at = time.time()
+
+    def add(
+        self, order_id: int, recipe_id: int, quantity: int, ordered_at: float, now: float | None = None
+    ) -> bool:
+        """
+        Queue (or re-queue with a new quantity) a confirmed order.
+        False if the recipe is unknown to this build; the queue is then stale.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            if recipe_id not in self._methods:
+                self.stale = True
+                return False
+            self._remove(order_id, now)
+            ticket = self._ticket(order_id, recipe_id, quantity, ordered_at)
+            method = ticket.method
+            first = self._first_pending(now)
+
+            if method.batch_size > 1:
+                for i in range(first, len(self._batches)):
+                    batch = self._batches[i]
+                    if batch.method != method:
+                        continue
+                    units = batch.units
+                    if method.cycles(units + ticket.quantity) == method.cycles(units):
+                        batch.tickets.append(ticket)
+                        self._position[order_id] = self._base + i
+                        return True
+
+            at = next(
+                (
+                    i
+                    for i in range(first, len(self._batches))
+                    if self._batches[i].tickets and ticket.key < self._batches[i].tickets[0].key
+                ),
+                len(self._batches),
+            )
+            self._replan(at, [ticket], now)
+            return True
+
+    def remove(self, order_id: int, now: float | None = None) -> bool:
+        """Drop an order that left Confirmed; False if it wasn't queued."""
+        now = time.time() if now is None else now
+        with self._lock:
+            return self._remove(order_id, now)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def plan(self) -> list[PrepBatch]:
+        """Copies of the non-empty batches in planning order."""
+        with self._lock:
+            return [
+                PrepBatch(b.method, b.station, b.start, b.end, list(b.tickets))
+                for b in self._batches
+                if b.tickets
+            ]
+
+    def find(self, order_id: int) -> Optional[tuple[PrepTicket, PrepBatch]]:
+        """The order's ticket and (a copy of) its batch, or None if not queued."""
+        with self._lock:
+            position = self._position.get(order_id)
+            if position is None:
+                return None
+            b = self._batches[position - self._base]
+            ticket = next(t for t in b.tickets if t.order_id == order_id)
+            return ticket, PrepBatch(b.method, b.station, b.start, b.end, list(b.tickets))
+
+    # ------------------------------------------------------------------
+    # Internals (lock held)
+    # ------------------------------------------------------------------
+    def _ticket(self, order_id: int, recipe_id: int, quantity: int, ordered_at: float) -> PrepTicket:
+        return PrepTicket(
+            order_id=order_id,
+            recipe_id=recipe_id,
+            quantity=quantity,
+            promised_at=ordered_at + self.promise_seconds,
+            method=self._methods.get(recipe_id, UNSPECIFIED),
+        )
+
+    def _first_pending(self, now: float) -> int:
+        """Index after the last batch that has started; everything from here may move."""
+        i = len(self._batches)
+        while i > 0 and self._batches[i - 1].start >= now:
+            i -= 1
+        return i
+
+    def _remove(self, order_id: int, now: float) -> bool:
+        position = self._position.pop(order_id, None)
+        if position is None:
+            return False
+        i = position - self._base
+        batch = self._batches[i]
+        units = batch.units
+        batch.tickets = [t for t in batch.tickets if t.order_id != order_id]
+        first = self._first_pending(now)
+
+        if i >= first:
+            if not batch.tickets or batch.method.cycles(batch.units) != batch.method.cycles(units):
+                self._replan(i, [], now)
+        elif not batch.tickets:
+            # Finished early: its station (and equipment) are free from now,
+            # unless a later started batch already claimed them.
+            self._free_early(i, first, now)
+            self._trim()
+        # Shrinking a started batch, or a pending one behind a started
+        # batch, leaves later ETAs as planned (an upper bound) until rebuild.
+        return True
+
+    def _free_early(self, i: int, first: int, now: float) -> None:
+        batch = self._batches[i]
+        started = self._batches[i + 1 : first]
+        stations, equipment = self._states[first]
+        changed = False
+        if all(b.station != batch.station for b in started) and stations[batch.station] > now:
+            stations = stations[: batch.station] + (now,) + stations[batch.station + 1 :]
+            changed = True
+        tool = batch.method.equipment
+        if (
+            tool is not None
+            and all(b.method.equipment != tool for b in started)
+            and equipment.get(tool, 0.0) > now
+        ):
+            equipment = {**equipment, tool: now}
+            changed = True
+        batch.end = now
+        if changed:
+            self._states[first] = (stations, equipment)
+            self._replan(first, [], now)
+
+    def _trim(self) -> None:
+        """Forget leading batches whose orders have all left the queue."""
+        n = 0
+        while n < len(self._batches) and not self._batches[n].tickets:
+            n += 1
+        if n:
+            del self._batches[:n]
+            del self._states[:n]
+            self._base += n
+
+    def _replan(self, index: int, tickets: list[PrepTicket], now: float) -> None:
+        """Re-place batches ``index``.. plus ``tickets`` from the state before ``index``."""
+        for batch in self._batches[index:]:
+            tickets.extend(batch.tickets)
+        del self._batches[index:]
+        del self._states[index + 1 :]
+
+        queues: dict[PrepMethod, list] = {}
+        for t in tickets:
+            queues.setdefault(t.method, []).append((t.key, t))
+        for queue in queues.values():
+            heapq.heapify(queue)
+
+        stations, equipment = self._states[index]
+        stations, equipment = list(stations), dict(equipment)
+        while queues:
+            method = min(queues, key=lambda m: queues[m][0][0])
+            queue = queues[method]
+            _, ticket = heapq.heappop(queue)
+            batch_tickets, units = [ticket], ticket.quantity
+            cycles = method.cycles(units)
+            while queue and method.cycles(units + queue[0][1].quantity) == cycles:
+                _, ticket = heapq.heappop(queue)
+                batch_tickets.append(ticket)
+                units += ticket.quantity
+            if not queue:
+                del queues[method]
+
+            station = min(range(len(stations)), key=stations.__getitem__)
+            start = max(stations[station], now)
+            if method.equipment is not None:
+                start = max(start, equipment.get(method.equipment, 0.0))
+            end = start + method.duration(units)
+            stations[station] = end
+            if method.equipment is not None:
+                equipment[method.equipment] = end
+
+            position = self._base + len(self._batches)
+            for t in batch_tickets:
+                self._position[t.order_id] = position
+            self._batches.append(PrepBatch(method, station, start, end, batch_tickets))
+            self._states.append((tuple(stations), dict(equipment)))
@@ -0,0 +1,190 @@
+"""
+Barista prep queue and live order ETAs.
+
+Each worker keeps a PrepQueue in memory. Status changes made through
+this worker reach it through the change bus and re-plan only what they
+affect; a full rebuild from the confirmed orders runs on the first
+request and every PREP_QUEUE_REFRESH_SECONDS (or as soon as an event
+names a recipe created since the last build), which also picks up the
+other workers' writes and brew-method edits.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+from app.constants.order_status import OrderStatus
+from app.constants.roles import Role
+from app.exceptions.custom_exceptions import ForbiddenError, NotFoundError
+from app.repositories.order_repository import OrderRepository
+from app.repositories.recipe_repository import RecipeRepository
+from app.services.change_bus import ChangeEvent
+from app.services.prep_queue import UNSPECIFIED, PrepBatch, PrepMethod, PrepQueue
+
+logger = logging.getLogger(__name__)
+
+prep_queue = PrepQueue()
+_refresh_lock = threading.Lock()
+
+
+def _epoch(value) -> float:
+    # ordered_at is naive UTC throughout the app (ISO text on the bus).
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _iso(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def apply_prep_event(queue: PrepQueue, event: ChangeEvent) -> None:
+    """Add or drop the order in ``queue`` when it enters or leaves Confirmed."""
+    data = event.data
+    confirmed = data["status"] == OrderStatus.CONFIRMED
+    if event.kind == "order.deleted":
+        if confirmed:
+            queue.remove(data["id"])
+        return
+    previous = data.get("previous") or {}
+    was_confirmed = previous.get("status") == OrderStatus.CONFIRMED
+    if confirmed and not (was_confirmed and previous["quantity"] == data["quantity"]):
+        queue.add(data["id"], data["recipe_id"], data["quantity"], _epoch(data["ordered_at"]))
+    elif was_confirmed and not confirmed:
+        queue.remove(data["id"])
+
+
+def prep_queue_listener(event: ChangeEvent) -> None:
+    """Change-bus listener feeding this process's prep queue."""
+    if prep_queue.built_at is not None:
+        apply_prep_event(prep_queue, event)
+
+
+def _serialise_batch(b: PrepBatch) -> dict:
+    return {
+        "station": b.station + 1,
+        "brew_method": b.method.name,
+        "start": _iso(b.start),
+        "eta": _iso(b.end),
+        "cups": b.units,
+        "orders": [
+            {
+                "order_id": t.order_id,
+                "recipe_id": t.recipe_id,
+                "quantity": t.quantity,
+                "promised_at": _iso(t.promised_at),
+                "late": b.end > t.promised_at,
+            }
+            for t in b.tickets
+        ],
+    }
+
+
+class PrepQueueService:
+
+    def __init__(
+        self,
+        queue: PrepQueue,
+        order_repo: OrderRepository,
+        recipe_repo: RecipeRepository,
+        stations: int = 2,
+        promise_minutes: float = 15.0,
+        refresh_seconds: float = 60.0,
+    ) -> None:
+        self._queue = queue
+        self._order_repo = order_repo
+        self._recipe_repo = recipe_repo
+        self._stations = stations
+        self._promise_seconds = promise_minutes * 60
+        self._refresh_seconds = refresh_seconds
+
+    def queue(self) -> dict:
+        """Planned batches per station, in the order they will be made."""
+        self._ensure_fresh()
+        batches = self._queue.plan()
+        return {
+            "stations": self._queue.stations,
+            "orders": sum(len(b.tickets) for b in batches),
+            "batches": [_serialise_batch(b) for b in batches],
+        }
+
+    def eta(self, order_id: int, requesting_user_id: int, requesting_user_role: str) -> dict:
+        """
+        When a confirmed order is expected to be ready.
+
+        Raises:
+            NotFoundError: Order not found.
+            ForbiddenError: Non-admin asking about another user's order.
+        """
+        facts = self._order_repo.find_facts(order_id)
+        if facts is None:
+            raise NotFoundError("Order not found.")
+        if requesting_user_role != Role.ADMIN and facts.user_id != requesting_user_id:
+            raise ForbiddenError()
+
+        result = {"order_id": order_id, "status": facts.status, "queued": False}
+        if facts.status != OrderStatus.CONFIRMED:
+            return result
+        self._ensure_fresh()
+        built_at = self._queue.built_at
+        found = self._queue.find(order_id)
+        if found is None:
+            # Confirmed by another worker since our last rebuild.
+            self._rebuild_since(built_at)
+            found = self._queue.find(order_id)
+        if found is None:
+            return result
+        ticket, batch = found
+        return {
+            **result,
+            "queued": True,
+            "station": batch.station + 1,
+            "brew_method": batch.method.name,
+            "start": _iso(batch.start),
+            "eta": _iso(batch.end),
+            "promised_at": _iso(ticket.promised_at),
+            "late": batch.end > ticket.promised_at,
+        }
+
+    def rebuild(self) -> int:
+        """Re-plan every confirmed order from scratch; returns the number queued."""
+        methods = {
+            row.recipe_id: (
+                UNSPECIFIED
+                if row.brew_method_id is None
+                else PrepMethod(
+                    id=row.brew_method_id,
+                    name=row.name,
+                    prep_seconds=float(row.prep_seconds),
+                    batch_size=max(1, row.batch_size),
+                    equipment=row.equipment,
+                )
+            )
+            for row in self._recipe_repo.prep_methods()
+        }
+        orders = [
+            (row.id, row.recipe_id, row.quantity, _epoch(row.ordered_at))
+            for row in self._order_repo.find_facts_by_status(OrderStatus.CONFIRMED)
+        ]
+        self._queue.rebuild(methods, orders, self._stations, self._promise_seconds)
+        logger.info(
+            "Prep queue rebuilt: %d confirmed orders on %d stations", len(orders), self._stations
+        )
+        return len(orders)
+
+    def _ensure_fresh(self) -> None:
+        built_at = self._queue.built_at
+        if (
+            built_at is not None
+            and not self._queue.stale
+            and time.time() - built_at < self._refresh_seconds
+        ):
+            return
+        self._rebuild_since(built_at)
+
+    def _rebuild_since(self, built_at: float | None) -> None:
+        """Rebuild unless another thread already has since ``built_at``."""
+        with _refresh_lock:
+            if self._queue.built_at == built_at:
+                self.rebuild()
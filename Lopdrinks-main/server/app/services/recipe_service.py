@@ -9,16 +9,19 @@ from app.repositories.recipe_repository import RecipeRepository
 from app.repositories.brew_method_repository import BrewMethodRepository
 from app.repositories.ingredient_repository import IngredientRepository
 from app.repositories.category_repository import CategoryRepository
+from app.services.stock_service import StockService
+from app.services.view_counter import ViewCounter
 from app.exceptions.custom_exceptions import (
     ValidationError,
     NotFoundError,
     InternalServerError,
 )
+from app.utils.quantities import parse_quantity
 
 logger = logging.getLogger(__name__)
 
 
-def _serialise_recipe(r: Recipe) -> dict:
+def _serialise_recipe(r: Recipe, sold_out: bool = False) -> dict:
     """Convert a Recipe ORM object to a plain dict (used internally)."""
     return {
         "id": r.id,
@@ -27,6 +30,7 @@ def _serialise_recipe(r: Recipe) -> dict:
         "price": float(r.price),
         "takeaway": r.takeaway,
         "image_url": r.image_url,
+        "sold_out": sold_out,
         "category": (
             {"id": r.category.id, "name": r.category.name}
             if r.category
@@ -46,12 +50,26 @@ def _serialise_recipe(r: Recipe) -> dict:
                 "id": ri.ingredient.id,
                 "name": ri.ingredient.name,
                 "quantity": ri.quantity,
+                "amount": ri.amount,
+                "unit": ri.unit,
             }
             for ri in r.ingredients
         ],
     }
 
 
+def _recipe_ingredient(recipe_id: int, ing: dict[str, Any]) -> RecipeIngredient:
+    """Build a RecipeIngredient, storing the parsed amount/unit alongside the text."""
+    amount, unit = parse_quantity(ing["quantity"])
+    return RecipeIngredient(
+        recipe_id=recipe_id,
+        ingredient_id=ing["ingredient_id"],
+        quantity=ing["quantity"],
+        amount=amount,
+        unit=unit,
+    )
+
+
 class RecipeService:
 
     def __init__(
@@ -60,26 +78,38 @@ class RecipeService:
         brew_method_repo: BrewMethodRepository,
         ingredient_repo: IngredientRepository,
         category_repo: CategoryRepository,
+        stock_service: StockService | None = None,
+        view_counter: ViewCounter | None = None,
     ) -> None:
         self._recipe_repo = recipe_repo
         self._brew_method_repo = brew_method_repo
         self._ingredient_repo = ingredient_repo
         self._category_repo = category_repo
+        self._stock_service = stock_service
+        self._view_counter = view_counter
+
+    def _sold_out(self) -> set[int]:
+        return self._stock_service.sold_out() if self._stock_service else set()
 
     def get_all(self) -> list[dict]:
         recipes = self._recipe_repo.find_all()
         logger.debug("Fetched %d recipes", len(recipes))
-        return [_serialise_recipe(r) for r in recipes]
+        sold_out = self._sold_out()
+        return [_serialise_recipe(r, r.id in sold_out) for r in recipes]
 
     def get_by_id(self, recipe_id: int) -> dict:
         """
+        Fetch one recipe and count the view (in memory; see ViewCounter).
+
         Raises:
             NotFoundError: Recipe not found.
         """
         recipe = self._recipe_repo.find_by_id(recipe_id)
         if not recipe:
             raise NotFoundError(f"Recipe {recipe_id} not found.")
-        return _serialise_recipe(recipe)
+        if self._view_counter is not None:
+            self._view_counter.record(recipe_id)
+        return _serialise_recipe(recipe, recipe.id in self._sold_out())
 
     def get_by_category(self, category_id: int) -> list[dict]:
         """
@@ -88,7 +118,8 @@ class RecipeService:
         """
         recipes = self._recipe_repo.find_by_category_id(category_id)
         logger.debug("Fetched %d recipes for category_id=%d", len(recipes), category_id)
-        return [_serialise_recipe(r) for r in recipes]
+        sold_out = self._sold_out()
+        return [_serialise_recipe(r, r.id in sold_out) for r in recipes]
 
     def create(self, data: dict[str, Any], created_by: int) -> dict:
         """
@@ -135,13 +166,7 @@ class RecipeService:
         try:
             self._recipe_repo.save(recipe)
             for ing in data.get("ingredients", []):
-                self._recipe_repo.add_ingredient(
-                    RecipeIngredient(
-                        recipe_id=recipe.id,
-                        ingredient_id=ing["ingredient_id"],
-                        quantity=ing["quantity"],
-                    )
-                )
+                self._recipe_repo.add_ingredient(_recipe_ingredient(recipe.id, ing))
             self._recipe_repo.commit()
         except Exception as exc:
             self._recipe_repo.rollback()
@@ -192,13 +217,7 @@ class RecipeService:
                     )
             self._recipe_repo.delete_ingredients(recipe_id)
             for ing in data["ingredients"]:
-                self._recipe_repo.add_ingredient(
-                    RecipeIngredient(
-                        recipe_id=recipe.id,
-                        ingredient_id=ing["ingredient_id"],
-                        quantity=ing["quantity"],
-                    )
-                )
+                self._recipe_repo.add_ingredient(_recipe_ingredient(recipe.id, ing))
 
         try:
             self._recipe_repo.commit()
@@ -210,6 +229,32 @@ class RecipeService:
         logger.info("Recipe updated: id=%d", recipe_id)
         return {"message": "Recipe updated."}
 
+    def parse_quantities(self) -> dict:
+        """
+        Re-parse every ingredient line's quantity text into amount/unit
+        (backfill after the columns were added, or after parser changes).
+
+        Raises:
+            InternalServerError: DB failure.
+        """
+        lines = self._recipe_repo.find_all_ingredient_lines()
+        for line in lines:
+            line.amount, line.unit = parse_quantity(line.quantity)
+        try:
+            self._recipe_repo.commit()
+        except Exception as exc:
+            self._recipe_repo.rollback()
+            logger.exception("DB error parsing recipe ingredient quantities")
+            raise InternalServerError("Failed to parse ingredient quantities.") from exc
+
+        unparsed = sorted({line.quantity or "" for line in lines if line.amount is None})
+        logger.info(
+            "Parsed %d recipe ingredient quantities (%d distinct unparsed)",
+            len(lines),
+            len(unparsed),
+        )
+        return {"lines": len(lines), "unparsed": unparsed}
+
     def delete(self, recipe_id: int) -> dict:
         """
         Raises:
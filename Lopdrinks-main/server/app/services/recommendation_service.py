@@ -0,0 +1,122 @@
+"""
+Personalised recipe recommendations.
+
+Training runs offline over the columnar order snapshot (see
+app.analytics.recommendations); serving reads the published in-memory
+table only, so a request never touches the database.
+"""
+
+import logging
+import time
+
+import numpy as np
+
+from app.analytics.order_snapshot import STATUS_CODES, load_current_snapshot
+from app.analytics.recommendations import (
+    als_implicit,
+    implicit_feedback,
+    load_current_recommendations,
+    publish_recommendations,
+    top_unseen,
+)
+from app.constants.order_status import OrderStatus
+from app.exceptions.custom_exceptions import NotFoundError
+from app.repositories.recipe_repository import RecipeRepository
+
+logger = logging.getLogger(__name__)
+
+# Recommendations stored per user; ?k= is capped here.
+RECOMMENDATION_TABLE_K = 20
+
+
+class RecommendationService:
+
+    def __init__(self, snapshot_dir: str, recipe_repo: RecipeRepository) -> None:
+        self._snapshot_dir = snapshot_dir
+        self._recipe_repo = recipe_repo
+
+    def train(
+        self,
+        factors: int = 16,
+        iterations: int = 10,
+        half_life_days: float = 60.0,
+        alpha: float = 20.0,
+        regularization: float = 0.1,
+    ) -> dict:
+        """
+        Factorise the current order snapshot and publish a new table.
+
+        Raises:
+            NotFoundError: No snapshot has been exported yet.
+        """
+        snapshot = load_current_snapshot(self._snapshot_dir)
+        if snapshot is None:
+            raise NotFoundError(
+                "No analytics snapshot yet. Run `flask analytics export`."
+            )
+        started = time.perf_counter()
+        keep = snapshot.status != STATUS_CODES[OrderStatus.CANCELLED]
+        users, recipes, rows, cols, values = implicit_feedback(
+            snapshot.user_id[keep].astype(np.int64),
+            snapshot.recipe_id[keep].astype(np.int64),
+            snapshot.quantity[keep].astype(np.float64),
+            snapshot.ordered_at[keep].astype(np.float64),
+            now=time.time(),
+            half_life_days=half_life_days,
+        )
+        popularity = np.bincount(cols, weights=values, minlength=len(recipes))
+        popular = np.lexsort((recipes, -popularity))
+
+        if len(rows):
+            user_f, recipe_f = als_implicit(
+                rows, cols, values, (len(users), len(recipes)),
+                factors=factors, regularization=regularization,
+                alpha=alpha, iterations=iterations,
+            )
+            picks = top_unseen(user_f, recipe_f, rows, cols, popular, RECOMMENDATION_TABLE_K)
+        else:
+            picks = np.full((0, 0), -1, dtype=np.int64)
+        table = np.where(picks >= 0, recipes[np.maximum(picks, 0)], -1)
+
+        summaries = self._recipe_repo.find_summaries(recipes.tolist())
+        return publish_recommendations(
+            self._snapshot_dir,
+            users=users,
+            table=table,
+            popular=recipes[popular],
+            recipes={
+                recipe_id: {"name": name, "price": price, "image_url": image_url}
+                for recipe_id, (name, price, image_url) in summaries.items()
+            },
+            stats={
+                "snapshot_version": snapshot.version,
+                "pairs": int(len(rows)),
+                "factors": factors,
+                "iterations": iterations,
+                "half_life_days": half_life_days,
+                "train_seconds": round(time.perf_counter() - started, 3),
+            },
+        )
+
+    def for_user(self, user_id: int, k: int) -> dict:
+        """
+        Up to ``k`` recipes for ``user_id``: their own recommendations, or
+        the most popular recipes if they had no orders when the model was
+        trained. Empty until the first ``flask analytics recommend``.
+        """
+        k = max(1, min(k, RECOMMENDATION_TABLE_K))
+        model = load_current_recommendations(self._snapshot_dir)
+        if model is None:
+            return {"source": "none", "model_version": None, "recipes": []}
+
+        source, recipe_ids = model.lookup(user_id, k)
+        return {
+            "source": source,
+            "model_version": model.version,
+            "recipes": [
+                # Recipes deleted since training have no display fields.
+                {"recipe_id": recipe_id, **model.recipes[recipe_id]}
+                for recipe_id in recipe_ids
+                if recipe_id in model.recipes
+            ],
+        }
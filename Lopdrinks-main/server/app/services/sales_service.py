@@ -0,0 +1,198 @@
+"""Sales dashboard service — aggregates served from the daily rollups."""
+
+import logging
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from app.analytics.consumption import bill_of_materials, consumption
+from app.repositories.recipe_repository import RecipeRepository
+from app.repositories.sales_rollup_repository import SalesRollupRepository
+from app.services.view_counter import ViewCounter
+from app.exceptions.custom_exceptions import ValidationError, InternalServerError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW_DAYS = 7
+
+
+def _serialise_totals(row) -> dict:
+    return {
+        "orders": int(row.order_count or 0),
+        "quantity": int(row.quantity or 0),
+        "revenue": round(float(row.revenue or 0.0), 2),
+    }
+
+
+class SalesService:
+
+    def __init__(
+        self,
+        rollup_repo: SalesRollupRepository,
+        recipe_repo: RecipeRepository,
+        view_counter: ViewCounter | None = None,
+    ) -> None:
+        self._rollup_repo = rollup_repo
+        self._recipe_repo = recipe_repo
+        self._view_counter = view_counter
+
+    def daily(self, day_from: date | None = None, day_to: date | None = None) -> dict:
+        """Per-day totals (cancelled orders excluded). Reads O(days) rows."""
+        day_from, day_to = self._window(day_from, day_to)
+        rows = self._rollup_repo.totals_by_day(day_from, day_to)
+        return {
+            "from": day_from.isoformat(),
+            "to": day_to.isoformat(),
+            "days": [
+                {"day": _as_date(r.day).isoformat(), **_serialise_totals(r)}
+                for r in rows
+            ],
+        }
+
+    def by_recipe(self, day_from: date | None = None, day_to: date | None = None) -> dict:
+        """Per-recipe totals over the window, highest revenue first."""
+        day_from, day_to = self._window(day_from, day_to)
+        rows = self._rollup_repo.totals_by_recipe(day_from, day_to)
+        return {
+            "from": day_from.isoformat(),
+            "to": day_to.isoformat(),
+            "recipes": [
+                {"recipe_id": r.recipe_id, "recipe_name": r.name, **_serialise_totals(r)}
+                for r in rows
+            ],
+        }
+
+    def by_status(self, day_from: date | None = None, day_to: date | None = None) -> dict:
+        """Totals per current status over the window (all orders)."""
+        day_from, day_to = self._window(day_from, day_to)
+        rows = self._rollup_repo.totals_by_status(day_from, day_to)
+        return {
+            "from": day_from.isoformat(),
+            "to": day_to.isoformat(),
+            "statuses": [{"status": r.status, **_serialise_totals(r)} for r in rows],
+        }
+
+    def consumption(self, day_from: date | None = None, day_to: date | None = None) -> dict:
+        """
+        Per-day ingredient usage over the window (cancelled orders excluded):
+        the day x recipe sales matrix times the recipe x ingredient bill of
+        materials. Ingredient lines whose quantity text did not parse are
+        counted in ``unparsed_lines`` and left out.
+        """
+        day_from, day_to = self._window(day_from, day_to)
+        lines = self._recipe_repo.bill_of_materials()
+        parsed = [line for line in lines if line.amount is not None]
+        recipe_ids, columns, bom = bill_of_materials(parsed)
+
+        rows = self._rollup_repo.recipe_quantities_between(day_from, day_to)
+        n_days = (day_to - day_from).days + 1
+        if rows:
+            days, recipe_id, quantity = zip(*rows)
+            day_index = np.array([(_as_date(d) - day_from).days for d in days])
+            used = consumption(
+                day_index,
+                np.array(recipe_id, dtype=np.int64),
+                np.array(quantity, dtype=np.float64),
+                n_days,
+                recipe_ids,
+                bom,
+            )
+        else:
+            used = np.zeros((n_days, len(columns)))
+
+        return {
+            "from": day_from.isoformat(),
+            "to": day_to.isoformat(),
+            "days": [(day_from + timedelta(days=i)).isoformat() for i in range(n_days)],
+            "ingredients": [
+                {
+                    "ingredient_id": ingredient_id,
+                    "ingredient_name": name,
+                    "unit": unit,
+                    "total": round(float(used[:, i].sum()), 2),
+                    "daily": [round(float(v), 2) for v in used[:, i]],
+                }
+                for i, (ingredient_id, name, unit) in enumerate(columns)
+            ],
+            "unparsed_lines": len(lines) - len(parsed),
+        }
+
+    def conversion(self, k: int, max_k: int) -> dict:
+        """
+        All-time detail-page views, orders and orders per view for the ``k``
+        most viewed recipes. Views this worker hasn't flushed yet are
+        included; other workers' are at most one flush interval behind.
+        """
+        k = max(1, min(k, max_k))
+        pending = self._view_counter.pending() if self._view_counter else {}
+        rows = [
+            (r, int(r.views) + pending.get(r.recipe_id, 0))
+            for r in self._rollup_repo.orders_and_views()
+        ]
+        rows.sort(key=lambda item: (-item[1], item[0].recipe_id))
+        return {
+            "recipes": [
+                {
+                    "recipe_id": r.recipe_id,
+                    "recipe_name": r.name,
+                    "views": views,
+                    "orders": int(r.order_count),
+                    "quantity": int(r.quantity),
+                    "conversion": round(r.order_count / views, 4) if views else None,
+                }
+                for r, views in rows[:k]
+            ],
+        }
+
+    def record_views(self, counts: dict[int, int]) -> None:
+        """
+        Add flushed view counts to the recipe rows (the ViewCounter's flush).
+        Re-raises DB errors so the counter keeps the counts for a retry.
+        """
+        try:
+            self._recipe_repo.add_views(counts)
+            self._recipe_repo.commit()
+        except Exception:
+            self._recipe_repo.rollback()
+            raise
+
+    def rebuild(self) -> dict:
+        """
+        Recompute the rollups from the order table (backfill / repair).
+
+        Raises:
+            InternalServerError: On DB failure.
+        """
+        try:
+            recipe_rows, status_rows = self._rollup_repo.rebuild()
+            self._rollup_repo.commit()
+        except Exception as exc:
+            self._rollup_repo.rollback()
+            logger.exception("DB error rebuilding sales rollups")
+            raise InternalServerError("Failed to rebuild sales rollups.") from exc
+
+        logger.info(
+            "Sales rollups rebuilt: %d recipe rows, %d status rows",
+            recipe_rows,
+            status_rows,
+        )
+        return {"recipe_rows": recipe_rows, "status_rows": status_rows}
+
+    @staticmethod
+    def _window(day_from: date | None, day_to: date | None) -> tuple[date, date]:
+        """
+        Default to the last DEFAULT_WINDOW_DAYS days ending today (UTC).
+
+        Raises:
+            ValidationError: If from is after to.
+        """
+        day_to = day_to or datetime.utcnow().date()
+        day_from = day_from or day_to - timedelta(days=DEFAULT_WINDOW_DAYS - 1)
+        if day_from > day_to:
+            raise ValidationError("from must not be after to.")
+        return day_from, day_to
+
+
+def _as_date(value) -> date:
+    # SQLite returns rollup days written by INSERT ... SELECT as text.
+    return date.fromisoformat(value) if isinstance(value, str) else value
@@ -0,0 +1,80 @@
+"""
+Per-worker "sold out" cache for the catalog.
+
+A recipe is sold out when any of its stock-tracked ingredients holds less
+than one cup needs. The index keeps, per ingredient unit, the recipes that
+use it and how much, plus a count of short ingredients per recipe, so a
+level change (every reservation returns the new levels) only re-checks the
+recipes that use that ingredient.
+
+The cache is advisory: it never blocks an order. Reservations are decided
+by the conditional UPDATE in StockRepository.adjust().
+"""
+
+import threading
+import time
+from collections import defaultdict
+from typing import Iterable
+
+StockKey = tuple[int, str]  # (ingredient_id, unit)
+
+
+class AvailabilityIndex:
+    """Sold-out recipe ids, maintained incrementally from stock levels."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.built_at: float | None = None
+        self._levels: dict[StockKey, float] = {}
+        self._users: dict[StockKey, list[tuple[int, float]]] = {}
+        self._short: dict[int, int] = {}
+
+    def rebuild(
+        self,
+        levels: Iterable[tuple[int, str, float]],
+        lines: Iterable[tuple[int, int, str, float]],
+    ) -> None:
+        """
+        Args:
+            levels: (ingredient_id, unit, quantity) for every stock row.
+            lines: Tracked (recipe_id, ingredient_id, unit, amount) lines.
+        """
+        level_of = {(i, u): q for i, u, q in levels}
+        per_recipe: dict[tuple[int, StockKey], float] = defaultdict(float)
+        for recipe_id, ingredient_id, unit, amount in lines:
+            per_recipe[(recipe_id, (ingredient_id, unit))] += amount
+        users: dict[StockKey, list[tuple[int, float]]] = defaultdict(list)
+        short: dict[int, int] = defaultdict(int)
+        for (recipe_id, key), amount in per_recipe.items():
+            users[key].append((recipe_id, amount))
+            if level_of.get(key, 0.0) < amount:
+                short[recipe_id] += 1
+
+        with self._lock:
+            self._levels = level_of
+            self._users = dict(users)
+            self._short = dict(short)
+            self.built_at = time.time()
+
+    def apply_levels(self, levels: Iterable[tuple[int, str, float]]) -> None:
+        """Record new levels; only recipes using those ingredients are re-checked."""
+        with self._lock:
+            for ingredient_id, unit, quantity in levels:
+                key = (ingredient_id, unit)
+                old = self._levels.get(key)
+                self._levels[key] = quantity
+                if old is None:
+                    # Newly tracked: its recipe lines arrive with the next rebuild.
+                    continue
+                for recipe_id, amount in self._users.get(key, ()):
+                    was, now = old < amount, quantity < amount
+                    if was != now:
+                        count = self._short.get(recipe_id, 0) + (1 if now else -1)
+                        if count:
+                            self._short[recipe_id] = count
+                        else:
+                            self._short.pop(recipe_id, None)
+
+    def sold_out(self) -> set[int]:
+        with self._lock:
+            return set(self._short)
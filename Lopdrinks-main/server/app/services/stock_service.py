@@ -0,0 +1,138 @@
+"""
+Ingredient stock levels and recipe availability.
+
+Orders reserve stock inside their own transaction (OrderService); this
+service sets and receives levels and answers "which recipes are sold
+out?" from a per-worker AvailabilityIndex. Levels written by this worker
+apply immediately; other workers' writes and recipe edits are picked up
+by a full rebuild every STOCK_REFRESH_SECONDS.
+"""
+
+import logging
+import math
+import threading
+import time
+from typing import Any
+
+from app.exceptions.custom_exceptions import (
+    InternalServerError,
+    NotFoundError,
+    ValidationError,
+)
+from app.repositories.ingredient_repository import IngredientRepository
+from app.repositories.stock_repository import StockRepository
+from app.services.stock_availability import AvailabilityIndex
+from app.utils.quantities import UNITS
+
+logger = logging.getLogger(__name__)
+
+recipe_availability = AvailabilityIndex()
+_refresh_lock = threading.Lock()
+
+
+def _serialise_level(row) -> dict:
+    return {
+        "unit": row.unit,
+        "quantity": row.quantity,
+        "updated_at": row.updated_at.isoformat(),
+    }
+
+
+class StockService:
+
+    def __init__(
+        self,
+        index: AvailabilityIndex,
+        stock_repo: StockRepository,
+        ingredient_repo: IngredientRepository,
+        refresh_seconds: float = 30.0,
+    ) -> None:
+        self._index = index
+        self._stock_repo = stock_repo
+        self._ingredient_repo = ingredient_repo
+        self._refresh_seconds = refresh_seconds
+
+    def sold_out(self) -> set[int]:
+        """Ids of recipes a tracked ingredient can't cover one cup of."""
+        self._ensure_fresh()
+        return self._index.sold_out()
+
+    def levels(self, ingredient_id: int) -> list[dict]:
+        """
+        Raises:
+            NotFoundError: Ingredient not found.
+        """
+        self._require_ingredient(ingredient_id)
+        return [_serialise_level(row) for row in self._stock_repo.levels(ingredient_id)]
+
+    def set_level(self, ingredient_id: int, data: dict[str, Any], received: bool = False) -> dict:
+        """
+        Set an ingredient unit's stock level (a stocktake), or add a delivery
+        to it when ``received`` is true.
+
+        Raises:
+            NotFoundError: Ingredient not found.
+            ValidationError: Unknown unit or invalid quantity.
+            InternalServerError: DB failure.
+        """
+        self._require_ingredient(ingredient_id)
+        unit = data.get("unit")
+        if unit not in UNITS:
+            raise ValidationError(f"unit must be one of: {', '.join(sorted(UNITS))}.")
+        try:
+            quantity = float(data.get("quantity"))
+        except (TypeError, ValueError) as exc:
+            raise ValidationError("quantity must be a number.") from exc
+        if not math.isfinite(quantity) or quantity < 0:
+            raise ValidationError("quantity must not be negative.")
+
+        try:
+            if received:
+                level = self._stock_repo.receive(ingredient_id, unit, quantity)
+            else:
+                level = self._stock_repo.set_level(ingredient_id, unit, quantity)
+            self._stock_repo.commit()
+        except Exception as exc:
+            self._stock_repo.rollback()
+            logger.exception("DB error setting stock for ingredient id=%d", ingredient_id)
+            raise InternalServerError("Failed to update stock.") from exc
+
+        self._index.apply_levels([(ingredient_id, unit, level)])
+        logger.info(
+            "Stock %s: ingredient=%d unit=%s quantity=%s (now %s)",
+            "received" if received else "set",
+            ingredient_id,
+            unit,
+            quantity,
+            level,
+        )
+        return {
+            "message": "Stock received." if received else "Stock level set.",
+            "stock": {"unit": unit, "quantity": level},
+        }
+
+    def rebuild(self) -> int:
+        """Reload levels and tracked recipe lines; returns the number of sold-out recipes."""
+        levels = [(r.ingredient_id, r.unit, r.quantity) for r in self._stock_repo.levels()]
+        lines = [tuple(line) for line in self._stock_repo.tracked_lines()]
+        self._index.rebuild(levels, lines)
+        sold_out = len(self._index.sold_out())
+        logger.info(
+            "Availability rebuilt: %d stock rows, %d tracked lines, %d recipes sold out",
+            len(levels),
+            len(lines),
+            sold_out,
+        )
+        return sold_out
+
+    def _require_ingredient(self, ingredient_id: int) -> None:
+        if not self._ingredient_repo.find_by_id(ingredient_id):
+            raise NotFoundError(f"Ingredient {ingredient_id} not found.")
+
+    def _ensure_fresh(self) -> None:
+        built_at = self._index.built_at
+        if built_at is not None and time.time() - built_at < self._refresh_seconds:
+            return
+        with _refresh_lock:
+            if self._index.built_at == built_at:
+                self.rebuild()
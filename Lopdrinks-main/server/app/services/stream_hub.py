@@ -0,0 +1,223 @@
+"""
+One thread per process serving every open order stream.
+
+A stream handed to the hub no longer needs a request thread: its socket
+is switched to non-blocking and registered with a selector, and a single
+hub thread writes to all of them. When the change bus queues an event for
+a stream's subscription it wakes the hub, which formats the event into
+that client's buffer and sends what the socket will take; the rest waits
+for the socket to become writable. Idle clients get a keep-alive comment
+every ``heartbeat`` seconds, and a client that stops reading for longer
+than its buffer allows is dropped (it reconnects with Last-Event-ID).
+
+An open stream therefore costs a file descriptor and a few kilobytes, not
+a thread, so a worker can hold hundreds of dashboards while every request
+thread stays free for the API. See app/middleware/stream_handoff.py for
+how a gunicorn connection gets here.
+
+Like the change bus, the hub is keyed by PID so a forked gunicorn worker
+starts its own thread.
+"""
+
+import logging
+import os
+import selectors
+import socket
+import threading
+import time
+from typing import Optional
+
+from app.services.change_bus import RESET, Subscription
+from app.utils.sse import format_comment, format_event
+
+logger = logging.getLogger(__name__)
+
+# Unsent bytes a client may accumulate before it is dropped as too slow.
+MAX_CLIENT_BUFFER_BYTES = 256 * 1024
+
+
+class _Client:
+
+    def __init__(
+        self, sock: socket.socket, head: bytes, subscription: Subscription, heartbeat: float
+    ) -> None:
+        self.sock = sock
+        self.buffer = bytearray(head)
+        self.subscription = subscription
+        self.heartbeat = heartbeat
+        self.last_write = time.monotonic()
+        self.closing = False  # close once the buffer is flushed
+        self.writing = False  # registered for EVENT_WRITE
+
+
+class StreamHub:
+
+    def __init__(self, max_buffer: int = MAX_CLIENT_BUFFER_BYTES) -> None:
+        self._max_buffer = max_buffer
+        self._lock = threading.Lock()
+        self._incoming: list[_Client] = []
+        self._ready: set[_Client] = set()
+        self._clients: set[_Client] = set()
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._wake_r: Optional[socket.socket] = None
+        self._wake_w: Optional[socket.socket] = None
+        self._pid: Optional[int] = None
+
+    def attach(
+        self, sock: socket.socket, head: bytes, subscription: Subscription, heartbeat: float
+    ) -> None:
+        """
+        Take over ``sock``: send ``head`` (status line, headers, preamble),
+        then every event ``subscription`` receives. The hub closes the
+        socket and the subscription when the client goes away.
+        """
+        self._ensure_started()
+        sock.setblocking(False)
+        client = _Client(sock, head, subscription, heartbeat)
+        subscription.notify = lambda: self._mark_ready(client)
+        with self._lock:
+            self._incoming.append(client)
+            self._ready.add(client)  # anything queued before notify was set
+        self._wake()
+
+    @property
+    def client_count(self) -> int:
+        return len(self._clients) + len(self._incoming)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _ensure_started(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                # A forked worker inherits the parent's state but not its thread.
+                self._incoming, self._ready, self._clients = [], set(), set()
+                self._selector = selectors.DefaultSelector()
+                self._wake_r, self._wake_w = socket.socketpair()
+                self._wake_r.setblocking(False)
+                self._wake_w.setblocking(False)
+                self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+                threading.Thread(target=self._run, name="order-stream-hub", daemon=True).start()
+                self._pid = os.getpid()
+
+    def _mark_ready(self, client: _Client) -> None:
+        with self._lock:
+            first = not self._ready
+            self._ready.add(client)
+        if first:
+            self._wake()
+
+    def _wake(self) -> None:
+        try:
+            self._wake_w.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass  # a wake-up is already pending
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self._tick()
+            except Exception:
+                logger.exception("Order stream hub iteration failed")
+                time.sleep(0.1)
+
+    def _tick(self) -> None:
+        now = time.monotonic()
+        timeout = min(
+            (max(0.0, c.last_write + c.heartbeat - now) for c in self._clients), default=None
+        )
+        for key, mask in self._selector.select(timeout):
+            client = key.data
+            if client is None:
+                try:
+                    while self._wake_r.recv(4096):
+                        pass
+                except (BlockingIOError, OSError):
+                    pass
+                continue
+            if mask & selectors.EVENT_READ and not self._still_open(client):
+                self._drop(client)
+                continue
+            if mask & selectors.EVENT_WRITE:
+                self._flush(client)
+
+        with self._lock:
+            incoming, self._incoming = self._incoming, []
+            ready, self._ready = self._ready, set()
+        for client in incoming:
+            self._clients.add(client)
+            self._selector.register(client.sock, selectors.EVENT_READ, client)
+        for client in ready:
+            if client in self._clients:
+                self._pull(client)
+                self._flush(client)
+
+        now = time.monotonic()
+        for client in list(self._clients):
+            if not client.buffer and now - client.last_write >= client.heartbeat:
+                client.buffer += format_comment("keep-alive").encode()
+                self._flush(client)
+
+    def _pull(self, client: _Client) -> None:
+        for event in client.subscription.pending():
+            client.buffer += format_event(
+                event.data, event=event.kind, event_id=event.id or None
+            ).encode()
+            if event is RESET:
+                client.closing = True
+        if len(client.buffer) > self._max_buffer:
+            logger.warning("Dropping order stream that stopped reading")
+            self._drop(client)
+
+    def _flush(self, client: _Client) -> None:
+        if client not in self._clients:
+            return
+        try:
+            while client.buffer:
+                sent = client.sock.send(client.buffer)
+                del client.buffer[:sent]
+                client.last_write = time.monotonic()
+        except BlockingIOError:
+            pass
+        except OSError:
+            self._drop(client)
+            return
+        if not client.buffer and client.closing:
+            self._drop(client)
+            return
+        writing = bool(client.buffer)
+        if writing != client.writing:
+            events = selectors.EVENT_READ | (selectors.EVENT_WRITE if writing else 0)
+            self._selector.modify(client.sock, events, client)
+            client.writing = writing
+
+    @staticmethod
+    def _still_open(client: _Client) -> bool:
+        # SSE clients send nothing after the request, so a readable socket
+        # is almost always one the client has closed.
+        try:
+            return bool(client.sock.recv(4096))
+        except BlockingIOError:
+            return True
+        except OSError:
+            return False
+
+    def _drop(self, client: _Client) -> None:
+        if client not in self._clients:
+            return
+        self._clients.discard(client)
+        client.subscription.notify = None
+        client.subscription.close()
+        try:
+            self._selector.unregister(client.sock)
+        except (KeyError, ValueError):
+            pass
+        try:
+            client.sock.close()
+        except OSError:
+            pass
+
+
+order_stream_hub = StreamHub()
@@ -0,0 +1,68 @@
+"""Per-user order summary — served from the user_order_summary read model."""
+
+import logging
+
+from app.repositories.user_summary_repository import UserSummaryRepository
+from app.exceptions.custom_exceptions import InternalServerError
+
+logger = logging.getLogger(__name__)
+
+
+class UserSummaryService:
+
+    def __init__(self, summary_repo: UserSummaryRepository) -> None:
+        self._summary_repo = summary_repo
+
+    def for_user(self, user_id: int) -> dict:
+        """Lifetime totals, favourite recipe and last order (cancelled orders excluded)."""
+        row = self._summary_repo.find(user_id)
+        if row is None:
+            return {
+                "order_count": 0,
+                "quantity": 0,
+                "total_spend": 0.0,
+                "favourite_recipe": None,
+                "last_order": None,
+            }
+        return {
+            "order_count": int(row.order_count),
+            "quantity": int(row.quantity),
+            "total_spend": round(float(row.revenue), 2),
+            "favourite_recipe": (
+                {
+                    "recipe_id": row.favourite_recipe_id,
+                    "recipe_name": row.favourite_recipe_name,
+                    "quantity": row.favourite_quantity,
+                }
+                if row.favourite_recipe_id is not None
+                else None
+            ),
+            "last_order": (
+                {
+                    "order_id": row.last_order_id,
+                    "recipe_id": row.last_recipe_id,
+                    "recipe_name": row.last_recipe_name,
+                    "ordered_at": row.last_ordered_at.isoformat(),
+                }
+                if row.last_order_id is not None
+                else None
+            ),
+        }
+
+    def rebuild(self) -> dict:
+        """
+        Recompute every user's summary from the order tables (backfill / repair).
+
+        Raises:
+            InternalServerError: On DB failure.
+        """
+        try:
+            users = self._summary_repo.rebuild()
+            self._summary_repo.commit()
+        except Exception as exc:
+            self._summary_repo.rollback()
+            logger.exception("DB error rebuilding user order summaries")
+            raise InternalServerError("Failed to rebuild user order summaries.") from exc
+
+        logger.info("User order summaries rebuilt: %d users", users)
+        return {"users": users}
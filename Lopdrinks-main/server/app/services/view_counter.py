@@ -0,0 +1,119 @@
+"""
+Write-behind recipe view counter.
+
+``GET /recipes/<id>`` must stay a read, so views are only counted in
+memory: one ViewCounter per worker process adds them up under a lock and
+a background thread hands the totals to ``flush`` every
+``VIEW_FLUSH_SECONDS`` — one batched ``UPDATE recipe SET views = views + n``
+for however many views arrived in between. The counter is flushed once
+more when the process exits, so a graceful worker shutdown loses nothing;
+a crash loses at most one interval. A failed flush puts its counts back
+for the next attempt.
+
+Like the group-commit writer, the counter is keyed by PID so a forked
+gunicorn worker starts its own thread.
+"""
+
+import atexit
+import logging
+import os
+import threading
+from collections import Counter
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+# flush({recipe_id: views}) -> None, committing the increments.
+FlushFn = Callable[[dict[int, int]], None]
+
+
+class ViewCounter:
+    """Per-worker view totals, flushed periodically on a background thread."""
+
+    def __init__(self, flush: FlushFn, interval: float = 5.0) -> None:
+        self._flush = flush
+        self._interval = interval
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+        # Handed to flush() but not yet committed.
+        self._in_flight: Counter = Counter()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def record(self, recipe_id: int, views: int = 1) -> None:
+        self._ensure_started()
+        with self._lock:
+            self._counts[recipe_id] += views
+
+    def pending(self) -> dict[int, int]:
+        """Views counted by this worker that aren't in the database yet."""
+        with self._lock:
+            return dict(self._counts + self._in_flight)
+
+    def flush(self) -> int:
+        """Write out everything counted so far; returns the views flushed."""
+        with self._flush_lock:
+            with self._lock:
+                counts, self._counts = self._counts, Counter()
+                self._in_flight = counts
+            if not counts:
+                return 0
+            try:
+                self._flush(dict(counts))
+            except Exception:
+                logger.exception("Flushing %d recipe views failed; will retry", sum(counts.values()))
+                with self._lock:
+                    self._counts.update(counts)
+                    self._in_flight = Counter()
+                return 0
+            with self._lock:
+                self._in_flight = Counter()
+            logger.debug("Flushed views for %d recipes", len(counts))
+            return sum(counts.values())
+
+    def close(self, timeout: float | None = 5.0) -> None:
+        """Stop the flusher thread and flush what's left."""
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None and thread.is_alive():
+            thread.join(timeout)
+        self.flush()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _ensure_started(self) -> None:
+        if self._thread is not None or self._stop.is_set():
+            return
+        with self._lock:
+            if self._thread is None and not self._stop.is_set():
+                self._thread = threading.Thread(
+                    target=self._run, name="recipe-view-flush", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self.flush()
+
+
+_counters: dict[tuple[int, int], ViewCounter] = {}
+_counters_lock = threading.Lock()
+
+
+def get_counter(key: object, factory: Callable[[], ViewCounter]) -> ViewCounter:
+    """
+    Return this process's counter for ``key`` (usually the Flask app),
+    creating it with ``factory`` on first use or after a fork.
+    """
+    slot = (id(key), os.getpid())
+    counter = _counters.get(slot)
+    if counter is None:
+        with _counters_lock:
+            counter = _counters.get(slot)
+            if counter is None:
+                counter = factory()
+                _counters[slot] = counter
+                atexit.register(counter.close)
+    return counter
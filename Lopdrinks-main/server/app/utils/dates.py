@@ -0,0 +1,20 @@
+"""Date/time parsing helpers for query-string and JSON input."""
+
+from datetime import datetime
+
+from app.exceptions.custom_exceptions import ValidationError
+
+
+def parse_iso_datetime(value: str | None, field: str) -> datetime | None:
+    """
+    Parse an ISO-8601 date or datetime, returning None for empty input.
+
+    Raises:
+        ValidationError: If the value is not a valid ISO-8601 timestamp.
+    """
+    if value in (None, ""):
+        return None
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError as exc:
+        raise ValidationError(f"{field} must be an ISO-8601 date or datetime.") from exc
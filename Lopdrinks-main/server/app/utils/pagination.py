@@ -0,0 +1,47 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Cursors are opaque to clients: a URL-safe base64 encoding of the sort key
+of the last row on a page. Paging with a cursor turns into an index range
+seek, so page 1000 costs the same as page 1 (no OFFSET scan).
+"""
+
+import base64
+import binascii
+from datetime import datetime
+
+from app.exceptions.custom_exceptions import ValidationError
+
+
+def encode_cursor(ordered_at: datetime, row_id: int) -> str:
+    """Encode an (ordered_at, id) sort key into an opaque cursor token."""
+    raw = f"{ordered_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> tuple[datetime, int]:
+    """
+    Decode a cursor token produced by encode_cursor().
+
+    Raises:
+        ValidationError: If the token is malformed or has been tampered with.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        ordered_at, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(ordered_at), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise ValidationError("Invalid pagination cursor.") from exc
+
+
+def clamp_limit(limit: int, max_limit: int) -> int:
+    """
+    Bound a client-supplied page size to [1, max_limit].
+
+    Raises:
+        ValidationError: If limit < 1.
+    """
+    if limit < 1:
+        raise ValidationError("limit must be a positive integer.")
+    return min(limit, max_limit)
@@ -0,0 +1,104 @@
+"""
+Parse free-text recipe ingredient quantities ("2 shots", "130ml", "½ tsp")
+into a numeric amount and a canonical unit.
+
+Volumes are normalised to ``ml`` and masses to ``g`` so the same
+ingredient sums across recipes; countable units ("shot", "pump", "tsp",
+"dollop", ...) are kept as their singular name. Text that does not parse
+yields ``(None, None)`` and is left out of consumption reports.
+"""
+
+import re
+from fractions import Fraction
+
+# unit spelling -> (canonical unit, factor into that unit)
+_UNITS: dict[str, tuple[str, float]] = {
+    "ml": ("ml", 1.0),
+    "millilitre": ("ml", 1.0),
+    "milliliter": ("ml", 1.0),
+    "cl": ("ml", 10.0),
+    "l": ("ml", 1000.0),
+    "litre": ("ml", 1000.0),
+    "liter": ("ml", 1000.0),
+    "floz": ("ml", 29.5735),  # "fl oz", "fl. oz."
+    "cup": ("ml", 240.0),
+    "g": ("g", 1.0),
+    "gram": ("g", 1.0),
+    "gr": ("g", 1.0),
+    "mg": ("g", 0.001),
+    "kg": ("g", 1000.0),
+    # Bare "oz" is the avoirdupois ounce; liquid ounces are written "fl oz".
+    "oz": ("g", 28.3495),
+    "ounce": ("g", 28.3495),
+    "shot": ("shot", 1.0),
+    "pump": ("pump", 1.0),
+    "scoop": ("scoop", 1.0),
+    "tsp": ("tsp", 1.0),
+    "teaspoon": ("tsp", 1.0),
+    "tbsp": ("tbsp", 1.0),
+    "tablespoon": ("tbsp", 1.0),
+    "dollop": ("dollop", 1.0),
+    "pinch": ("pinch", 1.0),
+    "dash": ("dash", 1.0),
+    "slice": ("slice", 1.0),
+    "piece": ("piece", 1.0),
+    "bag": ("bag", 1.0),
+    "cube": ("cube", 1.0),
+    "sprig": ("sprig", 1.0),
+    "unit": ("unit", 1.0),
+    "": ("unit", 1.0),  # a bare number: "2"
+}
+
+# Every canonical unit parse_quantity can return.
+UNITS: frozenset[str] = frozenset(unit for unit, _ in _UNITS.values())
+
+_VULGAR = {"¼": "1/4", "½": "1/2", "¾": "3/4", "⅓": "1/3", "⅔": "2/3", "⅛": "1/8"}
+
+_NUMBER = r"\d+(?:\.\d+)?(?:\s+\d+/\d+)?|\d+/\d+"
+_PATTERN = re.compile(
+    rf"^\s*(?:(?P<amount>{_NUMBER})(?:\s*-\s*(?P<upper>{_NUMBER}))?)?\s*"
+    r"(?P<unit>[a-z. ]*?)\s*$"
+)
+
+
+def _number(text: str) -> float:
+    """'1 1/2' -> 1.5, '2.5' -> 2.5, '3/4' -> 0.75."""
+    return float(sum(Fraction(part) for part in text.split()))
+
+
+def _unit(text: str) -> tuple[str, float] | None:
+    key = text.replace(".", "").replace(" ", "")
+    if key in _UNITS:
+        return _UNITS[key]
+    if key.endswith("es") and key[:-2] in _UNITS:  # "pinches", "dashes"
+        return _UNITS[key[:-2]]
+    if key.endswith("s") and key[:-1] in _UNITS:
+        return _UNITS[key[:-1]]
+    return None
+
+
+def parse_quantity(text: str | None) -> tuple[float | None, str | None]:
+    """
+    Return ``(amount, unit)`` for a quantity string, e.g.
+    ``"130ml" -> (130.0, "ml")``, ``"2 shots" -> (2.0, "shot")``,
+    ``"dollop" -> (1.0, "dollop")``. A range ("1-2 tsp") counts as its
+    midpoint. Unparseable text returns ``(None, None)``.
+    """
+    if not text:
+        return None, None
+    normalised = text.strip().lower()
+    for glyph, fraction in _VULGAR.items():
+        normalised = normalised.replace(glyph, f" {fraction}")
+    match = _PATTERN.match(normalised.strip())
+    if match is None or not (match["amount"] or match["unit"]):
+        return None, None
+
+    unit = _unit(match["unit"])
+    if unit is None:
+        return None, None
+    canonical, factor = unit
+
+    amount = _number(match["amount"]) if match["amount"] else 1.0
+    if match["upper"]:
+        amount = (amount + _number(match["upper"])) / 2
+    return round(amount * factor, 4), canonical
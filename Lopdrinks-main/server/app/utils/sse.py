@@ -0,0 +1,30 @@
+"""
+Server-Sent Events wire format.
+
+See https://html.spec.whatwg.org/multipage/server-sent-events.html —
+each message is a block of ``field: value`` lines ended by a blank line.
+"""
+
+import json
+from typing import Any, Optional
+
+
+def format_event(data: Any, event: Optional[str] = None, event_id: Optional[int] = None) -> str:
+    """Encode one SSE message; ``data`` is serialised as compact JSON."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+def format_comment(text: str = "") -> str:
+    """A comment line; clients ignore it, proxies see traffic (keep-alive)."""
+    return f": {text}\n\n"
+
+
+def format_retry(milliseconds: int) -> str:
+    """Tell the client how long to wait before reconnecting."""
+    return f"retry: {milliseconds}\n\n"
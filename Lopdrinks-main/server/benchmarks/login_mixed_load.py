@@ -0,0 +1,177 @@
+"""
+Benchmark: login throughput vs catalog-read latency under mixed load.
+
+Models one gunicorn worker: ``--threads`` request threads serve every
+request, as under ``gunicorn --threads``. Reader clients list the catalog
+(RecipeService.get_all) in a closed loop while login clients sign in as
+seeded users; each client hands its request to the worker and waits, so
+read latency includes waiting for a free request thread. Three phases run
+for the same time each: reads alone, reads + logins hashing on the
+request threads, and reads + logins hashing on a process pool capped at
+``threads - 1`` hashes in flight (the app's default), where logins over
+the cap are shed with a 503. Reports logins/s, shed logins/s and read
+latency percentiles per phase.
+
+Usage (from the server/ directory):
+    python -m benchmarks.login_mixed_load                   # temp SQLite file
+    python -m benchmarks.login_mixed_load --method scrypt:16384:8:1 --workers 4 --threads 8
+    DATABASE_URL=postgresql://... python -m benchmarks.login_mixed_load
+
+The target database is created with db.create_all(); point DATABASE_URL
+at a scratch database, never a real one.
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+PASSWORD = "bench-password"
+
+
+def _phase(
+    app, hasher, seconds: float, threads: int, readers: int, logins: int, emails: list[str]
+) -> dict:
+    from app.api.dependencies import get_recipe_service
+    from app.exceptions.custom_exceptions import ServiceUnavailableError
+    from app.repositories.user_repository import UserRepository
+    from app.services.auth_service import AuthService
+
+    stop = threading.Event()
+    latencies: list[float] = []
+    counts = {"signed_in": 0, "shed": 0}
+    lock = threading.Lock()
+
+    def read() -> None:
+        with app.app_context():
+            get_recipe_service().get_all()
+
+    def login(email: str) -> bool:
+        with app.app_context():
+            try:
+                AuthService(user_repo=UserRepository(), hasher=hasher).login(email, PASSWORD)
+            except ServiceUnavailableError:
+                return False
+        return True
+
+    def reader(worker: ThreadPoolExecutor) -> None:
+        mine = []
+        while not stop.is_set():
+            start = time.perf_counter()
+            worker.submit(read).result()
+            mine.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(mine)
+
+    def login_client(worker: ThreadPoolExecutor, offset: int) -> None:
+        done = shed = 0
+        while not stop.is_set():
+            email = emails[(offset + done + shed) % len(emails)]
+            if worker.submit(login, email).result():
+                done += 1
+            else:
+                shed += 1
+                time.sleep(0.01)  # a client backing off after a 503
+        with lock:
+            counts["signed_in"] += done
+            counts["shed"] += shed
+
+    with ThreadPoolExecutor(max_workers=threads) as worker:
+        clients = [threading.Thread(target=reader, args=(worker,)) for _ in range(readers)]
+        clients += [
+            threading.Thread(target=login_client, args=(worker, i)) for i in range(logins)
+        ]
+        for t in clients:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in clients:
+            t.join()
+
+    ms = np.array(latencies) * 1000
+    return {
+        "logins_per_s": counts["signed_in"] / seconds,
+        "shed_per_s": counts["shed"] / seconds,
+        "reads_per_s": len(ms) / seconds,
+        "p50": np.percentile(ms, 50),
+        "p95": np.percentile(ms, 95),
+        "p99": np.percentile(ms, 99),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--threads", type=int, default=2, help="Request threads per worker.")
+    parser.add_argument("--readers", type=int, default=4, help="Concurrent reader clients.")
+    parser.add_argument("--logins", type=int, default=8, help="Concurrent login clients.")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--recipes", type=int, default=50)
+    parser.add_argument("--method", default="scrypt", help="werkzeug password hash method.")
+    parser.add_argument("--workers", type=int, default=2, help="Hashing processes in the pool phase.")
+    args = parser.parse_args()
+
+    if not os.getenv("DATABASE_URL"):
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+
+    from app import create_app
+    from app.extensions import db
+    from app.models.recipe import Recipe
+    from app.models.user import User
+    from app.services.password_hasher import PasswordHasher
+
+    inline = PasswordHasher(method=args.method)
+    app = create_app("development")
+    with app.app_context():
+        db.create_all()
+        # One hash for everyone: each login still verifies at full cost.
+        hashed = inline.hash(PASSWORD)
+        users = [
+            User(
+                username=f"bench_login_{i}",
+                email=f"bench_login_{i}@example.com",
+                password=hashed,
+                is_verified=True,
+            )
+            for i in range(args.users)
+        ]
+        recipes = [Recipe(name=f"Bench Catalog {i}", price=4.0) for i in range(args.recipes)]
+        db.session.add_all([*users, *recipes])
+        db.session.commit()
+        emails = [u.email for u in users]
+
+    print(
+        f"{args.threads} request threads, {args.readers} readers, {args.logins} login clients, "
+        f"{args.seconds:g}s per phase, "
+        f"{inline.params}, {app.config['SQLALCHEMY_DATABASE_URI']}"
+    )
+    print(
+        f"  {'phase':<22}{'logins/s':>10}{'shed/s':>8}{'reads/s':>10}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+    )
+    pool = PasswordHasher(
+        method=args.method, workers=args.workers, max_pending=max(1, args.threads - 1)
+    )
+    try:
+        phases = [
+            ("reads only", inline, 0),
+            ("logins inline", inline, args.logins),
+            (f"logins on {args.workers} procs", pool, args.logins),
+        ]
+        for name, hasher, logins in phases:
+            r = _phase(app, hasher, args.seconds, args.threads, args.readers, logins, emails)
+            print(
+                f"  {name:<22}{r['logins_per_s']:>10.1f}{r['shed_per_s']:>8.1f}{r['reads_per_s']:>10.0f}"
+                f"{r['p50']:>9.2f}{r['p95']:>9.2f}{r['p99']:>9.2f}"
+            )
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark: per-request commit vs group commit for POST /orders/ inserts.
+
+Drives OrderService.create() from many threads (one app context each, as
+gunicorn threads would) and reports orders/second for both modes.
+
+Usage (from the server/ directory):
+    python -m benchmarks.order_ingest                      # temp SQLite file
+    DATABASE_URL=postgresql://... python -m benchmarks.order_ingest --orders 5000
+
+The target database is created with db.create_all(); point DATABASE_URL
+at a scratch database, never a real one.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _run(app, user_id: int, recipe_id: int, orders: int, threads: int) -> float:
+    from app.api.dependencies import get_order_service
+
+    def place(_):
+        with app.app_context():
+            get_order_service().create(user_id=user_id, recipe_id=recipe_id, quantity=1)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(place, range(orders)))
+    return orders / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    if not os.getenv("DATABASE_URL"):
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+
+    from app import create_app
+    from app.extensions import db
+    from app.models.user import User
+    from app.models.recipe import Recipe
+
+    app = create_app("development")
+    app.config["ORDER_GROUP_COMMIT_WAIT_MS"] = args.wait_ms
+    with app.app_context():
+        db.create_all()
+        user = User(username="bench", email="bench@example.com", password="x", is_verified=True)
+        recipe = Recipe(name="Bench Brew", price=4.0)
+        db.session.add_all([user, recipe])
+        db.session.commit()
+        user_id, recipe_id = user.id, recipe.id
+
+    print(f"{args.orders} orders, {args.threads} threads, {app.config['SQLALCHEMY_DATABASE_URI']}")
+    for group_commit in (False, True):
+        app.config["ORDER_GROUP_COMMIT"] = group_commit
+        rate = _run(app, user_id, recipe_id, args.orders, args.threads)
+        label = "group commit" if group_commit else "per-request commit"
+        print(f"  {label:<20} {rate:>9.0f} orders/s")
+
+
+if __name__ == "__main__":
+    main()
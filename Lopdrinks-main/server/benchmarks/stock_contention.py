@@ -0,0 +1,112 @@
+"""
+Benchmark: parallel checkouts against limited ingredient stock.
+
+Many threads check out carts for recipes sharing one stocked ingredient
+until it runs out. Reports checkouts/second and verifies that the stock
+reserved equals what the accepted orders need — i.e. nothing was oversold
+and nothing leaked.
+
+Usage (from the server/ directory):
+    python -m benchmarks.stock_contention                   # temp SQLite file
+    DATABASE_URL=postgresql://... python -m benchmarks.stock_contention --threads 64
+
+The target database is created with db.create_all(); point DATABASE_URL
+at a scratch database, never a real one.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--attempts", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--stock-ml", type=float, default=100_000)
+    args = parser.parse_args()
+
+    if not os.getenv("DATABASE_URL"):
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+
+    from app import create_app
+    from app.api.dependencies import get_order_service
+    from app.exceptions.custom_exceptions import ConflictError
+    from app.extensions import db
+    from app.models.ingredient import Ingredient
+    from app.models.ingredient_stock import IngredientStock
+    from app.models.order import Order
+    from app.models.recipe import Recipe
+    from app.models.recipe_ingredient import RecipeIngredient
+    from app.models.user import User
+
+    # Oat milk per cup for each benchmark recipe.
+    amounts = {"Bench Oat Latte": 250.0, "Bench Oat Flat White": 150.0, "Bench Oat Cortado": 60.0}
+
+    app = create_app("development")
+    with app.app_context():
+        db.create_all()
+        user = User(username="bench", email="bench@example.com", password="x", is_verified=True)
+        oat = Ingredient(name="Bench Oat Milk")
+        recipes = [Recipe(name=name, price=4.0) for name in amounts]
+        db.session.add_all([user, oat, *recipes])
+        db.session.flush()
+        db.session.add_all(
+            RecipeIngredient(
+                recipe_id=r.id,
+                ingredient_id=oat.id,
+                quantity=f"{amounts[r.name]:g}ml",
+                amount=amounts[r.name],
+                unit="ml",
+            )
+            for r in recipes
+        )
+        db.session.add(IngredientStock(ingredient_id=oat.id, unit="ml", quantity=args.stock_ml))
+        db.session.commit()
+        user_id, oat_id = user.id, oat.id
+        needs = {r.id: amounts[r.name] for r in recipes}
+
+    rng = random.Random(7)
+    carts = [
+        [
+            {"recipe_id": recipe_id, "quantity": rng.randint(1, 3)}
+            for recipe_id in rng.sample(sorted(needs), rng.randint(1, 2))
+        ]
+        for _ in range(args.attempts)
+    ]
+
+    def checkout(items) -> bool:
+        with app.app_context():
+            try:
+                get_order_service().create_many(user_id=user_id, items=items)
+                return True
+            except ConflictError:
+                return False
+
+    print(
+        f"{args.attempts} carts, {args.threads} threads, {args.stock_ml:g} ml stock, "
+        f"{app.config['SQLALCHEMY_DATABASE_URI']}"
+    )
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        accepted = sum(pool.map(checkout, carts))
+    elapsed = time.perf_counter() - start
+
+    with app.app_context():
+        left = db.session.get(IngredientStock, (oat_id, "ml")).quantity
+        orders = db.session.query(Order.recipe_id, Order.quantity).filter_by(user_id=user_id).all()
+    used = sum(needs[recipe_id] * quantity for recipe_id, quantity in orders)
+
+    print(f"  accepted {accepted}, rejected {args.attempts - accepted} ({args.attempts / elapsed:.0f} carts/s)")
+    print(f"  reserved {args.stock_ml - left:g} ml for orders needing {used:g} ml; {left:g} ml left")
+    if left < 0 or abs((args.stock_ml - left) - used) > 1e-6:
+        raise SystemExit("FAIL: stock does not match accepted orders")
+    print("  OK: no oversell")
+
+
+if __name__ == "__main__":
+    main()
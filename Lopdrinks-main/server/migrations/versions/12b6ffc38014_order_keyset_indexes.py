@@ -0,0 +1,39 @@
+"""Add composite (ordered_at, id) indexes on order for keyset pagination
+
+Revision ID: 12b6ffc38014
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+from sqlalchemy import inspect
+
+
+revision = '12b6ffc38014'
+down_revision = 'a1b2c3d4e5f6'
+branch_labels = None
+depends_on = None
+
+
+_INDEXES = {
+    'ix_order_ordered_at_id': ['ordered_at', 'id'],
+    'ix_order_user_id_ordered_at_id': ['user_id', 'ordered_at', 'id'],
+    'ix_order_status_ordered_at_id': ['status', 'ordered_at', 'id'],
+}
+
+
+def _index_exists(table_name: str, index_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return any(ix["name"] == index_name for ix in inspector.get_indexes(table_name))
+
+
+def upgrade():
+    for name, columns in _INDEXES.items():
+        if not _index_exists('order', name):
+            op.create_index(name, 'order', columns)
+
+
+def downgrade():
+    for name in _INDEXES:
+        op.drop_index(name, table_name='order')
@@ -0,0 +1,42 @@
+"""Add parsed amount/unit columns to recipe_ingredient
+
+Revision ID: 3e8f1a6c2b90
+Revises: 7d2b4c8e9f31
+Create Date: 2026-10-19 12:00:00.000000
+
+Columns start empty; backfill with `flask recipes parse-quantities`.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = '3e8f1a6c2b90'
+down_revision = '7d2b4c8e9f31'
+branch_labels = None
+depends_on = None
+
+
+def _column_exists(table_name: str, column_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return any(
+        col["name"] == column_name
+        for col in inspector.get_columns(table_name)
+    )
+
+
+def upgrade():
+    # Batch mode so SQLite handles this via copy-and-move instead of ALTER.
+    with op.batch_alter_table('recipe_ingredient') as batch_op:
+        if not _column_exists('recipe_ingredient', 'amount'):
+            batch_op.add_column(sa.Column('amount', sa.Float(), nullable=True))
+        if not _column_exists('recipe_ingredient', 'unit'):
+            batch_op.add_column(sa.Column('unit', sa.String(length=20), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('recipe_ingredient') as batch_op:
+        batch_op.drop_column('unit')
+        batch_op.drop_column('amount')
@@ -0,0 +1,47 @@
+"""Add idempotency_key table for replay-safe order creation
+
+Revision ID: 5c3e9d1f7a20
+Revises: a50a017b050d
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = '5c3e9d1f7a20'
+down_revision = 'a50a017b050d'
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(table_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+def upgrade():
+    if not _table_exists('idempotency_key'):
+        op.create_table(
+            'idempotency_key',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('key', sa.String(length=255), nullable=False),
+            sa.Column('request_hash', sa.String(length=64), nullable=False),
+            sa.Column('status_code', sa.Integer(), nullable=True),
+            sa.Column('response_body', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('expires_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('user_id', 'key', name='uq_idempotency_key_user_id_key')
+        )
+        op.create_index(
+            'ix_idempotency_key_expires_at', 'idempotency_key', ['expires_at']
+        )
+
+
+def downgrade():
+    op.drop_index('ix_idempotency_key_expires_at', table_name='idempotency_key')
+    op.drop_table('idempotency_key')
@@ -0,0 +1,189 @@
+"""Partition order by month on PostgreSQL; add order_archive
+
+Revision ID: 7d2b4c8e9f31
+Revises: 5c3e9d1f7a20
+Create Date: 2026-10-19 12:00:00.000000
+
+On PostgreSQL the existing `order` table is rebuilt as a RANGE-partitioned
+table on `ordered_at` (one partition per month, plus a DEFAULT partition)
+with a BRIN index on `ordered_at`. The primary key becomes (id, ordered_at)
+because PostgreSQL requires the partition key in every unique constraint;
+the id sequence is kept, so ids stay unique. NOT NULL constraints on the
+old table's columns are carried over (tables built by db.create_all()
+have them on user_id, recipe_id and status; ones built by migrations
+don't). Rows are copied in one INSERT ... SELECT, so run this in a
+maintenance window on large tables. Future partitions are created by
+`flask orders partitions`.
+
+On other databases only the order_archive table is added.
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = '7d2b4c8e9f31'
+down_revision = '5c3e9d1f7a20'
+branch_labels = None
+depends_on = None
+
+_KEYSET_INDEXES = {
+    'ix_order_ordered_at_id': 'ordered_at, id',
+    'ix_order_user_id_ordered_at_id': 'user_id, ordered_at, id',
+    'ix_order_status_ordered_at_id': 'status, ordered_at, id',
+}
+_MONTHS_AHEAD = 3
+
+
+def _table_exists(table_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+def _is_partitioned(bind) -> bool:
+    return bool(bind.execute(sa.text(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = '\"order\"'::regclass"
+    )).scalar())
+
+
+def _not_null_columns(bind, table_name: str) -> list[str]:
+    return list(bind.execute(sa.text(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = :t AND is_nullable = 'NO'"
+    ), {"t": table_name}).scalars())
+
+
+def _set_not_null(table_name: str, columns: list[str]) -> None:
+    # The CREATE TABLE statements below only declare NOT NULL where every
+    # deployment has it; the rest is copied from the table being replaced
+    # (repeating one already declared is a no-op).
+    for column in columns:
+        op.execute(f'ALTER TABLE "{table_name}" ALTER COLUMN {column} SET NOT NULL')
+
+
+def _add_month(d: date) -> date:
+    return date(d.year + d.month // 12, d.month % 12 + 1, 1)
+
+
+def _partition_order_table(bind) -> None:
+    for name in _KEYSET_INDEXES:
+        op.execute(f'DROP INDEX IF EXISTS {name}')
+    not_null = _not_null_columns(bind, 'order')
+    op.execute('ALTER TABLE "order" RENAME TO order_unpartitioned')
+    op.execute('ALTER TABLE order_unpartitioned RENAME CONSTRAINT order_pkey TO order_unpartitioned_pkey')
+    # Keep the id sequence alive when the old table is dropped.
+    op.execute('ALTER SEQUENCE order_id_seq OWNED BY NONE')
+
+    op.execute("""
+        CREATE TABLE "order" (
+            id integer NOT NULL DEFAULT nextval('order_id_seq'),
+            user_id integer REFERENCES "user" (id),
+            recipe_id integer REFERENCES recipe (id),
+            quantity integer NOT NULL,
+            unit_price double precision NOT NULL,
+            status varchar(20),
+            ordered_at timestamp without time zone NOT NULL,
+            CONSTRAINT order_pkey PRIMARY KEY (id, ordered_at)
+        ) PARTITION BY RANGE (ordered_at)
+    """)
+    _set_not_null('order', not_null)
+    op.execute('CREATE TABLE order_default PARTITION OF "order" DEFAULT')
+
+    first = bind.execute(sa.text(
+        "SELECT date_trunc('month', min(ordered_at))::date FROM order_unpartitioned"
+    )).scalar()
+    today = date.today().replace(day=1)
+    month = min(first or today, today)
+    end = today
+    for _ in range(_MONTHS_AHEAD):
+        end = _add_month(end)
+    while month <= end:
+        nxt = _add_month(month)
+        op.execute(
+            f'CREATE TABLE order_y{month.year}m{month.month:02d} PARTITION OF "order" '
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{nxt.isoformat()}')"
+        )
+        month = nxt
+
+    # Legacy rows without a timestamp cannot be routed to a partition.
+    op.execute("""
+        INSERT INTO "order" (id, user_id, recipe_id, quantity, unit_price, status, ordered_at)
+        SELECT id, user_id, recipe_id, quantity, unit_price, status,
+               COALESCE(ordered_at, timestamp '1970-01-01')
+        FROM order_unpartitioned
+    """)
+    op.execute('DROP TABLE order_unpartitioned')
+    op.execute('ALTER SEQUENCE order_id_seq OWNED BY "order".id')
+
+    for name, columns in _KEYSET_INDEXES.items():
+        op.execute(f'CREATE INDEX {name} ON "order" ({columns})')
+    # Tiny index that lets range scans skip cold partitions' blocks cheaply.
+    op.execute('CREATE INDEX ix_order_ordered_at_brin ON "order" USING brin (ordered_at)')
+
+
+def _unpartition_order_table(bind) -> None:
+    not_null = _not_null_columns(bind, 'order')
+    op.execute('ALTER TABLE "order" RENAME TO order_partitioned')
+    op.execute('ALTER TABLE order_partitioned RENAME CONSTRAINT order_pkey TO order_partitioned_pkey')
+    for name in (*_KEYSET_INDEXES, 'ix_order_ordered_at_brin'):
+        op.execute(f'DROP INDEX IF EXISTS {name}')
+    op.execute('ALTER SEQUENCE order_id_seq OWNED BY NONE')
+    op.execute("""
+        CREATE TABLE "order" (
+            id integer NOT NULL DEFAULT nextval('order_id_seq') PRIMARY KEY,
+            user_id integer REFERENCES "user" (id),
+            recipe_id integer REFERENCES recipe (id),
+            quantity integer NOT NULL,
+            unit_price double precision NOT NULL,
+            status varchar(20),
+            ordered_at timestamp without time zone
+        )
+    """)
+    _set_not_null('order', not_null)
+    op.execute('INSERT INTO "order" SELECT * FROM order_partitioned')
+    op.execute('DROP TABLE order_partitioned CASCADE')
+    op.execute('ALTER SEQUENCE order_id_seq OWNED BY "order".id')
+    for name, columns in _KEYSET_INDEXES.items():
+        op.execute(f'CREATE INDEX {name} ON "order" ({columns})')
+
+
+def upgrade():
+    if not _table_exists('order_archive'):
+        op.create_table(
+            'order_archive',
+            sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('recipe_id', sa.Integer(), nullable=False),
+            sa.Column('quantity', sa.Integer(), nullable=False),
+            sa.Column('unit_price', sa.Float(), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('ordered_at', sa.DateTime(), nullable=False),
+            sa.Column('archived_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(
+            'ix_order_archive_ordered_at_id', 'order_archive', ['ordered_at', 'id']
+        )
+        op.create_index(
+            'ix_order_archive_user_id_ordered_at_id',
+            'order_archive',
+            ['user_id', 'ordered_at', 'id'],
+        )
+
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql' and not _is_partitioned(bind):
+        _partition_order_table(bind)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql' and _is_partitioned(bind):
+        _unpartition_order_table(bind)
+
+    op.drop_index('ix_order_archive_user_id_ordered_at_id', table_name='order_archive')
+    op.drop_index('ix_order_archive_ordered_at_id', table_name='order_archive')
+    op.drop_table('order_archive')
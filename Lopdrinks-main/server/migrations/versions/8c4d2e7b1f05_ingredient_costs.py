@@ -0,0 +1,45 @@
+"""Add ingredient_cost table for effective-dated unit costs
+
+Revision ID: 8c4d2e7b1f05
+Revises: 3e8f1a6c2b90
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = '8c4d2e7b1f05'
+down_revision = '3e8f1a6c2b90'
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(table_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+def upgrade():
+    if not _table_exists('ingredient_cost'):
+        op.create_table(
+            'ingredient_cost',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('ingredient_id', sa.Integer(), nullable=False),
+            sa.Column('unit', sa.String(length=20), nullable=False),
+            sa.Column('cost_per_unit', sa.Float(), nullable=False),
+            sa.Column('effective_from', sa.DateTime(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['ingredient_id'], ['ingredient.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint(
+                'ingredient_id', 'unit', 'effective_from',
+                name='uq_ingredient_cost_ingredient_unit_from'
+            )
+        )
+
+
+def downgrade():
+    op.drop_table('ingredient_cost')
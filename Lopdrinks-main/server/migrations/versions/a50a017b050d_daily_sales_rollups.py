@@ -0,0 +1,84 @@
+"""Add daily_recipe_sales and daily_status_sales rollup tables
+
+Revision ID: a50a017b050d
+Revises: 12b6ffc38014
+Create Date: 2026-10-19 10:00:00.000000
+
+Backfills both rollups from the existing orders, the same totals
+`flask rollups rebuild` computes, so incremental upkeep starts from the
+real figures instead of from zero.
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = 'a50a017b050d'
+down_revision = '12b6ffc38014'
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(table_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+def _totals_columns() -> list[sa.Column]:
+    return [
+        sa.Column('order_count', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Float(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+    ]
+
+
+def _backfill(table: str, key: str, where: str) -> None:
+    op.get_bind().execute(
+        sa.text(
+            f"""
+            INSERT INTO {table} (day, {key}, order_count, quantity, revenue, updated_at)
+            SELECT date(o.ordered_at), o.{key}, COUNT(*), SUM(o.quantity),
+                   SUM(o.quantity * o.unit_price), :now
+            FROM "order" o
+            {where}
+            GROUP BY date(o.ordered_at), o.{key}
+            """
+        ),
+        {"now": datetime.utcnow()},
+    )
+
+
+def upgrade():
+    if not _table_exists('daily_recipe_sales'):
+        op.create_table(
+            'daily_recipe_sales',
+            sa.Column('day', sa.Date(), nullable=False),
+            sa.Column('recipe_id', sa.Integer(), nullable=False),
+            *_totals_columns(),
+            sa.PrimaryKeyConstraint('day', 'recipe_id')
+        )
+        op.create_index(
+            'ix_daily_recipe_sales_updated_at', 'daily_recipe_sales', ['updated_at']
+        )
+        _backfill('daily_recipe_sales', 'recipe_id', "WHERE o.status <> 'Cancelled'")
+
+    if not _table_exists('daily_status_sales'):
+        op.create_table(
+            'daily_status_sales',
+            sa.Column('day', sa.Date(), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            *_totals_columns(),
+            sa.PrimaryKeyConstraint('day', 'status')
+        )
+        _backfill('daily_status_sales', 'status', '')
+
+
+def downgrade():
+    op.drop_table('daily_status_sales')
+    op.drop_index('ix_daily_recipe_sales_updated_at', table_name='daily_recipe_sales')
+    op.drop_table('daily_recipe_sales')
@@ -0,0 +1,54 @@
+"""Add order_stock_reservation table for per-order reserved stock
+
+Revision ID: a7c2e5f9d3b1
+Revises: f4b8d2a6c1e7
+Create Date: 2026-10-20 09:00:00.000000
+
+Backfills open (Pending / Confirmed) orders from their recipe's current
+tracked ingredient lines — the amounts the previous code reserved for
+them, as long as the recipe hasn't changed since.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = 'a7c2e5f9d3b1'
+down_revision = 'f4b8d2a6c1e7'
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(table_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+def upgrade():
+    if _table_exists('order_stock_reservation'):
+        return
+    op.create_table(
+        'order_stock_reservation',
+        sa.Column('order_id', sa.Integer(), nullable=False),
+        sa.Column('ingredient_id', sa.Integer(), nullable=False),
+        sa.Column('unit', sa.String(length=20), nullable=False),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('order_id', 'ingredient_id', 'unit'),
+    )
+    op.execute(
+        """
+        INSERT INTO order_stock_reservation (order_id, ingredient_id, unit, amount)
+        SELECT o.id, ri.ingredient_id, ri.unit, SUM(o.quantity * ri.amount)
+        FROM "order" o
+        JOIN recipe_ingredient ri ON ri.recipe_id = o.recipe_id
+        JOIN ingredient_stock s ON s.ingredient_id = ri.ingredient_id AND s.unit = ri.unit
+        WHERE o.status IN ('Pending', 'Confirmed') AND ri.amount IS NOT NULL
+        GROUP BY o.id, ri.ingredient_id, ri.unit
+        """
+    )
+
+
+def downgrade():
+    op.drop_table('order_stock_reservation')
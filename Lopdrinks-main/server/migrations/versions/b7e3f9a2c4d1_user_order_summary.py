@@ -0,0 +1,125 @@
+"""Add user_order_summary and user_recipe_totals read models
+
+Revision ID: b7e3f9a2c4d1
+Revises: 8c4d2e7b1f05
+Create Date: 2026-10-19 14:00:00.000000
+
+Backfills both tables from live and archived orders — the figures
+`flask rollups rebuild-summaries` computes — so existing users' summaries
+are right from the start and incremental upkeep never goes negative.
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = 'b7e3f9a2c4d1'
+down_revision = '8c4d2e7b1f05'
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(table_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+def _totals_columns() -> list[sa.Column]:
+    return [
+        sa.Column('order_count', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Float(), nullable=False),
+    ]
+
+
+# Live and archived orders that count towards a summary.
+_COUNTED = """
+    (SELECT id, user_id, recipe_id, quantity, unit_price, ordered_at
+     FROM "order" WHERE status <> 'Cancelled'
+     UNION ALL
+     SELECT id, user_id, recipe_id, quantity, unit_price, ordered_at
+     FROM order_archive WHERE status <> 'Cancelled') o
+"""
+
+
+def _backfill() -> None:
+    bind = op.get_bind()
+    bind.execute(sa.text(
+        f"""
+        INSERT INTO user_recipe_totals (user_id, recipe_id, order_count, quantity, revenue)
+        SELECT o.user_id, o.recipe_id, COUNT(*), SUM(o.quantity), SUM(o.quantity * o.unit_price)
+        FROM {_COUNTED}
+        GROUP BY o.user_id, o.recipe_id
+        """
+    ))
+    bind.execute(
+        sa.text(
+            f"""
+            INSERT INTO user_order_summary (user_id, order_count, quantity, revenue, updated_at)
+            SELECT o.user_id, COUNT(*), SUM(o.quantity), SUM(o.quantity * o.unit_price), :now
+            FROM {_COUNTED}
+            GROUP BY o.user_id
+            """
+        ),
+        {"now": datetime.utcnow()},
+    )
+    # Favourite: highest-quantity recipe (ties: lowest id). Last: newest order.
+    favourite = """
+        (SELECT t.{col} FROM user_recipe_totals t
+         WHERE t.user_id = user_order_summary.user_id AND t.quantity > 0
+         ORDER BY t.quantity DESC, t.recipe_id LIMIT 1)
+    """
+    last = f"""
+        (SELECT o.{{col}} FROM {_COUNTED}
+         WHERE o.user_id = user_order_summary.user_id
+         ORDER BY o.ordered_at DESC, o.id DESC LIMIT 1)
+    """
+    bind.execute(sa.text(
+        f"""
+        UPDATE user_order_summary SET
+            favourite_recipe_id = {favourite.format(col='recipe_id')},
+            favourite_quantity = {favourite.format(col='quantity')},
+            last_order_id = {last.format(col='id')},
+            last_recipe_id = {last.format(col='recipe_id')},
+            last_ordered_at = {last.format(col='ordered_at')}
+        """
+    ))
+
+
+def upgrade():
+    # Tables made by db.create_all() are already maintained; fill only new ones.
+    backfill = not _table_exists('user_order_summary')
+    if backfill:
+        op.create_table(
+            'user_order_summary',
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            *_totals_columns(),
+            sa.Column('favourite_recipe_id', sa.Integer(), nullable=True),
+            sa.Column('favourite_quantity', sa.Integer(), nullable=True),
+            sa.Column('last_order_id', sa.Integer(), nullable=True),
+            sa.Column('last_recipe_id', sa.Integer(), nullable=True),
+            sa.Column('last_ordered_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('user_id')
+        )
+
+    if not _table_exists('user_recipe_totals'):
+        op.create_table(
+            'user_recipe_totals',
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('recipe_id', sa.Integer(), nullable=False),
+            *_totals_columns(),
+            sa.PrimaryKeyConstraint('user_id', 'recipe_id')
+        )
+
+    if backfill:
+        _backfill()
+
+
+def downgrade():
+    op.drop_table('user_recipe_totals')
+    op.drop_table('user_order_summary')
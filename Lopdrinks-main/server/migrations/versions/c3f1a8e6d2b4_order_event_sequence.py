@@ -0,0 +1,27 @@
+"""Add order_event_id_seq for change-feed event ids shared by all workers
+
+Revision ID: c3f1a8e6d2b4
+Revises: a7c2e5f9d3b1
+Create Date: 2026-10-21 09:00:00.000000
+
+PostgreSQL only: the LISTEN/NOTIFY relay numbers events from it. Other
+databases run without the relay and number events per process.
+
+"""
+from alembic import op
+
+
+revision = 'c3f1a8e6d2b4'
+down_revision = 'a7c2e5f9d3b1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('CREATE SEQUENCE IF NOT EXISTS order_event_id_seq')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP SEQUENCE IF EXISTS order_event_id_seq')
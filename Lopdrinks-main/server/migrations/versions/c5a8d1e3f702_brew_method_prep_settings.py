@@ -0,0 +1,49 @@
+"""Add prep-queue settings to brew_method
+
+Revision ID: c5a8d1e3f702
+Revises: b7e3f9a2c4d1
+Create Date: 2026-10-19 15:00:00.000000
+
+Existing methods default to 120 s, made to order, no shared equipment.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = 'c5a8d1e3f702'
+down_revision = 'b7e3f9a2c4d1'
+branch_labels = None
+depends_on = None
+
+
+def _column_exists(table_name: str, column_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return any(
+        col["name"] == column_name
+        for col in inspector.get_columns(table_name)
+    )
+
+
+def upgrade():
+    # Batch mode so SQLite handles this via copy-and-move instead of ALTER.
+    with op.batch_alter_table('brew_method') as batch_op:
+        if not _column_exists('brew_method', 'prep_seconds'):
+            batch_op.add_column(
+                sa.Column('prep_seconds', sa.Integer(), nullable=False, server_default='120')
+            )
+        if not _column_exists('brew_method', 'batch_size'):
+            batch_op.add_column(
+                sa.Column('batch_size', sa.Integer(), nullable=False, server_default='1')
+            )
+        if not _column_exists('brew_method', 'equipment'):
+            batch_op.add_column(sa.Column('equipment', sa.String(length=50), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('brew_method') as batch_op:
+        batch_op.drop_column('equipment')
+        batch_op.drop_column('batch_size')
+        batch_op.drop_column('prep_seconds')
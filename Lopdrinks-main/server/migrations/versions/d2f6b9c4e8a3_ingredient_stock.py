@@ -0,0 +1,42 @@
+"""Add ingredient_stock table for per-ingredient stock levels
+
+Revision ID: d2f6b9c4e8a3
+Revises: c5a8d1e3f702
+Create Date: 2026-10-19 16:00:00.000000
+
+Starts empty: ingredients are untracked until a level is set.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = 'd2f6b9c4e8a3'
+down_revision = 'c5a8d1e3f702'
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(table_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+def upgrade():
+    if not _table_exists('ingredient_stock'):
+        op.create_table(
+            'ingredient_stock',
+            sa.Column('ingredient_id', sa.Integer(), nullable=False),
+            sa.Column('unit', sa.String(length=20), nullable=False),
+            sa.Column('quantity', sa.Float(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['ingredient_id'], ['ingredient.id']),
+            sa.PrimaryKeyConstraint('ingredient_id', 'unit'),
+            sa.CheckConstraint('quantity >= 0', name='ck_ingredient_stock_non_negative'),
+        )
+
+
+def downgrade():
+    op.drop_table('ingredient_stock')
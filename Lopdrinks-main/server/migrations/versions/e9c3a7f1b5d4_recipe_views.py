@@ -0,0 +1,39 @@
+"""Add recipe.views counter
+
+Revision ID: e9c3a7f1b5d4
+Revises: d2f6b9c4e8a3
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = 'e9c3a7f1b5d4'
+down_revision = 'd2f6b9c4e8a3'
+branch_labels = None
+depends_on = None
+
+
+def _column_exists(table_name: str, column_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return any(
+        col["name"] == column_name
+        for col in inspector.get_columns(table_name)
+    )
+
+
+def upgrade():
+    # Batch mode so SQLite handles this via copy-and-move instead of ALTER.
+    with op.batch_alter_table('recipe') as batch_op:
+        if not _column_exists('recipe', 'views'):
+            batch_op.add_column(
+                sa.Column('views', sa.BigInteger(), nullable=False, server_default='0')
+            )
+
+
+def downgrade():
+    with op.batch_alter_table('recipe') as batch_op:
+        batch_op.drop_column('views')
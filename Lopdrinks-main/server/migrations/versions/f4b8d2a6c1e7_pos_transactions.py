@@ -0,0 +1,36 @@
+"""Add pos_transaction table for idempotent POS history imports
+
+Revision ID: f4b8d2a6c1e7
+Revises: e9c3a7f1b5d4
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = 'f4b8d2a6c1e7'
+down_revision = 'e9c3a7f1b5d4'
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(table_name: str) -> bool:
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    return table_name in inspector.get_table_names()
+
+
+def upgrade():
+    if not _table_exists('pos_transaction'):
+        op.create_table(
+            'pos_transaction',
+            sa.Column('txn_id', sa.String(length=64), nullable=False),
+            sa.Column('imported_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('txn_id'),
+        )
+
+
+def downgrade():
+    op.drop_table('pos_transaction')
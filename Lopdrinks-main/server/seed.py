@@ -22,6 +22,7 @@ import os
 import sys
 import random
 from datetime import datetime, timedelta
+from flask import current_app
 from werkzeug.security import generate_password_hash
 
 # ---------------------------------------------------------------------------
@@ -30,6 +31,7 @@ from werkzeug.security import generate_password_hash
 sys.path.insert(0, os.path.dirname(__file__))
 
 from app import create_app
+from app.api.dependencies import get_sales_service, get_user_summary_service
 from app.extensions import db
 from app.models.user import User
 from app.models.brew_method import BrewMethod
@@ -38,6 +40,7 @@ from app.models.category import Category
 from app.models.recipe import Recipe
 from app.models.recipe_ingredient import RecipeIngredient
 from app.models.order import Order
+from app.utils.quantities import parse_quantity
 
 
 # ---------------------------------------------------------------------------
@@ -65,11 +68,16 @@ CATEGORIES = [
 # ---------------------------------------------------------------------------
 # BREW METHODS
 # ---------------------------------------------------------------------------
+# prep_seconds / batch_size / equipment drive the barista prep queue.
 BREW_METHODS = [
-    {"name": "Pour Over",   "details": "Hot water poured slowly over grounds in a filter — clean, bright cup."},
-    {"name": "French Press","details": "Steep & press — rich, full-bodied brew with natural oils intact."},
-    {"name": "Espresso",    "details": "Pressurised water through fine grounds — concentrated shot with crema."},
-    {"name": "Cold Brew",   "details": "Coarse grounds steeped cold 12-24 h — smooth, low-acid concentrate."},
+    {"name": "Pour Over",   "details": "Hot water poured slowly over grounds in a filter — clean, bright cup.",
+     "prep_seconds": 240, "batch_size": 1, "equipment": None},
+    {"name": "French Press","details": "Steep & press — rich, full-bodied brew with natural oils intact.",
+     "prep_seconds": 300, "batch_size": 4, "equipment": None},
+    {"name": "Espresso",    "details": "Pressurised water through fine grounds — concentrated shot with crema.",
+     "prep_seconds": 90,  "batch_size": 1, "equipment": "espresso machine"},
+    {"name": "Cold Brew",   "details": "Coarse grounds steeped cold 12-24 h — smooth, low-acid concentrate.",
+     "prep_seconds": 60,  "batch_size": 12, "equipment": None},
 ]
 
 # ---------------------------------------------------------------------------
@@ -323,7 +331,9 @@ def _get_or_create_user(data: dict) -> tuple[User, bool]:
     user = User(
         username=data["username"],
         email=data["email"],
-        password=generate_password_hash(data["password"]),
+        password=generate_password_hash(
+            data["password"], method=current_app.config["PASSWORD_HASH_METHOD"]
+        ),
         role=data["role"],
         is_verified=data["is_verified"],
     )
@@ -344,7 +354,7 @@ def _get_or_create_brew_method(data: dict) -> tuple[BrewMethod, bool]:
     existing = BrewMethod.query.filter_by(name=data["name"]).first()
     if existing:
         return existing, False
-    bm = BrewMethod(name=data["name"], details=data["details"])
+    bm = BrewMethod(**data)
     db.session.add(bm)
     return bm, True
 
@@ -449,10 +459,13 @@ def seed() -> None:
                 for ing_name, quantity in ingredients:
                     ingredient = ing_map.get(ing_name)
                     if ingredient:
+                        amount, unit = parse_quantity(quantity)
                         db.session.add(RecipeIngredient(
                             recipe_id=existing.id,
                             ingredient_id=ingredient.id,
                             quantity=quantity,
+                            amount=amount,
+                            unit=unit,
                         ))
 
                 recipe_objects.append(existing)
@@ -475,10 +488,13 @@ def seed() -> None:
             for ing_name, quantity in ingredients:
                 ingredient = ing_map.get(ing_name)
                 if ingredient:
+                    amount, unit = parse_quantity(quantity)
                     db.session.add(RecipeIngredient(
                         recipe_id=recipe.id,
                         ingredient_id=ingredient.id,
                         quantity=quantity,
+                        amount=amount,
+                        unit=unit,
                     ))
 
             recipe_objects.append(recipe)
@@ -518,6 +534,16 @@ def seed() -> None:
         # ── Commit everything ─────────────────────────────────────────────────
         db.session.commit()
 
+        # ── Read models ──────────────────────────────────────────────────────
+        # Orders above bypass OrderService, so recompute what it would have
+        # maintained incrementally.
+        if o_created:
+            rollups = get_sales_service().rebuild()
+            print(f"  Sales rollups  : {rollups['recipe_rows']} recipe rows, "
+                  f"{rollups['status_rows']} status rows")
+            summaries = get_user_summary_service().rebuild()
+            print(f"  User summaries : {summaries['users']} users")
+
         print("\n=== Seed complete ===")
         print(f"\n  Recipes by category:")
         for cat_name in CATEGORIES:
@@ -42,9 +42,10 @@ with engine.connect() as conn:
 
     if not has_alembic:
         if has_brew and has_category:
-            # All tables present — stamp at final head, nothing to migrate
-            print("All tables exist, no alembic tracking — stamping head.")
-            run(["flask", "--app", "run:app", "db", "stamp", "head"])
+            # Baseline tables present — stamp the category revision (the
+            # last one those tables cover); upgrade applies everything after.
+            print("Baseline tables exist, no alembic tracking — stamping a1b2c3d4e5f6.")
+            run(["flask", "--app", "run:app", "db", "stamp", "a1b2c3d4e5f6"])
 
         elif has_brew and not has_category:
             # Pre-category deploy — tables exist up to initial migration only
@@ -67,4 +68,7 @@ echo "==> [3/4] Seeding database..."
 python seed.py
 
 echo "==> [4/4] Starting gunicorn..."
-exec gunicorn "run:app" --workers 2 --threads 2 --timeout 120 --bind "0.0.0.0:$PORT"
+# WEB_THREADS is also read by the app to cap SSE streams and in-flight
+# password hashes below the thread count (see README).
+export WEB_THREADS="${WEB_THREADS:-8}"
+exec gunicorn "run:app" --workers 2 --threads "$WEB_THREADS" --timeout 120 --bind "0.0.0.0:$PORT"
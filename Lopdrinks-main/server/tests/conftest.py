@@ -12,10 +12,14 @@ from app.extensions import db as _db
 @pytest.fixture(scope="session")
 def app():
     """Create a test application with an in-memory database."""
+    from app.api.dependencies import get_view_counter
+
     flask_app = create_app("testing")
     with flask_app.app_context():
         _db.create_all()
         yield flask_app
+        # Write out buffered recipe views while the tables still exist.
+        get_view_counter().close()
         _db.drop_all()
 
 
@@ -31,3 +35,49 @@ def clean_db(app):
     with app.app_context():
         yield
         _db.session.rollback()
+
+
+@pytest.fixture
+def make_user(app):
+    """
+    Factory fixture: persist a verified user and return (user, auth headers).
+
+    Usernames are made unique per call because committed rows outlive the
+    per-test rollback.
+    """
+    from uuid import uuid4
+
+    from flask_jwt_extended import create_access_token
+    from app.models.user import User
+
+    def _make(role: str = "User"):
+        n = uuid4().hex[:12]
+        user = User(
+            username=f"user_{n}",
+            email=f"user_{n}@example.com",
+            password="x",
+            role=role,
+            is_verified=True,
+        )
+        _db.session.add(user)
+        _db.session.commit()
+        token = create_access_token(
+            identity={"id": user.id, "role": user.role}, expires_delta=False
+        )
+        return user, {"Authorization": f"Bearer {token}"}
+
+    return _make
+
+
+@pytest.fixture
+def make_recipe(app):
+    """Factory fixture: persist a minimal recipe and return it."""
+    from app.models.recipe import Recipe
+
+    def _make(name: str = "Test Brew", price: float = 4.0, **fields):
+        recipe = Recipe(name=name, price=price, **fields)
+        _db.session.add(recipe)
+        _db.session.commit()
+        return recipe
+
+    return _make
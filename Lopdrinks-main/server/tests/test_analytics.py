@@ -0,0 +1,439 @@
+"""Integration tests for the /admin/analytics endpoints."""
+
+from datetime import datetime
+
+import pytest
+
+from app.extensions import db
+from app.models.order import Order
+
+
+@pytest.fixture
+def snapshot_dir(app, tmp_path):
+    original = app.config["ANALYTICS_DIR"]
+    app.config["ANALYTICS_DIR"] = str(tmp_path)
+    yield tmp_path
+    app.config["ANALYTICS_DIR"] = original
+
+
+def test_revenue_requires_snapshot(client, make_user, snapshot_dir):
+    _, headers = make_user(role="Admin")
+    res = client.get("/admin/analytics/revenue", headers=headers)
+    assert res.status_code == 404
+
+
+def test_revenue_by_recipe_from_snapshot(app, client, make_user, make_recipe, snapshot_dir):
+    from app.api.dependencies import get_analytics_service
+
+    user, _ = make_user()
+    _, headers = make_user(role="Admin")
+    recipe = make_recipe(name="Snapshot Latte", price=4.0)
+    when = datetime(2021, 3, 4, 9, 30)
+    db.session.add_all([
+        Order(user_id=user.id, recipe_id=recipe.id, quantity=2, unit_price=4.0, ordered_at=when),
+        Order(user_id=user.id, recipe_id=recipe.id, quantity=1, unit_price=4.0, ordered_at=when),
+        Order(user_id=user.id, recipe_id=recipe.id, quantity=5, unit_price=4.0,
+              ordered_at=when, status="Cancelled"),
+    ])
+    db.session.commit()
+    get_analytics_service().export_snapshot(batch_size=2)
+
+    res = client.get(
+        "/admin/analytics/revenue?group_by=recipe&from=2021-03-04&to=2021-03-05",
+        headers=headers,
+    )
+    assert res.status_code == 200
+    rows = res.get_json()["data"]["rows"]
+    assert rows == [{"key": recipe.id, "revenue": 12.0, "quantity": 3, "orders": 2}]
+
+    res = client.get("/admin/analytics/revenue?group_by=day&from=2021-03-04", headers=headers)
+    assert res.get_json()["data"]["rows"][0]["key"] == "2021-03-04"
+
+
+def _rollup_rows():
+    from app.models.daily_recipe_sales import DailyRecipeSales
+    from app.models.daily_status_sales import DailyStatusSales
+
+    db.session.expire_all()
+    recipe = {
+        (str(r.day), r.recipe_id): (r.order_count, r.quantity, round(r.revenue, 2))
+        for r in DailyRecipeSales.query.all()
+        if r.order_count
+    }
+    status = {
+        (str(r.day), r.status): (r.order_count, r.quantity, round(r.revenue, 2))
+        for r in DailyStatusSales.query.all()
+        if r.order_count
+    }
+    return recipe, status
+
+
+def test_rollups_follow_order_writes_and_match_rebuild(client, make_user, make_recipe):
+    from app.api.dependencies import get_sales_service
+
+    user, headers = make_user()
+    _, admin_headers = make_user(role="Admin")
+    recipe = make_recipe(name="Rollup Mocha", price=5.0)
+    # Other tests seed orders directly; start from a consistent baseline.
+    get_sales_service().rebuild()
+
+    created = client.post(
+        "/orders/cart",
+        json={"items": [{"recipe_id": recipe.id, "quantity": 2}, {"recipe_id": recipe.id}]},
+        headers=headers,
+    ).get_json()["data"]["order_ids"]
+    client.patch(f"/orders/{created[0]}", json={"quantity": 3}, headers=headers)
+    client.patch("/orders/bulk", json={"status": "Cancelled", "ids": [created[1]]},
+                 headers=admin_headers)
+
+    res = client.get("/admin/sales/recipes", headers=admin_headers)
+    mine = [r for r in res.get_json()["data"]["recipes"] if r["recipe_id"] == recipe.id]
+    assert mine == [{
+        "recipe_id": recipe.id, "recipe_name": "Rollup Mocha",
+        "orders": 1, "quantity": 3, "revenue": 15.0,
+    }]
+
+    client.delete(f"/orders/{created[0]}", headers=headers)
+    incremental = _rollup_rows()
+    get_sales_service().rebuild()
+    assert _rollup_rows() == incremental
+
+
+def test_decayed_leaderboard_ranks_decays_and_retracts():
+    from app.analytics.popularity import DecayedLeaderboard
+
+    board = DecayedLeaderboard(half_life_seconds=100, now=0)
+    board.add(1, 4, at=0)
+    board.add(2, 3, at=100)  # newer, so it outweighs the older 4
+    board.add(3, 1, at=100)
+    assert [i for i, _ in board.top(2, now=100)] == [2, 1]
+    assert dict(board.top(3, now=200)) == pytest.approx({2: 1.5, 1: 1.0, 3: 0.5})
+
+    board.add(2, -3, at=100)
+    assert [i for i, _ in board.top(5, now=200)] == [1, 3]
+
+    # Far-future writes rebase the landmark without changing the scores.
+    board.add(3, 1, at=100 * 70)
+    assert dict(board.top(2, now=100 * 70)) == pytest.approx({3: 1.0, 1: 4 * 2.0 ** -70})
+
+
+def test_co_occurrence_counts_match_dense_product(monkeypatch):
+    import numpy as np
+
+    from app.analytics import co_occurrence
+
+    monkeypatch.setattr(co_occurrence, "USER_BLOCK", 3)  # force several blocks
+    rng = np.random.default_rng(7)
+    dense = rng.random((10, 6)) < 0.4
+    users, cols = np.nonzero(dense)
+    recipe_ids = np.array([11, 12, 13, 14, 15, 16])[cols]
+
+    recipes, counts, baskets = co_occurrence.co_occurrence_counts(users * 100, recipe_ids)
+
+    present = dense[:, np.isin([11, 12, 13, 14, 15, 16], recipes)].astype(int)
+    assert (counts == present.T @ present).all()
+    assert baskets[100] == {11 + c: 1 for c in np.flatnonzero(dense[1])}
+    assert co_occurrence.top_k(np.array([5, 2, 9, 2, 0]), k=3, exclude=0) == [(2, 9), (1, 2), (3, 2)]
+
+
+def test_co_occurrence_takes_back_deleted_and_cancelled_orders():
+    import numpy as np
+
+    from app.analytics.co_occurrence import CoOccurrenceIndex
+    from app.services.change_bus import ChangeEvent
+    from app.services.co_occurrence_service import apply_co_occurrence_event
+
+    index = CoOccurrenceIndex(k=5)
+    # User 1 ordered recipe 10 twice and 20 once; user 2 each once.
+    index.rebuild(
+        [(np.array([1, 1, 2, 2]), np.array([10, 20, 10, 20]), np.array([2, 1, 1, 1]))],
+        now=0.0,
+        since=946_684_800.0,  # 2000-01-01 UTC
+    )
+    assert index.also_ordered(10, 5) == (2, [(20, 2)])
+
+    def event(kind, recipe_id, status="Pending", previous=None, when="2026-03-01T09:00:00"):
+        data = {"user_id": 1, "recipe_id": recipe_id, "status": status, "ordered_at": when}
+        if previous:
+            data["previous"] = {"quantity": 1, "status": previous}
+        return ChangeEvent(kind=kind, user_id=1, data=data)
+
+    # One of two recipe-10 orders cancelled: user 1 still ordered it.
+    apply_co_occurrence_event(index, event("order.updated", 10, "Cancelled", previous="Pending"))
+    assert index.also_ordered(10, 5) == (2, [(20, 2)])
+    # Deleting the only recipe-20 order takes the pair back.
+    apply_co_occurrence_event(index, event("order.deleted", 20))
+    assert index.also_ordered(10, 5) == (2, [(20, 1)])
+    assert index.also_ordered(20, 5) == (1, [(10, 1)])
+    # Already-cancelled or out-of-window orders were never counted.
+    apply_co_occurrence_event(index, event("order.deleted", 10, "Cancelled"))
+    apply_co_occurrence_event(index, event("order.deleted", 10, when="1900-01-01T00:00:00"))
+    assert index.also_ordered(10, 5) == (2, [(20, 1)])
+    # Ordering 20 again brings it back.
+    apply_co_occurrence_event(index, event("order.created", 20))
+    assert index.also_ordered(10, 5) == (2, [(20, 2)])
+
+
+def test_als_recommends_what_similar_customers_ordered():
+    import numpy as np
+
+    from app.analytics.recommendations import als_implicit, implicit_feedback, top_unseen
+
+    # Users 1-3 order recipes 10 + 20; users 4-6 order 30 + 40; user 7 only 10.
+    pairs = [(u, r) for u in (1, 2, 3) for r in (10, 20)]
+    pairs += [(u, r) for u in (4, 5, 6) for r in (30, 40)] + [(7, 10)]
+    user_id, recipe_id = (np.array(col) for col in zip(*pairs))
+    users, recipes, rows, cols, values = implicit_feedback(
+        user_id, recipe_id, np.ones(len(pairs)), np.zeros(len(pairs)), now=0, half_life_days=30
+    )
+    user_f, recipe_f = als_implicit(rows, cols, values, (len(users), len(recipes)), factors=4)
+    table = top_unseen(user_f, recipe_f, rows, cols, popular=np.arange(4), k=3)
+
+    assert recipes[table[list(users).index(7), 0]] == 20
+    assert (table[list(users).index(1)] == -1).sum() == 1  # 2 unseen recipes for 3 slots
+
+
+def test_me_recommendations_served_from_memory(app, client, make_user, make_recipe, snapshot_dir):
+    from app.api.dependencies import get_analytics_service, get_recommendation_service
+
+    from tests.test_orders import _selects_during
+
+    regular, headers = make_user()
+    _, newcomer_headers = make_user()
+    latte, mocha = make_recipe(name="Rec Latte"), make_recipe(name="Rec Mocha")
+    when = datetime(2021, 6, 1, 9)
+    db.session.add_all([
+        Order(user_id=regular.id, recipe_id=latte.id, quantity=3, unit_price=4.0, ordered_at=when),
+        Order(user_id=regular.id, recipe_id=mocha.id, quantity=1, unit_price=4.0,
+              ordered_at=when, status="Cancelled"),
+    ])
+    db.session.commit()
+    assert client.get("/me/recommendations", headers=headers).get_json()["data"]["source"] == "none"
+
+    get_analytics_service().export_snapshot()
+    manifest = get_recommendation_service().train(factors=4, iterations=3)
+    assert manifest["users"] >= 1
+
+    responses = []
+    selects = _selects_during(lambda: responses.extend([
+        client.get("/me/recommendations?k=50", headers=headers),
+        client.get("/me/recommendations?k=2", headers=newcomer_headers),
+    ]))
+    assert selects == []
+
+    mine, newcomer = (r.get_json()["data"] for r in responses)
+    assert mine["source"] == "personal"
+    assert latte.id not in [r["recipe_id"] for r in mine["recipes"]]
+    assert newcomer["source"] == "popular"
+    assert 1 <= len(newcomer["recipes"]) <= 2
+    assert client.get("/me/recommendations").status_code == 401
+
+
+def test_parse_quantity_normalises_units():
+    from app.utils.quantities import parse_quantity
+
+    assert parse_quantity("130ml") == (130.0, "ml")
+    assert parse_quantity("2 shots") == (2.0, "shot")
+    assert parse_quantity("1 ¼ tsp") == (1.25, "tsp")
+    assert parse_quantity("0.5 L") == (500.0, "ml")
+    assert parse_quantity("dollop") == (1.0, "dollop")
+    assert parse_quantity("a splash") == (None, None)
+    # Bare ounces weigh; fluid ounces measure volume.
+    assert parse_quantity("2 oz") == (56.699, "g")
+    assert parse_quantity("2 fl oz") == (59.147, "ml")
+    assert parse_quantity("1 fl. oz.") == (29.5735, "ml")
+
+
+def test_consumption_matches_per_row_loop():
+    import numpy as np
+
+    from app.analytics.consumption import bill_of_materials, consumption
+
+    lines = [(1, 10, "Milk", 130.0, "ml"), (1, 20, "Espresso", 2.0, "shot"),
+             (2, 20, "Espresso", 1.0, "shot"), (3, 10, "Milk", 2.0, "tsp")]
+    recipe_ids, columns, bom = bill_of_materials(lines)
+    assert columns == [(10, "Milk", "ml"), (10, "Milk", "tsp"), (20, "Espresso", "shot")]
+
+    rng = np.random.default_rng(3)
+    day, recipe, qty = rng.integers(0, 5, 50), rng.integers(1, 5, 50), rng.integers(1, 4, 50)
+    used = consumption(day, recipe, qty.astype(float), 5, recipe_ids, bom)
+
+    expected = np.zeros((5, len(columns)))
+    for d, r, q in zip(day, recipe, qty):
+        for line_recipe, ing, name, amount, unit in lines:
+            if line_recipe == r:
+                expected[d, columns.index((ing, name, unit))] += q * amount
+    assert np.allclose(used, expected)
+
+
+def test_ingredient_consumption_from_rollups(client, make_user, make_recipe):
+    from app.models.ingredient import Ingredient
+
+    _, headers = make_user()
+    _, admin_headers = make_user(role="Admin")
+    milk, shot = Ingredient(name="Usage Milk"), Ingredient(name="Usage Espresso")
+    db.session.add_all([milk, shot])
+    db.session.commit()
+    latte, espresso = make_recipe(name="Usage Latte"), make_recipe(name="Usage Espresso")
+    client.put(f"/recipes/{latte.id}", headers=admin_headers, json={"ingredients": [
+        {"ingredient_id": milk.id, "quantity": "180ml"},
+        {"ingredient_id": shot.id, "quantity": "2 shots"},
+    ]})
+    client.put(f"/recipes/{espresso.id}", headers=admin_headers, json={"ingredients": [
+        {"ingredient_id": shot.id, "quantity": "1 shot"},
+        {"ingredient_id": milk.id, "quantity": "a splash"},
+    ]})
+    client.post("/orders/cart", headers=headers, json={"items": [
+        {"recipe_id": latte.id, "quantity": 2}, {"recipe_id": espresso.id, "quantity": 3},
+    ]})
+
+    today = datetime.utcnow().date().isoformat()
+    res = client.get(f"/admin/sales/consumption?from={today}&to={today}", headers=admin_headers)
+    assert res.status_code == 200
+    data = res.get_json()["data"]
+    usage = {(i["ingredient_id"], i["unit"]): i["daily"] for i in data["ingredients"]}
+    assert usage[(milk.id, "ml")] == [360.0]
+    assert usage[(shot.id, "shot")] == [7.0]
+    assert data["unparsed_lines"] >= 1
+
+
+def test_forecast_follows_weekly_pattern_and_is_cached(client, make_user, make_recipe):
+    from datetime import timedelta
+
+    from app.models.daily_recipe_sales import DailyRecipeSales
+    from app.models.ingredient import Ingredient
+    from app.models.recipe_ingredient import RecipeIngredient
+
+    from tests.test_orders import _selects_during
+
+    _, admin_headers = make_user(role="Admin")
+    recipe = make_recipe(name="Forecast Cold Brew")
+    beans = Ingredient(name="Forecast Beans")
+    db.session.add(beans)
+    db.session.commit()
+    db.session.add(RecipeIngredient(recipe_id=recipe.id, ingredient_id=beans.id,
+                                    quantity="18g", amount=18.0, unit="g"))
+    today = datetime.utcnow().date()
+    # Weekends sell 30, weekdays 10, for the last eight weeks.
+    db.session.add_all([
+        DailyRecipeSales(day=day, recipe_id=recipe.id, order_count=1, revenue=0.0,
+                         quantity=30 if day.weekday() >= 5 else 10, updated_at=datetime.utcnow())
+        for day in (today - timedelta(days=n) for n in range(1, 57))
+    ])
+    db.session.commit()
+
+    res = client.get("/admin/forecast?days=7", headers=admin_headers)
+    assert res.status_code == 200
+    data = res.get_json()["data"]
+    mine = next(r for r in data["recipes"] if r["recipe_id"] == recipe.id)
+    expected = [30 if (today + timedelta(days=n)).weekday() >= 5 else 10 for n in range(7)]
+    assert mine["daily"] == pytest.approx(expected, abs=0.5)
+    grams = next(i for i in data["ingredients"] if i["ingredient_id"] == beans.id)
+    assert grams["total"] == pytest.approx(18 * sum(expected), rel=0.02)
+
+    selects = _selects_during(lambda: client.get("/admin/forecast?days=3", headers=admin_headers))
+    assert not any("daily_recipe_sales.day" in s for s in selects)
+    assert client.get("/admin/forecast?days=0", headers=admin_headers).status_code == 400
+
+
+def test_rollup_watermark_covers_status_rollup(app):
+    from datetime import timedelta
+
+    from app.models.daily_status_sales import DailyStatusSales
+    from app.repositories.sales_rollup_repository import SalesRollupRepository
+
+    repo = SalesRollupRepository()
+    later = (repo.watermark() or datetime.utcnow()) + timedelta(hours=1)
+    db.session.add(DailyStatusSales(day=later.date(), status="Watermark", order_count=1,
+                                    quantity=1, revenue=0.0, updated_at=later))
+    db.session.commit()
+    try:
+        assert repo.watermark() == later
+    finally:
+        DailyStatusSales.query.filter_by(status="Watermark").delete()
+        db.session.commit()
+
+
+def test_popularity_rebuild_neither_double_counts_nor_loses_racing_events():
+    from app.analytics.popularity import PopularityIndex
+
+    index = PopularityIndex({"hour": 3600.0})
+    now = 1_000_000.0
+
+    def load():
+        # Dispatched while the rollups are read: one change the read saw
+        # (stamp 2), one it missed (stamp 4).
+        index.add(1, 5, now, version=2)
+        index.add(2, 7, now, version=4)
+        return [(1, 5, now)], 3
+
+    index.rebuild(load, now)
+    # Dispatched after the read: one already counted, one new.
+    index.add(1, 5, now, version=3)
+    index.add(2, 1, now, version=5)
+    assert dict(index.top("hour", 5, now)) == pytest.approx({1: 5.0, 2: 8.0})
+
+
+def test_margin_index_patch_matches_rebuild():
+    from app.analytics.margins import MarginIndex
+
+    recipes = [(1, "Latte", 5.0), (2, "Espresso", 3.0), (3, "Tea", 2.0)]
+    lines = [(1, 10, 200.0, "ml"), (1, 20, 2.0, "shot"), (2, 20, 2.0, "shot")]
+    patched, fresh = MarginIndex(), MarginIndex()
+    patched.rebuild(recipes, lines, unparsed={3: 1}, costs={(10, "ml"): 0.002})
+    assert patched.set_cost(20, "shot", 0.9) == 2
+    fresh.rebuild(recipes, lines, unparsed={3: 1}, costs={(10, "ml"): 0.002, (20, "shot"): 0.9})
+
+    assert patched.lowest(3) == fresh.lowest(3)
+    espresso, latte, tea = patched.lowest(3)
+    assert (espresso["recipe_id"], espresso["cost"], espresso["missing_costs"]) == (2, 1.8, 0)
+    assert latte["cost"] == pytest.approx(2.2)
+    assert (tea["margin_pct"], tea["missing_costs"]) == (100.0, 1)
+
+
+def test_lowest_margins_follow_ingredient_costs(client, make_user, make_recipe):
+    from datetime import timedelta
+
+    from app.models.ingredient import Ingredient
+
+    _, admin_headers = make_user(role="Admin")
+    syrup = Ingredient(name="Margin Saffron Syrup")
+    db.session.add(syrup)
+    db.session.commit()
+    cheap = make_recipe(name="Margin Cheap", price=6.0)
+    pricey = make_recipe(name="Margin Pricey", price=6.0)
+    client.put(f"/recipes/{cheap.id}", headers=admin_headers,
+               json={"ingredients": [{"ingredient_id": syrup.id, "quantity": "10ml"}]})
+    client.put(f"/recipes/{pricey.id}", headers=admin_headers,
+               json={"ingredients": [{"ingredient_id": syrup.id, "quantity": "50ml"}]})
+
+    costs_url = f"/ingredients/{syrup.id}/costs"
+    res = client.post(costs_url, headers=admin_headers, json={"unit": "ml", "cost_per_unit": 0.2})
+    assert res.status_code == 201
+    lowest = client.get("/admin/margins?k=2", headers=admin_headers).get_json()["data"]["recipes"]
+    assert [(r["recipe_id"], r["cost"]) for r in lowest] == [(pricey.id, 10.0), (cheap.id, 2.0)]
+    assert lowest[0]["margin_pct"] == pytest.approx(-66.67)
+
+    # Applied incrementally in this worker; a future-dated cost waits its turn.
+    client.post(costs_url, headers=admin_headers, json={"unit": "ml", "cost_per_unit": 0.01})
+    later = (datetime.utcnow() + timedelta(days=30)).isoformat()
+    client.post(costs_url, headers=admin_headers,
+                json={"unit": "ml", "cost_per_unit": 5, "effective_from": later})
+    ranked = client.get("/admin/margins?k=100", headers=admin_headers).get_json()["data"]["recipes"]
+    assert next(r["cost"] for r in ranked if r["recipe_id"] == pricey.id) == 0.5
+    history = client.get(costs_url, headers=admin_headers).get_json()["data"]
+    assert [c["cost_per_unit"] for c in history] == [5, 0.01, 0.2]
+
+    res = client.post(costs_url, headers=admin_headers,
+                      json={"unit": "ml", "cost_per_unit": 1, "effective_from": later})
+    assert res.status_code == 409
+    # The same instant with an offset is normalised to naive UTC first.
+    shifted = (datetime.fromisoformat(later) + timedelta(hours=2)).isoformat() + "+02:00"
+    res = client.post(costs_url, headers=admin_headers,
+                      json={"unit": "ml", "cost_per_unit": 1, "effective_from": shifted})
+    assert res.status_code == 409
+    assert client.post(costs_url, headers=admin_headers,
+                       json={"unit": "bucket", "cost_per_unit": 1}).status_code == 400
+    for bad in ("nan", "inf"):
+        assert client.post(costs_url, headers=admin_headers,
+                           json={"unit": "ml", "cost_per_unit": bad}).status_code == 400
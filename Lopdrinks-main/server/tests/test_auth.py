@@ -9,6 +9,8 @@ Tests confirm that:
   - Login succeeds after verification and returns a token
 """
 
+import os
+
 import pytest
 
 
@@ -69,3 +71,112 @@ def test_login_invalid_credentials(client):
         json={"email": "nobody@example.com", "password": "wrong"},
     )
     assert res.status_code == 401
+
+
+def test_login_rehashes_password_when_hash_parameters_change(app, client):
+    from app.extensions import db
+    from app.exceptions.custom_exceptions import UnauthorizedError
+    from app.models.user import User
+    from app.repositories.user_repository import UserRepository
+    from app.services.auth_service import AuthService
+    from app.services.password_hasher import PasswordHasher
+
+    client.post(
+        "/register",
+        json={"username": "rehashuser", "email": "rehash@example.com", "password": "pass"},
+    )
+    user = User.query.filter_by(email="rehash@example.com").one()
+    client.post("/verify", json={"email": user.email, "otp": user.otp_code})
+    assert user.password.startswith("pbkdf2:sha256:1000$")
+
+    # Stronger parameters, checked and hashed on a worker process.
+    hasher = PasswordHasher(method="pbkdf2:sha256:2000", workers=1)
+    try:
+        service = AuthService(user_repo=UserRepository(), hasher=hasher)
+        assert service.login(user.email, "pass")["token"]
+        db.session.refresh(user)
+        upgraded = user.password
+        assert upgraded.startswith("pbkdf2:sha256:2000$")
+
+        service.login(user.email, "pass")  # already current: left alone
+        db.session.refresh(user)
+        assert user.password == upgraded
+        with pytest.raises(UnauthorizedError):
+            service.login(user.email, "wrong")
+    finally:
+        hasher.close()
+
+    # Back through the API with the app's configured parameters.
+    res = client.post("/login", json={"email": user.email, "password": "pass"})
+    assert res.status_code == 200
+    db.session.refresh(user)
+    assert user.password.startswith("pbkdf2:sha256:1000$")
+
+
+def _pool_processes() -> list[int]:
+    """Our grandchildren: the hashing processes the forkserver started."""
+    parents: dict[int, int] = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    parents[int(entry)] = int(f.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, ValueError):
+                continue
+    children = {pid for pid, ppid in parents.items() if ppid == os.getpid()}
+    return [pid for pid, ppid in parents.items() if ppid in children]
+
+
+def _until_admitted(call):
+    """Retry ``call`` while the hasher sheds it with a 503."""
+    import time
+
+    from app.exceptions.custom_exceptions import ServiceUnavailableError
+
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            return call()
+        except ServiceUnavailableError:
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="finds the pool processes via /proc")
+def test_password_hasher_recovers_from_a_dead_worker():
+    import signal
+
+    from app.services.password_hasher import PasswordHasher
+
+    hasher = PasswordHasher(method="pbkdf2:sha256:1000", workers=1)
+    try:
+        stored = hasher.hash("pass")
+        pids = _pool_processes()
+        assert pids
+        for pid in pids:
+            os.kill(pid, signal.SIGKILL)
+        # The broken pool is replaced and the call retried.
+        assert hasher.verify(stored, "pass")
+    finally:
+        hasher.close()
+
+
+def test_password_hasher_times_out_and_sheds_load_while_a_hash_runs_on():
+    from app.exceptions.custom_exceptions import ServiceUnavailableError
+    from app.services.password_hasher import PasswordHasher
+
+    hasher = PasswordHasher(method="pbkdf2:sha256:1000", workers=1, max_pending=1, timeout=0.2)
+    try:
+        # The first call also starts the pool process, which may take longer.
+        stored = _until_admitted(lambda: hasher.hash("pass"))
+        slow = "pbkdf2:sha256:5000000" + stored[len("pbkdf2:sha256:1000"):]
+        with pytest.raises(ServiceUnavailableError):
+            hasher.verify(slow, "pass")
+        # The timed-out hash still holds the only slot until it finishes...
+        with pytest.raises(ServiceUnavailableError):
+            hasher.verify(stored, "pass")
+        # ...and then the hasher admits work again.
+        assert _until_admitted(lambda: hasher.verify(stored, "pass"))
+        assert not _until_admitted(lambda: hasher.verify(stored, "wrong"))
+    finally:
+        hasher.close()
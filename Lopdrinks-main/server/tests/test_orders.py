@@ -1,5 +1,48 @@
 """Integration tests for the /orders/ endpoint."""
 
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.extensions import db
+from app.models.order import Order
+
+
+def _seed_orders(user, recipe, n: int, base: datetime = datetime(2026, 1, 1, 8)) -> list[Order]:
+    orders = [
+        Order(
+            user_id=user.id,
+            recipe_id=recipe.id,
+            quantity=1,
+            unit_price=recipe.price,
+            # Pairs share a timestamp so the id tie-breaker is exercised.
+            ordered_at=base + timedelta(minutes=i // 2),
+        )
+        for i in range(n)
+    ]
+    db.session.add_all(orders)
+    db.session.commit()
+    return orders
+
+
+def _selects_during(fn) -> list[str]:
+    from sqlalchemy import event
+
+    statements: list[str] = []
+
+    def _record(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _record)
+    try:
+        fn()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _record)
+    return statements
+
 
 def test_get_orders_requires_auth(client):
     """GET /orders/ without a token should return 401."""
@@ -11,3 +54,1014 @@ def test_create_order_requires_auth(client):
     """POST /orders/ without a token should return 401."""
     res = client.post("/orders/", json={"recipe_id": 1, "quantity": 2})
     assert res.status_code == 401
+
+
+def test_get_orders_keyset_pages_cover_all_rows(client, make_user, make_recipe):
+    user, headers = make_user()
+    recipe = make_recipe()
+    seeded = _seed_orders(user, recipe, 7)
+
+    seen, after = [], None
+    while True:
+        params = {"limit": 3} | ({"after": after} if after else {})
+        res = client.get("/orders/", query_string=params, headers=headers)
+        assert res.status_code == 200
+        page = res.get_json()["data"]
+        seen.extend(o["id"] for o in page["items"])
+        after = page["next_cursor"]
+        if after is None:
+            break
+
+    expected = sorted(seeded, key=lambda o: (o.ordered_at, o.id), reverse=True)
+    assert seen == [o.id for o in expected]
+
+
+def test_get_orders_clamps_limit_and_reports_total(
+    app, client, make_user, make_recipe, monkeypatch
+):
+    user, headers = make_user()
+    _seed_orders(user, make_recipe(), 4)
+    monkeypatch.setitem(app.config, "MAX_PAGE_LIMIT", 2)
+    res = client.get("/orders/?limit=1000&count=true", headers=headers)
+    page = res.get_json()["data"]
+    assert len(page["items"]) == 2
+    assert page["total"] == 4
+    assert page["total_is_estimate"] is False
+
+
+def test_get_orders_rejects_bad_cursor(client, make_user):
+    _, headers = make_user()
+    res = client.get("/orders/?after=not-a-cursor", headers=headers)
+    assert res.status_code == 400
+
+
+def test_get_orders_rejects_unknown_status(client, make_user):
+    _, headers = make_user()
+    for path in ("/orders/", "/orders/archive"):
+        res = client.get(f"{path}?status=Pending'--&include_total=1", headers=headers)
+        assert res.status_code == 400
+    assert client.get("/orders/?status=Pending&include_total=1", headers=headers).status_code == 200
+
+
+def test_get_orders_loads_recipe_names_without_n_plus_one(
+    client, make_user, make_recipe
+):
+    admin, headers = make_user(role="Admin")
+    for i in range(6):
+        _seed_orders(admin, make_recipe(name=f"N+1 Brew {i}"), 1, base=datetime(2099, 1, 1))
+    db.session.expunge_all()
+
+    responses = []
+    statements = _selects_during(
+        lambda: responses.append(client.get("/orders/?limit=6", headers=headers))
+    )
+    res = responses[0]
+
+    items = res.get_json()["data"]["items"]
+    assert len(items) == 6
+    assert all(o["recipe_name"].startswith("N+1 Brew") for o in items)
+    # One user check plus one joined order query, independent of page size.
+    assert len(statements) <= 2
+
+
+def test_get_orders_skips_user_lookup_once_cached(client, make_user):
+    _, headers = make_user()
+    client.get("/orders/", headers=headers)  # warms the existence cache
+
+    statements = _selects_during(lambda: client.get("/orders/", headers=headers))
+    assert not any('FROM "user"' in s or "FROM user" in s for s in statements)
+
+
+def test_get_orders_rejects_deleted_user(client, make_user):
+    from app.repositories.user_repository import UserRepository
+
+    user, headers = make_user()
+    assert client.get("/orders/", headers=headers).status_code == 200
+
+    UserRepository().delete(user)
+    assert client.get("/orders/", headers=headers).status_code == 404
+
+
+def test_checkout_cart_inserts_all_lines(client, make_user, make_recipe):
+    user, headers = make_user()
+    latte, mocha = make_recipe(price=4.5), make_recipe(price=5.0)
+
+    res = client.post(
+        "/orders/cart",
+        json={"items": [
+            {"recipe_id": latte.id, "quantity": 2},
+            {"recipe_id": mocha.id, "quantity": 1},
+        ]},
+        headers=headers,
+    )
+    assert res.status_code == 201
+    data = res.get_json()["data"]
+    assert data["total"] == 14.0
+
+    orders = [db.session.get(Order, i) for i in data["order_ids"]]
+    assert [(o.recipe_id, o.quantity, o.unit_price) for o in orders] == [
+        (latte.id, 2, 4.5),
+        (mocha.id, 1, 5.0),
+    ]
+    assert all(o.user_id == user.id for o in orders)
+
+
+def test_checkout_cart_is_all_or_nothing(client, make_user, make_recipe):
+    user, headers = make_user()
+    recipe = make_recipe()
+    res = client.post(
+        "/orders/cart",
+        json={"items": [{"recipe_id": recipe.id}, {"recipe_id": 999_999}]},
+        headers=headers,
+    )
+    assert res.status_code == 404
+    assert Order.query.filter_by(user_id=user.id).count() == 0
+
+
+def test_checkout_cart_rejects_non_integer_lines(client, make_user, make_recipe):
+    user, headers = make_user()
+    recipe = make_recipe()
+    for item in (
+        {"recipe_id": True},
+        {"recipe_id": recipe.id, "quantity": True},
+        {"recipe_id": recipe.id, "quantity": 2.5},
+        {"recipe_id": recipe.id, "quantity": "2"},
+    ):
+        res = client.post("/orders/cart", json={"items": [item]}, headers=headers)
+        assert res.status_code == 400, item
+    assert Order.query.filter_by(user_id=user.id).count() == 0
+
+
+def test_bulk_update_status_by_ids_reports_skipped(client, make_user, make_recipe):
+    user, _ = make_user()
+    _, admin_headers = make_user(role="Admin")
+    pending, delivered = _seed_orders(user, make_recipe(), 2)
+    delivered.status = "Delivered"
+    db.session.commit()
+
+    res = client.patch(
+        "/orders/bulk",
+        json={"status": "Confirmed", "ids": [pending.id, delivered.id]},
+        headers=admin_headers,
+    )
+    assert res.status_code == 200
+    data = res.get_json()["data"]
+    assert data["updated_ids"] == [pending.id]
+    assert data["skipped_ids"] == [delivered.id]
+    db.session.expire_all()
+    assert db.session.get(Order, pending.id).status == "Confirmed"
+
+
+def test_bulk_update_status_by_filter(client, make_user, make_recipe):
+    user, _ = make_user()
+    _, admin_headers = make_user(role="Admin")
+    orders = _seed_orders(user, make_recipe(), 3)
+
+    res = client.patch(
+        "/orders/bulk",
+        json={"status": "Cancelled", "filter": {"user_id": user.id, "status": "Pending"}},
+        headers=admin_headers,
+    )
+    assert sorted(res.get_json()["data"]["updated_ids"]) == sorted(o.id for o in orders)
+
+
+def test_bulk_update_status_rejects_filters_without_real_criteria(client, make_user, make_recipe):
+    user, _ = make_user()
+    _, admin_headers = make_user(role="Admin")
+    order, = _seed_orders(user, make_recipe(), 1)
+
+    for selector in ({"foo": 1}, {"user_id": user.id, "foo": 1}, {"status": None}, {"user_id": True}):
+        res = client.patch(
+            "/orders/bulk", json={"status": "Cancelled", "filter": selector}, headers=admin_headers
+        )
+        assert res.status_code == 400, selector
+    db.session.expire_all()
+    assert db.session.get(Order, order.id).status == "Pending"
+
+
+def test_bulk_update_status_is_admin_only(client, make_user):
+    _, headers = make_user()
+    res = client.patch("/orders/bulk", json={"status": "Confirmed", "ids": [1]}, headers=headers)
+    assert res.status_code == 403
+
+
+def test_group_commit_writer_batches_and_isolates_failures():
+    from concurrent.futures import ThreadPoolExecutor
+    from app.services.order_writer import GroupCommitWriter
+
+    flushes: list[list[dict]] = []
+
+    def flush(rows):
+        flushes.append(rows)
+        if any(r["bad"] for r in rows):
+            raise RuntimeError("constraint violated")
+        return [r["n"] * 10 for r in rows]
+
+    writer = GroupCommitWriter(flush, max_rows=50, max_wait_ms=50)
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        futures = list(pool.map(lambda n: writer.submit({"n": n, "bad": n == 7}), range(20)))
+    writer.close()
+
+    assert [f.result() for i, f in enumerate(futures) if i != 7] == [
+        n * 10 for n in range(20) if n != 7
+    ]
+    assert isinstance(futures[7].exception(), RuntimeError)
+    # Far fewer shared commits than rows (plus the one-by-one retries).
+    assert len([b for b in flushes if len(b) > 1]) < 20
+
+
+def test_group_commit_writer_logs_sold_out_rows_without_a_traceback(caplog):
+    import logging
+
+    from app.exceptions.custom_exceptions import ConflictError
+    from app.services.order_writer import GroupCommitWriter
+
+    def flush(rows):
+        raise ConflictError("Not enough stock: Oat Milk.")
+
+    writer = GroupCommitWriter(flush, max_wait_ms=1)
+    with caplog.at_level(logging.INFO, logger="app.services.order_writer"):
+        future = writer.submit({"n": 1})
+        assert isinstance(future.exception(timeout=5), ConflictError)
+    writer.close()
+    assert not [r for r in caplog.records if r.levelno >= logging.ERROR or r.exc_info]
+
+
+def test_create_order_with_group_commit(app, client, make_user, make_recipe, monkeypatch):
+    user, headers = make_user()
+    recipe = make_recipe(name="Group Commit Latte", price=3.5)
+    monkeypatch.setitem(app.config, "ORDER_GROUP_COMMIT", True)
+
+    res = client.post("/orders/", json={"recipe_id": recipe.id, "quantity": 2}, headers=headers)
+
+    assert res.status_code == 201
+    order = db.session.get(Order, res.get_json()["data"]["order_id"])
+    assert (order.user_id, order.quantity, order.unit_price) == (user.id, 2, 3.5)
+
+
+def test_group_commit_timeout_answers_202_and_keyed_retry_replays_it(
+    app, client, make_user, make_recipe, monkeypatch
+):
+    import threading
+
+    from app.api import dependencies
+    from app.services import order_service
+    from app.services.order_writer import GroupCommitWriter
+
+    _, headers = make_user()
+    recipe = make_recipe(name="Slow Commit Mocha")
+    released, flushed = threading.Event(), []
+
+    def flush(rows):
+        released.wait(5)
+        flushed.extend(rows)
+        return list(range(1, len(rows) + 1))
+
+    writer = GroupCommitWriter(flush, max_wait_ms=1)
+    monkeypatch.setitem(app.config, "ORDER_GROUP_COMMIT", True)
+    monkeypatch.setattr(dependencies, "get_order_writer", lambda: writer)
+    monkeypatch.setattr(order_service, "RESULT_TIMEOUT_SECONDS", 0.05)
+    headers = {**headers, "Idempotency-Key": "slow-1"}
+    try:
+        first = client.post("/orders/", json={"recipe_id": recipe.id}, headers=headers)
+        retry = client.post("/orders/", json={"recipe_id": recipe.id}, headers=headers)
+    finally:
+        released.set()
+        writer.close()
+
+    assert first.status_code == retry.status_code == 202
+    assert first.get_json()["data"]["pending"] is True
+    assert first.get_json()["data"]["order_id"] is None
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert len(flushed) == 1  # the row was still written, once
+
+
+def test_create_order_replays_idempotency_key(client, make_user, make_recipe):
+    user, headers = make_user()
+    recipe = make_recipe(name="Idempotent Flat White")
+    headers = {**headers, "Idempotency-Key": "retry-1"}
+    body = {"recipe_id": recipe.id, "quantity": 1}
+
+    first = client.post("/orders/", json=body, headers=headers)
+    second = client.post("/orders/", json=body, headers=headers)
+    other = client.post("/orders/", json={**body, "quantity": 2}, headers=headers)
+
+    assert first.status_code == second.status_code == 201
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert second.get_json() == first.get_json()
+    assert Order.query.filter_by(user_id=user.id).count() == 1
+    assert other.status_code == 400
+
+
+def test_failed_request_releases_idempotency_key(client, make_user):
+    _, headers = make_user()
+    headers = {**headers, "Idempotency-Key": "retry-404"}
+
+    for _ in range(2):
+        res = client.post("/orders/cart", json={"items": [{"recipe_id": 999_999}]}, headers=headers)
+        assert res.status_code == 404
+        assert "Idempotent-Replayed" not in res.headers
+
+
+def test_concurrent_idempotency_duplicate_waits_for_owner(app, make_user):
+    import pytest
+    from app.api.dependencies import get_idempotency_service
+    from app.exceptions.custom_exceptions import ConflictError
+
+    user, _ = make_user()
+    service = get_idempotency_service()
+
+    assert service.begin(user.id, "in-flight", "h", wait_seconds=0) is None
+    with pytest.raises(ConflictError):
+        service.begin(user.id, "in-flight", "h", wait_seconds=0)
+
+    service.complete(user.id, "in-flight", "h", 201, '{"ok": true}')
+    assert service.begin(user.id, "in-flight", "h", wait_seconds=0) == (201, '{"ok": true}')
+
+
+def test_change_bus_filters_and_resumes():
+    from app.services.change_bus import ChangeBus, RESET
+
+    bus = ChangeBus(buffer_size=3)
+    admin, mine = bus.subscribe(None), bus.subscribe(user_id=1)
+    for n, user_id in enumerate((1, 2, 1, 2)):
+        bus.publish("order.created", user_id, {"n": n})
+    admin_events = [e for _, e in zip(range(4), admin.events(heartbeat=1))]
+    mine_events = [e for _, e in zip(range(2), mine.events(heartbeat=1))]
+
+    assert [e.data["n"] for e in admin_events] == [0, 1, 2, 3]
+    assert [e.data["n"] for e in mine_events] == [0, 2]
+
+    resumed = bus.subscribe(user_id=2, last_event_id=2)
+    assert next(resumed.events(heartbeat=1)).data == {"n": 3}
+    # Event 1 has been evicted from the 3-slot buffer.
+    assert next(bus.subscribe(None, last_event_id=0).events(heartbeat=1)) is RESET
+
+
+def test_change_bus_dispatches_relayed_events_and_caps_subscribers():
+    from dataclasses import replace
+    from itertools import count
+
+    from app.services.change_bus import ChangeBus, RESET
+    from app.services.change_relay import _decode, _encode
+
+    class LoopbackRelay:
+        """Stands in for LISTEN/NOTIFY: everything sent comes straight back."""
+
+        sequence = count(41)  # the shared database sequence
+
+        def start(self, bus):
+            self.bus = bus
+
+        def send(self, event):
+            self.bus.deliver(_decode(_encode(replace(event, id=next(self.sequence)))))
+
+    bus = ChangeBus()
+    bus.relay_through(LoopbackRelay())
+    first = bus.subscribe(None, limit=1)
+    assert bus.subscribe(None, limit=1) is None
+
+    bus.publish("order.updated", 7, {"id": 3, "previous": {"quantity": 1}})
+    event = next(first.events(heartbeat=1))
+    assert (event.id, event.kind, event.user_id, event.data) == (
+        41, "order.updated", 7, {"id": 3, "previous": {"quantity": 1}}
+    )
+
+    bus.reset_subscribers()
+    assert next(first.events(heartbeat=1)) is RESET
+    assert bus.subscribe(None, limit=1) is not None
+
+    # Relayed ids are the shared ones, so another worker's id resumes here.
+    bus.publish("order.created", 7, {"id": 4})
+    resumed = bus.subscribe(None, last_event_id=41)
+    assert next(resumed.events(heartbeat=1)).id == 42
+
+
+def test_order_stream_sends_own_changes(app, client, make_user, make_recipe, monkeypatch):
+    import json
+
+    monkeypatch.setitem(app.config, "ORDER_STREAM_HEARTBEAT_SECONDS", 0.05)
+    _, headers = make_user()
+    _, other_headers = make_user()
+    recipe = make_recipe(name="Streamed Cortado")
+
+    monkeypatch.setitem(app.config, "ORDER_STREAM_MAX_CLIENTS", 1)
+    res = client.get("/orders/stream", headers=headers)
+    assert res.mimetype == "text/event-stream"
+    assert client.get("/orders/stream", headers=other_headers).status_code == 503
+    chunks = iter(res.response)
+    assert next(chunks) == b"retry: 3000\n\n"
+
+    client.post("/orders/", json={"recipe_id": recipe.id}, headers=other_headers)
+    created = client.post("/orders/", json={"recipe_id": recipe.id}, headers=headers)
+
+    events = (c.decode() for c in chunks if not c.startswith(b":"))
+    lines = dict(line.split(": ", 1) for line in next(events).strip().splitlines())
+    res.close()
+
+    assert lines["event"] == "order.created"
+    assert json.loads(lines["data"])["id"] == created.get_json()["data"]["order_id"]
+
+
+def test_order_stream_is_handed_to_the_hub_under_gunicorn(app, client, make_user, make_recipe, monkeypatch):
+    import json
+    import socket
+
+    from app.services.change_bus import order_change_bus
+
+    monkeypatch.setitem(app.config, "ORDER_STREAM_HEARTBEAT_SECONDS", 0.05)
+    _, headers = make_user()
+    recipe = make_recipe(name="Handed-off Macchiato")
+    open_before = order_change_bus.subscriber_count
+
+    server_end, client_end = socket.socketpair()
+    client_end.settimeout(2)
+    # gunicorn drops the connection on StopIteration without writing to it.
+    with pytest.raises(StopIteration):
+        client.get("/orders/stream", headers=headers, environ_overrides={"gunicorn.socket": server_end})
+    server_end.close()  # gunicorn's descriptor; the hub holds a duplicate
+
+    created = client.post("/orders/", json={"recipe_id": recipe.id}, headers=headers)
+    received = b""
+    while b"event: order.created" not in received or not received.endswith(b"\n\n"):
+        received += client_end.recv(4096)
+    head, _, body = received.partition(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 200 OK")
+    assert b"Content-Type: text/event-stream" in head
+    assert b"Connection: close" in head
+    assert body.startswith(b"retry: 3000\n\n")
+    block = body[body.index(b"id: "):].decode()
+    lines = dict(line.split(": ", 1) for line in block.strip().splitlines())
+    assert json.loads(lines["data"])["id"] == created.get_json()["data"]["order_id"]
+
+    client_end.close()
+    deadline = time.monotonic() + 2
+    while order_change_bus.subscriber_count > open_before and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert order_change_bus.subscriber_count == open_before
+
+
+def test_archive_moves_old_terminal_orders(app, client, make_user, make_recipe):
+    from app.api.dependencies import get_order_service
+
+    user, headers = make_user()
+    recipe = make_recipe(name="Archived Americano")
+    orders = _seed_orders(user, recipe, 3, base=datetime(2019, 5, 1, 8))
+    orders[0].status, orders[1].status = "Delivered", "Cancelled"
+    db.session.commit()
+    ids = [o.id for o in orders]
+
+    get_order_service().archive_old_orders(older_than_days=90, batch_size=1)
+
+    live = client.get("/orders/", headers=headers).get_json()["data"]["items"]
+    archived = client.get("/orders/archive?limit=1", headers=headers).get_json()["data"]
+    rest = client.get(
+        f"/orders/archive?after={archived['next_cursor']}", headers=headers
+    ).get_json()["data"]
+
+    assert [o["id"] for o in live] == [ids[2]]
+    assert [o["id"] for o in archived["items"] + rest["items"]] == [ids[1], ids[0]]
+    assert archived["items"][0]["recipe_name"] == "Archived Americano"
+    assert rest["next_cursor"] is None
+
+
+@pytest.mark.skipif(
+    not os.getenv("TEST_POSTGRES_URL"),
+    reason="set TEST_POSTGRES_URL to a scratch PostgreSQL database to run",
+)
+def test_postgres_partitioning_keeps_constraints_and_drains_default_partition():
+    """Runs the real migrations; TEST_POSTGRES_URL's public schema is wiped."""
+    from pathlib import Path
+
+    from flask import Flask
+    from flask_migrate import upgrade
+    from sqlalchemy import text
+
+    from app.extensions import migrate
+    from app.models.recipe import Recipe
+    from app.models.user import User
+    from app.repositories.order_repository import OrderRepository
+
+    pg_app = Flask(__name__)
+    pg_app.config.update(
+        SQLALCHEMY_DATABASE_URI=os.environ["TEST_POSTGRES_URL"],
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+    )
+    db.init_app(pg_app)
+    migrations = str(Path(__file__).resolve().parents[1] / "migrations")
+    migrate.init_app(pg_app, db, directory=migrations)
+
+    def wipe():
+        db.session.execute(text("DROP SCHEMA public CASCADE; CREATE SCHEMA public"))
+        db.session.commit()
+
+    with pg_app.app_context():
+        wipe()
+        try:
+            # As db.create_all() builds it, ahead of partitioning.
+            upgrade(directory=migrations, revision="5c3e9d1f7a20")
+            db.session.execute(
+                text(
+                    'ALTER TABLE "order" ALTER COLUMN user_id SET NOT NULL, '
+                    "ALTER COLUMN recipe_id SET NOT NULL, ALTER COLUMN status SET NOT NULL"
+                )
+            )
+            db.session.commit()
+            upgrade(directory=migrations)
+
+            nullable = dict(
+                db.session.execute(
+                    text(
+                        "SELECT column_name, is_nullable FROM information_schema.columns "
+                        "WHERE table_name = 'order'"
+                    )
+                ).all()
+            )
+            assert [nullable[c] for c in ("user_id", "recipe_id", "status")] == ["NO"] * 3
+
+            # Beyond the partitions the migration made: lands in DEFAULT.
+            month = datetime.utcnow().date().replace(day=1)
+            for _ in range(5):
+                month = (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+            user = User(username="pg_user", email="pg@example.com", password="x")
+            recipe = Recipe(name="PG Flat White", price=4.0)
+            db.session.add_all([user, recipe])
+            db.session.flush()
+            order = Order(
+                user_id=user.id,
+                recipe_id=recipe.id,
+                quantity=1,
+                unit_price=4.0,
+                status="Delivered",
+                ordered_at=datetime(month.year, month.month, 3),
+            )
+            db.session.add(order)
+            db.session.commit()
+
+            name = f"order_y{month.year}m{month.month:02d}"
+            assert name in OrderRepository().ensure_partitions(months_ahead=6)
+            db.session.commit()
+
+            home = db.session.execute(
+                text('SELECT tableoid::regclass::text FROM "order" WHERE id = :id'),
+                {"id": order.id},
+            ).scalar()
+            default = db.session.execute(
+                text(
+                    "SELECT NULLIF(partdefid, 0)::regclass::text FROM pg_partitioned_table "
+                    "WHERE partrelid = '\"order\"'::regclass"
+                )
+            ).scalar()
+            assert (home, default) == (name, "order_default")
+        finally:
+            db.session.rollback()
+            wipe()
+
+
+def test_export_orders_streams_csv_and_gzipped_ndjson(client, make_user, make_recipe):
+    import csv
+    import gzip
+    import io
+    import json
+
+    user, _ = make_user()
+    _, admin_headers = make_user(role="Admin")
+    recipe = make_recipe(name="Exported, Espresso", price=2.5)
+    seeded = [o.id for o in _seed_orders(user, recipe, 3, base=datetime(2018, 3, 1, 8))]
+    window = "from=2018-03-01T00:00:00&to=2018-03-02T00:00:00"
+
+    res = client.get(f"/orders/export?format=csv&{window}", headers=admin_headers)
+    rows = list(csv.DictReader(io.StringIO(res.get_data(as_text=True))))
+
+    assert res.status_code == 200 and res.mimetype == "text/csv"
+    assert [int(r["id"]) for r in rows] == seeded
+    assert rows[0]["recipe_name"] == "Exported, Espresso"
+    assert rows[0]["username"] == user.username
+
+    res = client.get(
+        f"/orders/export?format=ndjson&{window}",
+        headers={**admin_headers, "Accept-Encoding": "gzip"},
+    )
+    assert res.headers["Content-Encoding"] == "gzip"
+    lines = gzip.decompress(res.get_data()).decode().splitlines()
+    assert [json.loads(line)["id"] for line in lines] == seeded
+
+    res = client.get(
+        f"/orders/export?format=ndjson&{window}",
+        headers={**admin_headers, "Accept-Encoding": "gzip;q=0, identity"},
+    )
+    assert "Content-Encoding" not in res.headers
+    assert [json.loads(line)["id"] for line in res.get_data(as_text=True).splitlines()] == seeded
+
+
+def test_export_orders_is_admin_only(client, make_user):
+    _, headers = make_user()
+    assert client.get("/orders/export", headers=headers).status_code == 403
+
+
+def test_status_update_is_one_guarded_statement(client, make_user, make_recipe):
+    user, _ = make_user()
+    _, admin_headers = make_user(role="Admin")
+    order_id = _seed_orders(user, make_recipe(), 1)[0].id
+
+    def _confirm():
+        res = client.patch(f"/orders/{order_id}", json={"status": "Confirmed"}, headers=admin_headers)
+        assert res.status_code == 200
+
+    # Only the JWT/rollup plumbing may read; the order itself is never SELECTed.
+    assert not [s for s in _selects_during(_confirm) if 'FROM "order"' in s]
+
+    res = client.patch(f"/orders/{order_id}", json={"status": "Pending"}, headers=admin_headers)
+    assert res.status_code == 409
+    res = client.patch(f"/orders/{order_id}", json={"status": "Delivered"}, headers=admin_headers)
+    assert res.status_code == 409
+    assert client.patch("/orders/999999", json={"status": "Shipped"}, headers=admin_headers).status_code == 404
+
+
+def test_guarded_mutations_report_403_404_409(client, make_user, make_recipe):
+    user, headers = make_user()
+    _, other_headers = make_user()
+    _, admin_headers = make_user(role="Admin")
+    pending, shipped = (o.id for o in _seed_orders(user, make_recipe(), 2))
+    client.patch("/orders/bulk", json={"status": "Confirmed", "ids": [shipped]}, headers=admin_headers)
+    client.patch(f"/orders/{shipped}", json={"status": "Shipped"}, headers=admin_headers)
+
+    assert client.patch(f"/orders/{pending}", json={"quantity": 2}, headers=other_headers).status_code == 403
+    assert client.patch(f"/orders/{shipped}", json={"quantity": 2}, headers=headers).status_code == 409
+    assert client.delete(f"/orders/{shipped}", headers=headers).status_code == 403
+    assert client.delete(f"/orders/{shipped}", headers=other_headers).status_code == 403
+    assert client.delete(f"/orders/{pending}", headers=other_headers).status_code == 403
+    assert client.delete("/orders/999999", headers=headers).status_code == 404
+
+    res = client.patch(f"/orders/{pending}", json={"quantity": 4}, headers=headers)
+    assert res.status_code == 200 and res.get_json()["data"]["quantity"] == 4
+    assert client.delete(f"/orders/{pending}", headers=headers).status_code == 200
+    assert client.delete(f"/orders/{shipped}", headers=admin_headers).status_code == 200
+
+
+def test_quantity_edit_is_one_statement_that_reports_the_replaced_values(client, make_user, make_recipe):
+    from app.api.dependencies import get_sales_service
+
+    user, headers = make_user()
+    _, admin_headers = make_user(role="Admin")
+    recipe = make_recipe(name="Single Statement Flat White", price=3.0)
+    order_id = _seed_orders(user, recipe, 1)[0].id
+    sales = get_sales_service()
+    sales.rebuild()  # _seed_orders bypasses the rollups
+    client.patch(f"/orders/{order_id}", json={"status": "Confirmed"}, headers=admin_headers)
+
+    def _edit():
+        res = client.patch(
+            f"/orders/{order_id}", json={"quantity": 5, "status": "Cancelled"}, headers=admin_headers
+        )
+        assert res.status_code == 200
+
+    # The previous quantity and status come back from the UPDATE itself.
+    assert not [s for s in _selects_during(_edit) if 'FROM "order"' in s]
+
+    # ...and the rollup deltas built from them match a full rebuild.
+    day = db.session.get(Order, order_id).ordered_at.date()
+
+    def _totals():
+        # Deltas can leave zeroed rows behind; a rebuild doesn't write them.
+        def nonzero(rows):
+            return [r for r in rows if r["orders"] or r["quantity"] or r["revenue"]]
+
+        return (
+            nonzero(sales.by_status(day, day)["statuses"]),
+            nonzero(sales.by_recipe(day, day)["recipes"]),
+        )
+
+    incremental = _totals()
+    sales.rebuild()
+    assert _totals() == incremental
+
+
+def test_me_summary_follows_order_writes_and_matches_rebuild(client, make_user, make_recipe):
+    from app.api.dependencies import get_user_summary_service
+
+    user, headers = make_user()
+    _, admin_headers = make_user(role="Admin")
+    latte = make_recipe(name="Summary Latte", price=4.0)
+    mocha = make_recipe(name="Summary Mocha", price=5.0)
+    assert client.get("/me/summary", headers=headers).get_json()["data"]["order_count"] == 0
+
+    client.post("/orders/cart", headers=headers, json={"items": [
+        {"recipe_id": latte.id, "quantity": 3}, {"recipe_id": mocha.id, "quantity": 2},
+    ]})
+    newest = client.post("/orders/", headers=headers,
+                         json={"recipe_id": mocha.id, "quantity": 2}).get_json()["data"]["order_id"]
+
+    selects = _selects_during(lambda: client.get("/me/summary", headers=headers))
+    assert len(selects) == 1 and "user_order_summary.user_id =" in selects[0]
+    data = client.get("/me/summary", headers=headers).get_json()["data"]
+    assert (data["order_count"], data["quantity"], data["total_spend"]) == (3, 7, 32.0)
+    assert data["favourite_recipe"] == {
+        "recipe_id": mocha.id, "recipe_name": "Summary Mocha", "quantity": 4,
+    }
+    assert data["last_order"]["order_id"] == newest
+
+    # Cancelling the newest order moves both the favourite and the last order back.
+    client.patch("/orders/bulk", headers=admin_headers, json={"status": "Cancelled", "ids": [newest]})
+    data = client.get("/me/summary", headers=headers).get_json()["data"]
+    assert (data["order_count"], data["total_spend"]) == (2, 22.0)
+    assert data["favourite_recipe"]["recipe_id"] == latte.id
+    assert data["last_order"]["order_id"] != newest
+
+    get_user_summary_service().rebuild()
+    assert client.get("/me/summary", headers=headers).get_json()["data"] == data
+
+
+def test_prep_queue_incremental_updates_match_full_replan():
+    from app.services.prep_queue import PrepMethod, PrepQueue
+
+    espresso = PrepMethod(1, "Espresso", 90, equipment="espresso machine")
+    cold = PrepMethod(2, "Cold Brew", 60, batch_size=12)
+    pour = PrepMethod(3, "Pour Over", 240)
+    methods = {10: espresso, 20: cold, 30: pour}
+    # (order_id, recipe_id, quantity, ordered_at), oldest first.
+    orders = [(1, 10, 1, 0), (2, 20, 3, 10), (3, 10, 2, 20), (4, 30, 1, 30), (5, 20, 4, 40)]
+    now = 100.0
+
+    def placements(queue):
+        return {t.order_id: (b.station, b.start, b.end) for b in queue.plan() for t in b.tickets}
+
+    def planned(subset):
+        fresh = PrepQueue()
+        fresh.rebuild(methods, subset, stations=2, promise_seconds=600, now=now)
+        return placements(fresh)
+
+    queue = PrepQueue()
+    queue.rebuild(methods, orders[:1], stations=2, promise_seconds=600, now=now)
+    for order in orders[1:]:
+        assert queue.add(*order, now=now)
+    assert placements(queue) == planned(orders)
+
+    batches = queue.plan()
+    assert [t.order_id for t in batches[1].tickets] == [2, 5]  # one Cold Brew pour
+    machine = sorted((b.start, b.end) for b in batches if b.method == espresso)
+    assert all(a_end <= b_start for (_, a_end), (b_start, _) in zip(machine, machine[1:]))
+
+    # Dropping a cup from a batch with spare capacity moves nothing.
+    before = placements(queue)
+    queue.remove(5, now=now)
+    assert placements(queue) == {k: v for k, v in before.items() if k != 5}
+    # Cancelling a pending espresso re-plans everything behind it.
+    queue.remove(1, now=now)
+    assert placements(queue) == planned([orders[1], orders[2], orders[3]])
+    # A started batch finishing early frees its station from that moment.
+    queue.remove(2, now=now + 30)
+    assert placements(queue)[4] == (0, now + 30, now + 270)
+
+    assert queue.add(6, 999, 1, 50, now=now) is False
+    assert queue.stale
+
+
+def test_eta_fallback_rebuilds_once_for_concurrent_misses():
+    import threading
+    import time
+    from types import SimpleNamespace
+
+    from app.services.prep_queue import PrepQueue
+    from app.services.prep_queue_service import PrepQueueService
+
+    rebuilds = []
+
+    class Orders:
+        def find_facts(self, order_id):
+            return SimpleNamespace(user_id=1, status="Confirmed")
+
+        def find_facts_by_status(self, status):
+            rebuilds.append(status)
+            time.sleep(0.05)  # long enough for every caller to miss
+            return []
+
+    class Recipes:
+        def prep_methods(self):
+            return []
+
+    service = PrepQueueService(
+        queue=PrepQueue(), order_repo=Orders(), recipe_repo=Recipes(),
+        stations=1, promise_minutes=15, refresh_seconds=3600,
+    )
+    service.rebuild()
+    start = threading.Barrier(4)
+
+    def ask():
+        start.wait()
+        service.eta(42, requesting_user_id=1, requesting_user_role="User")
+
+    threads = [threading.Thread(target=ask) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # The initial build plus one shared fallback, not one per caller.
+    assert len(rebuilds) == 2
+
+
+def test_prep_queue_and_eta_follow_status_changes(app, client, make_user, make_recipe):
+    import time
+
+    from app.models.brew_method import BrewMethod
+
+    _, admin_headers = make_user(role="Admin")
+    user, headers = make_user()
+    _, other_headers = make_user()
+    res = client.post("/brew_methods/", headers=admin_headers, json={
+        "name": "Prep Queue Cold Brew", "prep_seconds": 60, "batch_size": 12,
+    })
+    assert res.status_code == 201
+    method = BrewMethod.query.filter_by(name="Prep Queue Cold Brew").one()
+    assert client.patch(f"/brew_methods/{method.id}", headers=admin_headers,
+                        json={"batch_size": 0}).status_code == 400
+    recipe = make_recipe(name="Prep Queue Brew", brew_method_id=method.id)
+
+    order_ids = client.post("/orders/cart", headers=headers, json={"items": [
+        {"recipe_id": recipe.id, "quantity": 2}, {"recipe_id": recipe.id, "quantity": 3},
+    ]}).get_json()["data"]["order_ids"]
+    assert client.get(f"/orders/{order_ids[0]}/eta", headers=headers).get_json()["data"] == {
+        "order_id": order_ids[0], "status": "Pending", "queued": False,
+    }
+    assert client.get(f"/orders/{order_ids[0]}/eta", headers=other_headers).status_code == 403
+    assert client.get("/orders/prep-queue", headers=headers).status_code == 403
+
+    client.patch(f"/orders/{order_ids[0]}", headers=admin_headers, json={"status": "Confirmed"})
+    eta = client.get(f"/orders/{order_ids[0]}/eta", headers=headers).get_json()["data"]
+    assert eta["queued"] and eta["brew_method"] == "Prep Queue Cold Brew"
+
+    # The second confirmation reaches the queue through the change bus.
+    client.patch(f"/orders/{order_ids[1]}", headers=admin_headers, json={"status": "Confirmed"})
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline:
+        data = client.get("/orders/prep-queue", headers=admin_headers).get_json()["data"]
+        queued = {o["order_id"]: b for b in data["batches"] for o in b["orders"]}
+        if order_ids[1] in queued:
+            break
+        time.sleep(0.02)
+    assert queued[order_ids[1]]["brew_method"] == "Prep Queue Cold Brew"
+    eta = client.get(f"/orders/{order_ids[1]}/eta", headers=headers).get_json()["data"]
+    assert eta["eta"] == queued[order_ids[1]]["eta"]
+
+    client.patch(f"/orders/{order_ids[0]}", headers=admin_headers, json={"status": "Shipped"})
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline:
+        data = client.get("/orders/prep-queue", headers=admin_headers).get_json()["data"]
+        queued = {o["order_id"] for b in data["batches"] for o in b["orders"]}
+        if order_ids[0] not in queued:
+            break
+        time.sleep(0.02)
+    assert order_ids[0] not in queued and order_ids[1] in queued
+
+
+def test_orders_reserve_ingredient_stock_and_mark_recipes_sold_out(client, make_user, make_recipe):
+    from app.models.ingredient import Ingredient
+
+    _, admin_headers = make_user(role="Admin")
+    _, headers = make_user()
+    oat, syrup = Ingredient(name="Stock Oat Milk"), Ingredient(name="Stock Syrup")
+    db.session.add_all([oat, syrup])
+    db.session.commit()
+    latte, flat_white = make_recipe(name="Stock Oat Latte"), make_recipe(name="Stock Flat White")
+    client.put(f"/recipes/{latte.id}", headers=admin_headers, json={"ingredients": [
+        {"ingredient_id": oat.id, "quantity": "200ml"},
+        {"ingredient_id": syrup.id, "quantity": "10ml"},  # untracked: no stock row
+    ]})
+    client.put(f"/recipes/{flat_white.id}", headers=admin_headers,
+               json={"ingredients": [{"ingredient_id": oat.id, "quantity": "150ml"}]})
+    stock_url = f"/ingredients/{oat.id}/stock"
+    assert client.put(stock_url, headers=admin_headers,
+                      json={"unit": "ml", "quantity": 500}).status_code == 200
+
+    order = client.post("/orders/", headers=headers, json={"recipe_id": latte.id, "quantity": 2})
+    assert order.status_code == 201
+    assert client.get(stock_url, headers=admin_headers).get_json()["data"][0]["quantity"] == 100
+    # 100 ml left: neither recipe can be made, and the catalog says so.
+    assert client.get(f"/recipes/{latte.id}").get_json()["data"]["sold_out"] is True
+    catalog = {r["id"]: r["sold_out"] for r in client.get("/recipes/").get_json()["data"]}
+    assert catalog[flat_white.id] is True
+
+    res = client.post("/orders/", headers=headers, json={"recipe_id": flat_white.id})
+    assert res.status_code == 409
+    assert "Stock Oat Milk" in res.get_json()["message"]
+
+    # Cancelling gives the reservation back; a cart is reserved all-or-nothing.
+    order_id = order.get_json()["data"]["order_id"]
+    client.patch("/orders/bulk", headers=admin_headers, json={"status": "Cancelled", "ids": [order_id]})
+    assert client.get(f"/recipes/{latte.id}").get_json()["data"]["sold_out"] is False
+    res = client.post("/orders/cart", headers=headers, json={"items": [
+        {"recipe_id": latte.id, "quantity": 1}, {"recipe_id": flat_white.id, "quantity": 3},
+    ]})
+    assert res.status_code == 409
+    assert client.get(stock_url, headers=admin_headers).get_json()["data"][0]["quantity"] == 500
+
+    client.post(stock_url, headers=admin_headers, json={"unit": "ml", "quantity": 250})
+    res = client.post("/orders/cart", headers=headers, json={"items": [
+        {"recipe_id": latte.id, "quantity": 1}, {"recipe_id": flat_white.id, "quantity": 3},
+    ]})
+    assert res.status_code == 201
+    assert client.get(stock_url, headers=admin_headers).get_json()["data"][0]["quantity"] == 100
+
+
+def test_cancel_and_delete_release_exactly_what_the_order_reserved(client, make_user, make_recipe):
+    from app.models.ingredient import Ingredient
+    from app.models.order_stock_reservation import OrderStockReservation
+
+    _, admin_headers = make_user(role="Admin")
+    _, headers = make_user()
+    milk = Ingredient(name="Reserved Milk")
+    db.session.add(milk)
+    db.session.commit()
+    recipe = make_recipe(name="Reserved Cappuccino")
+    recipe_url, stock_url = f"/recipes/{recipe.id}", f"/ingredients/{milk.id}/stock"
+    client.put(recipe_url, headers=admin_headers,
+               json={"ingredients": [{"ingredient_id": milk.id, "quantity": "100ml"}]})
+
+    def stock():
+        return client.get(stock_url, headers=admin_headers).get_json()["data"][0]["quantity"]
+
+    def place(quantity=1):
+        res = client.post("/orders/", headers=headers, json={"recipe_id": recipe.id, "quantity": quantity})
+        assert res.status_code == 201
+        return res.get_json()["data"]["order_id"]
+
+    # Placed before milk was tracked: it reserved nothing, so cancelling gives nothing back.
+    untracked = place()
+    client.put(stock_url, headers=admin_headers, json={"unit": "ml", "quantity": 600})
+    client.patch("/orders/bulk", headers=admin_headers, json={"status": "Cancelled", "ids": [untracked]})
+    assert stock() == 600
+
+    # Recipe edits after placing don't change what the order gives back.
+    edited = place()
+    assert stock() == 500
+    client.put(recipe_url, headers=admin_headers,
+               json={"ingredients": [{"ingredient_id": milk.id, "quantity": "250ml"}]})
+    assert client.delete(f"/orders/{edited}", headers=headers).status_code == 200
+    assert stock() == 600
+
+    # Quantity edits scale the reservation; shipping uses it up.
+    resized = place()
+    assert stock() == 350
+    assert client.patch(f"/orders/{resized}", headers=headers, json={"quantity": 2}).status_code == 200
+    assert stock() == 100
+    for status in ("Confirmed", "Shipped"):
+        client.patch("/orders/bulk", headers=admin_headers, json={"status": status, "ids": [resized]})
+    assert db.session.query(OrderStockReservation).filter_by(order_id=resized).count() == 0
+    assert client.delete(f"/orders/{resized}", headers=admin_headers).status_code == 200
+    assert stock() == 100
+
+
+def test_import_pos_history_is_idempotent_and_rebuilds_rollups(app, make_user, make_recipe, tmp_path):
+    import gzip
+    import json
+
+    from sqlalchemy import inspect
+
+    from app.models.daily_recipe_sales import DailyRecipeSales
+
+    user, _ = make_user()
+    recipe = make_recipe(name="POS Flat White", price=3.5)
+    csv_path = tmp_path / "pos.csv"
+    csv_path.write_text(
+        "transaction_id,ordered_at,username,recipe_name,quantity,unit_price,status\n"
+        f"T1,2019-05-01T08:00:00,{user.username},POS Flat White,2,3.00,\n"
+        f"T2,2019-05-01T09:30:00+02:00,{user.username},POS Flat White,1,,Cancelled\n"
+        f"T1,2019-05-01T08:00:00,{user.username},POS Flat White,2,3.00,\n"
+        "T3,2019-05-01T10:00:00,nobody,POS Flat White,1,,\n"
+        f"T4,2019-05-01T10:00:00,{user.username},POS Flat White,zero,,\n"
+    )
+    ndjson_path = tmp_path / "pos.ndjson.gz"
+    with gzip.open(ndjson_path, "wt") as f:
+        f.write(json.dumps({
+            "transaction_id": "T5", "ordered_at": "2019-05-02T08:00:00",
+            "username": user.username, "recipe_name": "POS Flat White", "quantity": 3,
+        }) + "\nnot json\n")
+
+    runner = app.test_cli_runner()
+    first = runner.invoke(args=["orders", "import-pos", str(csv_path), "--chunk-size", "2"])
+    assert first.exit_code == 0, first.output
+    assert "Read 5 records: 2 imported, 1 duplicates skipped, 2 rejected" in first.output
+    assert "line 5: unknown user 'nobody'" in first.output
+    assert "line 6: quantity is not an integer" in first.output
+
+    rerun = runner.invoke(args=["orders", "import-pos", str(csv_path)])
+    assert "Read 5 records: 0 imported, 3 duplicates skipped, 2 rejected" in rerun.output
+    ndjson = runner.invoke(args=["orders", "import-pos", str(ndjson_path), "--keep-indexes"])
+    assert "Read 2 records: 1 imported, 0 duplicates skipped, 1 rejected" in ndjson.output
+
+    orders = db.session.query(Order).filter_by(user_id=user.id).order_by(Order.ordered_at).all()
+    assert [(o.quantity, o.unit_price, o.status, o.ordered_at.hour) for o in orders] == [
+        (1, 3.5, "Cancelled", 7),  # 09:30+02:00 stored as UTC; price from the recipe
+        (2, 3.0, "Delivered", 8),
+        (3, 3.5, "Delivered", 8),
+    ]
+    rollup = (
+        db.session.query(DailyRecipeSales)
+        .filter_by(recipe_id=recipe.id)
+        .order_by(DailyRecipeSales.day)
+        .all()
+    )
+    assert [(r.order_count, r.quantity) for r in rollup] == [(1, 2), (1, 3)]
+    indexes = {ix["name"] for ix in inspect(db.engine).get_indexes("order")}
+    assert {ix.name for ix in Order.__table__.indexes} <= indexes
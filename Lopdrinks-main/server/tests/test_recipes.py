@@ -14,3 +14,127 @@ def test_create_recipe_requires_auth(client):
     """POST /recipes/ without a token should return 401."""
     res = client.post("/recipes/", json={"name": "Espresso", "price": 3.5, "brew_method_id": 1})
     assert res.status_code == 401
+
+
+def test_popular_recipes_rebuild_from_rollups_then_follow_orders(app, client, make_user, make_recipe):
+    import time
+
+    from app.api.dependencies import get_popularity_service
+
+    _, headers = make_user()
+    steady, surge = make_recipe(name="Popular Flat White"), make_recipe(name="Surging Affogato")
+    client.post("/orders/cart", json={"items": [{"recipe_id": steady.id, "quantity": 500}]}, headers=headers)
+    with app.app_context():
+        get_popularity_service().rebuild()
+
+    res = client.get("/recipes/popular?k=1&window=trending")
+    assert res.status_code == 200
+    data = res.get_json()["data"]
+    assert data["window"] == "trending"
+    assert [r["recipe_id"] for r in data["recipes"]] == [steady.id]
+    assert data["recipes"][0]["name"] == "Popular Flat White"
+
+    # New orders reach the board through the change bus, no rebuild needed.
+    client.post("/orders/", json={"recipe_id": surge.id, "quantity": 900}, headers=headers)
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline:
+        top = client.get("/recipes/popular?k=2").get_json()["data"]["recipes"]
+        if top[0]["recipe_id"] == surge.id:
+            break
+        time.sleep(0.02)
+    assert [r["recipe_id"] for r in top] == [surge.id, steady.id]
+
+
+def test_popular_recipes_rejects_unknown_window(client):
+    res = client.get("/recipes/popular?window=decade")
+    assert res.status_code == 400
+
+
+def test_also_ordered_ranks_co_purchases_and_follows_new_orders(app, client, make_user, make_recipe):
+    import time
+
+    from app.api.dependencies import get_co_occurrence_service
+
+    mocha, scone, bagel, tea = (make_recipe(name=f"Cross-sell {n}") for n in range(4))
+    baskets = [(mocha, scone), (mocha, scone, bagel), (mocha, bagel)]
+    for items in baskets:
+        _, headers = make_user()
+        lines = [{"recipe_id": r.id, "quantity": 1} for r in items]
+        client.post("/orders/cart", json={"items": lines}, headers=headers)
+    # A deleted order doesn't count as having bought tea.
+    _, headers = make_user()
+    order = client.post("/orders/cart", json={"items": [
+        {"recipe_id": mocha.id}, {"recipe_id": tea.id},
+    ]}, headers=headers).get_json()["data"]["order_ids"][1]
+    client.delete(f"/orders/{order}", headers=headers)
+    with app.app_context():
+        get_co_occurrence_service().rebuild()
+
+    res = client.get(f"/recipes/{mocha.id}/also_ordered?k=5")
+    assert res.status_code == 200
+    data = res.get_json()["data"]
+    assert data["customers"] == 4
+    assert [(r["recipe_id"], r["customers"]) for r in data["also_ordered"]] == [
+        (scone.id, 2), (bagel.id, 2),
+    ]
+
+    # A new customer buying bagel + tea shows up without a rebuild.
+    _, headers = make_user()
+    for recipe in (bagel, tea):
+        client.post("/orders/", json={"recipe_id": recipe.id}, headers=headers)
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline:
+        related = client.get(f"/recipes/{tea.id}/also_ordered").get_json()["data"]["also_ordered"]
+        if related:
+            break
+        time.sleep(0.02)
+    assert [r["recipe_id"] for r in related] == [bagel.id]
+
+    assert client.get("/recipes/999999/also_ordered").status_code == 404
+
+
+def test_recipe_views_are_written_behind_and_joined_with_orders(app, client, make_user, make_recipe):
+    from sqlalchemy import event
+
+    from app.api.dependencies import get_view_counter
+    from app.extensions import db
+
+    _, admin_headers = make_user(role="Admin")
+    _, headers = make_user()
+    viewed, ordered = make_recipe(name="Viewed Mocha"), make_recipe(name="Viewed Cortado")
+    get_view_counter().flush()
+
+    writes: list[str] = []
+
+    def _record(conn, cursor, statement, *args):
+        if not statement.lstrip().upper().startswith("SELECT"):
+            writes.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _record)
+    try:
+        for recipe, views in ((viewed, 40), (ordered, 10)):
+            for _ in range(views):
+                assert client.get(f"/recipes/{recipe.id}").status_code == 200
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _record)
+    assert writes == []  # views stay in memory until the flush
+
+    client.post("/orders/cart", headers=headers, json={"items": [
+        {"recipe_id": ordered.id, "quantity": 2}, {"recipe_id": ordered.id, "quantity": 1},
+    ]})
+
+    def conversion():
+        res = client.get("/admin/sales/conversion?k=200", headers=admin_headers)
+        return {r["recipe_id"]: r for r in res.get_json()["data"]["recipes"]}
+
+    # Unflushed views from this worker already count...
+    before = conversion()
+    assert (before[viewed.id]["views"], before[viewed.id]["conversion"]) == (40, 0.0)
+    assert (before[ordered.id]["orders"], before[ordered.id]["conversion"]) == (2, 0.2)
+
+    # ...and a flush writes them with one batched UPDATE.
+    assert get_view_counter().flush() == 50
+    db.session.expire_all()
+    assert (viewed.views, ordered.views) == (40, 10)
+    assert conversion() == before
+    assert client.get("/admin/sales/conversion", headers=headers).status_code == 403